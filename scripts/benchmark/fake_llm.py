@@ -0,0 +1,196 @@
+"""
+基准测试用的本地 LLM 客户端
+
+通过 ClientRegistry 注册为所有 client_type 的实现，替代真实的 API 调用：
+- 对话请求返回固定候选回复（按输入内容哈希选择，结果可复现）
+- 嵌入请求返回确定性向量：由字符二元组的哈希向量叠加后归一化，
+  共享字词的文本彼此相似，使向量检索的行为接近真实情况
+- 每次请求按配置的延迟等待，模拟网络与推理耗时
+"""
+
+import asyncio
+import hashlib
+from collections.abc import Callable
+from typing import Any, ClassVar
+
+import numpy as np
+
+from src.llm_models.model_client.base_client import APIResponse, BaseClient, UsageRecord, client_registry
+from src.llm_models.payload_content.message import Message
+from src.llm_models.payload_content.resp_format import RespFormat
+from src.llm_models.payload_content.tool_option import ToolOption
+
+CANNED_COMPLETIONS = [
+    "好的，我知道了",
+    "哈哈，这个挺有意思的",
+    "嗯嗯，我也这么觉得",
+    "真的吗？展开说说",
+    "我去看看再回你",
+]
+
+# 注册表中的全部客户端类型（见 APIProvider.client_type）
+CLIENT_TYPES = ("openai", "gemini", "aiohttp_gemini")
+
+
+class FakeLLMSettings:
+    """所有 FakeClient 实例共享的配置与统计"""
+
+    latency: float = 0.0  # 每次请求的模拟延迟（秒）
+    embedding_dimension: int = 1024
+    completions: ClassVar[list[str]] = CANNED_COMPLETIONS
+    calls: ClassVar[dict[str, int]] = {"response": 0, "embedding": 0, "audio": 0}
+
+
+def _stable_hash(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+
+
+_gram_vectors: dict[str, np.ndarray] = {}
+
+
+def _gram_vector(gram: str, dim: int) -> np.ndarray:
+    key = f"{dim}:{gram}"
+    vector = _gram_vectors.get(key)
+    if vector is None:
+        vector = np.random.default_rng(_stable_hash(gram)).standard_normal(dim).astype(np.float32)
+        _gram_vectors[key] = vector
+    return vector
+
+
+def deterministic_embedding(text: str, dim: int) -> list[float]:
+    """根据文本生成确定性的单位向量"""
+    grams = [text[i : i + 2] for i in range(max(1, len(text) - 1))] or [""]
+    vector = np.zeros(dim, dtype=np.float32)
+    for gram in grams:
+        vector += _gram_vector(gram, dim)
+    norm = float(np.linalg.norm(vector))
+    if norm > 0:
+        vector /= norm
+    return vector.tolist()
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 2)
+
+
+def _message_text(message: Message) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(part if isinstance(part, str) else "" for part in message.content)
+
+
+class FakeClient(BaseClient):
+    """返回固定结果的本地客户端"""
+
+    async def _simulate_latency(self, interrupt_flag: asyncio.Event | None = None) -> None:
+        if FakeLLMSettings.latency <= 0:
+            return
+        if interrupt_flag is None:
+            await asyncio.sleep(FakeLLMSettings.latency)
+            return
+        try:
+            await asyncio.wait_for(interrupt_flag.wait(), timeout=FakeLLMSettings.latency)
+        except asyncio.TimeoutError:
+            return
+        raise asyncio.CancelledError("请求被中断")
+
+    async def get_response(
+        self,
+        model_info,
+        message_list: list[Message],
+        tool_options: list[ToolOption] | None = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        response_format: RespFormat | None = None,
+        stream_response_handler: Callable | None = None,
+        async_response_parser: Callable | None = None,
+        interrupt_flag: asyncio.Event | None = None,
+        extra_params: dict[str, Any] | None = None,
+    ) -> APIResponse:
+        FakeLLMSettings.calls["response"] += 1
+        await self._simulate_latency(interrupt_flag)
+
+        prompt = "".join(_message_text(m) for m in message_list)
+        if response_format is not None:
+            content = "{}"
+        else:
+            completions = FakeLLMSettings.completions
+            content = completions[_stable_hash(prompt) % len(completions)]
+
+        prompt_tokens = _estimate_tokens(prompt)
+        completion_tokens = _estimate_tokens(content)
+        return APIResponse(
+            content=content,
+            usage=UsageRecord(
+                model_name=model_info.name,
+                provider_name=model_info.api_provider,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+    async def get_embedding(
+        self,
+        model_info,
+        embedding_input: str | list[str],
+        extra_params: dict[str, Any] | None = None,
+    ) -> APIResponse:
+        FakeLLMSettings.calls["embedding"] += 1
+        await self._simulate_latency()
+
+        dim = FakeLLMSettings.embedding_dimension
+        if isinstance(embedding_input, list):
+            embedding: list[float] | list[list[float]] = [deterministic_embedding(t, dim) for t in embedding_input]
+            prompt_tokens = sum(_estimate_tokens(t) for t in embedding_input)
+        else:
+            embedding = deterministic_embedding(embedding_input, dim)
+            prompt_tokens = _estimate_tokens(embedding_input)
+
+        return APIResponse(
+            embedding=embedding,
+            usage=UsageRecord(
+                model_name=model_info.name,
+                provider_name=model_info.api_provider,
+                prompt_tokens=prompt_tokens,
+                total_tokens=prompt_tokens,
+            ),
+        )
+
+    async def get_audio_transcriptions(
+        self,
+        model_info,
+        audio_base64: str,
+        extra_params: dict[str, Any] | None = None,
+    ) -> APIResponse:
+        FakeLLMSettings.calls["audio"] += 1
+        await self._simulate_latency()
+        return APIResponse(content="（语音）你好")
+
+    def get_support_image_formats(self) -> list[str]:
+        return ["jpg", "jpeg", "png", "webp", "gif"]
+
+
+def install_fake_llm(latency: float = 0.0, embedding_dimension: int | None = None) -> None:
+    """
+    用 FakeClient 替换所有已注册的客户端类型
+
+    先导入真实客户端模块，确保它们的注册不会在之后覆盖 FakeClient；
+    同时清空实例缓存，避免沿用已创建的真实客户端。
+    """
+    import src.llm_models.model_client  # noqa: F401
+    from src.config.config import global_config
+
+    FakeLLMSettings.latency = latency
+    if embedding_dimension is not None:
+        FakeLLMSettings.embedding_dimension = embedding_dimension
+    elif global_config is not None:
+        FakeLLMSettings.embedding_dimension = global_config.lpmm_knowledge.embedding_dimension
+
+    for client_type in CLIENT_TYPES:
+        client_registry.register_client_class(client_type)(FakeClient)
+    client_registry.client_instance_cache.clear()
+
+
+def get_call_stats() -> dict[str, int]:
+    return dict(FakeLLMSettings.calls)
@@ -0,0 +1,136 @@
+"""
+基准测试公共设施
+
+- LatencyRecorder：记录单次操作耗时，汇总吞吐量与 p50/p95/p99 延迟
+- temporary_sqlite_database：把全局数据库切换到临时 SQLite 文件，结束后恢复并清理
+- write_report：以稳定的键顺序输出 JSON 报告，便于不同运行之间直接 diff
+"""
+
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    """最近秩法计算百分位数（输入需已排序）"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+@dataclass
+class LatencyRecorder:
+    """单个指标的耗时记录器"""
+
+    name: str
+    samples: list[float] = field(default_factory=list)  # 单次耗时（秒）
+    errors: int = 0
+    _wall_start: float | None = None
+    _wall_end: float | None = None
+
+    def start(self) -> None:
+        """开始计时整段运行（用于计算吞吐量）"""
+        self._wall_start = time.perf_counter()
+
+    def stop(self) -> None:
+        self._wall_end = time.perf_counter()
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def record_error(self) -> None:
+        self.errors += 1
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        """测量 with 块的耗时，块内抛出的异常计为错误并继续向外抛出"""
+        begin = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.errors += 1
+            raise
+        self.samples.append(time.perf_counter() - begin)
+
+    def summary(self) -> dict[str, Any]:
+        """汇总统计（延迟单位为毫秒）"""
+        ordered = sorted(self.samples)
+        count = len(ordered)
+        if self._wall_start is not None and self._wall_end is not None:
+            wall = self._wall_end - self._wall_start
+        else:
+            wall = sum(ordered)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "wall_seconds": round(wall, 6),
+            "throughput_per_sec": round(count / wall, 3) if wall > 0 else 0.0,
+            "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+        }
+
+
+@asynccontextmanager
+async def temporary_sqlite_database() -> AsyncIterator[Path]:
+    """
+    使用临时 SQLite 数据库运行基准测试
+
+    必须在任何数据库连接创建之前进入：这里会关闭已有引擎、切换配置并重建会话工厂，
+    退出时关闭写入队列与引擎、恢复原配置并删除临时目录。
+    """
+    from src.common.database.core import close_engine, create_all_tables, reset_session_factory
+    from src.common.database.optimization.write_queue import close_write_queue
+    from src.config.config import global_config
+
+    assert global_config is not None
+    db_config = global_config.database
+    original = (db_config.database_type, db_config.sqlite_path)
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="mofox_bench_"))
+    await close_engine()
+    await reset_session_factory()
+    db_config.database_type = "sqlite"
+    db_config.sqlite_path = str(tmp_dir / "benchmark.db")
+
+    try:
+        await create_all_tables()
+        yield tmp_dir
+    finally:
+        await close_write_queue()
+        await close_engine()
+        await reset_session_factory()
+        db_config.database_type, db_config.sqlite_path = original
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def environment_info() -> dict[str, Any]:
+    """记录运行环境，方便解读不同机器上的结果"""
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_report(report: dict[str, Any], output: str | None) -> None:
+    """输出 JSON 报告（output 为空时写到标准输出）"""
+    text = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True)
+    if output:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        Path(output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
@@ -0,0 +1,118 @@
+"""
+合成 OneBot v11 消息生成器
+
+按固定种子生成群聊 / 私聊消息事件（文本、@、表情段混合），
+并按 napcat 适配器的规则转换为 MessageEnvelope，无需连接真实的 QQ 客户端。
+"""
+
+import random
+import time
+from typing import Any
+
+from mofox_wire import MessageBuilder
+
+WORDS = [
+    "今天", "天气", "不错", "吃饭", "了吗", "晚上", "一起", "打游戏", "学习", "好累",
+    "哈哈", "这个", "好像", "有点", "意思", "明天", "考试", "加油", "电影", "推荐",
+    "猫猫", "可爱", "周末", "出去", "玩", "下雨", "记得", "带伞", "新闻", "看到",
+]
+
+# 部分 QQ 表情 ID 与名称（转换规则同 napcat 适配器的 QQ_FACE）
+FACES = {"14": "微笑", "21": "可爱", "76": "赞", "178": "斜眼笑", "277": "汪汪"}
+
+ACCEPT_FORMAT = ["text", "image", "emoji", "reply", "voice", "command", "voiceurl", "music", "videourl", "file"]
+
+
+class OneBotMessageGenerator:
+    """按种子生成可复现的 OneBot 消息事件"""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        group_count: int = 4,
+        users_per_group: int = 20,
+        private_ratio: float = 0.2,
+        self_id: int = 10000,
+    ):
+        self._rng = random.Random(seed)
+        self.self_id = self_id
+        self.group_ids = [800000 + i for i in range(group_count)]
+        self.user_ids = [100000 + i for i in range(users_per_group)]
+        self.private_ratio = private_ratio
+        self._message_seq = 0
+
+    def _text(self) -> str:
+        return "".join(self._rng.choice(WORDS) for _ in range(self._rng.randint(2, 12)))
+
+    def _segments(self, is_group: bool) -> list[dict[str, Any]]:
+        segments: list[dict[str, Any]] = []
+        if is_group and self._rng.random() < 0.15:
+            segments.append({"type": "at", "data": {"qq": str(self._rng.choice(self.user_ids))}})
+        segments.append({"type": "text", "data": {"text": self._text()}})
+        if self._rng.random() < 0.1:
+            segments.append({"type": "face", "data": {"id": self._rng.choice(list(FACES))}})
+        return segments
+
+    def next_event(self) -> dict[str, Any]:
+        """生成下一条原始 OneBot 消息事件"""
+        self._message_seq += 1
+        is_group = self._rng.random() >= self.private_ratio
+        user_id = self._rng.choice(self.user_ids)
+        event: dict[str, Any] = {
+            "post_type": "message",
+            "message_type": "group" if is_group else "private",
+            "sub_type": "normal" if is_group else "friend",
+            "message_id": 1_000_000 + self._message_seq,
+            "user_id": user_id,
+            "self_id": self.self_id,
+            "time": int(time.time()),
+            "message": self._segments(is_group),
+            "sender": {"user_id": user_id, "nickname": f"用户{user_id % 1000}", "card": ""},
+        }
+        if is_group:
+            group_id = self._rng.choice(self.group_ids)
+            event["group_id"] = group_id
+            event["group_name"] = f"测试群{group_id % 100}"
+        return event
+
+    def events(self, count: int) -> list[dict[str, Any]]:
+        return [self.next_event() for _ in range(count)]
+
+
+def _convert_segment(segment: dict[str, Any]) -> dict[str, Any] | None:
+    seg_type = segment.get("type")
+    data = segment.get("data", {})
+    if seg_type == "text":
+        return {"type": "text", "data": data.get("text", "")}
+    if seg_type == "at":
+        qq = data.get("qq", "")
+        return {"type": "at", "data": f"用户{int(qq) % 1000}:{qq}"} if qq else None
+    if seg_type == "face":
+        name = FACES.get(str(data.get("id")))
+        return {"type": "text", "data": f"[表情：{name}]"} if name else None
+    return None
+
+
+def to_envelope(raw: dict[str, Any]) -> dict[str, Any]:
+    """把原始 OneBot 事件转换为 MessageEnvelope（与 napcat 适配器的转换保持一致）"""
+    sender = raw.get("sender", {})
+    builder = MessageBuilder()
+    (
+        builder.direction("incoming")
+        .message_id(str(raw.get("message_id", "")))
+        .timestamp_ms(int(time.time() * 1000))
+        .from_user(
+            user_id=str(sender.get("user_id", "")),
+            platform="qq",
+            nickname=sender.get("nickname", ""),
+            cardname=sender.get("card", ""),
+            user_avatar=sender.get("avatar", ""),
+        )
+    )
+    if raw.get("message_type") == "group" and raw.get("group_id"):
+        builder.from_group(group_id=str(raw["group_id"]), platform="qq", name=raw.get("group_name", ""))
+
+    seg_list = [seg for seg in (_convert_segment(s) for s in raw.get("message", [])) if seg]
+    builder.format_info(content_format=[seg["type"] for seg in seg_list], accept_format=ACCEPT_FORMAT)
+    builder.seg_list(seg_list)
+    return builder.build()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+热路径基准测试入口
+
+所有外部依赖都替换为本地确定性实现：LLM 请求走 FakeClient，数据库使用临时 SQLite，
+入站消息由合成 OneBot 生成器产生。结果以 JSON 输出，键顺序固定，可直接 diff 两次运行。
+
+用法:
+    python scripts/benchmark/run_benchmarks.py
+    python scripts/benchmark/run_benchmarks.py --scenario memory_search --iterations 500
+    python scripts/benchmark/run_benchmarks.py --llm-latency 0.2 --output data/benchmark/latest.json
+
+注意：配置在导入时加载，运行前需要存在 config/bot_config.toml 与 config/model_config.toml。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import traceback
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_llm import get_call_stats, install_fake_llm
+from harness import environment_info, temporary_sqlite_database, write_report
+from onebot_generator import OneBotMessageGenerator
+from scenarios import SCENARIOS, ScenarioContext, shutdown_pipeline
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="MoFox 热路径基准测试")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="要运行的场景（可重复指定，默认运行全部）",
+    )
+    parser.add_argument("--iterations", type=int, default=200, help="每个场景的迭代次数")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发场景的并发数")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="FakeClient 每次请求的模拟延迟（秒）")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--output", help="JSON 报告输出路径（默认输出到标准输出）")
+    return parser.parse_args()
+
+
+async def main() -> int:
+    args = parse_args()
+    names = args.scenario or list(SCENARIOS)
+
+    install_fake_llm(latency=args.llm_latency)
+
+    report: dict = {
+        "environment": environment_info(),
+        "parameters": {
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency,
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+    failed = False
+
+    async with temporary_sqlite_database() as work_dir:
+        ctx = ScenarioContext(
+            iterations=args.iterations,
+            seed=args.seed,
+            work_dir=work_dir,
+            generator=OneBotMessageGenerator(seed=args.seed),
+            concurrency=args.concurrency,
+        )
+        try:
+            for name in names:
+                print(f"运行场景 {name} ...", file=sys.stderr)
+                begin = time.perf_counter()
+                try:
+                    result = await SCENARIOS[name](ctx)
+                except Exception as e:
+                    failed = True
+                    traceback.print_exc()
+                    result = {"error": f"{type(e).__name__}: {e}"}
+                result["elapsed_seconds"] = round(time.perf_counter() - begin, 3)
+                report["scenarios"][name] = result
+        finally:
+            await shutdown_pipeline(ctx)
+
+    report["fake_llm_calls"] = get_call_stats()
+    write_report(report, args.output)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,381 @@
+"""
+热路径基准场景
+
+每个场景接收 ScenarioContext，返回 {指标名: LatencyRecorder.summary()} 形式的结果：
+- message_ingest：MessageRuntime.handle_message 处理一条入站消息的耗时
+- stream_dispatch：消息进入 MessageHandler 到 StreamLoopManager 分发给 chatter 的延迟
+- replyer_prompt：DefaultReplyer.build_prompt_reply_context 构建回复提示词
+- memory_search：合成记忆图上的向量检索 + 路径评分扩展
+- expression_scoring：ExpressorModel / OnlineNaiveBayes 对候选表达打分
+- batch_scheduler：AdaptiveBatchScheduler 并发插入与查询的吞吐
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from fake_llm import deterministic_embedding
+from harness import LatencyRecorder
+from onebot_generator import WORDS, OneBotMessageGenerator, to_envelope
+
+ScenarioFunc = Callable[["ScenarioContext"], Awaitable[dict[str, Any]]]
+
+SCENARIOS: dict[str, ScenarioFunc] = {}
+
+
+def scenario(name: str) -> Callable[[ScenarioFunc], ScenarioFunc]:
+    def decorator(func: ScenarioFunc) -> ScenarioFunc:
+        SCENARIOS[name] = func
+        return func
+
+    return decorator
+
+
+@dataclass
+class ScenarioContext:
+    """场景运行参数与跨场景共享的状态"""
+
+    iterations: int
+    seed: int
+    work_dir: Path
+    generator: OneBotMessageGenerator
+    concurrency: int = 16
+    dispatch_timeout: float = 30.0
+    shared: dict[str, Any] = field(default_factory=dict)
+
+    def rng(self, salt: str) -> random.Random:
+        """按场景名派生的随机数发生器，保证单独运行某个场景时结果一致"""
+        return random.Random(f"{self.seed}:{salt}")
+
+
+class RecordingChatterManager:
+    """替代真实 ChatterManager：记录消息到达 chatter 的时间并直接标记为已读"""
+
+    def __init__(self) -> None:
+        self.sent_at: dict[str, float] = {}
+        self.recorder = LatencyRecorder("dispatch")
+        self.stream_ids: list[str] = []
+        self._drained = asyncio.Event()
+
+    def track(self, message_id: str) -> None:
+        self.sent_at[message_id] = time.perf_counter()
+        self._drained.clear()
+
+    async def wait_drained(self, timeout: float) -> None:
+        if not self.sent_at:
+            return
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def process_stream_context(self, stream_id: str, context) -> dict[str, Any]:
+        now = time.perf_counter()
+        if stream_id not in self.stream_ids:
+            self.stream_ids.append(stream_id)
+
+        unread = context.get_unread_messages()
+        for message in unread:
+            sent = self.sent_at.pop(str(message.message_id), None)
+            if sent is not None:
+                self.recorder.record(now - sent)
+        context.mark_messages_as_read([str(m.message_id) for m in unread])
+
+        if not self.sent_at:
+            self._drained.set()
+        return {"success": True}
+
+
+async def _ensure_pipeline(ctx: ScenarioContext):
+    """初始化消息处理链路（只执行一次）：MessageRuntime + MessageHandler + 记录用 chatter"""
+    if "runtime" in ctx.shared:
+        return ctx.shared["runtime"], ctx.shared["chatter"]
+
+    from mofox_wire import MessageRuntime
+
+    from src.chat.message_manager.distribution_manager import stream_loop_manager
+    from src.chat.message_receive import storage
+    from src.chat.message_receive.message_handler import get_message_handler
+
+    # 消息落盘使用临时目录中的 spool，避免写入 data/
+    storage._message_storage_batcher = storage.MessageStorageBatcher(
+        batch_size=50, flush_interval=5.0, spool_path=ctx.work_dir / "pending_messages.jsonl"
+    )
+    await storage._message_storage_batcher.start()
+
+    runtime = MessageRuntime()
+    handler = get_message_handler()
+    handler.register_handlers(runtime)
+    await handler.ensure_started()
+
+    chatter = RecordingChatterManager()
+    stream_loop_manager.set_chatter_manager(chatter)
+
+    ctx.shared["runtime"] = runtime
+    ctx.shared["chatter"] = chatter
+    return runtime, chatter
+
+
+async def shutdown_pipeline(ctx: ScenarioContext) -> None:
+    """关闭 _ensure_pipeline 启动的组件"""
+    if "runtime" not in ctx.shared:
+        return
+
+    from src.chat.message_manager.message_manager import message_manager
+    from src.chat.message_receive.message_handler import shutdown_message_handler
+    from src.chat.message_receive.storage import get_message_storage_batcher, get_message_update_batcher
+
+    await shutdown_message_handler()
+    await message_manager.stop()
+    await get_message_storage_batcher().stop()
+    await get_message_update_batcher().stop()
+
+
+@scenario("message_ingest")
+async def bench_message_ingest(ctx: ScenarioContext) -> dict[str, Any]:
+    runtime, chatter = await _ensure_pipeline(ctx)
+    envelopes = [to_envelope(raw) for raw in ctx.generator.events(ctx.iterations)]
+
+    recorder = LatencyRecorder("handle_message")
+    recorder.start()
+    for envelope in envelopes:
+        chatter.track(envelope["message_info"]["message_id"])
+        with recorder.measure():
+            await runtime.handle_message(envelope)
+    recorder.stop()
+
+    await chatter.wait_drained(ctx.dispatch_timeout)
+    return {"handle_message": recorder.summary()}
+
+
+@scenario("stream_dispatch")
+async def bench_stream_dispatch(ctx: ScenarioContext) -> dict[str, Any]:
+    runtime, chatter = await _ensure_pipeline(ctx)
+    await chatter.wait_drained(ctx.dispatch_timeout)
+    chatter.recorder = LatencyRecorder("dispatch")
+    chatter.sent_at.clear()
+
+    envelopes = [to_envelope(raw) for raw in ctx.generator.events(ctx.iterations)]
+    chatter.recorder.start()
+    for envelope in envelopes:
+        chatter.track(envelope["message_info"]["message_id"])
+        await runtime.handle_message(envelope)
+    await chatter.wait_drained(ctx.dispatch_timeout)
+    chatter.recorder.stop()
+
+    # 超时仍未到达 chatter 的消息计为错误
+    chatter.recorder.errors += len(chatter.sent_at)
+    chatter.sent_at.clear()
+    return {"dispatch": chatter.recorder.summary()}
+
+
+@scenario("replyer_prompt")
+async def bench_replyer_prompt(ctx: ScenarioContext) -> dict[str, Any]:
+    from src.chat.message_receive.chat_stream import get_chat_manager
+    from src.chat.replyer.default_generator import DefaultReplyer
+
+    runtime, chatter = await _ensure_pipeline(ctx)
+    if not chatter.stream_ids:
+        # 先灌入一批消息，让聊天流有可用的上下文
+        for raw in ctx.generator.events(max(20, ctx.iterations)):
+            envelope = to_envelope(raw)
+            chatter.track(envelope["message_info"]["message_id"])
+            await runtime.handle_message(envelope)
+        await chatter.wait_drained(ctx.dispatch_timeout)
+
+    streams = [s for s in [await get_chat_manager().get_stream(sid) for sid in chatter.stream_ids] if s]
+    if not streams:
+        raise RuntimeError("没有可用的聊天流")
+
+    replyers = {s.stream_id: DefaultReplyer(s) for s in streams}
+    rng = ctx.rng("replyer_prompt")
+    recorder = LatencyRecorder("build_prompt_reply_context")
+    recorder.start()
+    for _ in range(ctx.iterations):
+        stream = rng.choice(streams)
+        history = stream.context.get_messages(limit=1)
+        reply_message = history[-1] if history else None
+        sender = reply_message.user_info.user_nickname if reply_message else "用户"
+        content = reply_message.processed_plain_text if reply_message else "".join(rng.sample(WORDS, 4))
+        with recorder.measure():
+            await replyers[stream.stream_id].build_prompt_reply_context(
+                reply_to=f"{sender}:{content}",
+                enable_tool=False,
+                reply_message=reply_message,
+            )
+    recorder.stop()
+    return {"build_prompt_reply_context": recorder.summary()}
+
+
+MEMORY_EMBEDDING_DIM = 256
+
+
+@scenario("memory_search")
+async def bench_memory_search(ctx: ScenarioContext) -> dict[str, Any]:
+    from src.memory_graph.models import EdgeType, Memory, MemoryEdge, MemoryNode, MemoryType, NodeType
+    from src.memory_graph.storage.graph_store import GraphStore
+    from src.memory_graph.storage.vector_store import VectorStore
+    from src.memory_graph.utils.path_expansion import PathScoreExpansion
+
+    rng = ctx.rng("memory_search")
+    memory_count = max(200, ctx.iterations * 5)
+
+    def _node(node_id: str, content: str, node_type: NodeType, with_vector: bool) -> MemoryNode:
+        embedding = np.array(deterministic_embedding(content, MEMORY_EMBEDDING_DIM)) if with_vector else None
+        return MemoryNode(id=node_id, content=content, node_type=node_type, embedding=embedding)
+
+    subjects = [_node(f"subject_{i}", f"用户{i}", NodeType.SUBJECT, False) for i in range(20)]
+    graph_store = GraphStore()
+    vector_nodes: list[MemoryNode] = []
+
+    build_begin = time.perf_counter()
+    for i in range(memory_count):
+        subject = rng.choice(subjects)
+        topic = _node(f"topic_{i}", "".join(rng.sample(WORDS, 2)), NodeType.TOPIC, True)
+        obj = _node(f"object_{i}", "".join(rng.sample(WORDS, 3)), NodeType.OBJECT, True)
+        memory_type = rng.choice(list(MemoryType))
+        graph_store.add_memory(
+            Memory(
+                id=f"memory_{i}",
+                subject_id=subject.id,
+                memory_type=memory_type,
+                nodes=[subject, topic, obj],
+                edges=[
+                    MemoryEdge(
+                        id=f"edge_{i}_type",
+                        source_id=subject.id,
+                        target_id=topic.id,
+                        relation=memory_type.value,
+                        edge_type=EdgeType.MEMORY_TYPE,
+                        importance=rng.uniform(0.3, 1.0),
+                    ),
+                    MemoryEdge(
+                        id=f"edge_{i}_core",
+                        source_id=topic.id,
+                        target_id=obj.id,
+                        relation="是",
+                        edge_type=EdgeType.CORE_RELATION,
+                        importance=rng.uniform(0.3, 1.0),
+                    ),
+                ],
+                importance=rng.uniform(0.2, 1.0),
+            )
+        )
+        vector_nodes.extend([topic, obj])
+
+    vector_store = VectorStore(collection_name="benchmark_nodes", data_dir=ctx.work_dir / "memory_graph")
+    await vector_store.initialize()
+    await vector_store.add_nodes_batch(vector_nodes)
+    build_seconds = time.perf_counter() - build_begin
+
+    expander = PathScoreExpansion(graph_store, vector_store)
+    vector_search = LatencyRecorder("vector_search")
+    path_expansion = LatencyRecorder("path_expansion")
+    for _ in range(ctx.iterations):
+        query = "".join(rng.sample(WORDS, 3))
+        query_embedding = np.array(deterministic_embedding(query, MEMORY_EMBEDDING_DIM))
+        with vector_search.measure():
+            initial = await vector_store.search_similar_nodes(query_embedding, limit=10)
+        with path_expansion.measure():
+            await expander.expand_with_path_scoring(initial, query_embedding, top_k=10)
+
+    return {
+        "graph_memories": memory_count,
+        "build_seconds": round(build_seconds, 6),
+        "vector_search": vector_search.summary(),
+        "path_expansion": path_expansion.summary(),
+    }
+
+
+@scenario("expression_scoring")
+async def bench_expression_scoring(ctx: ScenarioContext) -> dict[str, Any]:
+    from src.chat.express.expressor_model.model import ExpressorModel
+
+    rng = ctx.rng("expression_scoring")
+    model = ExpressorModel(use_jieba=False)
+    candidate_count = 500
+    for i in range(candidate_count):
+        model.add_candidate(f"expr_{i}", "".join(rng.sample(WORDS, 3)))
+    # 模拟历史学习，让各候选的统计量不完全相同
+    for _ in range(candidate_count * 2):
+        cid = f"expr_{rng.randrange(candidate_count)}"
+        model.update_positive("".join(rng.sample(WORDS, 4)), cid)
+
+    recorder = LatencyRecorder("predict")
+    recorder.start()
+    for _ in range(ctx.iterations):
+        text = "".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16)))
+        with recorder.measure():
+            model.predict(text, k=5)
+    recorder.stop()
+    return {"candidates": candidate_count, "predict": recorder.summary()}
+
+
+@scenario("batch_scheduler")
+async def bench_batch_scheduler(ctx: ScenarioContext) -> dict[str, Any]:
+    import datetime
+
+    from src.common.database.core.models import OnlineTime
+    from src.common.database.optimization.batch_scheduler import AdaptiveBatchScheduler, BatchOperation
+
+    rng = ctx.rng("batch_scheduler")
+    scheduler = AdaptiveBatchScheduler()
+    await scheduler.start()
+
+    inserts = LatencyRecorder("insert")
+    selects = LatencyRecorder("select")
+    total = max(ctx.iterations, ctx.concurrency) * 4
+    plan = ["select" if rng.random() < 0.2 else "insert" for _ in range(total)]
+    queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue()
+    for item in enumerate(plan):
+        queue.put_nowait(item)
+
+    async def _worker() -> None:
+        while True:
+            try:
+                index, op_type = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            now = datetime.datetime.now()
+            if op_type == "insert":
+                operation = BatchOperation(
+                    operation_type="insert",
+                    model_class=OnlineTime,
+                    data={"timestamp": str(now), "duration": index, "start_timestamp": now, "end_timestamp": now},
+                )
+                recorder = inserts
+            else:
+                operation = BatchOperation(
+                    operation_type="select", model_class=OnlineTime, conditions={"duration": index % 50}
+                )
+                recorder = selects
+            begin = time.perf_counter()
+            try:
+                future = await scheduler.add_operation(operation)
+                await future
+            except Exception:
+                recorder.record_error()
+                continue
+            recorder.record(time.perf_counter() - begin)
+
+    overall = LatencyRecorder("overall")
+    overall.start()
+    try:
+        await asyncio.gather(*(_worker() for _ in range(ctx.concurrency)))
+    finally:
+        overall.stop()
+        await scheduler.stop()
+    overall.samples = inserts.samples + selects.samples
+    overall.errors = inserts.errors + selects.errors
+
+    return {
+        "concurrency": ctx.concurrency,
+        "overall": overall.summary(),
+        "insert": inserts.summary(),
+        "select": selects.summary(),
+    }
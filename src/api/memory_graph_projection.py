@@ -0,0 +1,241 @@
+"""
+记忆图可视化 - 图投影缓存
+
+把记忆图转换为前端使用的节点/边/记忆列表（投影）代价很高：需要遍历全部记忆并逐条调用 to_text()。
+这里把投影与 GraphStore.version 绑定缓存，图未变化时分页、聚类、搜索都直接复用；
+同时预先建立按连接度排序的索引、按类型分组的索引，分页时不再重新统计和排序。
+
+记忆对象上的字段（重要性等）可能被直接修改而不经过 GraphStore，
+因此投影另有最长存活时间，超时后即使版本号未变也会重建。
+"""
+
+import bisect
+import heapq
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any
+
+# 投影最长存活时间（秒）
+PROJECTION_MAX_AGE = 60.0
+
+# 每个投影最多缓存的聚类结果数（按参数区分）
+MAX_CLUSTER_RESULTS = 8
+
+
+@dataclass
+class GraphProjection:
+    """记忆图的只读投影及其索引"""
+
+    source_key: tuple
+    built_at: float
+    nodes: list[dict[str, Any]]
+    edges: list[dict[str, Any]]
+    memories: list[dict[str, Any]]
+    stats: dict[str, Any]
+    current_file: str
+    memory_node_ids: dict[str, list[str]] = field(default_factory=dict)
+
+    # 以下索引在 build_indexes() 中生成
+    degree: dict[str, int] = field(default_factory=dict)
+    ranked: list[dict[str, Any]] = field(default_factory=list)
+    ranked_neg_importance: list[float] = field(default_factory=list)
+    ranks_by_group: dict[str, list[int]] = field(default_factory=dict)
+    out_edges: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    cluster_results: dict[tuple[int, int], dict[str, Any]] = field(default_factory=dict)
+    full_body: bytes | None = None  # /api/graph/full 的序列化结果
+
+    def build_indexes(self) -> None:
+        """建立连接度、类型与出边索引"""
+        degree: dict[str, int] = defaultdict(int)
+        out_edges: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for edge in self.edges:
+            degree[edge.get("from")] += 1
+            degree[edge.get("to")] += 1
+            out_edges[edge.get("from")].append(edge)
+
+        # 按连接度降序排列（稳定排序，连接度相同时保持原有顺序）
+        ranked = sorted(self.nodes, key=lambda n: degree.get(n["id"], 0), reverse=True)
+        total_edges = max(len(self.edges), 1)
+
+        ranks_by_group: dict[str, list[int]] = defaultdict(list)
+        for rank, node in enumerate(ranked):
+            ranks_by_group[node.get("group")].append(rank)
+
+        self.degree = dict(degree)
+        self.out_edges = dict(out_edges)
+        self.ranked = ranked
+        # 重要性 = 连接度 / 总边数；取负值后为升序，便于按阈值二分查找
+        self.ranked_neg_importance = [-(degree.get(n["id"], 0) / total_edges) for n in ranked]
+        self.ranks_by_group = dict(ranks_by_group)
+
+    def is_fresh(self, source_key: tuple) -> bool:
+        return self.source_key == source_key and time.monotonic() - self.built_at < PROJECTION_MAX_AGE
+
+    def full_data(self) -> dict[str, Any]:
+        return {
+            "nodes": self.nodes,
+            "edges": self.edges,
+            "memories": self.memories,
+            "stats": self.stats,
+            "current_file": self.current_file,
+        }
+
+    def paginate(self, page: int, page_size: int, min_importance: float, node_types: str | None) -> dict[str, Any]:
+        """按重要性阈值与节点类型筛选后分页（使用预建索引，不重新排序）"""
+        total_edges = max(len(self.edges), 1)
+        # 满足重要性阈值的节点是 ranked 的一个前缀
+        cutoff = bisect.bisect_right(self.ranked_neg_importance, -min_importance)
+
+        if node_types:
+            allowed_types = set(node_types.split(","))
+            prefixes = []
+            for group in allowed_types:
+                ranks = self.ranks_by_group.get(group)
+                if ranks:
+                    prefixes.append(ranks[: bisect.bisect_left(ranks, cutoff)])
+            total_nodes = sum(len(ranks) for ranks in prefixes)
+            selected_ranks = heapq.merge(*prefixes)
+        else:
+            total_nodes = cutoff
+            selected_ranks = iter(range(cutoff))
+
+        total_pages = (total_nodes + page_size - 1) // page_size
+        start_idx = (page - 1) * page_size
+        page_ranks = list(islice(selected_ranks, start_idx, start_idx + page_size))
+
+        paginated_nodes = []
+        for rank in page_ranks:
+            node = self.ranked[rank]
+            paginated_nodes.append({**node, "importance": self.degree.get(node["id"], 0) / total_edges})
+        node_ids = {n["id"] for n in paginated_nodes}
+
+        # 只保留连接分页节点的边
+        paginated_edges = [
+            edge
+            for node in paginated_nodes
+            for edge in self.out_edges.get(node["id"], ())
+            if edge.get("to") in node_ids
+        ]
+
+        return {
+            "nodes": paginated_nodes,
+            "edges": paginated_edges,
+            "pagination": {
+                "page": page,
+                "page_size": page_size,
+                "total_nodes": total_nodes,
+                "total_pages": total_pages,
+                "has_next": page < total_pages,
+                "has_prev": page > 1,
+            },
+            "stats": {
+                "total_nodes": total_nodes,
+                "total_edges": len(paginated_edges),
+                "total_memories": self.stats.get("total_memories", 0),
+            },
+        }
+
+    def search(self, query: str) -> list[dict[str, Any]]:
+        """在已生成的记忆文本中搜索"""
+        query = query.lower()
+        results = []
+        for memory in self.memories:
+            if query in memory.get("text", "").lower():
+                node_ids = self.memory_node_ids.get(memory.get("id"))
+                results.append(memory if node_ids is None else {**memory, "node_ids": node_ids})
+        return results
+
+    def get_cluster_result(self, max_nodes: int, cluster_threshold: int) -> dict[str, Any] | None:
+        return self.cluster_results.get((max_nodes, cluster_threshold))
+
+    def put_cluster_result(self, max_nodes: int, cluster_threshold: int, result: dict[str, Any]) -> None:
+        if len(self.cluster_results) >= MAX_CLUSTER_RESULTS:
+            self.cluster_results.pop(next(iter(self.cluster_results)))
+        self.cluster_results[(max_nodes, cluster_threshold)] = result
+
+
+def build_projection_from_manager(memory_manager, source_key: tuple) -> GraphProjection:
+    """从 MemoryManager 生成投影（同步，需在线程池中调用）"""
+    if not memory_manager.graph_store:
+        projection = GraphProjection(
+            source_key=source_key,
+            built_at=time.monotonic(),
+            nodes=[],
+            edges=[],
+            memories=[],
+            stats={},
+            current_file="memory_manager (实时数据)",
+        )
+        projection.build_indexes()
+        return projection
+
+    all_memories = memory_manager.graph_store.get_all_memories()
+    nodes_dict = {}
+    edges_dict = {}
+    memory_info = []
+    memory_node_ids = {}
+
+    for memory in all_memories:
+        memory_info.append(
+            {
+                "id": memory.id,
+                "type": memory.memory_type.value,
+                "importance": memory.importance,
+                "text": memory.to_text(),
+            }
+        )
+        memory_node_ids[memory.id] = [node.id for node in memory.nodes]
+        for node in memory.nodes:
+            if node.id not in nodes_dict:
+                nodes_dict[node.id] = {
+                    "id": node.id,
+                    "label": node.content,
+                    "type": node.node_type.value,
+                    "group": node.node_type.name,
+                    "title": f"{node.node_type.value}: {node.content}",
+                }
+        for edge in memory.edges:
+            if edge.id not in edges_dict:
+                edges_dict[edge.id] = {
+                    "id": edge.id,
+                    "from": edge.source_id,
+                    "to": edge.target_id,
+                    "label": edge.relation,
+                    "arrows": "to",
+                    "memory_id": memory.id,
+                }
+
+    stats = memory_manager.get_statistics()
+    projection = GraphProjection(
+        source_key=source_key,
+        built_at=time.monotonic(),
+        nodes=list(nodes_dict.values()),
+        edges=list(edges_dict.values()),
+        memories=memory_info,
+        stats={
+            "total_nodes": stats.get("total_nodes", 0),
+            "total_edges": stats.get("total_edges", 0),
+            "total_memories": stats.get("total_memories", 0),
+        },
+        current_file="memory_manager (实时数据)",
+        memory_node_ids=memory_node_ids,
+    )
+    projection.build_indexes()
+    return projection
+
+
+def build_projection_from_data(data: dict[str, Any], source_key: tuple) -> GraphProjection:
+    """从文件加载的图数据生成投影（同步，需在线程池中调用）"""
+    projection = GraphProjection(
+        source_key=source_key,
+        built_at=time.monotonic(),
+        nodes=data.get("nodes", []),
+        edges=data.get("edges", []),
+        memories=data.get("memories", []),
+        stats=data.get("stats", {}),
+        current_file=data.get("current_file", ""),
+    )
+    projection.build_indexes()
+    return projection
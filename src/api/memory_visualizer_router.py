@@ -13,9 +13,15 @@ from typing import Any
 
 import orjson
 from fastapi import APIRouter, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 
+from src.api.memory_graph_projection import (
+    GraphProjection,
+    build_projection_from_data,
+    build_projection_from_manager,
+)
+
 
 # 调整项目根目录的计算方式
 project_root = Path(__file__).parent.parent.parent
@@ -24,10 +30,20 @@ data_dir = project_root / "data" / "memory_graph"
 # 缓存
 graph_data_cache = None
 current_data_file = None
+graph_data_version = 0  # graph_data_cache 每次被替换或清空时递增，作为文件模式下图投影的缓存键
 
 # 线程池用于异步文件读取
 _executor = ThreadPoolExecutor(max_workers=2)
 
+# 图投影的生成与序列化只占用一个线程，浏览可视化页面时不与实时检索争抢 CPU
+_projection_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph_projection")
+_projection: GraphProjection | None = None
+_projection_lock = asyncio.Lock()
+
+# 超过该大小的响应分块流式发送
+STREAM_THRESHOLD = 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
 # FastAPI 路由
 router = APIRouter()
 
@@ -68,12 +84,18 @@ def find_available_data_files() -> list[Path]:
     return sorted(files, key=lambda f: f.stat().st_mtime, reverse=True)
 
 
+def _set_graph_data_cache(data: dict[str, Any] | None) -> None:
+    global graph_data_cache, graph_data_version
+    graph_data_cache = data
+    graph_data_version += 1
+
+
 async def load_graph_data_from_file(file_path: Path | None = None) -> dict[str, Any]:
     """从磁盘加载图数据（异步，不阻塞主线程）"""
-    global graph_data_cache, current_data_file
+    global current_data_file
 
     if file_path and file_path != current_data_file:
-        graph_data_cache = None
+        _set_graph_data_cache(None)
         current_data_file = file_path
 
     if graph_data_cache:
@@ -104,8 +126,8 @@ async def load_graph_data_from_file(file_path: Path | None = None) -> dict[str,
             _executor, _process_graph_data, nodes, edges, metadata, graph_file
         )
         
-        graph_data_cache = processed
-        return graph_data_cache
+        _set_graph_data_cache(processed)
+        return processed
 
     except Exception as e:
         import traceback
@@ -172,79 +194,89 @@ async def index(request: Request):
     return templates.TemplateResponse("visualizer.html", {"request": request})
 
 
-def _format_graph_data_from_manager(memory_manager) -> dict[str, Any]:
-    """从 MemoryManager 提取并格式化图数据（同步版本，需在线程池中调用）"""
-    if not memory_manager.graph_store:
-        return {"nodes": [], "edges": [], "memories": [], "stats": {}}
+def _get_live_memory_manager():
+    """获取已初始化的 MemoryManager，不可用时返回 None"""
+    from src.memory_graph.manager_singleton import get_memory_manager
 
-    all_memories = memory_manager.graph_store.get_all_memories()
-    nodes_dict = {}
-    edges_dict = {}
-    memory_info = []
+    memory_manager = get_memory_manager()
+    if memory_manager and memory_manager._initialized:
+        return memory_manager
+    return None
 
-    for memory in all_memories:
-        memory_info.append(
-            {
-                "id": memory.id,
-                "type": memory.memory_type.value,
-                "importance": memory.importance,
-                "text": memory.to_text(),
-            }
-        )
-        for node in memory.nodes:
-            if node.id not in nodes_dict:
-                nodes_dict[node.id] = {
-                    "id": node.id,
-                    "label": node.content,
-                    "type": node.node_type.value,
-                    "group": node.node_type.name,
-                    "title": f"{node.node_type.value}: {node.content}",
-                }
-        for edge in memory.edges:
-            if edge.id not in edges_dict:
-                edges_dict[edge.id] = {
-                    "id": edge.id,
-                    "from": edge.source_id,
-                    "to": edge.target_id,
-                    "label": edge.relation,
-                    "arrows": "to",
-                    "memory_id": memory.id,
-                }
 
-    edges_list = list(edges_dict.values())
+async def _get_projection() -> GraphProjection:
+    """获取图投影：图版本号未变化且未超时时直接复用，否则在专用线程中重建（并发请求只重建一次）"""
+    global _projection
 
-    stats = memory_manager.get_statistics()
-    return {
-        "nodes": list(nodes_dict.values()),
-        "edges": edges_list,
-        "memories": memory_info,
-        "stats": {
-            "total_nodes": stats.get("total_nodes", 0),
-            "total_edges": stats.get("total_edges", 0),
-            "total_memories": stats.get("total_memories", 0),
-        },
-        "current_file": "memory_manager (实时数据)",
-    }
+    memory_manager = _get_live_memory_manager()
+    data = None
+    if memory_manager is not None:
+        graph_store = memory_manager.graph_store
+        source_key = ("manager", id(graph_store), getattr(graph_store, "version", 0))
+    else:
+        data = await load_graph_data_from_file()
+        source_key = ("file", graph_data_version)
+
+    if _projection is not None and _projection.is_fresh(source_key):
+        return _projection
+
+    async with _projection_lock:
+        if _projection is not None and _projection.is_fresh(source_key):
+            return _projection
+
+        loop = asyncio.get_running_loop()
+        if memory_manager is not None:
+            projection = await loop.run_in_executor(
+                _projection_executor, build_projection_from_manager, memory_manager, source_key
+            )
+        else:
+            projection = await loop.run_in_executor(
+                _projection_executor, build_projection_from_data, data, source_key
+            )
+        _projection = projection
+        return projection
+
+
+def _iter_chunks(body: bytes):
+    for i in range(0, len(body), STREAM_CHUNK_SIZE):
+        yield body[i : i + STREAM_CHUNK_SIZE]
+
+
+def _body_response(body: bytes, status_code: int = 200) -> Response:
+    """大响应分块流式发送，小响应直接返回"""
+    if len(body) > STREAM_THRESHOLD:
+        return StreamingResponse(_iter_chunks(body), status_code=status_code, media_type="application/json")
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+async def _json_response(content: Any, status_code: int = 200) -> Response:
+    """在专用线程中用 orjson 序列化响应"""
+    loop = asyncio.get_running_loop()
+    body = await loop.run_in_executor(_projection_executor, _dumps, content)
+    return _body_response(body, status_code)
+
+
+def _dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=str)
 
 
 @router.get("/api/graph/full")
 async def get_full_graph():
     """获取完整记忆图数据"""
     try:
-        from src.memory_graph.manager_singleton import get_memory_manager
-
-        memory_manager = get_memory_manager()
-
-        data = {}
-        if memory_manager and memory_manager._initialized:
-            # 在线程池中执行，避免阻塞主事件循环
-            loop = asyncio.get_event_loop()
-            data = await loop.run_in_executor(_executor, _format_graph_data_from_manager, memory_manager)
-        else:
+        if _get_live_memory_manager() is None:
             # 如果内存管理器不可用，则从文件加载
             data = await load_graph_data_from_file()
-
-        return JSONResponse(content={"success": True, "data": data})
+            return await _json_response({"success": True, "data": data})
+
+        projection = await _get_projection()
+        if projection.full_body is None:
+            # 序列化结果随投影一起缓存，图未变化时重复请求无需再次序列化
+            loop = asyncio.get_running_loop()
+            projection.full_body = await loop.run_in_executor(
+                _projection_executor, _dumps, {"success": True, "data": projection.full_data()}
+            )
+        return _body_response(projection.full_body)
     except Exception as e:
         import traceback
 
@@ -289,97 +321,16 @@ async def get_paginated_graph(
 ):
     """分页获取图数据，支持重要性过滤"""
     try:
-        from src.memory_graph.manager_singleton import get_memory_manager
-
-        memory_manager = get_memory_manager()
-
-        # 获取完整数据（已经是异步的）
-        if memory_manager and memory_manager._initialized:
-            loop = asyncio.get_event_loop()
-            full_data = await loop.run_in_executor(_executor, _format_graph_data_from_manager, memory_manager)
-        else:
-            full_data = await load_graph_data_from_file()
-
-        # 在线程池中处理分页逻辑
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            _executor, 
-            _process_pagination, 
-            full_data, page, page_size, min_importance, node_types
-        )
-
-        return JSONResponse(content={"success": True, "data": result})
+        # 翻页时复用同一份投影，只在预建索引上切片
+        projection = await _get_projection()
+        result = projection.paginate(page, page_size, min_importance, node_types)
+        return await _json_response({"success": True, "data": result})
     except Exception as e:
         import traceback
         traceback.print_exc()
         return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
 
 
-def _process_pagination(full_data: dict, page: int, page_size: int, min_importance: float, node_types: str | None) -> dict:
-    """处理分页逻辑（在线程池中执行）"""
-    nodes = full_data.get("nodes", [])
-    edges = full_data.get("edges", [])
-
-    # 过滤节点类型
-    if node_types:
-        allowed_types = set(node_types.split(","))
-        nodes = [n for n in nodes if n.get("group") in allowed_types]
-
-    # 构建边的索引以加速查找
-    edge_count_map = {}
-    for e in edges:
-        from_id = e.get("from")
-        to_id = e.get("to")
-        edge_count_map[from_id] = edge_count_map.get(from_id, 0) + 1
-        edge_count_map[to_id] = edge_count_map.get(to_id, 0) + 1
-
-    # 按重要性排序
-    nodes_with_importance = []
-    total_edges = max(len(edges), 1)
-    for node in nodes:
-        edge_count = edge_count_map.get(node["id"], 0)
-        importance = edge_count / total_edges
-        if importance >= min_importance:
-            node["importance"] = importance
-            nodes_with_importance.append(node)
-
-    # 按重要性降序排序
-    nodes_with_importance.sort(key=lambda x: x.get("importance", 0), reverse=True)
-
-    # 分页
-    total_nodes = len(nodes_with_importance)
-    total_pages = (total_nodes + page_size - 1) // page_size
-    start_idx = (page - 1) * page_size
-    end_idx = min(start_idx + page_size, total_nodes)
-
-    paginated_nodes = nodes_with_importance[start_idx:end_idx]
-    node_ids = set(n["id"] for n in paginated_nodes)
-
-    # 只保留连接分页节点的边
-    paginated_edges = [
-        e for e in edges
-        if e.get("from") in node_ids and e.get("to") in node_ids
-    ]
-
-    return {
-        "nodes": paginated_nodes,
-        "edges": paginated_edges,
-        "pagination": {
-            "page": page,
-            "page_size": page_size,
-            "total_nodes": total_nodes,
-            "total_pages": total_pages,
-            "has_next": page < total_pages,
-            "has_prev": page > 1,
-        },
-        "stats": {
-            "total_nodes": total_nodes,
-            "total_edges": len(paginated_edges),
-            "total_memories": full_data.get("stats", {}).get("total_memories", 0),
-        },
-    }
-
-
 @router.get("/api/graph/clustered")
 async def get_clustered_graph(
     max_nodes: int = Query(300, ge=50, le=1000, description="最大节点数"),
@@ -387,43 +338,36 @@ async def get_clustered_graph(
 ):
     """获取聚类简化后的图数据"""
     try:
-        from src.memory_graph.manager_singleton import get_memory_manager
-
-        memory_manager = get_memory_manager()
-
-        # 获取完整数据（异步）
-        if memory_manager and memory_manager._initialized:
-            loop = asyncio.get_event_loop()
-            full_data = await loop.run_in_executor(_executor, _format_graph_data_from_manager, memory_manager)
-        else:
-            full_data = await load_graph_data_from_file()
-
-        nodes = full_data.get("nodes", [])
-        edges = full_data.get("edges", [])
+        projection = await _get_projection()
+        nodes = projection.nodes
+        edges = projection.edges
 
         # 如果节点数小于阈值，直接返回
         if len(nodes) <= max_nodes:
-            return JSONResponse(content={"success": True, "data": {
+            return await _json_response({"success": True, "data": {
                 "nodes": nodes,
                 "edges": edges,
-                "stats": full_data.get("stats", {}),
+                "stats": projection.stats,
                 "clustered": False,
             }})
 
-        # 在线程池中执行聚类
-        loop = asyncio.get_event_loop()
-        clustered_data = await loop.run_in_executor(
-            _executor, _cluster_graph_data, nodes, edges, max_nodes, cluster_threshold
-        )
+        clustered_data = projection.get_cluster_result(max_nodes, cluster_threshold)
+        if clustered_data is None:
+            # 在专用线程中执行聚类，结果随投影缓存
+            loop = asyncio.get_running_loop()
+            clustered_data = await loop.run_in_executor(
+                _projection_executor, _cluster_graph_data, nodes, edges, max_nodes, cluster_threshold
+            )
+            projection.put_cluster_result(max_nodes, cluster_threshold, clustered_data)
 
-        return JSONResponse(content={"success": True, "data": {
+        return await _json_response({"success": True, "data": {
             **clustered_data,
             "stats": {
                 "original_nodes": len(nodes),
                 "original_edges": len(edges),
                 "clustered_nodes": len(clustered_data["nodes"]),
                 "clustered_edges": len(clustered_data["edges"]),
-                "total_memories": full_data.get("stats", {}).get("total_memories", 0),
+                "total_memories": projection.stats.get("total_memories", 0),
             },
             "clustered": True,
         }})
@@ -551,7 +495,7 @@ async def list_files_api():
 @router.post("/select_file")
 async def select_file(request: Request):
     """选择要加载的数据文件"""
-    global graph_data_cache, current_data_file
+    global current_data_file
     try:
         data = await request.json()
         file_path = data.get("file_path")
@@ -562,7 +506,7 @@ async def select_file(request: Request):
         if not file_to_load.exists():
             raise HTTPException(status_code=404, detail=f"文件不存在: {file_path}")
 
-        graph_data_cache = None
+        _set_graph_data_cache(None)
         current_data_file = file_to_load
         graph_data = await load_graph_data_from_file(file_to_load)
 
@@ -580,8 +524,7 @@ async def select_file(request: Request):
 @router.get("/reload")
 async def reload_data():
     """重新加载数据"""
-    global graph_data_cache
-    graph_data_cache = None
+    _set_graph_data_cache(None)
     data = await load_graph_data_from_file()
     return JSONResponse(content={"success": True, "message": "数据已重新加载", "stats": data.get("stats", {})})
 
@@ -590,34 +533,10 @@ async def reload_data():
 async def search_memories(q: str, limit: int = 50):
     """搜索记忆"""
     try:
-        from src.memory_graph.manager_singleton import get_memory_manager
-
-        memory_manager = get_memory_manager()
-
-        results = []
-        if memory_manager and memory_manager._initialized and memory_manager.graph_store:
-            # 从 memory_manager 搜索
-            all_memories = memory_manager.graph_store.get_all_memories()
-            for memory in all_memories:
-                if q.lower() in memory.to_text().lower():
-                    node_ids = [node.id for node in memory.nodes]
-                    results.append(
-                        {
-                            "id": memory.id,
-                            "type": memory.memory_type.value,
-                            "importance": memory.importance,
-                            "text": memory.to_text(),
-                            "node_ids": node_ids,  # 返回关联的节点ID
-                        }
-                    )
-        else:
-            # 从文件加载的数据中搜索 (降级方案)
-            # 注意：此模式下无法直接获取关联节点，前端需要做兼容处理
-            data = await load_graph_data_from_file()
-            for memory in data.get("memories", []):
-                if q.lower() in memory.get("text", "").lower():
-                    results.append(memory)  # node_ids 可能不存在
-
+        # 复用投影中已生成的记忆文本；实时数据附带关联节点ID，
+        # 从文件加载的数据 (降级方案) 无法直接获取关联节点，前端需要做兼容处理
+        projection = await _get_projection()
+        results = projection.search(q)
         return JSONResponse(
             content={
                 "success": True,
@@ -27,19 +27,20 @@ async def get_message_stats(
         end_time = time.time()
         start_time = end_time - (days * 24 * 3600)
 
-        messages = await message_api.get_messages_by_time(start_time, end_time)
-
-        sent_count = 0
-        received_count = 0
         if global_config is None:
             raise HTTPException(status_code=500, detail="Global config is not initialized")
         bot_qq = str(global_config.bot.qq_account)
 
-        for msg in messages:
-            if msg.get("user_id") == bot_qq:
-                sent_count += 1
+        # 在数据库中按发送者聚合，只取回每个用户的消息数
+        rows = await message_api.count_messages_by_group(start_time, end_time, ("user_id",))
+
+        sent_count = 0
+        received_count = 0
+        for user_id, count in rows:
+            if user_id == bot_qq:
+                sent_count += count
             else:
-                received_count += 1
+                received_count += count
         if message_type == "sent":
             return {"days": days, "message_type": message_type, "count": sent_count}
         elif message_type == "received":
@@ -50,9 +51,11 @@ async def get_message_stats(
                 "message_type": message_type,
                 "sent_count": sent_count,
                 "received_count": received_count,
-                "total_count": len(messages),
+                "total_count": sent_count + received_count,
             }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -73,52 +76,42 @@ async def get_message_stats_by_chat(
         # 计算查询的时间范围
         end_time = time.time()
         start_time = end_time - (days * 24 * 3600)
-        # 从数据库获取指定时间范围内的所有消息
-        messages = await message_api.get_messages_by_time(start_time, end_time)
         if global_config is None:
             raise HTTPException(status_code=500, detail="Global config is not initialized")
         bot_qq = str(global_config.bot.qq_account)
 
-        # --- 2. 消息筛选 ---
-        # 根据 source 参数筛选消息来源
-        if source == "user":
-            # 筛选出用户发送的消息（即非机器人发送的消息）
-            messages = [msg for msg in messages if msg.get("user_id") != bot_qq]
-        else:  # source == "bot"
-            # 筛选出机器人发送的消息
-            messages = [msg for msg in messages if msg.get("user_id") == bot_qq]
+        # --- 2. 数据库聚合 ---
+        # 按 (会话, 发送者) 分组计数，结果规模只与分组数有关
+        rows = await message_api.count_messages_by_group(start_time, end_time, ("chat_id", "user_id"))
 
         # --- 3. 数据统计 ---
         stats = {}
         # 如果统计来源是用户
         if source == "user":
-            # 遍历用户消息进行统计
-            for msg in messages:
-                chat_id = msg.get("chat_id", "unknown")
-                user_id = msg.get("user_id")
+            for chat_id, user_id, count in rows:
+                # 跳过机器人自己发送的消息
+                if user_id == bot_qq:
+                    continue
+                chat_id = chat_id or "unknown"
                 # 初始化聊天会话的统计结构
                 if chat_id not in stats:
                     stats[chat_id] = {"total_stats": {"total": 0}, "user_stats": {}}
                 # 累加总消息数
-                stats[chat_id]["total_stats"]["total"] += 1
-                # 如果需要按用户分组，则进一步统计每个用户的消息数
+                stats[chat_id]["total_stats"]["total"] += count
+                # 如果需要按用户分组，则记录每个用户的消息数
                 if group_by_user:
-                    if user_id not in stats[chat_id]["user_stats"]:
-                        stats[chat_id]["user_stats"][user_id] = 0
-                    stats[chat_id]["user_stats"][user_id] += 1
+                    user_stats = stats[chat_id]["user_stats"]
+                    user_stats[user_id] = user_stats.get(user_id, 0) + count
             # 如果不按用户分组，则简化统计结果，只保留总数
             if not group_by_user:
                 stats = {chat_id: data["total_stats"] for chat_id, data in stats.items()}
         # 如果统计来源是机器人
         else:
-            # 遍历机器人消息进行统计
-            for msg in messages:
-                chat_id = msg.get("chat_id", "unknown")
-                # 初始化聊天会话的统计结构
-                if chat_id not in stats:
-                    stats[chat_id] = 0
-                # 累加机器人发送的消息数
-                stats[chat_id] += 1
+            for chat_id, user_id, count in rows:
+                if user_id != bot_qq:
+                    continue
+                chat_id = chat_id or "unknown"
+                stats[chat_id] = stats.get(chat_id, 0) + count
 
         # --- 4. 格式化输出 ---
         # 如果 format 参数为 False，直接返回原始统计数据
@@ -128,6 +121,18 @@ async def get_message_stats_by_chat(
         # 获取聊天管理器以查询会话信息
         from src.chat.message_receive.chat_stream import get_chat_manager
         chat_manager = get_chat_manager()
+
+        # 一次性批量查询所有涉及用户的昵称
+        nicknames = {}
+        if source == "user" and group_by_user:
+            person_ids = {
+                user_id: person_api.get_person_id("qq", user_id)
+                for data in stats.values()
+                for user_id in data["user_stats"]
+            }
+            found = await person_api.get_person_nicknames(list(person_ids.values()))
+            nicknames = {user_id: found.get(person_id) for user_id, person_id in person_ids.items()}
+
         formatted_stats = {}
         # 遍历统计结果进行格式化
         for chat_id, data in stats.items():
@@ -154,14 +159,14 @@ async def get_message_stats_by_chat(
             if group_by_user and "user_stats" in data:
                 formatted_data["user_stats"] = {}
                 for user_id, count in data["user_stats"].items():
-                    person_id = person_api.get_person_id("qq", user_id)
-                    person_info = await person_api.get_person_info(person_id)
-                    nickname = person_info.get("nickname", "未知用户")
+                    nickname = nicknames.get(user_id) or "未知用户"
                     formatted_data["user_stats"][user_id] = {"nickname": nickname, "count": count}
             formatted_stats[chat_id] = formatted_data
 
         return formatted_stats
 
+    except HTTPException:
+        raise
     except Exception as e:
         # 统一异常处理
         logger.error(f"获取消息统计时发生错误: {e}")
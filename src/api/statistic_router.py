@@ -24,6 +24,7 @@ IN_TOK_BY_TYPE = "in_tokens_by_type"
 IN_TOK_BY_USER = "in_tokens_by_user"
 IN_TOK_BY_MODEL = "in_tokens_by_model"
 IN_TOK_BY_MODULE = "in_tokens_by_module"
+CACHED_TOK_BY_MODEL = "cached_tokens_by_model"
 OUT_TOK_BY_TYPE = "out_tokens_by_type"
 OUT_TOK_BY_USER = "out_tokens_by_user"
 OUT_TOK_BY_MODEL = "out_tokens_by_model"
@@ -106,6 +107,11 @@ async def get_llm_stats(
                 "output_tokens": period_stats.get(out_tok_key, {}).get(group_name, 0),
                 "total_tokens": period_stats.get(total_tok_key, {}).get(group_name, 0),
             }
+            if group_by == "model":
+                # 命中服务端提示词缓存的输入token数（已包含在 input_tokens 中）
+                details_by_group[group_name]["cached_input_tokens"] = period_stats.get(
+                    CACHED_TOK_BY_MODEL, {}
+                ).get(group_name, 0)
 
         return {
             "period": {"start": start_time.isoformat(), "end": end_time.isoformat()},
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.common.logger import get_logger
+from src.common.message_trace import get_message_tracer
+from src.common.security import get_api_key
+
+logger = get_logger("消息追踪API")
+
+router = APIRouter(dependencies=[Depends(get_api_key)])
+
+
+@router.get("/traces")
+async def get_recent_traces(
+    limit: int = Query(50, ge=1, le=1000, description="返回的追踪数量"),
+    stream_id: str | None = Query(None, description="只返回指定聊天流的追踪"),
+):
+    """
+    获取最近完成的消息延迟追踪（新的在前）。
+    """
+    tracer = get_message_tracer()
+    return {"stats": tracer.get_stats(), "traces": tracer.get_recent_traces(limit=limit, stream_id=stream_id)}
+
+
+@router.get("/traces/stages")
+async def get_stage_histograms():
+    """
+    获取各处理阶段的耗时直方图。
+    """
+    tracer = get_message_tracer()
+    return {"stats": tracer.get_stats(), "stages": tracer.get_stage_histograms()}
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """
+    获取单条追踪的详细阶段耗时。
+    """
+    trace = get_message_tracer().get_trace(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="追踪不存在或已被淘汰")
+    return trace
+
+
+@router.delete("/traces")
+async def reset_traces():
+    """
+    清空已归档的追踪与直方图。
+    """
+    get_message_tracer().reset()
+    logger.info("已清空消息追踪数据")
+    return {"success": True}
@@ -1,13 +1,18 @@
 """兴趣值计算组件管理器
 
 管理兴趣值计算组件的生命周期，确保系统只能有一个兴趣值计算组件实例运行
+
+计算请求会按聊天流在短时间窗口内合并，交由计算组件的批量入口统一计算，
+结果按消息ID缓存；超时返回默认值的消息在计算完成后仍会回写真实结果。
 """
 
 import asyncio
 import time
+from collections import OrderedDict, defaultdict
 from typing import TYPE_CHECKING
 
 from src.common.logger import get_logger
+from src.common.message_trace import trace_span
 from src.plugin_system.base.base_interest_calculator import BaseInterestCalculator, InterestCalculationResult
 
 if TYPE_CHECKING:
@@ -15,6 +20,13 @@ if TYPE_CHECKING:
 
 logger = get_logger("interest_manager")
 
+# 同一聊天流内合并计算请求的时间窗口（秒）
+BATCH_WINDOW = 0.05
+# 单批最多计算的消息数
+MAX_BATCH_SIZE = 32
+# 按消息ID缓存的计算结果数量
+RESULT_CACHE_SIZE = 2000
+
 
 class InterestManager:
     """兴趣值计算组件管理器"""
@@ -34,19 +46,39 @@ class InterestManager:
             self._last_calculation_time = 0.0
             self._total_calculations = 0
             self._failed_calculations = 0
-            self._calculation_queue = asyncio.Queue()
-            self._worker_task = None
+            self._calculation_queue: asyncio.Queue[tuple[DatabaseMessages, asyncio.Future]] = asyncio.Queue()
+            self._worker_task: asyncio.Task | None = None
             self._shutdown_event = asyncio.Event()
+            # 计算中的请求（message_id -> future），相同消息的重复请求共享同一结果
+            self._inflight: dict[str, asyncio.Future] = {}
+            self._result_cache: OrderedDict[str, InterestCalculationResult] = OrderedDict()
+            self._batch_tasks: set[asyncio.Task] = set()
+            self._total_batches = 0
+            self._late_results = 0
             self._initialized = True
 
     async def initialize(self):
         """初始化管理器"""
-        pass
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        """确保批量计算工作任务在运行"""
+        if self._worker_task is None or self._worker_task.done():
+            self._shutdown_event.clear()
+            self._worker_task = asyncio.create_task(self._calculation_worker(), name="interest_calculation_worker")
 
     async def shutdown(self):
         """关闭管理器"""
         self._shutdown_event.set()
 
+        if self._worker_task and not self._worker_task.done():
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+        self._worker_task = None
+
         if self._current_calculator:
             await self._current_calculator.cleanup()
             self._current_calculator = None
@@ -111,24 +143,21 @@ class InterestManager:
                 error_message="没有可用的兴趣值计算组件",
             )
 
-        # 使用 create_task 异步执行计算
-        task = asyncio.create_task(self._async_calculate(message))
+        cached = self._get_cached_result(message)
+        if cached is not None:
+            return cached
+
+        future = self._submit(message)
 
         try:
-            # 等待计算结果，但有超时限制
-            result = await asyncio.wait_for(task, timeout=timeout)
-            return result
+            # 等待计算结果，但有超时限制；shield 保证超时后计算仍在后台继续
+            with trace_span("interest"):
+                return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
         except asyncio.TimeoutError:
-            # 超时返回默认结果，但计算仍在后台继续
+            # 超时返回默认结果，计算完成后再回写真实结果
             logger.warning(f"兴趣值计算超时 ({timeout}s)，消息 {getattr(message, 'message_id', '')} 使用默认兴趣值 0.5")
-            return InterestCalculationResult(
-                success=True,
-                message_id=getattr(message, "message_id", ""),
-                interest_value=0.5,  # 固定默认兴趣值
-                should_reply=False,
-                should_act=False,
-                error_message=f"计算超时({timeout}s)，使用默认值",
-            )
+            self._publish_when_done(message, future)
+            return self._timeout_result(message, timeout)
         except Exception as e:
             # 发生异常，返回默认结果
             logger.error(f"兴趣值计算异常: {e}")
@@ -139,53 +168,157 @@ class InterestManager:
                 error_message=f"计算异常: {e!s}",
             )
 
-    async def _async_calculate(self, message: "DatabaseMessages") -> InterestCalculationResult:
-        """异步执行兴趣值计算"""
-        start_time = time.time()
-        self._total_calculations += 1
+    async def calculate_interest_batch(
+        self, messages: list["DatabaseMessages"], timeout: float = 2.0
+    ) -> list[InterestCalculationResult]:
+        """批量计算消息兴趣值
 
-        if not self._current_calculator:
-            return InterestCalculationResult(
-                success=False,
-                message_id=getattr(message, "message_id", ""),
-                interest_value=0.0,
-                error_message="没有可用的兴趣值计算组件",
-                calculation_time=time.time() - start_time,
-            )
-
-        try:
-            # 使用组件的安全执行方法
-            result = await self._current_calculator._safe_execute(message)
+        Args:
+            messages: 数据库消息对象列表
+            timeout: 整批的最大等待时间（秒），超时的消息使用默认值返回
 
-            if result.success:
-                self._last_calculation_time = time.time()
-                logger.debug(f"兴趣值计算完成: {result.interest_value:.3f} (耗时: {result.calculation_time:.3f}s)")
+        Returns:
+            list[InterestCalculationResult]: 与 messages 一一对应的计算结果
+        """
+        if not messages:
+            return []
+        if not self._current_calculator:
+            return [await self.calculate_interest(message) for message in messages]
+
+        results: list[InterestCalculationResult | None] = [self._get_cached_result(message) for message in messages]
+        futures = {index: self._submit(message) for index, message in enumerate(messages) if results[index] is None}
+
+        if futures:
+            with trace_span("interest"):
+                await asyncio.wait(futures.values(), timeout=timeout)
+
+        for index, future in futures.items():
+            message = messages[index]
+            if future.done() and not future.cancelled() and future.exception() is None:
+                results[index] = future.result()
+            elif future.done():
+                error = future.exception() if not future.cancelled() else None
+                results[index] = InterestCalculationResult(
+                    success=False,
+                    message_id=getattr(message, "message_id", ""),
+                    interest_value=0.3,
+                    error_message=f"计算异常: {error!s}",
+                )
             else:
-                self._failed_calculations += 1
-                logger.warning(f"兴趣值计算失败: {result.error_message}")
-
-            return result
+                self._publish_when_done(message, future)
+                results[index] = self._timeout_result(message, timeout)
+
+        return [result for result in results if result is not None]
+
+    @staticmethod
+    def _timeout_result(message: "DatabaseMessages", timeout: float) -> InterestCalculationResult:
+        return InterestCalculationResult(
+            success=True,
+            message_id=getattr(message, "message_id", ""),
+            interest_value=0.5,  # 固定默认兴趣值
+            should_reply=False,
+            should_act=False,
+            error_message=f"计算超时({timeout}s)，使用默认值",
+        )
+
+    def _get_cached_result(self, message: "DatabaseMessages") -> InterestCalculationResult | None:
+        message_id = str(getattr(message, "message_id", "") or "")
+        if not message_id:
+            return None
+        result = self._result_cache.get(message_id)
+        if result is not None:
+            self._result_cache.move_to_end(message_id)
+        return result
+
+    def _cache_result(self, result: InterestCalculationResult):
+        if not result.success or not result.message_id:
+            return
+        message_id = str(result.message_id)
+        self._result_cache[message_id] = result
+        self._result_cache.move_to_end(message_id)
+        while len(self._result_cache) > RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+
+    def _submit(self, message: "DatabaseMessages") -> asyncio.Future:
+        """提交计算请求，相同消息ID的请求共享同一个 future"""
+        message_id = str(getattr(message, "message_id", "") or "")
+        if message_id and message_id in self._inflight:
+            return self._inflight[message_id]
+
+        future = asyncio.get_running_loop().create_future()
+        if message_id:
+            self._inflight[message_id] = future
+            future.add_done_callback(lambda _f, key=message_id: self._inflight.pop(key, None))
+
+        self._ensure_worker()
+        self._calculation_queue.put_nowait((message, future))
+        return future
+
+    def _publish_when_done(self, message: "DatabaseMessages", future: asyncio.Future):
+        """超时的计算完成后，将真实结果回写到消息对象和数据库"""
+
+        def _on_done(done_future: asyncio.Future):
+            if done_future.cancelled() or done_future.exception() is not None:
+                return
+            result: InterestCalculationResult = done_future.result()
+            if not result.success:
+                return
+
+            message.interest_value = result.interest_value
+            message.should_reply = result.should_reply
+            message.should_act = result.should_act
+            if hasattr(message, "interest_calculated"):
+                message.interest_calculated = True
+            self._late_results += 1
+
+            task = asyncio.create_task(self._persist_late_result(result))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+        future.add_done_callback(_on_done)
+
+    @staticmethod
+    async def _persist_late_result(result: InterestCalculationResult):
+        try:
+            from src.chat.message_receive.storage import MessageStorage
 
-        except Exception as e:
-            self._failed_calculations += 1
-            logger.error(f"兴趣值计算异常: {e}")
-            return InterestCalculationResult(
-                success=False,
-                message_id=getattr(message, "message_id", ""),
-                interest_value=0.0,
-                error_message=f"计算异常: {e!s}",
-                calculation_time=time.time() - start_time,
+            await MessageStorage.update_message_interest_value(
+                result.message_id, result.interest_value, should_reply=result.should_reply
             )
+            logger.debug(f"已回写超时消息 {result.message_id} 的兴趣值: {result.interest_value:.3f}")
+        except Exception as e:
+            logger.warning(f"回写超时消息兴趣值失败: {e}")
 
     async def _calculation_worker(self):
-        """计算工作线程（预留用于批量处理）"""
+        """计算工作任务：按聊天流合并短时间窗口内的请求，批量计算"""
         while not self._shutdown_event.is_set():
             try:
                 # 等待计算任务或关闭信号
-                await asyncio.wait_for(self._calculation_queue.get(), timeout=1.0)
-
-                # 处理计算任务
-                # 这里可以实现批量处理逻辑
+                first = await asyncio.wait_for(self._calculation_queue.get(), timeout=1.0)
+                requests = [first]
+
+                # 在窗口期内继续收集请求
+                deadline = time.perf_counter() + BATCH_WINDOW
+                while True:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        requests.append(await asyncio.wait_for(self._calculation_queue.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                # 按聊天流分组，每组拆分为不超过 MAX_BATCH_SIZE 的批次并发计算
+                by_stream: dict[str, list[tuple[DatabaseMessages, asyncio.Future]]] = defaultdict(list)
+                for message, future in requests:
+                    by_stream[getattr(message, "chat_id", "") or ""].append((message, future))
+
+                for stream_requests in by_stream.values():
+                    for start in range(0, len(stream_requests), MAX_BATCH_SIZE):
+                        batch = stream_requests[start : start + MAX_BATCH_SIZE]
+                        task = asyncio.create_task(self._process_batch(batch))
+                        self._batch_tasks.add(task)
+                        task.add_done_callback(self._batch_tasks.discard)
 
             except asyncio.TimeoutError:
                 # 超时继续循环
@@ -196,6 +329,61 @@ class InterestManager:
             except Exception as e:
                 logger.error(f"计算工作线程异常: {e}")
 
+    async def _process_batch(self, batch: list[tuple["DatabaseMessages", asyncio.Future]]):
+        """执行一批计算并分发结果"""
+        messages = [message for message, _ in batch]
+        results = await self._async_calculate_batch(messages)
+
+        for (_, future), result in zip(batch, results):
+            self._cache_result(result)
+            if not future.done():
+                future.set_result(result)
+
+    async def _async_calculate_batch(self, messages: list["DatabaseMessages"]) -> list[InterestCalculationResult]:
+        """异步执行批量兴趣值计算"""
+        start_time = time.time()
+        self._total_calculations += len(messages)
+        self._total_batches += 1
+
+        if not self._current_calculator:
+            self._failed_calculations += len(messages)
+            return [
+                InterestCalculationResult(
+                    success=False,
+                    message_id=getattr(message, "message_id", ""),
+                    interest_value=0.0,
+                    error_message="没有可用的兴趣值计算组件",
+                    calculation_time=time.time() - start_time,
+                )
+                for message in messages
+            ]
+
+        try:
+            # 使用组件的安全批量执行方法
+            results = await self._current_calculator._safe_execute_batch(messages)
+        except Exception as e:
+            logger.error(f"兴趣值计算异常: {e}")
+            results = [
+                InterestCalculationResult(
+                    success=False,
+                    message_id=getattr(message, "message_id", ""),
+                    interest_value=0.0,
+                    error_message=f"计算异常: {e!s}",
+                    calculation_time=time.time() - start_time,
+                )
+                for message in messages
+            ]
+
+        for result in results:
+            if result.success:
+                self._last_calculation_time = time.time()
+            else:
+                self._failed_calculations += 1
+                logger.warning(f"兴趣值计算失败: {result.error_message}")
+
+        logger.debug(f"批量兴趣值计算完成: {len(messages)} 条消息 (耗时: {time.time() - start_time:.3f}s)")
+        return results
+
     def get_current_calculator(self) -> BaseInterestCalculator | None:
         """获取当前活跃的兴趣值计算组件"""
         return self._current_calculator
@@ -207,7 +395,10 @@ class InterestManager:
         stats = {
             "manager_statistics": {
                 "total_calculations": self._total_calculations,
+                "total_batches": self._total_batches,
                 "failed_calculations": self._failed_calculations,
+                "late_results": self._late_results,
+                "cached_results": len(self._result_cache),
                 "success_rate": success_rate,
                 "last_calculation_time": self._last_calculation_time,
                 "current_calculator": self._current_calculator.component_name if self._current_calculator else None,
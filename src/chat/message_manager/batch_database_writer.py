@@ -9,8 +9,8 @@ from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Any
 
-from src.common.database.compatibility import get_db_session
 from src.common.database.core.models import ChatStreams
+from src.common.database.optimization.write_queue import execute_write
 from src.common.logger import get_logger
 from src.config.config import global_config
 
@@ -22,9 +22,16 @@ class StreamUpdatePayload:
     """流更新数据结构"""
 
     stream_id: str
-    update_data: dict[str, Any]
+    update_data: dict[str, Any]  # 插入新行时使用的完整字段
     priority: int = 0  # 优先级，数字越大优先级越高
     timestamp: float = field(default_factory=time.time)
+    update_fields: set[str] | None = None  # 行已存在时需要更新的字段，None 表示 update_data 中的全部字段
+
+
+# SQLite 单条语句的绑定参数上限（旧版本为 999），多行 VALUES 需要按此拆分
+_SQLITE_MAX_BIND_PARAMS = 900
+# 其他数据库单条语句的最大行数
+_MAX_ROWS_PER_STATEMENT = 500
 
 
 class BatchDatabaseWriter:
@@ -96,14 +103,21 @@ class BatchDatabaseWriter:
 
         logger.info("批量数据库写入器已停止")
 
-    async def schedule_stream_update(self, stream_id: str, update_data: dict[str, Any], priority: int = 0) -> bool:
+    async def schedule_stream_update(
+        self,
+        stream_id: str,
+        update_data: dict[str, Any],
+        priority: int = 0,
+        update_fields: set[str] | None = None,
+    ) -> bool:
         """
         调度流更新
 
         Args:
             stream_id: 流ID
-            update_data: 更新数据
+            update_data: 更新数据（插入新行时使用的完整字段）
             priority: 优先级
+            update_fields: 行已存在时需要更新的字段，None 表示全部字段
 
         Returns:
             bool: 是否成功加入队列
@@ -111,11 +125,13 @@ class BatchDatabaseWriter:
         try:
             if not self.is_running:
                 logger.warning("批量写入器未运行，直接写入数据库")
-                await self._direct_write(stream_id, update_data)
+                await self._direct_write(stream_id, update_data, update_fields)
                 return True
 
             # 创建更新载荷
-            payload = StreamUpdatePayload(stream_id=stream_id, update_data=update_data, priority=priority)
+            payload = StreamUpdatePayload(
+                stream_id=stream_id, update_data=update_data, priority=priority, update_fields=update_fields
+            )
 
             # 非阻塞方式加入队列
             try:
@@ -189,14 +205,27 @@ class BatchDatabaseWriter:
             # 按优先级排序
             batch.sort(key=lambda x: (-x.priority, x.timestamp))
 
-            # 合并同一流ID的更新（保留最新的）
-            merged_updates = {}
+            # 合并同一流ID的更新（保留最新的数据，合并需要更新的字段）
+            merged_updates: dict[str, StreamUpdatePayload] = {}
             for payload in batch:
-                if (
-                    payload.stream_id not in merged_updates
-                    or payload.timestamp > merged_updates[payload.stream_id].timestamp
-                ):
+                existing = merged_updates.get(payload.stream_id)
+                if existing is None:
                     merged_updates[payload.stream_id] = payload
+                    continue
+                latest = payload if payload.timestamp > existing.timestamp else existing
+                if existing.update_fields is None or payload.update_fields is None:
+                    fields = None
+                else:
+                    fields = existing.update_fields | payload.update_fields
+                merged_updates[payload.stream_id] = StreamUpdatePayload(
+                    stream_id=latest.stream_id,
+                    update_data={**existing.update_data, **payload.update_data}
+                    if latest is payload
+                    else {**payload.update_data, **existing.update_data},
+                    priority=max(existing.priority, payload.priority),
+                    timestamp=latest.timestamp,
+                    update_fields=fields,
+                )
 
             # 批量写入
             await self._batch_write_to_database(list(merged_updates.values()))
@@ -214,83 +243,98 @@ class BatchDatabaseWriter:
             # 降级到单个写入
             for payload in batch:
                 try:
-                    await self._direct_write(payload.stream_id, payload.update_data)
+                    await self._direct_write(payload.stream_id, payload.update_data, payload.update_fields)
                 except Exception as single_e:
                     logger.error(f"单个写入也失败: {single_e}")
 
+    async def write_stream_updates(self, payloads: list[StreamUpdatePayload]):
+        """立即批量写入一组流更新（不经过队列）"""
+        if payloads:
+            await self._batch_write_to_database(payloads)
+
     async def _batch_write_to_database(self, payloads: list[StreamUpdatePayload]):
-        """批量写入数据库"""
+        """批量写入数据库
+
+        按（插入字段集合, 更新字段集合）分组，每组构建多行 VALUES 的 upsert 语句，
+        SQLite 下经由单写者队列与其他写入合并提交。
+        """
         if global_config is None:
             raise RuntimeError("Global config is not initialized")
 
-        async with get_db_session() as session:
-            for payload in payloads:
-                stream_id = payload.stream_id
-                update_data = payload.update_data
-
-                # 根据数据库类型选择不同的插入/更新策略
-                if global_config.database.database_type == "sqlite":
-                    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
-
-                    stmt = sqlite_insert(ChatStreams).values(stream_id=stream_id, **update_data)
-                    stmt = stmt.on_conflict_do_update(index_elements=["stream_id"], set_=update_data)
-                elif global_config.database.database_type == "mysql":
-                    from sqlalchemy.dialects.mysql import insert as mysql_insert
-
-                    stmt = mysql_insert(ChatStreams).values(stream_id=stream_id, **update_data)
-                    stmt = stmt.on_duplicate_key_update(
-                        **{key: value for key, value in update_data.items() if key != "stream_id"}
-                    )
-                elif global_config.database.database_type == "postgresql":
-                    from sqlalchemy.dialects.postgresql import insert as pg_insert
-
-                    stmt = pg_insert(ChatStreams).values(stream_id=stream_id, **update_data)
-                    stmt = stmt.on_conflict_do_update(
-                        index_elements=[ChatStreams.stream_id],
-                        set_=update_data
-                    )
-                else:
-                    # 默认使用SQLite语法
-                    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
-
-                    stmt = sqlite_insert(ChatStreams).values(stream_id=stream_id, **update_data)
-                    stmt = stmt.on_conflict_do_update(index_elements=["stream_id"], set_=update_data)
+        statements = self._build_bulk_upsert_stmts(payloads)
 
+        async def _write(session):
+            for stmt in statements:
                 await session.execute(stmt)
-    async def _direct_write(self, stream_id: str, update_data: dict[str, Any]):
-        """直接写入数据库（降级方案）"""
-        if global_config is None:
-            raise RuntimeError("Global config is not initialized")
 
-        async with get_db_session() as session:
-            if global_config.database.database_type == "sqlite":
-                from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        await execute_write(_write, name="chat_stream_batch")
 
-                stmt = sqlite_insert(ChatStreams).values(stream_id=stream_id, **update_data)
-                stmt = stmt.on_conflict_do_update(index_elements=["stream_id"], set_=update_data)
-            elif global_config.database.database_type == "mysql":
-                from sqlalchemy.dialects.mysql import insert as mysql_insert
+    async def _direct_write(
+        self, stream_id: str, update_data: dict[str, Any], update_fields: set[str] | None = None
+    ):
+        """直接写入数据库（降级方案）"""
+        await self._batch_write_to_database(
+            [StreamUpdatePayload(stream_id=stream_id, update_data=update_data, update_fields=update_fields)]
+        )
 
-                stmt = mysql_insert(ChatStreams).values(stream_id=stream_id, **update_data)
-                stmt = stmt.on_duplicate_key_update(
-                    **{key: value for key, value in update_data.items() if key != "stream_id"}
-                )
-            elif global_config.database.database_type == "postgresql":
-                from sqlalchemy.dialects.postgresql import insert as pg_insert
+    @staticmethod
+    def _build_bulk_upsert_stmts(payloads: list[StreamUpdatePayload]) -> list:
+        """构建多行 upsert 语句
 
-                stmt = pg_insert(ChatStreams).values(stream_id=stream_id, **update_data)
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=[ChatStreams.stream_id],
-                    set_=update_data
-                )
+        多行 VALUES 要求每行的列一致，因此按插入列与冲突时更新的列分组。
+        """
+        assert global_config is not None
+        db_type = global_config.database.database_type
+
+        groups: dict[tuple[tuple[str, ...], tuple[str, ...]], list[dict[str, Any]]] = defaultdict(list)
+        for payload in payloads:
+            row = {"stream_id": payload.stream_id, **payload.update_data}
+            insert_columns = tuple(sorted(row))
+            fields = payload.update_fields if payload.update_fields is not None else payload.update_data.keys()
+            update_columns = tuple(sorted(key for key in fields if key in row and key != "stream_id"))
+            groups[(insert_columns, update_columns)].append(row)
+
+        statements = []
+        for (insert_columns, update_columns), rows in groups.items():
+            if db_type in ("mysql", "postgresql"):
+                chunk_size = _MAX_ROWS_PER_STATEMENT
             else:
-                from sqlalchemy.dialects.sqlite import insert as sqlite_insert
-
-                stmt = sqlite_insert(ChatStreams).values(stream_id=stream_id, **update_data)
-                stmt = stmt.on_conflict_do_update(index_elements=["stream_id"], set_=update_data)
-
-            await session.execute(stmt)
-            await session.commit()
+                chunk_size = max(1, _SQLITE_MAX_BIND_PARAMS // len(insert_columns))
+
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start : start + chunk_size]
+                statements.append(BatchDatabaseWriter._build_upsert_stmt(db_type, chunk, update_columns))
+
+        return statements
+
+    @staticmethod
+    def _build_upsert_stmt(db_type: str, rows: list[dict[str, Any]], update_columns: tuple[str, ...]):
+        """根据数据库类型构建单条多行插入/更新语句"""
+        if db_type == "mysql":
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+            stmt = mysql_insert(ChatStreams).values(rows)
+            if not update_columns:
+                # MySQL 没有 DO NOTHING，用无副作用的自赋值代替
+                return stmt.on_duplicate_key_update(stream_id=stmt.inserted.stream_id)
+            return stmt.on_duplicate_key_update({key: stmt.inserted[key] for key in update_columns})
+
+        if db_type == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+            stmt = pg_insert(ChatStreams).values(rows)
+        else:
+            # SQLite（默认）
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            stmt = sqlite_insert(ChatStreams).values(rows)
+
+        if not update_columns:
+            return stmt.on_conflict_do_nothing(index_elements=[ChatStreams.stream_id])
+        return stmt.on_conflict_do_update(
+            index_elements=[ChatStreams.stream_id],
+            set_={key: stmt.excluded[key] for key in update_columns},
+        )
 
     async def _flush_all_batches(self):
         """刷新所有剩余批次"""
@@ -10,6 +10,7 @@ from typing import TYPE_CHECKING, Any
 from src.chat.chatter_manager import ChatterManager
 from src.chat.energy_system import energy_manager
 from src.common.logger import get_logger
+from src.common.message_trace import get_message_tracer
 from src.config.config import global_config
 from src.chat.message_receive.chat_stream import get_chat_manager
 
@@ -499,6 +500,8 @@ class StreamLoopManager:
         self._set_stream_processing_status(stream_id, True)
 
         chatter_task = None
+        tracer = get_message_tracer()
+        traces = []
         try:
             start_time = time.time()
             # 检查未读消息，如果为空则直接返回（优化：避免无效的 chatter 调用）
@@ -507,11 +510,16 @@ class StreamLoopManager:
                 logger.debug(f"流 {stream_id} 未读消息为空，跳过 chatter 处理")
                 return True  # 返回 True 表示处理完成（虽然没有实际处理）
 
+            # 认领这批消息的延迟追踪；以最新一条消息的追踪作为 chatter 任务的活动追踪
+            traces = tracer.claim(msg.message_id for msg in unread_messages)
+
             # 🔇 静默群组检查：在静默群组中，只有提到 Bot 名字/别名才响应
             if await self._should_skip_for_mute_group(stream_id, unread_messages):
                 # 清空未读消息，不触发 chatter
                 from .message_manager import message_manager
                 await message_manager.clear_stream_unread_messages(stream_id)
+                for trace in traces:
+                    tracer.finish(trace, status="skipped")
                 logger.debug(f"🔇 流 {stream_id} 在静默列表中且未提及Bot，跳过处理")
                 return True
 
@@ -526,11 +534,16 @@ class StreamLoopManager:
             context.is_chatter_processing = True
             logger.debug(f"设置 Chatter 处理标志: {stream_id}")
 
-            # 创建 chatter 处理任务，以便可以在打断时取消
-            chatter_task = asyncio.create_task(
-                self.chatter_manager.process_stream_context(stream_id, context),
-                name=f"chatter_process_{stream_id}"
-            )
+            # 创建 chatter 处理任务，以便可以在打断时取消（任务会复制当前上下文中的活动追踪）
+            trace_token = tracer.activate(traces[-1]) if traces else None
+            try:
+                chatter_task = asyncio.create_task(
+                    self.chatter_manager.process_stream_context(stream_id, context),
+                    name=f"chatter_process_{stream_id}"
+                )
+            finally:
+                if trace_token is not None:
+                    tracer.deactivate(trace_token)
 
             # 记录任务句柄，便于后续检测/自愈
             context.processing_task = chatter_task
@@ -571,6 +584,10 @@ class StreamLoopManager:
             context.processing_task = None
             logger.debug(f"清除 Chatter 处理标志: {stream_id}")
 
+            # 结束追踪：同批被合并处理的较早消息标记为 batched
+            for index, trace in enumerate(traces):
+                tracer.finish(trace, status="completed" if index == len(traces) - 1 else "batched")
+
             # 无论成功或失败，都要设置处理状态为未处理
             self._set_stream_processing_status(stream_id, False)
 
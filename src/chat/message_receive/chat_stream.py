@@ -1,16 +1,13 @@
 import asyncio
 import hashlib
 import time
+from typing import Any
 
 from rich.traceback import install
-from sqlalchemy.dialects.mysql import insert as mysql_insert
-from sqlalchemy.dialects.postgresql import insert as pg_insert
-from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from src.common.data_models.database_data_model import DatabaseGroupInfo,DatabaseUserInfo
 from src.common.data_models.database_data_model import DatabaseMessages
 from src.common.database.api.crud import CRUDBase
-from src.common.database.compatibility import get_db_session
 from src.common.database.core.models import ChatStreams  # 新增导入
 from src.common.logger import get_logger
 from src.config.config import global_config  # 新增导入
@@ -42,7 +39,8 @@ class ChatStream:
         self.create_time = data.get("create_time", time.time()) if data else time.time()
         self.last_active_time = data.get("last_active_time", self.create_time) if data else self.create_time
         self.sleep_pressure = data.get("sleep_pressure", 0.0) if data else 0.0
-        self.saved = False
+        # 上次成功持久化时的字段值，用于字段级脏检查；为空表示尚未持久化
+        self._persisted_fields: dict[str, Any] = {}
 
         from src.common.data_models.message_manager_data_model import StreamContext
         from src.plugin_system.base.component_types import ChatMode, ChatType
@@ -57,6 +55,52 @@ class ChatStream:
         self._focus_energy = 0.5  # 内部存储的focus_energy值
         self.no_reply_consecutive = 0
 
+    @property
+    def saved(self) -> bool:
+        """是否所有需要持久化的字段都已保存"""
+        return not self.get_dirty_fields()
+
+    @saved.setter
+    def saved(self, value: bool):
+        # 设置为 True 表示当前字段值已与数据库一致；
+        # 设置为 False 时无需额外处理，脏字段会在保存时按值比较得出
+        if value:
+            self.mark_fields_persisted(self.get_db_fields())
+
+    def get_db_fields(self) -> dict[str, Any]:
+        """获取聊天流自身维护的 chat_streams 表字段"""
+        user_info = self.user_info
+        group_info = self.group_info
+        return {
+            "platform": self.platform or "",
+            "create_time": self.create_time,
+            "last_active_time": self.last_active_time,
+            "user_platform": user_info.platform if user_info else "",
+            "user_id": user_info.user_id if user_info else "",
+            "user_nickname": user_info.user_nickname if user_info else "",
+            "user_cardname": user_info.user_cardname if user_info else None,
+            "group_platform": (group_info.platform or "") if group_info else "",
+            "group_id": group_info.group_id if group_info else "",
+            "group_name": group_info.group_name if group_info else "",
+            "sleep_pressure": self.sleep_pressure,
+            "focus_energy": self.focus_energy,
+            "base_interest_energy": self.base_interest_energy,
+            "interruption_count": self.context.interruption_count,
+        }
+
+    def get_dirty_fields(self) -> dict[str, Any]:
+        """获取自上次持久化以来发生变化的字段"""
+        persisted = self._persisted_fields
+        return {
+            key: value
+            for key, value in self.get_db_fields().items()
+            if key not in persisted or persisted[key] != value
+        }
+
+    def mark_fields_persisted(self, fields: dict[str, Any]):
+        """记录已持久化的字段值"""
+        self._persisted_fields.update(fields)
+
     def to_dict(self) -> dict:
         """转换为字典格式"""
         return {
@@ -119,7 +163,6 @@ class ChatStream:
     def update_active_time(self):
         """更新最后活跃时间"""
         self.last_active_time = time.time()
-        self.saved = False
 
     async def set_context(self, message: DatabaseMessages):
         """设置聊天消息上下文
@@ -551,148 +594,75 @@ class ChatManager:
         """
         return self.streams.copy()  # 返回副本以防止外部修改
 
-    @staticmethod
-    def _prepare_stream_data(stream_data_dict: dict) -> dict:
-        """准备聊天流保存数据"""
-        user_info_d = stream_data_dict.get("user_info")
-        group_info_d = stream_data_dict.get("group_info")
-
-        return {
-            "platform": stream_data_dict["platform"],
-            "create_time": stream_data_dict["create_time"],
-            "last_active_time": stream_data_dict["last_active_time"],
-            "user_platform": user_info_d["platform"] if user_info_d else "",
-            "user_id": user_info_d["user_id"] if user_info_d else "",
-            "user_nickname": user_info_d["user_nickname"] if user_info_d else "",
-            "user_cardname": user_info_d.get("user_cardname", "") if user_info_d else None,
-            "group_platform": group_info_d["platform"] if group_info_d else "",
-            "group_id": group_info_d["group_id"] if group_info_d else "",
-            "group_name": group_info_d["group_name"] if group_info_d else "",
-            "energy_value": stream_data_dict.get("energy_value", 5.0),
-            "sleep_pressure": stream_data_dict.get("sleep_pressure", 0.0),
-            "focus_energy": stream_data_dict.get("focus_energy", 0.5),
-            # 新增动态兴趣度系统字段
-            "base_interest_energy": stream_data_dict.get("base_interest_energy", 0.5),
-            "message_interest_total": stream_data_dict.get("message_interest_total", 0.0),
-            "message_count": stream_data_dict.get("message_count", 0),
-            "action_count": stream_data_dict.get("action_count", 0),
-            "reply_count": stream_data_dict.get("reply_count", 0),
-            "last_interaction_time": stream_data_dict.get("last_interaction_time", time.time()),
-            "consecutive_no_reply": stream_data_dict.get("consecutive_no_reply", 0),
-            "interruption_count": stream_data_dict.get("interruption_count", 0),
-        }
-
     @staticmethod
     async def _save_stream(stream: ChatStream):
-        """保存聊天流到数据库 - 优化版本使用异步批量写入"""
-        if stream.saved:
+        """保存聊天流到数据库 - 只写入发生变化的字段，优先使用异步批量写入"""
+        dirty_fields = stream.get_dirty_fields()
+        if not dirty_fields:
             return
-        stream_data_dict = stream.to_dict()
+        row = stream.get_db_fields()
 
-        # 优先使用新的批量写入器
-        try:
-            from src.chat.message_manager.batch_database_writer import get_batch_writer
+        from src.chat.message_manager.batch_database_writer import StreamUpdatePayload, get_batch_writer
 
-            batch_writer = get_batch_writer()
+        batch_writer = get_batch_writer()
+
+        # 优先使用批量写入器
+        try:
             if batch_writer.is_running:
                 success = await batch_writer.schedule_stream_update(
-                    stream_id=stream_data_dict["stream_id"],
-                    update_data=ChatManager._prepare_stream_data(stream_data_dict),
+                    stream_id=stream.stream_id,
+                    update_data=row,
                     priority=1,  # 流更新的优先级
+                    update_fields=set(dirty_fields),
                 )
                 if success:
-                    stream.saved = True
+                    stream.mark_fields_persisted(row)
                     logger.debug(f"聊天流 {stream.stream_id} 通过批量写入器调度成功")
                     return
                 else:
-                    logger.warning(f"批量写入器队列已满，使用原始方法: {stream.stream_id}")
+                    logger.warning(f"批量写入器队列已满，直接写入: {stream.stream_id}")
             else:
-                logger.debug(f"批量写入器未运行，使用原始方法: {stream.stream_id}")
+                logger.debug(f"批量写入器未运行，直接写入: {stream.stream_id}")
 
         except Exception as e:
-            logger.debug(f"批量写入器保存聊天流失败，使用原始方法: {e}")
-
-        # 尝试使用数据库批量调度器（回退方案1） - [已废弃]
-        # try:
-        #     from src.common.database.optimization.batch_scheduler import batch_update, get_batch_session
-        #
-        #     async with get_batch_session():
-        #         # 使用批量更新
-        #         result = await batch_update(
-        #             model_class=ChatStreams,
-        #             conditions={"stream_id": stream_data_dict["stream_id"]},
-        #             data=ChatManager._prepare_stream_data(stream_data_dict),
-        #         )
-        #         if result and result > 0:
-        #             stream.saved = True
-        #             logger.debug(f"聊天流 {stream.stream_id} 通过批量调度器保存成功")
-        #             return
-        # except (ImportError, Exception) as e:
-        #     logger.debug(f"批量调度器保存聊天流失败，使用原始方法: {e}")
-
-        # 回退到原始方法（最终方案）
-        async def _db_save_stream_async(s_data_dict: dict):
-            if global_config is None:
-                raise RuntimeError("Global config is not initialized")
-
-            async with get_db_session() as session:
-                user_info_d = s_data_dict.get("user_info")
-                group_info_d = s_data_dict.get("group_info")
-                fields_to_save = {
-                    "platform": s_data_dict.get("platform", "") or "",
-                    "create_time": s_data_dict["create_time"],
-                    "last_active_time": s_data_dict["last_active_time"],
-                    "user_platform": user_info_d["platform"] if user_info_d else "",
-                    "user_id": user_info_d["user_id"] if user_info_d else "",
-                    "user_nickname": user_info_d["user_nickname"] if user_info_d else "",
-                    "user_cardname": user_info_d.get("user_cardname", "") if user_info_d else None,
-                    "group_platform": group_info_d.get("platform", "") or "" if group_info_d else "",
-                    "group_id": group_info_d["group_id"] if group_info_d else "",
-                    "group_name": group_info_d["group_name"] if group_info_d else "",
-                    "energy_value": s_data_dict.get("energy_value", 5.0),
-                    "sleep_pressure": s_data_dict.get("sleep_pressure", 0.0),
-                    "focus_energy": s_data_dict.get("focus_energy", 0.5),
-                    # 新增动态兴趣度系统字段
-                    "base_interest_energy": s_data_dict.get("base_interest_energy", 0.5),
-                    "message_interest_total": s_data_dict.get("message_interest_total", 0.0),
-                    "message_count": s_data_dict.get("message_count", 0),
-                    "action_count": s_data_dict.get("action_count", 0),
-                    "reply_count": s_data_dict.get("reply_count", 0),
-                    "last_interaction_time": s_data_dict.get("last_interaction_time", time.time()),
-                    "consecutive_no_reply": s_data_dict.get("consecutive_no_reply", 0),
-                    "interruption_count": s_data_dict.get("interruption_count", 0),
-                }
-                if global_config.database.database_type == "sqlite":
-                    stmt = sqlite_insert(ChatStreams).values(stream_id=s_data_dict["stream_id"], **fields_to_save)
-                    stmt = stmt.on_conflict_do_update(index_elements=["stream_id"], set_=fields_to_save)
-                elif global_config.database.database_type == "mysql":
-                    stmt = mysql_insert(ChatStreams).values(stream_id=s_data_dict["stream_id"], **fields_to_save)
-                    stmt = stmt.on_duplicate_key_update(
-                        **{key: value for key, value in fields_to_save.items() if key != "stream_id"}
-                    )
-                elif global_config.database.database_type == "postgresql":
-                    stmt = pg_insert(ChatStreams).values(stream_id=s_data_dict["stream_id"], **fields_to_save)
-                    # PostgreSQL 需要使用 constraint 参数或正确的 index_elements
-                    stmt = stmt.on_conflict_do_update(
-                        index_elements=[ChatStreams.stream_id],
-                        set_=fields_to_save
-                    )
-                else:
-                    stmt = sqlite_insert(ChatStreams).values(stream_id=s_data_dict["stream_id"], **fields_to_save)
-                    stmt = stmt.on_conflict_do_update(index_elements=["stream_id"], set_=fields_to_save)
-                await session.execute(stmt)
-                await session.commit()
+            logger.debug(f"批量写入器保存聊天流失败，直接写入: {e}")
 
         try:
-            await _db_save_stream_async(stream_data_dict)
-            stream.saved = True
+            await batch_writer.write_stream_updates(
+                [StreamUpdatePayload(stream_id=stream.stream_id, update_data=row, update_fields=set(dirty_fields))]
+            )
+            stream.mark_fields_persisted(row)
         except Exception as e:
             logger.error(f"保存聊天流 {stream.stream_id} 到数据库失败 (SQLAlchemy): {e}")
 
     async def _save_all_streams(self):
-        """保存所有聊天流"""
-        for stream in self.streams.values():
-            await self._save_stream(stream)
+        """保存所有聊天流 - 收集所有脏聊天流后按变更字段分组批量写入"""
+        from src.chat.message_manager.batch_database_writer import StreamUpdatePayload, get_batch_writer
+
+        payloads = []
+        pending: list[tuple[ChatStream, dict]] = []
+        for stream in list(self.streams.values()):
+            dirty_fields = stream.get_dirty_fields()
+            if not dirty_fields:
+                continue
+            row = stream.get_db_fields()
+            payloads.append(
+                StreamUpdatePayload(stream_id=stream.stream_id, update_data=row, update_fields=set(dirty_fields))
+            )
+            pending.append((stream, row))
+
+        if not payloads:
+            return
+
+        try:
+            await get_batch_writer().write_stream_updates(payloads)
+        except Exception as e:
+            logger.error(f"批量保存 {len(payloads)} 个聊天流失败: {e}")
+            return
+
+        for stream, row in pending:
+            stream.mark_fields_persisted(row)
+        logger.debug(f"批量保存了 {len(payloads)} 个聊天流")
 
     async def load_all_streams(self):
         """从数据库加载所有聊天流"""
@@ -29,6 +29,7 @@ from __future__ import annotations
 
 import os
 import re
+import time
 import traceback
 from typing import TYPE_CHECKING, Any, cast
 
@@ -39,6 +40,7 @@ from src.chat.message_receive.storage import MessageStorage
 from src.chat.utils.utils import is_mentioned_bot_in_message
 from src.common.data_models.database_data_model import DatabaseGroupInfo, DatabaseMessages, DatabaseUserInfo
 from src.common.logger import get_logger
+from src.common.message_trace import get_current_trace, get_message_tracer
 from src.config.config import global_config
 from src.mood.mood_manager import mood_manager
 from src.plugin_system.base import BaseCommand, EventType
@@ -414,6 +416,11 @@ class MessageHandler:
         4. 命令处理
         5. 触发事件、存储、情绪更新
         """
+        begin = time.perf_counter()
+        received_at = time.time()
+        tracer = get_message_tracer()
+        trace = None
+        trace_token = None
         try:
             message_info = envelope.get("message_info")
             if not isinstance(message_info, dict):
@@ -445,6 +452,12 @@ class MessageHandler:
                 platform=chat.platform
             )
 
+            # 按采样率开始延迟追踪，适配器阶段为消息时间戳到收到消息的间隔
+            trace = tracer.start_trace(message.message_id, chat.stream_id, begin=begin)
+            if trace is not None:
+                trace.add_duration("adapter", max(0.0, received_at - message.time), end=begin)
+                trace_token = tracer.activate(trace)
+
             # 填充聊天流时间信息
             message.chat_info.create_time = chat.create_time
             message.chat_info.last_active_time = chat.last_active_time
@@ -498,6 +511,12 @@ class MessageHandler:
         except Exception as e:
             logger.error(f"处理消息时出错: {e}")
             logger.error(traceback.format_exc())
+        finally:
+            if trace_token is not None:
+                tracer.deactivate(trace_token)
+            # 未交接给流循环的消息（被过滤、命令拦截等）在此结束追踪
+            if trace is not None and trace.enqueued_at is None:
+                tracer.finish(trace, status="filtered")
 
         return None
 
@@ -727,6 +746,11 @@ class MessageHandler:
                     should_process_in_manager = False
 
             if should_process_in_manager:
+                trace = get_current_trace()
+                if trace is not None:
+                    # 先登记再入队，避免流循环在入队过程中就开始处理而认领不到
+                    trace.add_span("preprocess", trace.begin, time.perf_counter())
+                    get_message_tracer().hand_off(trace)
                 await message_manager.add_message(chat.stream_id, message)
                 logger.debug(f"消息已添加到消息管理器: {chat.stream_id}")
 
@@ -1,9 +1,11 @@
 import asyncio
+import os
 import re
 import time
 import traceback
 from collections import deque
-from typing import Optional, TYPE_CHECKING, cast
+from pathlib import Path
+from typing import BinaryIO, Optional, TYPE_CHECKING, cast
 
 import orjson
 from sqlalchemy import desc, select, update
@@ -12,39 +14,69 @@ from sqlalchemy.engine import CursorResult
 from src.common.data_models.database_data_model import DatabaseMessages
 from src.common.database.core import get_db_session
 from src.common.database.core.models import Images, Messages
+from src.common.database.optimization.write_queue import execute_write
 from src.common.logger import get_logger
+from src.common.recent_message_buffer import get_recent_message_buffer
 
 if TYPE_CHECKING:
     from src.chat.message_receive.chat_stream import ChatStream
     
 logger = get_logger("message_storage")
 
+# 待写入消息的本地 spool 文件
+MESSAGE_SPOOL_PATH = Path("data") / "message_spool" / "pending_messages.jsonl"
+
 
 class MessageStorageBatcher:
     """
     消息存储批处理器
 
     优化: 将消息缓存一段时间后批量写入数据库，减少数据库连接池压力
+
+    采用生产者/消费者模型：
+    - add_message 只把行数据放入内存队列和 spool 缓冲，不等待数据库提交，也不做磁盘 IO
+    - 刷新任务在写入数据库前先把 spool 缓冲批量追加到本地 spool 文件（在线程中执行）
+    - 唯一的刷新任务按数量或时间批量写入数据库，成功后再从队列头部移除
+    - spool 文件在启动时重放，进程崩溃或数据库暂时不可用时消息不会丢失
+    - 积压超过上限时 add_message 等待刷新任务腾出空间（背压）
     """
 
-    def __init__(self, batch_size: int = 50, flush_interval: float = 5.0):
+    def __init__(
+        self,
+        batch_size: int = 50,
+        flush_interval: float = 5.0,
+        max_pending: int = 5000,
+        spool_path: str | Path | None = None,
+    ):
         """
         初始化批处理器
 
         Args:
             batch_size: 批量大小，达到此数量立即写入
             flush_interval: 自动刷新间隔（秒）
+            max_pending: 积压消息上限，超出时 add_message 会等待
+            spool_path: spool 文件路径，None 表示不落盘（仅内存）
         """
         self.batch_size = batch_size
         self.flush_interval = flush_interval
-        self.pending_messages: deque = deque()
-        self._lock = asyncio.Lock()
+        self.max_pending = max_pending
+        self.spool_path = Path(spool_path) if spool_path else None
+        self.pending_messages: deque[dict] = deque()
+        self._flush_lock = asyncio.Lock()  # 保证同一时刻只有一个刷新在执行
+        self._flush_event = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._space_available.set()
+        self._spool_file: BinaryIO | None = None
+        self._spool_buffer: list[bytes] = []  # 尚未写入 spool 文件的行
+        self._spool_lines = 0  # spool 文件中的行数（含已写入数据库的）
+        self._consecutive_failures = 0
         self._flush_task = None
         self._running = False
 
     async def start(self):
-        """启动自动刷新任务"""
+        """启动刷新任务（先重放 spool 中未写入的消息）"""
         if self._flush_task is None and not self._running:
+            await self._replay_spool()
             self._running = True
             self._flush_task = asyncio.create_task(self._auto_flush_loop())
             logger.info(f"消息存储批处理器已启动 (批量大小: {self.batch_size}, 刷新间隔: {self.flush_interval}秒)")
@@ -54,15 +86,21 @@ class MessageStorageBatcher:
         self._running = False
 
         if self._flush_task:
-            self._flush_task.cancel()
-            try:
-                await self._flush_task
-            except asyncio.CancelledError:
-                pass
+            # 不能取消刷新任务：取消只会中断等待，已提交到写入队列的批次仍会执行，
+            # 而消息要等写入返回后才出队，随后的 flush 会把它们再写一遍。
+            # 这里唤醒刷新任务，让它写完当前积压后自行退出
+            self._flush_event.set()
+            await self._flush_task
             self._flush_task = None
 
-        # 刷新剩余的消息
+        # 刷新任务写入失败时残留的消息再尝试一次
         await self.flush()
+        # 仍未写入数据库的消息确保已落盘，下次启动时重放
+        async with self._flush_lock:
+            await self._write_spool_buffer()
+        self._close_spool()
+        # 唤醒可能仍在等待背压的写入方
+        self._space_available.set()
         logger.info("消息存储批处理器已停止")
 
     async def add_message(self, message_data: dict):
@@ -75,63 +113,216 @@ class MessageStorageBatcher:
                     'message': DatabaseMessages,
                     'chat_stream': ChatStream
                 }
+                或已准备好的行数据 {'message_dict': dict}
         """
-        async with self._lock:
-            self.pending_messages.append(message_data)
+        message_dict = message_data.get("message_dict")
+        if message_dict is None:
+            message_dict = await self._prepare_message_dict(message_data["message"], message_data["chat_stream"])
+            if message_dict is None:
+                return
 
-            # 如果达到批量大小，立即刷新
-            if len(self.pending_messages) >= self.batch_size:
-                logger.debug(f"达到批量大小 {self.batch_size}，立即刷新")
-                await self.flush()
+        # 背压：积压过多时等待刷新任务腾出空间
+        while self._running and len(self.pending_messages) >= self.max_pending:
+            self._space_available.clear()
+            self._flush_event.set()
+            await self._space_available.wait()
+
+        self._append_to_spool(message_dict)
+        self.pending_messages.append(message_dict)
+
+        # 如果达到批量大小，通知刷新任务
+        if len(self.pending_messages) >= self.batch_size:
+            self._flush_event.set()
 
     async def flush(self):
-        """执行批量写入"""
-        async with self._lock:
-            if not self.pending_messages:
-                return
+        """将当前积压的全部消息写入数据库"""
+        async with self._flush_lock:
+            await self._write_spool_buffer()
+            while self.pending_messages:
+                if not await self._flush_batch():
+                    break
 
-            messages_to_store = list(self.pending_messages)
-            self.pending_messages.clear()
+    async def _flush_batch(self) -> bool:
+        """写入队列头部的一批消息，成功后才从队列中移除
 
-        if not messages_to_store:
-            return
+        Returns:
+            bool: 是否写入成功
+        """
+        count = min(len(self.pending_messages), self.batch_size * 4)
+        if count == 0:
+            return True
+        messages_dicts = [self.pending_messages[i] for i in range(count)]
 
         start_time = time.time()
-        success_count = 0
+        try:
+            # 🔧 优化：使用批量INSERT
+            from sqlalchemy import insert
+
+            async def _insert_messages(session):
+                await session.execute(insert(Messages).values(messages_dicts))
+
+            await execute_write(_insert_messages, name="message_storage")
+            self._consecutive_failures = 0
+        except Exception as e:
+            self._consecutive_failures += 1
+            if self._consecutive_failures < 3 or not await self._isolate_bad_rows(messages_dicts):
+                logger.error(f"批量存储消息失败，{len(messages_dicts)} 条消息保留在队列中等待重试: {e}")
+                return False
+
+        for _ in range(count):
+            self.pending_messages.popleft()
+        await self._compact_spool()
+        if len(self.pending_messages) < self.max_pending:
+            self._space_available.set()
+
+        elapsed = time.time() - start_time
+        logger.info(
+            f"批量存储了 {count} 条消息 "
+            f"(耗时: {elapsed:.3f}秒, 平均 {elapsed/max(count,1)*1000:.2f}ms/条)"
+        )
+        return True
+
+    async def _isolate_bad_rows(self, messages_dicts: list[dict]) -> bool:
+        """连续写入失败时逐条写入，丢弃无法写入的消息，避免单条坏数据阻塞整个队列
+
+        Returns:
+            bool: 是否有消息写入成功（全部失败说明数据库不可用，消息保留在队列中）
+        """
+        from sqlalchemy import insert
+
+        failed = []
+        for message_dict in messages_dicts:
+            async def _insert_one(session, row=message_dict):
+                await session.execute(insert(Messages).values(row))
+
+            try:
+                await execute_write(_insert_one, name="message_storage")
+            except Exception as e:
+                failed.append((message_dict, e))
+
+        if len(failed) == len(messages_dicts):
+            return False
+
+        self._consecutive_failures = 0
+        for message_dict, error in failed:
+            logger.error(f"丢弃无法写入数据库的消息 {message_dict.get('message_id')}: {error}")
+        return True
 
+    # ===== spool 文件 =====
+
+    # spool 文件只在持有 _flush_lock 时读写，磁盘 IO 都放到线程中执行
+
+    def _append_to_spool(self, message_dict: dict) -> None:
+        """把一条消息放入 spool 缓冲，由刷新任务批量写入文件"""
+        if self.spool_path is None:
+            return
         try:
-            # 🔧 优化：准备字典数据而不是ORM对象，使用批量INSERT
-            messages_dicts = []
+            self._spool_buffer.append(orjson.dumps(message_dict, default=str) + b"\n")
+        except Exception as e:
+            logger.warning(f"序列化消息 spool 记录失败，消息仅保留在内存中: {e}")
 
-            for msg_data in messages_to_store:
-                try:
-                    message_dict = await self._prepare_message_dict(
-                        msg_data["message"],
-                        msg_data["chat_stream"]
-                    )
-                    if message_dict:
-                        messages_dicts.append(message_dict)
-                except Exception as e:
-                    logger.error(f"准备消息数据失败: {e}")
-                    continue
-
-            # 批量写入数据库 - 使用高效的批量INSERT
-            if messages_dicts:
-                from sqlalchemy import insert
-                async with get_db_session() as session:
-                    stmt = insert(Messages).values(messages_dicts)
-                    await session.execute(stmt)
-                    await session.commit()
-                    success_count = len(messages_dicts)
+    async def _write_spool_buffer(self) -> None:
+        """把 spool 缓冲追加写入 spool 文件"""
+        if not self._spool_buffer:
+            return
+        lines, self._spool_buffer = self._spool_buffer, []
+        try:
+            await asyncio.to_thread(self._write_spool_lines, lines)
+            self._spool_lines += len(lines)
+        except Exception as e:
+            logger.warning(f"写入消息 spool 失败，{len(lines)} 条消息仅保留在内存中: {e}")
+
+    def _write_spool_lines(self, lines: list[bytes]) -> None:
+        assert self.spool_path is not None
+        if self._spool_file is None:
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spool_file = open(self.spool_path, "ab")
+        self._spool_file.writelines(lines)
+        self._spool_file.flush()
+
+    async def _compact_spool(self, force: bool = False) -> None:
+        """压缩 spool 文件：队列清空时截断，已写入部分过多时用剩余消息重写"""
+        if self.spool_path is None:
+            return
+        if not force:
+            if self._spool_lines == 0:
+                return
+            if self.pending_messages and self._spool_lines - len(self.pending_messages) < self.batch_size * 20:
+                return
+        # 重写内容是队列的完整快照，已包含缓冲中的行
+        rows = list(self.pending_messages)
+        self._spool_buffer.clear()
+        try:
+            await asyncio.to_thread(self._rewrite_spool, rows)
+            self._spool_lines = len(rows)
+        except Exception as e:
+            logger.warning(f"压缩消息 spool 失败: {e}")
+
+    def _rewrite_spool(self, rows: list[dict]) -> None:
+        assert self.spool_path is not None
+        self._close_spool()
+        tmp_path = self.spool_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.writelines(orjson.dumps(row, default=str) + b"\n" for row in rows)
+        os.replace(tmp_path, self.spool_path)
+
+    def _close_spool(self) -> None:
+        if self._spool_file is not None:
+            try:
+                self._spool_file.close()
+            except Exception:
+                pass
+            self._spool_file = None
 
-            elapsed = time.time() - start_time
-            logger.info(
-                f"批量存储了 {success_count}/{len(messages_to_store)} 条消息 "
-                f"(耗时: {elapsed:.3f}秒, 平均 {elapsed/max(success_count,1)*1000:.2f}ms/条)"
-            )
+    async def _replay_spool(self) -> None:
+        """重放 spool 中上次未写入数据库的消息"""
+        if self.spool_path is None or not self.spool_path.exists():
+            return
 
+        try:
+            records = await asyncio.to_thread(self._read_spool)
         except Exception as e:
-            logger.error(f"批量存储消息失败: {e}")
+            logger.error(f"读取消息 spool 失败: {e}")
+            return
+
+        if records:
+            # 上次可能在提交数据库后、截断 spool 前崩溃，跳过已入库的消息
+            try:
+                existing = await self._find_existing_message_ids([r.get("message_id") for r in records])
+                records = [r for r in records if r.get("message_id") not in existing]
+            except Exception as e:
+                logger.warning(f"检查 spool 消息是否已入库失败，将全部重放: {e}")
+
+        self.pending_messages.extend(records)
+        async with self._flush_lock:
+            await self._compact_spool(force=True)
+        if records:
+            logger.info(f"从消息 spool 恢复了 {len(records)} 条未写入数据库的消息")
+            self._flush_event.set()
+
+    def _read_spool(self) -> list[dict]:
+        assert self.spool_path is not None
+        records = []
+        with open(self.spool_path, "rb") as f:
+            for line in f:
+                try:
+                    records.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    # 崩溃时最后一行可能只写了一半
+                    logger.warning("跳过消息 spool 中损坏的记录")
+        return records
+
+    @staticmethod
+    async def _find_existing_message_ids(message_ids: list) -> set:
+        ids = [mid for mid in message_ids if mid]
+        existing: set = set()
+        async with get_db_session() as session:
+            for i in range(0, len(ids), 500):
+                result = await session.execute(
+                    select(Messages.message_id).where(Messages.message_id.in_(ids[i : i + 500]))
+                )
+                existing.update(result.scalars().all())
+        return existing
 
     async def _prepare_message_dict(self, message, chat_stream):
         """准备消息字典数据（用于批量INSERT）
@@ -256,11 +447,23 @@ class MessageStorageBatcher:
             return None
 
     async def _auto_flush_loop(self):
-        """自动刷新循环"""
+        """刷新循环：达到批量大小或刷新间隔到期时写入"""
         while self._running:
             try:
-                await asyncio.sleep(self.flush_interval)
-                await self.flush()
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_event.clear()
+
+                async with self._flush_lock:
+                    await self._write_spool_buffer()
+                    ok = True
+                    while self.pending_messages and ok:
+                        ok = await self._flush_batch()
+                if not ok:
+                    # 写入失败，稍后重试
+                    await asyncio.sleep(1.0)
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -278,7 +481,8 @@ def get_message_storage_batcher() -> MessageStorageBatcher:
     if _message_storage_batcher is None:
         _message_storage_batcher = MessageStorageBatcher(
             batch_size=50,  # 批量大小：50条消息
-            flush_interval=5.0  # 刷新间隔：5秒
+            flush_interval=5.0,  # 刷新间隔：5秒
+            spool_path=MESSAGE_SPOOL_PATH,
         )
     return _message_storage_batcher
 
@@ -295,22 +499,25 @@ class MessageUpdateBatcher:
         self.flush_interval = flush_interval
         self.pending_updates: deque = deque()
         self._lock = asyncio.Lock()
+        self._flush_event = asyncio.Event()
         self._flush_task = None
+        self._running = False
 
     async def start(self):
         """启动自动刷新任务"""
         if self._flush_task is None:
+            self._running = True
             self._flush_task = asyncio.create_task(self._auto_flush_loop())
             logger.debug("消息更新批处理器已启动")
 
     async def stop(self):
         """停止批处理器"""
+        self._running = False
+
         if self._flush_task:
-            self._flush_task.cancel()
-            try:
-                await self._flush_task
-            except asyncio.CancelledError:
-                pass
+            # 唤醒刷新任务，等它完成正在进行的写入后退出，而不是在写入中途取消
+            self._flush_event.set()
+            await self._flush_task
             self._flush_task = None
 
         # 刷新剩余的更新
@@ -319,6 +526,7 @@ class MessageUpdateBatcher:
 
     async def add_update(self, mmc_message_id: str, qq_message_id: str):
         """添加消息ID更新到批处理队列"""
+        get_recent_message_buffer().rename_message(mmc_message_id, qq_message_id)
         async with self._lock:
             self.pending_updates.append((mmc_message_id, qq_message_id))
 
@@ -335,31 +543,35 @@ class MessageUpdateBatcher:
             updates = list(self.pending_updates)
             self.pending_updates.clear()
 
-        try:
-            async with get_db_session() as session:
-                updated_count = 0
-                for mmc_id, qq_id in updates:
-                    result = await session.execute(
-                        update(Messages)
-                        .where(Messages.message_id == mmc_id)
-                        .values(message_id=qq_id)
-                    )
-                    if cast(CursorResult, result).rowcount > 0:
-                        updated_count += 1
-
-                await session.commit()
+        async def _update_message_ids(session) -> int:
+            count = 0
+            for mmc_id, qq_id in updates:
+                result = await session.execute(
+                    update(Messages)
+                    .where(Messages.message_id == mmc_id)
+                    .values(message_id=qq_id)
+                )
+                if cast(CursorResult, result).rowcount > 0:
+                    count += 1
+            return count
 
-                if updated_count > 0:
-                    logger.debug(f"批量更新了 {updated_count}/{len(updates)} 条消息ID")
+        try:
+            updated_count = await execute_write(_update_message_ids, name="message_id_update")
+            if updated_count > 0:
+                logger.debug(f"批量更新了 {updated_count}/{len(updates)} 条消息ID")
 
         except Exception as e:
             logger.error(f"批量更新消息ID失败: {e}")
 
     async def _auto_flush_loop(self):
         """自动刷新循环"""
-        while True:
+        while self._running:
             try:
-                await asyncio.sleep(self.flush_interval)
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_event.clear()
                 await self.flush()
             except asyncio.CancelledError:
                 break
@@ -405,7 +617,12 @@ class MessageStorage:
         """
         if use_batch:
             batcher = get_message_storage_batcher()
-            await batcher.add_message({"message": message, "chat_stream": chat_stream})
+            # 入队前准备好行数据，同时写入近期消息缓冲区，使其在落库前即可被历史查询看到
+            message_dict = await batcher._prepare_message_dict(message, chat_stream)
+            if message_dict is None:
+                return
+            get_recent_message_buffer().add(dict(message_dict))
+            await batcher.add_message({"message_dict": message_dict})
             return
 
         try:
@@ -414,10 +631,18 @@ class MessageStorage:
             message_obj = await batcher._prepare_message_object(message, chat_stream)
             if message_obj is None:
                 return
+            message_dict = {
+                column.name: getattr(message_obj, column.name)
+                for column in Messages.__table__.columns
+                if column.name != "id"
+            }
 
-            async with get_db_session() as session:
+            async def _add_message(session):
                 session.add(message_obj)
-                await session.commit()
+
+            await execute_write(_add_message, name="message_storage")
+
+            get_recent_message_buffer().add(message_dict)
 
         except Exception:
             logger.exception("存储消息失败")
@@ -489,6 +714,7 @@ class MessageStorage:
                     ).scalar()
 
                     if matched_message:
+                        get_recent_message_buffer().rename_message(mmc_message_id, qq_message_id)
                         await session.execute(
                             update(Messages).where(Messages.id == matched_message.id).values(message_id=qq_message_id)
                         )
@@ -571,6 +797,7 @@ class MessageStorage:
                 stmt = update(Messages).where(Messages.message_id == message_id).values(**values)
                 result = await session.execute(stmt)
                 await session.commit()
+                get_recent_message_buffer().update_fields(message_id, values)
 
                 if cast(CursorResult, result).rowcount > 0:
                     logger.debug(f"成功更新消息 {message_id} 的interest_value为 {interest_value}")
@@ -591,6 +818,7 @@ class MessageStorage:
             return
 
         try:
+            buffer = get_recent_message_buffer()
             async with get_db_session() as session:
                 for message_id, interest_value in interest_map.items():
                     values = {"interest_value": interest_value}
@@ -599,6 +827,7 @@ class MessageStorage:
 
                     stmt = update(Messages).where(Messages.message_id == message_id).values(**values)
                     await session.execute(stmt)
+                    buffer.update_fields(message_id, values)
 
                 await session.commit()
                 logger.debug(f"批量更新兴趣度 {len(interest_map)} 条记录")
@@ -668,6 +897,7 @@ class MessageStorage:
                     )
 
                     result = await session.execute(update_stmt)
+                    get_recent_message_buffer().update_fields(msg.message_id, {"interest_value": default_interest})
                     if cast(CursorResult, result).rowcount > 0:
                         fixed_count += 1
                         logger.debug(f"修复消息 {msg.message_id} 的interest_value为 {default_interest}")
@@ -15,6 +15,7 @@ from src.chat.message_receive.storage import MessageStorage
 from src.chat.utils.utils import calculate_typing_time, truncate_message
 from src.common.data_models.database_data_model import DatabaseMessages, DatabaseUserInfo
 from src.common.logger import get_logger
+from src.common.message_trace import trace_span
 from src.config.config import global_config
 
 if TYPE_CHECKING:
@@ -126,7 +127,8 @@ class HeartFCSender:
                 )
                 await asyncio.sleep(typing_time)
 
-            await send_envelope(envelope, chat_stream=chat_stream, db_message=db_message, show_log=show_log)
+            with trace_span("send"):
+                await send_envelope(envelope, chat_stream=chat_stream, db_message=db_message, show_log=show_log)
 
             if storage_message:
                 await MessageStorage.store_message(db_message, chat_stream)
@@ -141,11 +143,9 @@ class HeartFCSender:
                         else:
                             max_context_size = 40
 
-                        if len(context.history_messages) >= max_context_size:
-                            context.history_messages = context.history_messages[1:]
-                            logger.debug(f"[{chat_stream.stream_id}] Send API发送前移除 1 条历史消息以控制上下文大小")
-
                         context.history_messages.append(db_message)
+                        if context.history_messages.trim(max_context_size):
+                            logger.debug(f"[{chat_stream.stream_id}] Send API发送后移除最早的历史消息以控制上下文大小")
                         logger.debug(f"[{chat_stream.stream_id}] Send API消息已写入上下文: {db_message.message_id}")
                 except Exception as context_error:
                     logger.warning(f"[{chat_stream.stream_id}] 将消息写入上下文失败: {context_error}")
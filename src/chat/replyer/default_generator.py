@@ -9,6 +9,7 @@ import re
 import time
 import traceback
 import uuid
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta
 from typing import Any, Literal, TYPE_CHECKING
 
@@ -23,10 +24,12 @@ from src.chat.utils.chat_message_builder import (
 # 导入新的统一Prompt系统
 from src.chat.utils.prompt import Prompt, global_prompt_manager
 from src.chat.utils.prompt_params import PromptParameters
+from src.chat.utils.stream_segmenter import StreamSentenceSegmenter
 from src.chat.utils.timer_calculator import Timer
 from src.chat.utils.utils import get_chat_type_and_target_info
 from src.common.data_models.database_data_model import DatabaseMessages, DatabaseUserInfo
 from src.common.logger import get_logger
+from src.common.message_trace import trace_span
 from src.config.config import global_config, model_config
 from src.individuality.individuality import get_individuality
 from src.llm_models.utils_model import LLMRequest
@@ -51,28 +54,31 @@ def init_prompt():
     Prompt("在群里聊天", "chat_target_group2")
     Prompt("和{sender_name}聊天", "chat_target_private2")
 
+    # 模板以 <<PROMPT_CACHE_BOUNDARY>> 分为两部分：之前是人设、风格、规则等稳定内容，
+    # 之后是心情、聊天记录、时间等每次都会变化的内容，保持前缀稳定以命中提示词缓存
     Prompt(
         """
+{identity}
+你需要使用合适的语法和句法，参考聊天内容，组织一条日常且口语化的回复。请你修改你想表达的原句，符合你的表达风格和语言习惯
+{reply_style}，你可以完全重组回复，保留最基本的表达含义就好，但重组后保持语意通顺。
+{moderation_prompt}
+不要复读你前面发过的内容，意思相近也不行。
+不要浮夸，不要夸张修辞，平淡且不要输出多余内容(包括前后缀，冒号和引号，括号，表情包，at，[xx：xxx]系统格式化文字或 @等 )，只输出一条回复就好。
+
+*你叫{bot_name}，也有人叫你{bot_nickname}*
+<<PROMPT_CACHE_BOUNDARY>>
 {expression_habits_block}
 {relation_info_block}
 
 {chat_target}
 {time_block}
 {chat_info}
-{identity}
 {auth_role_prompt_block}
 
 你正在{chat_target_2},{reply_target_block}
 对这条消息，你想表达，原句：{raw_reply},原因是：{reason}。你现在要思考怎么组织回复
 你现在的心情是：{mood_state}
-你需要使用合适的语法和句法，参考聊天内容，组织一条日常且口语化的回复。请你修改你想表达的原句，符合你的表达风格和语言习惯
-{reply_style}，你可以完全重组回复，保留最基本的表达含义就好，但重组后保持语意通顺。
 {keywords_reaction_prompt}
-{moderation_prompt}
-不要复读你前面发过的内容，意思相近也不行。
-不要浮夸，不要夸张修辞，平淡且不要输出多余内容(包括前后缀，冒号和引号，括号，表情包，at，[xx：xxx]系统格式化文字或 @等 )，只输出一条回复就好。
-
-*你叫{bot_name}，也有人叫你{bot_nickname}*
 
 现在，你说：
 """,
@@ -84,7 +90,22 @@ def init_prompt():
         """
 # 人设：{identity}
 
+## 回复风格
+- *你需要参考你的回复风格：*
+{reply_style}
 
+## 规则
+{safety_guidelines_block}
+
+{group_chat_reminder_block}
+- 在称呼用户时，请使用更自然的昵称或简称。对于长英文名，可使用首字母缩写；对于中文名，可提炼合适的简称。禁止直接复述复杂的用户名或输出用户名中的任何符号，让称呼更像人类习惯，注意，简称不是必须的，合理的使用。
+你的回复应该是一条简短、完整且口语化的回复。
+请注意不要输出多余内容(包括前后缀，冒号和引号，at，[xx：xxx]系统格式化文字或 @等 )。只输出回复内容。
+
+{moderation_prompt}
+
+*你叫{bot_name}，也有人叫你{bot_nickname}*
+<<PROMPT_CACHE_BOUNDARY>>
 ## 当前状态
 - 你现在的心情是：{mood_state}
 - {schedule_block}
@@ -99,8 +120,6 @@ def init_prompt():
 {notice_block}
 
 ## 表达方式
-- *你需要参考你的回复风格：*
-{reply_style}
 {keywords_reaction_prompt}
 
 {expression_habits_block}
@@ -128,22 +147,9 @@ def init_prompt():
 
 -  {reply_target_block} 你需要生成一段紧密相关且与历史消息相关的回复。
 
-## 规则
-{safety_guidelines_block}
-
-{group_chat_reminder_block}
-- 在称呼用户时，请使用更自然的昵称或简称。对于长英文名，可使用首字母缩写；对于中文名，可提炼合适的简称。禁止直接复述复杂的用户名或输出用户名中的任何符号，让称呼更像人类习惯，注意，简称不是必须的，合理的使用。
-你的回复应该是一条简短、完整且口语化的回复。
-
  --------------------------------
 {time_block}
 
-请注意不要输出多余内容(包括前后缀，冒号和引号，at，[xx：xxx]系统格式化文字或 @等 )。只输出回复内容。
-
-{moderation_prompt}
-
-*你叫{bot_name}，也有人叫你{bot_nickname}*
-
 现在，你说：
 """,
         "s4u_style_prompt",
@@ -171,6 +177,21 @@ If you need to use the search tool, please directly call the function "lpmm_sear
         """
 # 人设：{identity}
 
+## 回复风格
+- *你需要参考你的回复风格：*
+{reply_style}
+
+## 规则
+{safety_guidelines_block}
+{group_chat_reminder_block}
+- 在称呼用户时，请使用更自然的昵称或简称。对于长英文名，可使用首字母缩写；对于中文名，可提炼合适的简称。禁止直接复述复杂的用户名或输出用户名中的任何符号，让称呼更像人类习惯，注意，简称不是必须的，合理的使用。
+你的回复应该是一条简短、完整且口语化的回复。
+请注意不要输出多余内容(包括前后缀，冒号和引号，at，[xx：xxx]系统格式化文字或 @等 )。只输出回复内容。
+
+{moderation_prompt}
+
+*你叫{bot_name}，也有人叫你{bot_nickname}*
+<<PROMPT_CACHE_BOUNDARY>>
 ## 当前状态
 - 你现在的心情是：{mood_state}
 {schedule_block}
@@ -185,8 +206,6 @@ If you need to use the search tool, please directly call the function "lpmm_sear
 {notice_block}
 
 ## 表达方式
-- *你需要参考你的回复风格：*
-{reply_style}
 {keywords_reaction_prompt}
 
 {expression_habits_block}
@@ -212,21 +231,9 @@ If you need to use the search tool, please directly call the function "lpmm_sear
 - 你需要对以上未读历史消息进行统一回应。这些消息可能来自不同的参与者，你需要理解整体对话动态，生成一段自然、连贯的回复。
 - 你的回复应该能够推动对话继续，可以回应其中一个或多个话题，也可以提出新的观点。
 
-## 规则
-{safety_guidelines_block}
-{group_chat_reminder_block}
-- 在称呼用户时，请使用更自然的昵称或简称。对于长英文名，可使用首字母缩写；对于中文名，可提炼合适的简称。禁止直接复述复杂的用户名或输出用户名中的任何符号，让称呼更像人类习惯，注意，简称不是必须的，合理的使用。
-你的回复应该是一条简短、完整且口语化的回复。
-
  --------------------------------
 {time_block}
 
-请注意不要输出多余内容(包括前后缀，冒号和引号，at，[xx：xxx]系统格式化文字或 @等 )。只输出回复内容。
-
-{moderation_prompt}
-
-*你叫{bot_name}，也有人叫你{bot_nickname}*
-
 现在，你说：
 """,
         "normal_style_prompt",
@@ -298,6 +305,7 @@ class DefaultReplyer:
         from_plugin: bool = True,
         stream_id: str | None = None,
         reply_message: DatabaseMessages | None = None,
+        segment_callback: Callable[[str], Awaitable[None]] | None = None,
     ) -> tuple[bool, dict[str, Any] | None, str | None]:
         # sourcery skip: merge-nested-ifs
         """
@@ -309,6 +317,8 @@ class DefaultReplyer:
             available_actions: 可用的动作信息字典
             enable_tool: 是否启用工具调用
             from_plugin: 是否来自插件
+            segment_callback: 流式分段回调，提供时以流式生成，每切出一段完整的句子就立即调用；
+                注意 AFTER_LLM 事件触发时已发出的分段无法撤回
 
         Returns:
             Tuple[bool, Optional[Dict[str, Any]], Optional[str]]: (是否成功, 生成的回复, 使用的prompt)
@@ -370,7 +380,7 @@ class DefaultReplyer:
                     prompt_mode_value = mode
 
             # 构建 Prompt
-            with Timer("构建Prompt", {}):  # 内部计时器，可选保留
+            with Timer("构建Prompt", {}), trace_span("prompt_build"):
                 prompt = await self.build_prompt_reply_context(
                     reply_to=reply_to,
                     extra_info=extra_info,
@@ -401,7 +411,13 @@ class DefaultReplyer:
             try:
                 # 设置正在回复的状态
                 self.chat_stream.context.is_replying = True
-                content, reasoning_content, model_name, tool_call = await self.llm_generate_content(prompt)
+                with trace_span("replyer_llm"):
+                    if segment_callback is not None:
+                        content, reasoning_content, model_name, tool_call = await self.llm_generate_content_stream(
+                            prompt, segment_callback
+                        )
+                    else:
+                        content, reasoning_content, model_name, tool_call = await self.llm_generate_content(prompt)
                 logger.debug(f"replyer生成内容: {content}")
                 llm_response = {
                     "content": content,
@@ -889,7 +905,8 @@ class DefaultReplyer:
             Tuple[str, Any, float]: (任务名称, 任务结果, 执行耗时)
         """
         start_time = time.time()
-        result = await coroutine
+        with trace_span(f"prompt.{name}"):
+            result = await coroutine
         end_time = time.time()
         duration = end_time - start_time
         return name, result, duration
@@ -1803,6 +1820,46 @@ class DefaultReplyer:
             logger.debug(f"replyer生成内容: {content}")
         return content, reasoning_content, model_name, tool_calls
 
+    async def llm_generate_content_stream(self, prompt: str, segment_callback: Callable[[str], Awaitable[None]]):
+        """
+        流式生成回复：按句子边界切分模型输出，每凑齐一段就交给 segment_callback，
+        不必等待完整回复。返回值与 llm_generate_content 相同（内容为完整回复）。
+        """
+        assert global_config is not None
+        segmenter = StreamSentenceSegmenter(min_length=global_config.response_splitter.stream_min_segment_length)
+        response = None
+        model_name = "unknown_model"
+
+        with Timer("LLM生成", {}):
+            logger.info(f"使用模型集流式生成回复: {self.express_model.model_for_task}")
+
+            if global_config.debug.show_prompt:
+                logger.info(f"\n{prompt}\n")
+            else:
+                logger.debug(f"\n{prompt}\n")
+
+            async for chunk in self.express_model.generate_response_stream(prompt):
+                for segment in segmenter.feed(chunk.content.replace("[SPLIT]", "")):
+                    await segment_callback(segment)
+                if chunk.is_final:
+                    response = chunk.response
+                    model_name = chunk.model_name or model_name
+
+            if tail := segmenter.flush():
+                await segment_callback(tail)
+
+        if response is None:
+            raise RuntimeError("流式生成未返回完整响应")
+
+        content = response.content
+        if content:
+            # 与非流式保持一致：移除 [SPLIT] 标记并应用统一的格式过滤器
+            from src.chat.utils.utils import filter_system_format_content
+            content = filter_system_format_content(content.replace("[SPLIT]", ""))
+
+        logger.debug(f"replyer流式生成内容: {content}")
+        return content, response.reasoning_content or "", model_name, response.tool_calls
+
     async def get_prompt_info(self, message: str, sender: str, target: str):
         assert global_config is not None
         assert model_config is not None
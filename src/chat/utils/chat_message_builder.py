@@ -9,7 +9,8 @@ from sqlalchemy import and_, select
 
 from src.chat.utils.utils import assign_message_ids, translate_timestamp_to_human_readable
 from src.common.database.compatibility import get_db_session
-from src.common.database.core.models import ActionRecords, Images
+from src.common.database.core.models import ActionRecords, Images, PersonInfo
+from src.common.database.optimization.cache_manager import LRUCache
 from src.common.logger import get_logger
 from src.common.message_repository import count_messages, find_messages
 from src.config.config import global_config
@@ -19,6 +20,13 @@ logger = get_logger("chat_message_builder")
 
 install(extra_lines=3)
 
+_PIC_ID_PATTERN = re.compile(r"\[picid:([^\]]+)\]")
+_USER_REFERENCE_PATTERN = re.compile(r"(?:回复|@)<[^:<>]+:([^:<>]+)>")
+
+# 单条消息渲染结果缓存：同一段历史会在多次回复/规划中被重复构建
+# 键包含 message_id 与渲染参数，值为 (发送者显示名, 处理后的内容)
+_rendered_line_cache: LRUCache[tuple[str, str]] = LRUCache(max_size=4000, ttl=120, name="readable_line")
+
 
 def replace_user_references_sync(
     content: str,
@@ -525,6 +533,79 @@ async def num_new_messages_since_with_users(
     return await count_messages(message_filter=filter_query)
 
 
+def _get_render_cache_key(msg: dict[str, Any], replace_bot_name: bool, show_pic: bool) -> str | None:
+    """生成单条消息渲染缓存的键，没有 message_id 的消息（如动作记录）不缓存"""
+    if msg.get("is_action_record", False):
+        return None
+    message_id = msg.get("message_id")
+    if not message_id:
+        return None
+    return f"{msg.get('chat_id', '')}:{message_id}:{int(replace_bot_name)}{int(show_pic)}"
+
+
+def _collect_reference_ids(messages: list[dict[str, Any]], show_pic: bool) -> tuple[set[str], set[str]]:
+    """收集消息窗口内需要解析的图片ID和person_id（发送者及回复/@引用的用户）"""
+    assert global_config is not None
+    bot_account = str(global_config.bot.qq_account)
+    pic_ids: set[str] = set()
+    person_ids: set[str] = set()
+
+    for msg in messages:
+        content = msg.get("display_message") or msg.get("processed_plain_text") or ""
+        if show_pic and "[picid:" in content:
+            pic_ids.update(_PIC_ID_PATTERN.findall(content))
+        if msg.get("is_action_record", False):
+            continue
+
+        user_info = msg.get("user_info") or {}
+        platform = user_info.get("platform") or msg.get("user_platform") or msg.get("chat_info_platform")
+        user_id = user_info.get("user_id") or msg.get("user_id")
+        if not platform:
+            continue
+        if user_id and str(user_id) != bot_account:
+            person_ids.add(PersonInfoManager.get_person_id(platform, user_id))
+        if "<" in content:
+            for ref_user_id in _USER_REFERENCE_PATTERN.findall(content):
+                if ref_user_id != bot_account:
+                    person_ids.add(PersonInfoManager.get_person_id(platform, ref_user_id))
+
+    return pic_ids, person_ids
+
+
+async def _prefetch_pic_descriptions(pic_ids: set[str]) -> dict[str, str]:
+    """一次查询批量获取图片描述，只返回描述非空的图片"""
+    if not pic_ids:
+        return {}
+    try:
+        async with get_db_session() as session:
+            result = await session.execute(
+                select(Images.image_id, Images.description).where(Images.image_id.in_(pic_ids))
+            )
+            return {
+                image_id: description
+                for image_id, description in result.all()
+                if description and description.strip()
+            }
+    except Exception as e:
+        logger.debug(f"[chat_message_builder] 批量查询图片描述失败: {e}")
+        return {}
+
+
+async def _prefetch_person_names(person_ids: set[str]) -> dict[str, str]:
+    """一次查询批量获取 person_name，只返回已命名的用户"""
+    if not person_ids:
+        return {}
+    try:
+        async with get_db_session() as session:
+            result = await session.execute(
+                select(PersonInfo.person_id, PersonInfo.person_name).where(PersonInfo.person_id.in_(person_ids))
+            )
+            return {person_id: person_name for person_id, person_name in result.all() if person_name}
+    except Exception as e:
+        logger.debug(f"[chat_message_builder] 批量查询用户名称失败: {e}")
+        return {}
+
+
 async def _build_readable_messages_internal(
     messages: list[dict[str, Any]],
     replace_bot_name: bool = True,
@@ -562,35 +643,36 @@ async def _build_readable_messages_internal(
         pic_id_mapping = {}
     current_pic_counter = pic_counter
 
-    # --- 异步图片ID处理器 (修复核心问题) ---
-    async def process_pic_ids(content: str) -> str:
-        """异步处理内容中的图片ID，将其直接替换为[图片：描述]格式"""
-        pic_pattern = r"\[picid:([^\]]+)\]"
-        matches = list(re.finditer(pic_pattern, content))
-        if not matches:
+    # --- 预取阶段：批量解析窗口内的图片描述和用户名称，避免逐条查询数据库 ---
+    render_cache_keys: dict[int, str] = {}
+    cached_renders: dict[int, tuple[str, str]] = {}
+    pending_messages: list[dict[str, Any]] = []
+    for msg in messages:
+        cache_key = _get_render_cache_key(msg, replace_bot_name, show_pic)
+        if cache_key:
+            render_cache_keys[id(msg)] = cache_key
+            cached = await _rendered_line_cache.get(cache_key)
+            if cached is not None:
+                cached_renders[id(msg)] = cached
+                continue
+        pending_messages.append(msg)
+
+    pic_ids, person_ids = _collect_reference_ids(pending_messages, show_pic)
+    pic_descriptions = await _prefetch_pic_descriptions(pic_ids)
+    person_names = await _prefetch_person_names(person_ids)
+
+    def process_pic_ids(content: str) -> str:
+        """将内容中的图片ID替换为[图片：描述]格式（使用预取结果）"""
+        if "[picid:" not in content:
             return content
+        return _PIC_ID_PATTERN.sub(
+            lambda m: f"[图片：{pic_descriptions[m.group(1)]}]" if m.group(1) in pic_descriptions else "[图片内容未知]",
+            content,
+        )
 
-        new_content = ""
-        last_end = 0
-        for match in matches:
-            new_content += content[last_end : match.start()]
-            pic_id = match.group(1)
-            description = "[图片内容未知]"
-            try:
-                async with get_db_session() as session:
-                    result = await session.execute(select(Images.description).where(Images.image_id == pic_id))
-                    desc_scalar = result.scalar_one_or_none()
-                    if desc_scalar and desc_scalar.strip():
-                        description = f"[图片：{desc_scalar}]"
-                    else:
-                        description = "[图片内容未知]"
-            except Exception as e:
-                logger.debug(f"[chat_message_builder] 查询图片 {pic_id} 描述失败: {e}")
-                description = "[图片内容未知]"
-            new_content += description
-            last_end = match.end()
-        new_content += content[last_end:]
-        return new_content
+    async def prefetched_name_resolver(platform: str, user_id: str) -> str:
+        person_id = PersonInfoManager.get_person_id(platform, user_id)
+        return person_names.get(person_id) or user_id
 
     # 创建时间戳到消息ID的映射，用于在消息前添加[id]标识符
     timestamp_to_id = {}
@@ -609,7 +691,7 @@ async def _build_readable_messages_internal(
             timestamp: float = msg.get("time")  # type: ignore
             content = msg.get("display_message", "")
             if show_pic:
-                content = await process_pic_ids(content)
+                content = process_pic_ids(content)
             message_details_raw.append((timestamp, global_config.bot.nickname, content, is_action))
             continue
 
@@ -631,50 +713,59 @@ async def _build_readable_messages_internal(
         user_cardname = user_info.get("user_cardname")
 
         timestamp: float = msg.get("time")  # type: ignore
-        content: str
-        if msg.get("display_message"):
-            content = msg.get("display_message", "")
-        else:
-            content = msg.get("processed_plain_text", "")  # 默认空字符串
-
-        if "ᶠ" in content:
-            content = content.replace("ᶠ", "")
-        if "ⁿ" in content:
-            content = content.replace("ⁿ", "")
-
-        # 处理图片ID
-        if show_pic:
-            content = await process_pic_ids(content)
 
         # 检查必要信息是否存在
         if not all([platform, user_id, timestamp is not None]):
             continue
 
-        # 根据 replace_bot_name 参数决定是否替换机器人名称
-        person_name: str
-        # 检查是否是机器人自己（支持SELF标记或直接比对QQ号）
-        if replace_bot_name and user_id == str(global_config.bot.qq_account):
-            person_name = f"{global_config.bot.nickname}(你)"
+        cached = cached_renders.get(id(msg))
+        if cached is not None:
+            person_name, content = cached
         else:
-            person_id = PersonInfoManager.get_person_id(platform, user_id)
-            person_info_manager = get_person_info_manager()
-            person_name = await person_info_manager.get_value(person_id, "person_name")  # type: ignore
-
-        # 如果 person_name 未设置，则使用消息中的 nickname 或默认名称
-        if not person_name:
-            if user_cardname:
-                person_name = f"昵称：{user_cardname}"
-            elif user_nickname:
-                person_name = f"{user_nickname}"
+            if msg.get("display_message"):
+                content = msg.get("display_message", "")
             else:
-                person_name = "某人"
+                content = msg.get("processed_plain_text", "")  # 默认空字符串
 
-        # 在用户名后面添加 QQ 号, 但机器人本体不用
-        if user_id != str(global_config.bot.qq_account):
-            person_name = f"{person_name}({user_id})"
+            if "ᶠ" in content:
+                content = content.replace("ᶠ", "")
+            if "ⁿ" in content:
+                content = content.replace("ⁿ", "")
+
+            # 处理图片ID
+            if show_pic:
+                content = process_pic_ids(content)
+
+            # 根据 replace_bot_name 参数决定是否替换机器人名称
+            # 检查是否是机器人自己（支持SELF标记或直接比对QQ号）
+            if replace_bot_name and user_id == str(global_config.bot.qq_account):
+                person_name = f"{global_config.bot.nickname}(你)"
+            else:
+                person_id = PersonInfoManager.get_person_id(platform, user_id)
+                person_name = person_names.get(person_id)  # type: ignore
+
+            # 如果 person_name 未设置，则使用消息中的 nickname 或默认名称
+            if not person_name:
+                if user_cardname:
+                    person_name = f"昵称：{user_cardname}"
+                elif user_nickname:
+                    person_name = f"{user_nickname}"
+                else:
+                    person_name = "某人"
+
+            # 在用户名后面添加 QQ 号, 但机器人本体不用
+            if user_id != str(global_config.bot.qq_account):
+                person_name = f"{person_name}({user_id})"
+
+            # 使用独立函数处理用户引用格式
+            content = await replace_user_references_async(
+                content, platform, prefetched_name_resolver, replace_bot_name=replace_bot_name
+            )
 
-        # 使用独立函数处理用户引用格式
-        content = await replace_user_references_async(content, platform, replace_bot_name=replace_bot_name)
+            # 图片描述可能稍后才生成，含未知图片的渲染结果不缓存
+            cache_key = render_cache_keys.get(id(msg))
+            if cache_key and "[图片内容未知]" not in content:
+                await _rendered_line_cache.set(cache_key, (person_name, content), size=len(content) + len(person_name))
 
         target_str = "这是QQ的一个功能，用于提及某人，但没那么明显"
         if target_str in content and random.random() < 0.6:
@@ -18,6 +18,7 @@ from src.chat.utils.prompt_component_manager import prompt_component_manager
 from src.chat.utils.prompt_params import PromptParameters
 from src.common.logger import get_logger
 from src.config.config import global_config
+from src.llm_models.utils_model import PROMPT_CACHE_BOUNDARY, split_prompt_sections
 from src.person_info.person_info import get_person_info_manager
 
 install(extra_lines=3)
@@ -273,6 +274,10 @@ class Prompt:
     并将这些信息整合到最终的提示词中。
     """
 
+    # 静态前缀与动态后缀的分界标记。模板中标记之前只放人设、规则、输出格式等稳定内容，
+    # 之后放时间、聊天记录等每次请求都会变化的内容，LLM 层会据此保持前缀稳定以命中提示词缓存
+    CACHE_BOUNDARY = PROMPT_CACHE_BOUNDARY
+
     # 使用临时标记来处理模板中的转义花括号 `\{` 和 `\}`
     # 这是为了防止它们在 `format` 方法中被错误地解释为占位符
     _TEMP_LEFT_BRACE = "__ESCAPED_LEFT_BRACE__"
@@ -1034,6 +1039,16 @@ class Prompt:
                 f"格式化模板失败: {self.template}, args={args}, kwargs={kwargs} {e!s}"
             ) from e
 
+    @property
+    def has_static_prefix(self) -> bool:
+        """模板是否声明了静态前缀（包含分界标记）."""
+        return PROMPT_CACHE_BOUNDARY in self.template
+
+    @property
+    def sections(self) -> tuple[str, str]:
+        """最后一次格式化结果的 (静态前缀, 动态后缀)，未格式化时拆分原始模板."""
+        return split_prompt_sections(str(self))
+
     def __str__(self) -> str:
         """返回格式化后的结果，如果还未格式化，则返回原始模板."""
         return self._formatted_result if self._formatted_result else self.template
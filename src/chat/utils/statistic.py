@@ -266,6 +266,7 @@ class StatisticOutputTask(AsyncTask):
                 IN_TOK_BY_USER: defaultdict(int),
                 IN_TOK_BY_MODEL: defaultdict(int),
                 IN_TOK_BY_MODULE: defaultdict(int),
+                CACHED_TOK_BY_MODEL: defaultdict(int),
                 OUT_TOK_BY_TYPE: defaultdict(int),
                 OUT_TOK_BY_USER: defaultdict(int),
                 OUT_TOK_BY_MODEL: defaultdict(int),
@@ -374,6 +375,7 @@ class StatisticOutputTask(AsyncTask):
                             stats[period_key][IN_TOK_BY_USER][user_id] += prompt_tokens
                             stats[period_key][IN_TOK_BY_MODEL][model_name] += prompt_tokens
                             stats[period_key][IN_TOK_BY_MODULE][module_name] += prompt_tokens
+                            stats[period_key][CACHED_TOK_BY_MODEL][model_name] += record.get("cached_tokens") or 0
 
                             stats[period_key][OUT_TOK_BY_TYPE][request_type] += completion_tokens
                             stats[period_key][OUT_TOK_BY_USER][user_id] += completion_tokens
@@ -935,21 +937,24 @@ class StatisticOutputTask(AsyncTask):
         """
         if stats.get(TOTAL_REQ_CNT, 0) <= 0:
             return ""
-        data_fmt = "{:<32}  {:>10}  {:>12}  {:>12}  {:>12}  {:>9.4f}¥  {:>10}  {:>10}"
+        data_fmt = "{:<32}  {:>10}  {:>12}  {:>12}  {:>12}  {:>12}  {:>9.4f}¥  {:>10}  {:>10}"
 
         output = [
-            " 模型名称                          调用次数    输入Token     输出Token     Token总量     累计花费    平均耗时(秒)  标准差(秒)",
+            " 模型名称                          调用次数    输入Token     缓存命中     输出Token     Token总量     累计花费    平均耗时(秒)  标准差(秒)",
         ]
         for model_name, count in sorted(stats[REQ_CNT_BY_MODEL].items()):
             name = f"{model_name[:29]}..." if len(model_name) > 32 else model_name
             in_tokens = stats[IN_TOK_BY_MODEL][model_name]
+            cached_tokens = stats.get(CACHED_TOK_BY_MODEL, {}).get(model_name, 0)
             out_tokens = stats[OUT_TOK_BY_MODEL][model_name]
             tokens = stats[TOTAL_TOK_BY_MODEL][model_name]
             cost = stats[COST_BY_MODEL][model_name]
             avg_time_cost = stats[AVG_TIME_COST_BY_MODEL][model_name]
             std_time_cost = stats[STD_TIME_COST_BY_MODEL][model_name]
             output.append(
-                data_fmt.format(name, count, in_tokens, out_tokens, tokens, cost, avg_time_cost, std_time_cost)
+                data_fmt.format(
+                    name, count, in_tokens, cached_tokens, out_tokens, tokens, cost, avg_time_cost, std_time_cost
+                )
             )
 
         output.append("")
@@ -13,6 +13,7 @@ IN_TOK_BY_TYPE = "in_tokens_by_type"
 IN_TOK_BY_USER = "in_tokens_by_user"
 IN_TOK_BY_MODEL = "in_tokens_by_model"
 IN_TOK_BY_MODULE = "in_tokens_by_module"
+CACHED_TOK_BY_MODEL = "cached_tokens_by_model"
 OUT_TOK_BY_TYPE = "out_tokens_by_type"
 OUT_TOK_BY_USER = "out_tokens_by_user"
 OUT_TOK_BY_MODEL = "out_tokens_by_model"
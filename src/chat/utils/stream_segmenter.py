@@ -0,0 +1,100 @@
+"""
+流式回复分段器
+
+LLM 流式输出时按句子边界切出完整的段落，使第一段可以在后续 token 仍在生成时
+就进入后处理（分割、错别字）并发送。
+
+切分规则：
+- 只在句末标点（。！？!?…~～）或换行之后切分，连续的标点视为同一个边界
+- 括号、引号、代码块未闭合时不切分，保证颜文字、引用内容和代码不被截断
+- 段落过短时继续累积，避免产生过碎的消息
+"""
+
+SENTENCE_TERMINATORS = frozenset("。！？!?…~～\n")
+
+# 成对符号：开符号 -> 闭符号
+PAIRED_SYMBOLS = {"(": ")", "（": "）", "[": "]", "【": "】", "“": "”", "「": "」", "『": "』", "《": "》"}
+_CLOSING_SYMBOLS = frozenset(PAIRED_SYMBOLS.values())
+
+
+class StreamSentenceSegmenter:
+    """增量接收文本，产出可以独立处理的完整段落"""
+
+    def __init__(self, min_length: int = 6):
+        """
+        Args:
+            min_length: 段落的最小长度（去除空白后），不足时继续累积
+        """
+        self.min_length = max(1, min_length)
+        self._buffer = ""
+        self._scanned = 0  # 已扫描到的缓冲区位置
+        self._depth = 0  # 未闭合的成对符号数量
+        self._in_ascii_quote = False
+        self._in_code_block = False
+        self._backtick_run = 0
+        self._last_boundary = -1  # 最近一个可切分位置（切分点之后的第一个字符下标）
+
+    def feed(self, text: str) -> list[str]:
+        """
+        追加一段增量文本
+
+        Returns:
+            list[str]: 本次凑齐的段落（通常为空或只有一段）
+        """
+        if not text:
+            return []
+        self._buffer += text
+        self._scan()
+
+        if self._last_boundary <= 0:
+            return []
+        segment = self._buffer[: self._last_boundary]
+        if len(segment.strip()) < self.min_length:
+            return []
+
+        self._buffer = self._buffer[self._last_boundary :]
+        self._scanned -= self._last_boundary
+        self._last_boundary = -1
+        return [segment.strip()] if segment.strip() else []
+
+    def flush(self) -> str:
+        """流结束时取出剩余的全部内容"""
+        remaining = self._buffer.strip()
+        self._buffer = ""
+        self._scanned = 0
+        self._last_boundary = -1
+        return remaining
+
+    def _scan(self) -> None:
+        """扫描新到达的字符，更新成对符号状态与可切分位置"""
+        buffer = self._buffer
+        # 边界的判断需要看到下一个字符，因此最后一个字符留到下次扫描
+        while self._scanned < len(buffer) - 1:
+            index = self._scanned
+            char = buffer[index]
+            self._scanned += 1
+
+            if char == "`":
+                self._backtick_run += 1
+                continue
+            if self._backtick_run >= 3:
+                self._in_code_block = not self._in_code_block
+            self._backtick_run = 0
+            if self._in_code_block:
+                continue
+
+            if char in PAIRED_SYMBOLS:
+                self._depth += 1
+            elif char in _CLOSING_SYMBOLS:
+                self._depth = max(0, self._depth - 1)
+            elif char == '"':
+                self._in_ascii_quote = not self._in_ascii_quote
+
+            if (
+                char in SENTENCE_TERMINATORS
+                and buffer[index + 1] not in SENTENCE_TERMINATORS
+                and buffer[index + 1] not in _CLOSING_SYMBOLS
+                and self._depth == 0
+                and not self._in_ascii_quote
+            ):
+                self._last_boundary = index + 1
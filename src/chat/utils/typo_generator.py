@@ -2,6 +2,7 @@
 错别字生成器 - 基于拼音和字频的中文错别字生成工具
 
 内存优化：使用单例模式，避免重复创建拼音字典（约20992个汉字映射）
+性能优化：拼音字典与按拼音索引的同音词表只构建一次，并缓存到 depends-data 目录
 """
 
 import math
@@ -25,6 +26,19 @@ _typo_generator_singleton: "ChineseTypoGenerator | None" = None
 _singleton_lock = Lock()
 _shared_pinyin_dict: dict | None = None
 _shared_char_frequency: dict | None = None
+_shared_word_index: dict[str, list[tuple[str, float]]] | None = None
+_word_index_lock = Lock()
+
+_DEPENDS_DATA_DIR = Path("depends-data")
+_PINYIN_DICT_CACHE = _DEPENDS_DATA_DIR / "pinyin_dict.json"
+_WORD_INDEX_CACHE = _DEPENDS_DATA_DIR / "word_homophone_index.json"
+
+
+def _get_dict_path() -> str:
+    """获取 rjieba 词典文件路径"""
+    # 从当前文件向上返回三级目录到项目根目录，然后拼接路径
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    return os.path.join(base_dir, "depends-data", "dict.txt")
 
 
 def get_typo_generator(
@@ -96,9 +110,11 @@ class ChineseTypoGenerator:
 
         # 🔧 内存优化：复用全局缓存的拼音字典和字频数据
         if _shared_pinyin_dict is None:
-            _shared_pinyin_dict = self._create_pinyin_dict()
+            _shared_pinyin_dict = self._load_or_create_pinyin_dict()
             logger.debug("拼音字典已创建并缓存")
         self.pinyin_dict = _shared_pinyin_dict
+        # 汉字 -> 拼音的反向映射，用于构建和查询同音词索引
+        self.char_pinyin = {char: py for py, chars in self.pinyin_dict.items() for char in chars}
         
         if _shared_char_frequency is None:
             _shared_char_frequency = self._load_or_create_char_frequency()
@@ -118,9 +134,7 @@ class ChineseTypoGenerator:
 
         # 使用内置的词频文件
         char_freq = defaultdict(int)
-        # 从当前文件向上返回三级目录到项目根目录，然后拼接路径
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-        dict_path = os.path.join(base_dir, "depends-data", "dict.txt")
+        dict_path = _get_dict_path()
 
         # 读取rjieba的词典文件
         with open(dict_path, encoding="utf-8") as f:
@@ -141,6 +155,27 @@ class ChineseTypoGenerator:
 
         return normalized_freq
 
+    def _load_or_create_pinyin_dict(self):
+        """
+        加载或创建拼音到汉字的映射字典
+        """
+        if _PINYIN_DICT_CACHE.exists():
+            try:
+                with open(_PINYIN_DICT_CACHE, encoding="utf-8") as f:
+                    return defaultdict(list, orjson.loads(f.read()))
+            except Exception as e:
+                logger.warning(f"加载拼音字典缓存失败，将重新创建: {e}")
+
+        pinyin_dict = self._create_pinyin_dict()
+
+        try:
+            with open(_PINYIN_DICT_CACHE, "w", encoding="utf-8") as f:
+                f.write(orjson.dumps(pinyin_dict).decode("utf-8"))
+        except Exception as e:
+            logger.warning(f"保存拼音字典缓存失败: {e}")
+
+        return pinyin_dict
+
     @staticmethod
     def _create_pinyin_dict():
         """
@@ -292,59 +327,111 @@ class ChineseTypoGenerator:
         """
         return list(rjieba.cut(sentence))
 
-    def _get_word_homophones(self, word):
-        """
-        获取整个词的同音词，只返回高频的有意义词语
+    def _get_word_index(self) -> dict[str, list[tuple[str, float]]]:
         """
-        if len(word) == 1:
-            return []
+        获取同音词索引（全局只构建一次）
 
-        # 获取词的拼音
-        word_pinyin = self._get_word_pinyin(word)
+        以词中每个字的拼音组成的键（空格分隔）索引词典中的多字词，
+        每个键下的词语按词频降序排列。
+        """
+        global _shared_word_index
 
-        # 遍历所有可能的同音字组合
-        candidates = []
-        for py in word_pinyin:
-            chars = self.pinyin_dict.get(py, [])
-            if not chars:
-                return []
-            candidates.append(chars)
+        if _shared_word_index is not None:
+            return _shared_word_index
 
-        # 生成所有可能的组合
-        import itertools
+        with _word_index_lock:
+            if _shared_word_index is None:
+                _shared_word_index = self._load_or_create_word_index()
+                logger.debug(f"同音词索引已加载 ({len(_shared_word_index)} 个拼音组合)")
+        return _shared_word_index
 
-        all_combinations = itertools.product(*candidates)
+    def _load_or_create_word_index(self) -> dict[str, list[tuple[str, float]]]:
+        """
+        加载或创建同音词索引，词典文件更新后自动重建
+        """
+        dict_path = _get_dict_path()
 
-        # 获取rjieba词典和词频信息
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-        dict_path = os.path.join(base_dir, "depends-data", "dict.txt")
-        valid_words = {}  # 改用字典存储词语及其频率
+        if _WORD_INDEX_CACHE.exists():
+            try:
+                if not os.path.exists(dict_path) or os.path.getmtime(_WORD_INDEX_CACHE) >= os.path.getmtime(dict_path):
+                    with open(_WORD_INDEX_CACHE, encoding="utf-8") as f:
+                        raw_index = orjson.loads(f.read())
+                    return {key: [(w, freq) for w, freq in entries] for key, entries in raw_index.items()}
+            except Exception as e:
+                logger.warning(f"加载同音词索引缓存失败，将重新创建: {e}")
+
+        index: dict[str, list[tuple[str, float]]] = defaultdict(list)
         with open(dict_path, encoding="utf-8") as f:
             for line in f:
                 parts = line.strip().split()
-                if len(parts) >= 2:
-                    word_text = parts[0]
-                    word_freq = float(parts[1])  # 获取词频
-                    valid_words[word_text] = word_freq
+                if len(parts) < 2 or len(parts[0]) < 2:
+                    continue
+                word_text = parts[0]
+                key = self._get_index_key(word_text)
+                if key is not None:
+                    index[key].append((word_text, float(parts[1])))
+
+        for entries in index.values():
+            entries.sort(key=lambda x: x[1], reverse=True)
+        index = dict(index)
+
+        try:
+            with open(_WORD_INDEX_CACHE, "w", encoding="utf-8") as f:
+                f.write(orjson.dumps(index).decode("utf-8"))
+        except Exception as e:
+            logger.warning(f"保存同音词索引缓存失败: {e}")
 
-        # 获取原词的词频作为参考
-        original_word_freq = valid_words.get(word, 0)
+        return index
+
+    def _get_index_key(self, word) -> str | None:
+        """
+        按单字拼音生成同音词索引键，含有拼音字典之外的字时返回 None
+        """
+        pinyins = []
+        for char in word:
+            py = self.char_pinyin.get(char)
+            if py is None:
+                return None
+            pinyins.append(py)
+        return " ".join(pinyins)
+
+    def _get_word_homophones(self, word):
+        """
+        获取整个词的同音词，只返回高频的有意义词语
+        """
+        if len(word) == 1:
+            return []
+
+        word_index = self._get_word_index()
+
+        # 同音候选：每个字都可以替换为与该位置拼音相同的字，等价于按词的拼音查索引
+        candidates = word_index.get(" ".join(self._get_word_pinyin(word)))
+        if not candidates:
+            return []
+
+        # 获取原词的词频作为参考（原词按单字拼音所在的索引项中查找）
+        original_word_freq = 0.0
+        own_key = self._get_index_key(word)
+        for entry_word, entry_freq in word_index.get(own_key, ()) if own_key else ():
+            if entry_word == word:
+                original_word_freq = entry_freq
+                break
         min_word_freq = original_word_freq * 0.1  # 设置最小词频为原词频的10%
 
         # 过滤和计算频率
         homophones = []
-        for combo in all_combinations:
-            new_word = "".join(combo)
-            if new_word != word and new_word in valid_words:
-                new_word_freq = valid_words[new_word]
-                # 只保留词频达到阈值的词
-                if new_word_freq >= min_word_freq:
-                    # 计算词的平均字频（考虑字频和词频）
-                    char_avg_freq = sum(self.char_frequency.get(c, 0) for c in new_word) / len(new_word)
-                    # 综合评分：结合词频和字频
-                    combined_score = new_word_freq * 0.7 + char_avg_freq * 0.3
-                    if combined_score >= self.min_freq:
-                        homophones.append((new_word, combined_score))
+        for new_word, new_word_freq in candidates:
+            # 候选按词频降序排列，低于阈值后都不满足
+            if new_word_freq < min_word_freq:
+                break
+            if new_word == word:
+                continue
+            # 计算词的平均字频（考虑字频和词频）
+            char_avg_freq = sum(self.char_frequency.get(c, 0) for c in new_word) / len(new_word)
+            # 综合评分：结合词频和字频
+            combined_score = new_word_freq * 0.7 + char_avg_freq * 0.3
+            if combined_score >= self.min_freq:
+                homophones.append((new_word, combined_score))
 
         # 按综合分数排序并限制返回数量
         sorted_homophones = sorted(homophones, key=lambda x: x[1], reverse=True)
@@ -418,7 +505,7 @@ class ChineseTypoGenerator:
                         replace_prob = self._calculate_replacement_probability(orig_freq, typo_freq)
                         if random.random() < replace_prob:
                             result.append(typo_char)
-                            typo_py = pinyin(typo_char, style=Style.TONE3)[0][0]
+                            typo_py = self.char_pinyin.get(typo_char) or pinyin(typo_char, style=Style.TONE3)[0][0]
                             typo_info.append((char, typo_char, py, typo_py, orig_freq, typo_freq))
                             char_typos.append((typo_char, char))  # 记录(错字,正确字)对
                             current_pos += 1
@@ -441,7 +528,7 @@ class ChineseTypoGenerator:
                             replace_prob = self._calculate_replacement_probability(orig_freq, typo_freq)
                             if random.random() < replace_prob:
                                 word_result.append(typo_char)
-                                typo_py = pinyin(typo_char, style=Style.TONE3)[0][0]
+                                typo_py = self.char_pinyin.get(typo_char) or pinyin(typo_char, style=Style.TONE3)[0][0]
                                 typo_info.append((char, typo_char, py, typo_py, orig_freq, typo_freq))
                                 char_typos.append((typo_char, char))  # 记录(错字,正确字)对
                                 continue
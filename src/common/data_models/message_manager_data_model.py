@@ -4,11 +4,13 @@
 """
 
 import asyncio
+import heapq
 import time
-from collections import deque
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Optional, overload
 
 from src.common.logger import get_logger
 from src.config.config import global_config
@@ -55,6 +57,148 @@ class DecisionRecord(BaseDataModel):
     action: str
 
 
+class IndexedMessageList:
+    """按 message_id 索引、按时间有序的消息容器
+
+    用于 StreamContext 的未读/历史消息：
+    - 通过 message_id 查找、删除均为 O(1)
+    - 插入时保持时间顺序（顺序到达为 O(1)，乱序到达只移动比它新的少量消息）
+    - 可选容量上限，超出时直接淘汰最旧的消息，无需切片复制
+    保留了常用的列表接口（len、迭代、下标/切片、append、extend、remove、clear、+），
+    便于已有调用方无需修改即可使用。
+    """
+
+    __slots__ = ("_items", "maxlen")
+
+    def __init__(self, messages: Iterable["DatabaseMessages"] | None = None, maxlen: int | None = None):
+        self._items: OrderedDict[str, "DatabaseMessages"] = OrderedDict()
+        self.maxlen = maxlen
+        if messages:
+            self.extend(messages)
+
+    @staticmethod
+    def _key_of(message: "DatabaseMessages") -> str:
+        message_id = getattr(message, "message_id", None)
+        # 没有ID的消息使用对象标识作为键，避免互相覆盖
+        return str(message_id) if message_id not in (None, "") else f"__obj_{id(message)}"
+
+    @staticmethod
+    def _time_of(message: "DatabaseMessages") -> float:
+        return getattr(message, "time", 0) or 0
+
+    # ===== 写入 =====
+
+    def append(self, message: "DatabaseMessages") -> None:
+        """按时间顺序加入消息，相同 message_id 的旧条目会被替换"""
+        key = self._key_of(message)
+        self._items.pop(key, None)
+
+        msg_time = self._time_of(message)
+        if self._items and self._time_of(next(reversed(self._items.values()))) > msg_time:
+            # 乱序到达：暂时取出比它新的消息，插入后再按原顺序放回
+            newer: list[tuple[str, "DatabaseMessages"]] = []
+            while self._items and self._time_of(next(reversed(self._items.values()))) > msg_time:
+                newer.append(self._items.popitem(last=True))
+            self._items[key] = message
+            for newer_key, newer_message in reversed(newer):
+                self._items[newer_key] = newer_message
+        else:
+            self._items[key] = message
+
+        self.trim(self.maxlen)
+
+    def extend(self, messages: Iterable["DatabaseMessages"]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def trim(self, max_size: int | None) -> list["DatabaseMessages"]:
+        """淘汰最旧的消息直到不超过 max_size，返回被淘汰的消息"""
+        removed: list["DatabaseMessages"] = []
+        if max_size is None or max_size < 0:
+            return removed
+        while len(self._items) > max_size:
+            removed.append(self._items.popitem(last=False)[1])
+        return removed
+
+    def pop(self, message_id: Any, default: Any = None) -> Any:
+        """按 message_id 取出消息"""
+        if message_id in (None, ""):
+            # 无ID的消息以对象标识为键，退回到取出最早的一条无ID消息
+            for key, message in self._items.items():
+                if key.startswith("__obj_"):
+                    del self._items[key]
+                    return message
+            return default
+        return self._items.pop(str(message_id), default)
+
+    def remove(self, message: "DatabaseMessages") -> None:
+        """移除消息，不存在时与 list.remove 一样抛出 ValueError"""
+        if self._items.pop(self._key_of(message), None) is None:
+            raise ValueError("message not in IndexedMessageList")
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    # ===== 读取 =====
+
+    def get(self, message_id: Any) -> Optional["DatabaseMessages"]:
+        """按 message_id 查找消息"""
+        return self._items.get(str(message_id))
+
+    def latest(self, limit: int) -> list["DatabaseMessages"]:
+        """获取最新的 limit 条消息（按时间升序）"""
+        if limit <= 0:
+            return []
+        if limit >= len(self._items):
+            return list(self._items.values())
+        result: list["DatabaseMessages"] = []
+        iterator = reversed(self._items.values())
+        for _ in range(limit):
+            result.append(next(iterator))
+        result.reverse()
+        return result
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator["DatabaseMessages"]:
+        return iter(list(self._items.values()))
+
+    def __reversed__(self) -> Iterator["DatabaseMessages"]:
+        return iter(list(reversed(self._items.values())))
+
+    def __contains__(self, item: Any) -> bool:
+        if isinstance(item, str):
+            return item in self._items
+        return self._key_of(item) in self._items
+
+    @overload
+    def __getitem__(self, index: int) -> "DatabaseMessages": ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list["DatabaseMessages"]: ...
+
+    def __getitem__(self, index: int | slice) -> "DatabaseMessages | list[DatabaseMessages]":
+        if isinstance(index, slice):
+            if index.step is None and index.stop is None and index.start is not None and index.start < 0:
+                return self.latest(-index.start)
+            return list(self._items.values())[index]
+        if index == -1 and self._items:
+            return next(reversed(self._items.values()))
+        if index == 0 and self._items:
+            return next(iter(self._items.values()))
+        return list(self._items.values())[index]
+
+    def __add__(self, other: Iterable["DatabaseMessages"]) -> list["DatabaseMessages"]:
+        return [*self._items.values(), *other]
+
+    def __radd__(self, other: Iterable["DatabaseMessages"]) -> list["DatabaseMessages"]:
+        return [*other, *self._items.values()]
+
+    def __repr__(self) -> str:
+        return f"IndexedMessageList(size={len(self._items)}, maxlen={self.maxlen})"
+
+
 @dataclass
 class StreamContext(BaseDataModel):
     """聊天流上下文信息"""
@@ -65,8 +209,8 @@ class StreamContext(BaseDataModel):
     max_context_size: int = field(
         default_factory=lambda: getattr(global_config.chat, "max_context_size", 100) if global_config else 100
     )
-    unread_messages: list["DatabaseMessages"] = field(default_factory=list)
-    history_messages: list["DatabaseMessages"] = field(default_factory=list)
+    unread_messages: IndexedMessageList = field(default_factory=IndexedMessageList)
+    history_messages: IndexedMessageList = field(default_factory=IndexedMessageList)
     last_check_time: float = field(default_factory=time.time)
     is_active: bool = True
     processing_task: asyncio.Task | None = None
@@ -104,6 +248,14 @@ class StreamContext(BaseDataModel):
                 getattr(global_config.chat, "max_context_size", 100) if global_config else 100
             )
 
+        # 历史消息容器自带容量上限，超出时直接淘汰最旧的消息
+        if not isinstance(self.unread_messages, IndexedMessageList):
+            self.unread_messages = IndexedMessageList(self.unread_messages)
+        if not isinstance(self.history_messages, IndexedMessageList):
+            self.history_messages = IndexedMessageList(self.history_messages)
+        self.history_messages.maxlen = self.max_context_size
+        self.history_messages.trim(self.max_context_size)
+
         try:
             loop = asyncio.get_event_loop()
             if loop.is_running():
@@ -179,25 +331,16 @@ class StreamContext(BaseDataModel):
     async def update_message(self, message_id: str, updates: dict[str, Any]) -> bool:
         """更新上下文中的消息信息"""
         try:
-            for message in self.unread_messages:
-                if str(message.message_id) == str(message_id):
-                    if "interest_value" in updates:
-                        message.interest_value = updates["interest_value"]
-                    if "actions" in updates:
-                        message.actions = updates["actions"]
-                    if "should_reply" in updates:
-                        message.should_reply = updates["should_reply"]
-                    break
-
-            for message in self.history_messages:
-                if str(message.message_id) == str(message_id):
-                    if "interest_value" in updates:
-                        message.interest_value = updates["interest_value"]
-                    if "actions" in updates:
-                        message.actions = updates["actions"]
-                    if "should_reply" in updates:
-                        message.should_reply = updates["should_reply"]
-                    break
+            for container in (self.unread_messages, self.history_messages):
+                message = container.get(message_id)
+                if message is None:
+                    continue
+                if "interest_value" in updates:
+                    message.interest_value = updates["interest_value"]
+                if "actions" in updates:
+                    message.actions = updates["actions"]
+                if "should_reply" in updates:
+                    message.should_reply = updates["should_reply"]
 
             logger.debug(f"更新消息信息: {self.stream_id}/{message_id}")
             return True
@@ -213,44 +356,26 @@ class StreamContext(BaseDataModel):
             message_id: 消息ID
             action: 要添加的动作名称
         """
-        # 在未读消息中查找并更新（统一转字符串比较）
-        for message in self.unread_messages:
-            if str(message.message_id) == str(message_id):
-                message.add_action(action)
-                break
-
-        # 在历史消息中查找并更新（统一转字符串比较）
-        for message in self.history_messages:
-            if str(message.message_id) == str(message_id):
+        # 在未读消息与历史消息中查找并更新（容器按字符串ID索引）
+        for container in (self.unread_messages, self.history_messages):
+            message = container.get(message_id)
+            if message is not None:
                 message.add_action(action)
-                break
 
     def mark_message_as_read(self, message_id: str, max_history_size: int | None = None):
         """标记消息为已读"""
-        # 先找到要标记的消息（处理 int/str 类型不匹配问题）
-        message_to_mark = None
-        for msg in self.unread_messages:
-            # 统一转换为字符串比较，避免 int vs str 导致的匹配失败
-            if str(msg.message_id) == str(message_id):
-                message_to_mark = msg
-                break
+        # 容器按字符串ID索引，避免 int vs str 导致的匹配失败
+        message_to_mark = self.unread_messages.pop(message_id)
 
         # 然后移动到历史消息
         if message_to_mark:
             message_to_mark.is_read = True
 
-            # 应用历史消息长度限制
+            # 应用历史消息长度限制（容器自带上限，这里处理调用方指定的更小上限）
             if max_history_size is None:
                 max_history_size = self.max_context_size
-
-            # 如果历史消息已达到最大长度，移除最旧的消息
-            if len(self.history_messages) >= max_history_size:
-                # 移除最旧的历史消息（保持先进先出）
-                removed_count = len(self.history_messages) - max_history_size + 1
-                self.history_messages = self.history_messages[removed_count:]
-
             self.history_messages.append(message_to_mark)
-            self.unread_messages.remove(message_to_mark)
+            self.history_messages.trim(max_history_size)
 
     def get_unread_messages(self) -> list["DatabaseMessages"]:
         """获取未读消息"""
@@ -258,23 +383,20 @@ class StreamContext(BaseDataModel):
 
     def get_history_messages(self, limit: int = 20) -> list["DatabaseMessages"]:
         """获取历史消息"""
-        # 优先返回最近的历史消息和所有未读消息
-        recent_history = self.history_messages[-limit:] if len(self.history_messages) > limit else self.history_messages
-        return recent_history
+        # 容器已按时间排序，直接取最新的 limit 条
+        return self.history_messages.latest(limit)
 
     def get_messages(self, limit: int | None = None, include_unread: bool = True) -> list["DatabaseMessages"]:
         """获取上下文中的消息集合"""
         try:
-            messages: list["DatabaseMessages"] = []
+            history = self.get_history_messages(limit=limit) if limit else self.get_history_messages()
             if include_unread:
-                messages.extend(self.get_unread_messages())
-
-            if limit:
-                messages.extend(self.get_history_messages(limit=limit))
+                # 两个容器均已按时间有序，归并即可得到有序结果，无需重新排序
+                messages = list(
+                    heapq.merge(history, self.get_unread_messages(), key=lambda msg: getattr(msg, "time", 0) or 0)
+                )
             else:
-                messages.extend(self.get_history_messages())
-
-            messages.sort(key=lambda msg: getattr(msg, "time", 0))
+                messages = history
 
             if limit and len(messages) > limit:
                 messages = messages[-limit:]
@@ -395,7 +517,7 @@ class StreamContext(BaseDataModel):
                     logger.warning(f"上下文缺少必要属性: {attr}")
                     return False
 
-            all_messages = self.unread_messages + self.history_messages
+            all_messages = [*self.unread_messages, *self.history_messages]
             message_ids = [msg.message_id for msg in all_messages if hasattr(msg, "message_id")]
             if len(message_ids) != len(set(message_ids)):
                 logger.warning(f"上下文中存在重复的消息ID: {self.stream_id}")
@@ -521,12 +643,15 @@ class StreamContext(BaseDataModel):
 
             from src.chat.utils.chat_message_builder import get_raw_msg_before_timestamp_with_chat
             from src.common.data_models.database_data_model import DatabaseMessages
+            from src.common.recent_message_buffer import get_recent_message_buffer
 
             db_messages = await get_raw_msg_before_timestamp_with_chat(
                 chat_id=self.stream_id,
                 timestamp=time.time(),
                 limit=self.max_context_size,
             )
+            # 用加载结果补齐近期消息缓冲区，后续的近期历史查询可直接命中内存
+            get_recent_message_buffer().seed(self.stream_id, db_messages, limit=self.max_context_size)
 
             if db_messages:
                 logger.info(f"[历史加载] 从数据库获取到 {len(db_messages)} 条历史消息")
@@ -542,10 +667,9 @@ class StreamContext(BaseDataModel):
                         logger.warning(f"转换历史消息失败 (message_id={msg_dict.get('message_id', 'unknown')}): {e}")
                         continue
 
-                if len(self.history_messages) > self.max_context_size:
-                    removed_count = len(self.history_messages) - self.max_context_size
-                    self.history_messages = self.history_messages[-self.max_context_size :]
-                    logger.debug(f"[历史加载] 移除了 {removed_count} 条最早的消息以适配当前容量限制")
+                removed = self.history_messages.trim(self.max_context_size)
+                if removed:
+                    logger.debug(f"[历史加载] 移除了 {len(removed)} 条最早的消息以适配当前容量限制")
 
                 logger.info(f"[历史加载] 成功加载 {loaded_count} 条历史消息到内存: {self.stream_id}")
             else:
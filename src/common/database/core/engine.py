@@ -12,7 +12,7 @@ import asyncio
 import os
 from urllib.parse import quote_plus
 
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 from src.common.logger import get_logger
@@ -78,6 +78,8 @@ async def get_engine() -> AsyncEngine:
 
             # 数据库特定优化
             if db_type == "sqlite":
+                # 连接级 PRAGMA：每个新建连接执行一次，而不是每个会话都执行
+                event.listen(_engine.sync_engine, "connect", _set_sqlite_connection_pragmas)
                 await _enable_sqlite_optimizations(_engine)
             elif db_type == "postgresql":
                 await _enable_postgresql_optimizations(_engine)
@@ -239,14 +241,34 @@ async def close_engine():
         logger.info("✅ 数据库引擎已关闭")
 
 
+def _set_sqlite_connection_pragmas(dbapi_connection, connection_record):
+    """为每个新建的 SQLite 连接设置连接级 PRAGMA
+
+    这些参数只对当前连接生效，因此必须在连接建立时设置，
+    连接被连接池复用时无需重复执行。
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        # 设置适中的同步级别（WAL 模式下安全）
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        # 启用外键约束
+        cursor.execute("PRAGMA foreign_keys = ON")
+        # 设置busy_timeout，写入已由单写者队列串行化，这里只作为兜底
+        cursor.execute("PRAGMA busy_timeout = 60000")
+        # 设置缓存大小（10MB）
+        cursor.execute("PRAGMA cache_size = -10000")
+        # 临时存储使用内存
+        cursor.execute("PRAGMA temp_store = MEMORY")
+    finally:
+        cursor.close()
+
+
 async def _enable_sqlite_optimizations(engine: AsyncEngine):
     """启用SQLite性能优化
 
     优化项：
-    - WAL模式：提高并发性能
-    - NORMAL同步：平衡性能和安全性
-    - 启用外键约束
-    - 设置busy_timeout：避免锁定错误
+    - WAL模式：提高并发性能（持久化在数据库文件中，只需设置一次）
+    - 其余连接级参数由 _set_sqlite_connection_pragmas 在每个连接建立时设置
 
     Args:
         engine: SQLAlchemy异步引擎
@@ -255,16 +277,6 @@ async def _enable_sqlite_optimizations(engine: AsyncEngine):
         async with engine.begin() as conn:
             # 启用WAL模式
             await conn.execute(text("PRAGMA journal_mode = WAL"))
-            # 设置适中的同步级别
-            await conn.execute(text("PRAGMA synchronous = NORMAL"))
-            # 启用外键约束
-            await conn.execute(text("PRAGMA foreign_keys = ON"))
-            # 设置busy_timeout，避免锁定错误
-            await conn.execute(text("PRAGMA busy_timeout = 60000"))
-            # 设置缓存大小（10MB）
-            await conn.execute(text("PRAGMA cache_size = -10000"))
-            # 临时存储使用内存
-            await conn.execute(text("PRAGMA temp_store = MEMORY"))
 
         logger.info("✅ SQLite性能优化已启用 (WAL模式 + 并发优化)")
 
@@ -114,6 +114,7 @@ class LLMUsage(Base):
     request_type: Mapped[str] = mapped_column(get_string_field(50), nullable=False, index=True)
     endpoint: Mapped[str] = mapped_column(Text, nullable=False)
     prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False)
+    cached_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # 命中提示词缓存的token数
     completion_tokens: Mapped[int] = mapped_column(Integer, nullable=False)
     time_cost: Mapped[float | None] = mapped_column(Float, nullable=True)
     total_tokens: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -214,6 +215,8 @@ class Messages(Base):
         Index("idx_messages_chat_id", "chat_id"),
         Index("idx_messages_time", "time"),
         Index("idx_messages_user_id", "user_id"),
+        # 按时间范围对会话/用户做聚合统计时可以只扫描索引
+        Index("idx_messages_time_chat_user", "time", "chat_id", "user_id"),
         Index("idx_messages_should_reply", "should_reply"),
         Index("idx_messages_should_act", "should_act"),
     )
@@ -3,7 +3,7 @@
 单一职责：提供数据库会话工厂和上下文管理器
 
 支持的数据库类型：
-- SQLite: 设置 PRAGMA 参数优化并发
+- SQLite: PRAGMA 参数在连接建立时设置（见 engine._set_sqlite_connection_pragmas）
 - MySQL: 无特殊会话设置
 - PostgreSQL: 可选设置 schema 搜索路径
 """
@@ -66,11 +66,8 @@ async def _apply_session_settings(session: AsyncSession, db_type: str) -> None:
         db_type: 数据库类型
     """
     try:
-        if db_type == "sqlite":
-            # SQLite 特定的 PRAGMA 设置
-            await session.execute(text("PRAGMA busy_timeout = 60000"))
-            await session.execute(text("PRAGMA foreign_keys = ON"))
-        elif db_type == "postgresql":
+        # SQLite 的 PRAGMA 是连接级设置，已在连接建立时执行，这里无需重复
+        if db_type == "postgresql":
             # PostgreSQL 特定设置（如果需要）
             # 可以设置 schema 搜索路径等
             from src.config.config import global_config
@@ -92,7 +89,7 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     这是数据库操作的主要入口点，通过连接池管理器提供透明的连接复用。
 
     支持的数据库：
-    - SQLite: 自动设置 busy_timeout 和外键约束
+    - SQLite: busy_timeout 和外键约束在连接级设置，写入建议通过 execute_write 提交
     - MySQL: 直接使用，无特殊设置
     - PostgreSQL: 支持自定义 schema
 
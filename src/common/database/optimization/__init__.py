@@ -5,6 +5,7 @@
 - 批量调度
 - 多级缓存
 - 数据预加载
+- SQLite 单写者分组提交
 """
 
 from .batch_scheduler import (
@@ -36,6 +37,13 @@ from .preloader import (
     close_preloader,
     get_preloader,
 )
+from .write_queue import (
+    SQLiteWriteQueue,
+    WriteQueueStats,
+    close_write_queue,
+    execute_write,
+    get_write_queue,
+)
 
 __all__ = [
     "AccessPattern",
@@ -54,13 +62,19 @@ __all__ = [
     # Cache
     "MultiLevelCache",
     "Priority",
+    # Write Queue
+    "SQLiteWriteQueue",
+    "WriteQueueStats",
     "close_batch_scheduler",
     "close_cache",
     "close_preloader",
+    "close_write_queue",
+    "execute_write",
     "get_batch_scheduler",
     "get_cache",
     "get_connection_pool_manager",
     "get_preloader",
+    "get_write_queue",
     "start_connection_pool",
     "stop_connection_pool",
 ]
@@ -18,6 +18,7 @@ from typing import Any
 from sqlalchemy import delete, insert, select, update
 
 from src.common.database.core.session import get_db_session_direct
+from src.common.database.optimization.write_queue import execute_write
 from src.common.logger import get_logger
 from src.common.memory_utils import estimate_size_smart
 
@@ -369,129 +370,122 @@ class AdaptiveBatchScheduler:
         operations: list[BatchOperation],
     ) -> None:
         """批量执行插入操作"""
-        async with get_db_session_direct() as session:
-            try:
-                # 收集数据，并过滤掉 id=None 的情况（让数据库自动生成）
-                all_data = []
-                for op in operations:
-                    if op.data:
-                        # 过滤掉 id 为 None 的键，让数据库自动生成主键
-                        filtered_data = {k: v for k, v in op.data.items() if not (k == "id" and v is None)}
-                        all_data.append(filtered_data)
-                
-                if not all_data:
-                    return
-
-                # 批量插入
-                stmt = insert(operations[0].model_class).values(all_data)
-                await session.execute(stmt)
-                # 注意：commit 由 get_db_session_direct 上下文管理器自动处理
-
-                # 设置结果
-                for op in operations:
-                    if op.future and not op.future.done():
-                        op.future.set_result(True)
+        # 收集数据，并过滤掉 id=None 的情况（让数据库自动生成）
+        all_data = []
+        for op in operations:
+            if op.data:
+                # 过滤掉 id 为 None 的键，让数据库自动生成主键
+                filtered_data = {k: v for k, v in op.data.items() if not (k == "id" and v is None)}
+                all_data.append(filtered_data)
+
+        if not all_data:
+            return
 
-                    if op.callback:
-                        try:
-                            op.callback(True)
-                        except Exception as e:
-                            logger.warning(f"回调执行失败: {e}")
+        async def _insert(session) -> None:
+            # 批量插入（commit 由写入队列统一处理）
+            await session.execute(insert(operations[0].model_class).values(all_data))
 
-            except Exception as e:
-                logger.error(f"批量插入失败: {e}")
-                # 注意：rollback 由 get_db_session_direct 上下文管理器自动处理
-                for op in operations:
-                    if op.future and not op.future.done():
-                        op.future.set_exception(e)
-                raise  # 重新抛出异常以触发 rollback
+        try:
+            await execute_write(_insert, name="batch_insert")
+        except Exception as e:
+            logger.error(f"批量插入失败: {e}")
+            for op in operations:
+                if op.future and not op.future.done():
+                    op.future.set_exception(e)
+            raise
+
+        # 设置结果
+        for op in operations:
+            if op.future and not op.future.done():
+                op.future.set_result(True)
+
+            if op.callback:
+                try:
+                    op.callback(True)
+                except Exception as e:
+                    logger.warning(f"回调执行失败: {e}")
 
     async def _execute_update_batch(
         self,
         operations: list[BatchOperation],
     ) -> None:
         """批量执行更新操作"""
-        async with get_db_session_direct() as session:
-            results = []
-            try:
-                # 🔧 收集所有操作后一次性commit，而不是循环中多次commit
-                for op in operations:
-                    # 构建更新语句
-                    stmt = update(op.model_class)
-                    for key, value in op.conditions.items():
-                        attr = getattr(op.model_class, key)
-                        stmt = stmt.where(attr == value)
 
-                    if op.data:
-                        stmt = stmt.values(**op.data)
-
-                    # 执行更新（但不commit）
-                    result = await session.execute(stmt)
-                    results.append((op, result.rowcount))  # type: ignore
+        async def _update(session) -> list[int]:
+            # 🔧 收集所有操作后一次性commit，而不是循环中多次commit
+            rowcounts = []
+            for op in operations:
+                # 构建更新语句
+                stmt = update(op.model_class)
+                for key, value in op.conditions.items():
+                    attr = getattr(op.model_class, key)
+                    stmt = stmt.where(attr == value)
 
-                # 注意：commit 由 get_db_session_direct 上下文管理器自动处理
+                if op.data:
+                    stmt = stmt.values(**op.data)
 
-                # 设置所有操作的结果
-                for op, rowcount in results:
-                    if op.future and not op.future.done():
-                        op.future.set_result(rowcount)
+                # 执行更新（但不commit）
+                result = await session.execute(stmt)
+                rowcounts.append(result.rowcount)  # type: ignore
+            return rowcounts
 
-                    if op.callback:
-                        try:
-                            op.callback(rowcount)
-                        except Exception as e:
-                            logger.warning(f"回调执行失败: {e}")
+        try:
+            rowcounts = await execute_write(_update, name="batch_update")
+        except Exception as e:
+            logger.error(f"批量更新失败: {e}")
+            # 所有操作都失败
+            for op in operations:
+                if op.future and not op.future.done():
+                    op.future.set_exception(e)
+            raise
 
-            except Exception as e:
-                logger.error(f"批量更新失败: {e}")
-                # 注意：rollback 由 get_db_session_direct 上下文管理器自动处理
-                # 所有操作都失败
-                for op in operations:
-                    if op.future and not op.future.done():
-                        op.future.set_exception(e)
-                raise  # 重新抛出异常以触发 rollback
+        self._resolve_rowcounts(operations, rowcounts)
 
     async def _execute_delete_batch(
         self,
         operations: list[BatchOperation],
     ) -> None:
         """批量执行删除操作"""
-        async with get_db_session_direct() as session:
-            results = []
-            try:
-                # 🔧 收集所有操作后一次性commit，而不是循环中多次commit
-                for op in operations:
-                    # 构建删除语句
-                    stmt = delete(op.model_class)
-                    for key, value in op.conditions.items():
-                        attr = getattr(op.model_class, key)
-                        stmt = stmt.where(attr == value)
 
-                    # 执行删除（但不commit）
-                    result = await session.execute(stmt)
-                    results.append((op, result.rowcount))  # type: ignore
+        async def _delete(session) -> list[int]:
+            # 🔧 收集所有操作后一次性commit，而不是循环中多次commit
+            rowcounts = []
+            for op in operations:
+                # 构建删除语句
+                stmt = delete(op.model_class)
+                for key, value in op.conditions.items():
+                    attr = getattr(op.model_class, key)
+                    stmt = stmt.where(attr == value)
 
-                # 注意：commit 由 get_db_session_direct 上下文管理器自动处理
+                # 执行删除（但不commit）
+                result = await session.execute(stmt)
+                rowcounts.append(result.rowcount)  # type: ignore
+            return rowcounts
 
-                # 设置所有操作的结果
-                for op, rowcount in results:
-                    if op.future and not op.future.done():
-                        op.future.set_result(rowcount)
+        try:
+            rowcounts = await execute_write(_delete, name="batch_delete")
+        except Exception as e:
+            logger.error(f"批量删除失败: {e}")
+            # 所有操作都失败
+            for op in operations:
+                if op.future and not op.future.done():
+                    op.future.set_exception(e)
+            raise
 
-                    if op.callback:
-                        try:
-                            op.callback(rowcount)
-                        except Exception as e:
-                            logger.warning(f"回调执行失败: {e}")
+        self._resolve_rowcounts(operations, rowcounts)
 
-            except Exception as e:
-                logger.error(f"批量删除失败: {e}")
-                # 注意：rollback 由 get_db_session_direct 上下文管理器自动处理
-                # 所有操作都失败
-                for op in operations:
-                    if op.future and not op.future.done():
-                        op.future.set_exception(e)
-                raise  # 重新抛出异常以触发 rollback
+    @staticmethod
+    def _resolve_rowcounts(operations: list[BatchOperation], rowcounts: list[int]) -> None:
+        """设置所有操作的结果"""
+        for op, rowcount in zip(operations, rowcounts):
+            if op.future and not op.future.done():
+                op.future.set_result(rowcount)
+
+            if op.callback:
+                try:
+                    op.callback(rowcount)
+                except Exception as e:
+                    logger.warning(f"回调执行失败: {e}")
 
     async def _adjust_parameters(self) -> None:
         """根据性能自适应调整参数"""
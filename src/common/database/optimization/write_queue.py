@@ -0,0 +1,354 @@
+"""SQLite 专用写入队列
+
+SQLite 同一时刻只允许一个写事务，多个组件各自打开会话写入时会在写锁上互相等待，
+只能依赖 busy_timeout 兜底，突发负载下容易出现长时间卡顿。
+
+本模块提供一个单写者队列：
+- 所有写入方把"写入单元"（接收会话并执行语句的协程函数）提交到队列
+- 唯一的写入任务按短时间窗口收集写入单元，每组从会话工厂取一个会话，在一个事务中分组提交
+- 分组提交失败时回滚，并逐个重试各写入单元，避免单个坏单元拖垮整组
+- 读取仍然走连接池中的其他连接，在 WAL 模式下不会被写入阻塞
+
+非 SQLite 数据库本身支持并发写入，execute_write 会直接使用普通会话执行并提交。
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.common.database.core.session import get_db_session, get_session_factory
+from src.common.logger import get_logger
+
+logger = get_logger("write_queue")
+
+# 写入单元：在给定会话中执行写操作，不需要（也不应该）自行 commit
+WriteUnit = Callable[[AsyncSession], Awaitable[Any]]
+
+
+@dataclass
+class _WriteRequest:
+    """队列中的单个写入请求"""
+
+    unit: WriteUnit
+    future: asyncio.Future
+    name: str = ""
+    enqueued_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class WriteQueueStats:
+    """写入队列统计"""
+
+    total_units: int = 0
+    total_groups: int = 0
+    failed_units: int = 0
+    group_retries: int = 0
+    avg_group_size: float = 0.0
+    avg_wait_time: float = 0.0
+    last_commit_duration: float = 0.0
+
+
+class SQLiteWriteQueue:
+    """SQLite 单写者分组提交队列"""
+
+    def __init__(
+        self,
+        max_group_size: int = 200,
+        group_window: float = 0.01,
+        max_queue_size: int = 10000,
+    ):
+        """
+        初始化写入队列
+
+        Args:
+            max_group_size: 单个事务最多包含的写入单元数
+            group_window: 收到第一个写入单元后等待更多单元加入同组的时间（秒）
+            max_queue_size: 队列最大长度，超出时提交方会等待
+        """
+        self.max_group_size = max_group_size
+        self.group_window = group_window
+        # None 为停止标记：写入任务处理完它之前入队的所有单元后退出
+        self._queue: asyncio.Queue[_WriteRequest | None] = asyncio.Queue(maxsize=max_queue_size)
+        self._writer_task: asyncio.Task | None = None
+        self._running = False
+        self._stop_markers = 0
+        self.stats = WriteQueueStats()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    async def start(self) -> None:
+        """启动写入任务"""
+        if self._running:
+            return
+        self._running = True
+        self._writer_task = asyncio.create_task(self._writer_loop(), name="sqlite_write_queue")
+        logger.info(f"SQLite 写入队列已启动 (max_group_size={self.max_group_size}, window={self.group_window}s)")
+
+    async def stop(self) -> None:
+        """停止写入任务，队列中剩余的写入单元会先被提交"""
+        if not self._running:
+            return
+        self._running = False
+
+        if self._writer_task and not self._writer_task.done():
+            # 不取消写入任务，避免丢失其手中正在提交的分组；投递停止标记并等待队列排空
+            await self._queue.put(None)
+            await self._writer_task
+        self._writer_task = None
+
+        # 处理停止标记之后才入队的请求（提交时恰好在等待队列空位的写入方）
+        while not self._queue.empty():
+            group = self._drain_nowait(self.max_group_size)
+            if group:
+                await self._commit_group(group)
+
+        logger.info("SQLite 写入队列已停止")
+
+    async def submit(self, unit: WriteUnit, name: str = "") -> Any:
+        """提交写入单元并等待其所在分组提交完成
+
+        Args:
+            unit: 写入单元
+            name: 写入方名称（用于日志）
+
+        Returns:
+            写入单元的返回值
+        """
+        if not self._running:
+            raise RuntimeError("SQLite 写入队列未运行")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_WriteRequest(unit=unit, future=future, name=name))
+        self.stats.total_units += 1
+        return await future
+
+    async def _writer_loop(self) -> None:
+        """写入主循环：收集一组写入单元后一次性提交，收到停止标记后提交剩余单元并退出"""
+        stopping = False
+        while not stopping:
+            group: list[_WriteRequest] = []
+            try:
+                first = await self._queue.get()
+                if first is None:
+                    stopping = True
+                else:
+                    group.append(first)
+
+                # 在短窗口内继续收集，将突发写入合并进同一个事务
+                deadline = time.perf_counter() + self.group_window
+                while not stopping and len(group) < self.max_group_size:
+                    group.extend(self._drain_nowait(self.max_group_size - len(group)))
+                    if self._pop_stop_marker():
+                        stopping = True
+                    if stopping or len(group) >= self.max_group_size:
+                        break
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is None:
+                        stopping = True
+                    else:
+                        group.append(item)
+
+                if group:
+                    await self._commit_group(group)
+
+            except asyncio.CancelledError:
+                self._fail_all(group, RuntimeError("SQLite 写入队列已取消"))
+                raise
+            except Exception as e:
+                logger.error(f"SQLite 写入循环出错: {e}")
+                self._fail_all(group, e)
+                await asyncio.sleep(0.1)
+
+        # 停止标记之前入队的单元全部提交后再退出
+        while True:
+            group = self._drain_nowait(self.max_group_size)
+            if not group:
+                break
+            try:
+                await self._commit_group(group)
+            except Exception as e:
+                logger.error(f"SQLite 写入队列停止时提交失败: {e}")
+                self._fail_all(group, e)
+
+    def _drain_nowait(self, limit: int) -> list[_WriteRequest]:
+        """取出至多 limit 个写入请求，跳过其中的停止标记（计入 _stop_markers）"""
+        items = []
+        while len(items) < limit:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is None:
+                self._stop_markers += 1
+                continue
+            items.append(item)
+        return items
+
+    def _pop_stop_marker(self) -> int:
+        """返回并清零 _drain_nowait 期间遇到的停止标记数"""
+        count, self._stop_markers = self._stop_markers, 0
+        return count
+
+    def _fail_all(self, group: list[_WriteRequest], error: Exception) -> None:
+        for req in group:
+            if not req.future.done():
+                self._fail(req, error)
+
+    async def _commit_group(self, group: list[_WriteRequest]) -> None:
+        """在一个事务中执行并提交一组写入单元"""
+        pending = [req for req in group if not req.future.done()]
+        if not pending:
+            return
+
+        start_time = time.perf_counter()
+        now = time.time()
+        session_factory = await get_session_factory()
+
+        results: list[tuple[_WriteRequest, Any]] = []
+        try:
+            async with session_factory() as session:
+                try:
+                    for req in pending:
+                        results.append((req, await req.unit(session)))
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+        except Exception as e:
+            if len(pending) == 1:
+                self._fail(pending[0], e)
+            else:
+                # 整组回滚后逐个重试，只让真正出错的写入单元失败
+                logger.warning(f"分组提交失败，逐个重试 {len(pending)} 个写入单元: {e}")
+                self.stats.group_retries += 1
+                for req in pending:
+                    await self._commit_single(req)
+            return
+
+        for req, result in results:
+            if not req.future.done():
+                req.future.set_result(result)
+
+        duration = time.perf_counter() - start_time
+        wait_time = sum(now - req.enqueued_at for req in pending) / len(pending)
+        self.stats.total_groups += 1
+        self.stats.last_commit_duration = duration
+        self.stats.avg_group_size = self.stats.avg_group_size * 0.9 + len(pending) * 0.1
+        self.stats.avg_wait_time = self.stats.avg_wait_time * 0.9 + wait_time * 0.1
+
+        if len(pending) > 1:
+            logger.debug(f"分组提交 {len(pending)} 个写入单元，耗时 {duration:.3f}s")
+
+    async def _commit_single(self, req: _WriteRequest) -> None:
+        session_factory = await get_session_factory()
+        try:
+            async with session_factory() as session:
+                try:
+                    result = await req.unit(session)
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+        except Exception as e:
+            self._fail(req, e)
+            return
+        if not req.future.done():
+            req.future.set_result(result)
+
+    def _fail(self, req: _WriteRequest, error: Exception) -> None:
+        self.stats.failed_units += 1
+        logger.error(f"写入单元执行失败{f' ({req.name})' if req.name else ''}: {error}")
+        if not req.future.done():
+            req.future.set_exception(error)
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取统计信息"""
+        return {
+            "is_running": self._running,
+            "queue_size": self._queue.qsize(),
+            "total_units": self.stats.total_units,
+            "total_groups": self.stats.total_groups,
+            "failed_units": self.stats.failed_units,
+            "group_retries": self.stats.group_retries,
+            "avg_group_size": self.stats.avg_group_size,
+            "avg_wait_time": self.stats.avg_wait_time,
+            "last_commit_duration": self.stats.last_commit_duration,
+        }
+
+
+# 全局写入队列实例
+_global_write_queue: SQLiteWriteQueue | None = None
+_write_queue_lock = asyncio.Lock()
+_write_queue_closed = False
+
+
+def _is_sqlite() -> bool:
+    from src.config.config import global_config
+
+    return global_config is None or global_config.database.database_type not in ("mysql", "postgresql")
+
+
+async def get_write_queue() -> SQLiteWriteQueue:
+    """获取全局 SQLite 写入队列（单例）"""
+    global _global_write_queue
+
+    if _global_write_queue is None:
+        async with _write_queue_lock:
+            if _global_write_queue is None:
+                _global_write_queue = SQLiteWriteQueue()
+                await _global_write_queue.start()
+
+    return _global_write_queue
+
+
+async def close_write_queue() -> None:
+    """关闭全局写入队列（需在关闭数据库引擎之前调用）"""
+    global _global_write_queue, _write_queue_closed
+
+    _write_queue_closed = True
+    if _global_write_queue is not None:
+        await _global_write_queue.stop()
+        _global_write_queue = None
+        logger.info("全局 SQLite 写入队列已关闭")
+
+
+async def execute_write(unit: WriteUnit, name: str = "") -> Any:
+    """执行一个写入单元
+
+    SQLite 下提交到单写者队列分组提交；其他数据库（或队列已关闭时）直接在普通会话中执行并提交。
+
+    写入单元只应包含数据库操作：分组提交失败时它可能会被重新执行一次。
+
+    使用示例:
+        async def _unit(session):
+            await session.execute(insert(Messages).values(rows))
+
+        await execute_write(_unit, name="messages")
+
+    Args:
+        unit: 写入单元，接收 AsyncSession，无需自行 commit
+        name: 写入方名称（用于日志）
+
+    Returns:
+        写入单元的返回值
+    """
+    if _is_sqlite() and not _write_queue_closed:
+        queue = await get_write_queue()
+        return await queue.submit(unit, name=name)
+
+    async with get_db_session() as session:
+        result = await unit(session)
+        await session.commit()
+        return result
@@ -10,6 +10,7 @@ from src.common.database.compatibility import get_db_session
 # from src.common.database.database_model import Messages
 from src.common.database.core.models import Messages
 from src.common.logger import get_logger
+from src.common.recent_message_buffer import get_recent_message_buffer
 from src.config.config import global_config
 
 logger = get_logger(__name__)
@@ -53,6 +54,19 @@ async def find_messages(
     Returns:
         消息字典列表，如果出错则返回空列表。
     """
+    # 活跃聊天流的近期消息优先由内存缓冲区响应，超出其水位线的范围才查询数据库
+    buffered = get_recent_message_buffer().query(
+        message_filter,
+        sort=sort,
+        limit=limit,
+        limit_mode=limit_mode,
+        filter_bot=filter_bot,
+        filter_command=filter_command,
+        filter_meaningless=filter_meaningless,
+    )
+    if buffered is not None:
+        return buffered
+
     try:
         assert global_config is not None
         async with get_db_session() as session:
@@ -174,6 +188,10 @@ async def count_messages(message_filter: dict[str, Any]) -> int:
     Returns:
         符合条件的消息数量，如果出错则返回 0。
     """
+    buffered = get_recent_message_buffer().query(message_filter)
+    if buffered is not None:
+        return len(buffered)
+
     try:
         async with get_db_session() as session:
             query = select(func.count(Messages.id))
@@ -221,6 +239,41 @@ async def count_messages(message_filter: dict[str, Any]) -> int:
         return 0
 
 
+async def count_messages_grouped(
+    start_time: float, end_time: float, group_by: tuple[str, ...] = ("chat_id", "user_id")
+) -> list[tuple[Any, ...]]:
+    """
+    在数据库中按字段分组统计时间范围内的消息数量。
+
+    结果规模只与分组数有关，不会把消息本身加载到内存中。
+
+    Args:
+        start_time: 开始时间戳（不含）
+        end_time: 结束时间戳（不含）
+        group_by: 分组字段，必须是 Messages 的列
+
+    Returns:
+        [(分组值1, 分组值2, ..., 数量), ...]，如果出错则返回空列表。
+    """
+    try:
+        columns = [getattr(Messages, name) for name in group_by]
+    except AttributeError as e:
+        raise ValueError(f"无效的分组字段: {group_by}") from e
+
+    try:
+        async with get_db_session() as session:
+            query = (
+                select(*columns, func.count(Messages.id))
+                .where(Messages.time > start_time, Messages.time < end_time)
+                .group_by(*columns)
+            )
+            result = await session.execute(query)
+            return [tuple(row) for row in result.all()]
+    except Exception as e:
+        logger.error(f"使用 SQLAlchemy 分组统计消息失败 (group_by={group_by}): {e}\n{traceback.format_exc()}")
+        return []
+
+
 # 你可以在这里添加更多与 messages 集合相关的数据库操作函数，例如 find_one_message, insert_message 等。
 # 注意：对于 SQLAlchemy，插入操作通常是使用 await session.add() 和 await session.commit()。
 # 查找单个消息可以使用 session.execute(select(Messages).where(...)).scalar_one_or_none()。
@@ -0,0 +1,324 @@
+"""
+消息处理延迟追踪
+
+对单条入站消息从接收到回复发送的全过程分阶段计时，定位回复变慢的环节：
+- 追踪上下文通过 contextvars 传播，同一任务内以及由其创建的子任务都能记录阶段耗时
+- MessageHandler 入队后，追踪按消息ID交接给 StreamLoopManager，在 chatter 任务中继续记录
+- 完成的追踪进入内存环形缓冲区，同时按阶段累计直方图，通过 API 路由查看
+
+按 debug.trace_sample_rate 采样；未采样的消息不会创建追踪，
+trace_span 在没有活动追踪时直接返回共享的空操作对象，开销可以忽略。
+
+使用示例:
+    with trace_span("replyer_llm"):
+        content = await self.llm_generate_content(prompt)
+"""
+
+import bisect
+import contextvars
+import random
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+# 直方图桶上界（毫秒），最后一个桶收集所有更大的值
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# 等待交接的追踪上限，超出时丢弃最早的（消息被静默或过滤时不会被 chatter 认领）
+MAX_PENDING_TRACES = 1000
+
+_current_trace: contextvars.ContextVar["MessageTrace | None"] = contextvars.ContextVar(
+    "current_message_trace", default=None
+)
+
+
+@dataclass
+class TraceSpan:
+    """单个阶段的耗时记录"""
+
+    name: str
+    offset: float  # 相对追踪开始的时间（秒）
+    duration: float  # 耗时（秒）
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "offset_ms": round(self.offset * 1000, 2),
+            "duration_ms": round(self.duration * 1000, 2),
+        }
+
+
+@dataclass
+class MessageTrace:
+    """一条消息的追踪记录"""
+
+    message_id: str
+    stream_id: str
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    started_at: float = field(default_factory=time.time)  # 墙钟时间，用于展示
+    begin: float = field(default_factory=time.perf_counter)  # 追踪起点（perf_counter）
+    spans: list[TraceSpan] = field(default_factory=list)
+    status: str = "active"  # active / completed / batched / dropped
+    duration: float = 0.0
+    enqueued_at: float | None = None  # 交接给流循环的时间（perf_counter）
+
+    def add_span(self, name: str, start: float, end: float) -> None:
+        """记录阶段耗时（start/end 为 perf_counter 时间）"""
+        self.spans.append(TraceSpan(name=name, offset=start - self.begin, duration=max(0.0, end - start)))
+
+    def add_duration(self, name: str, duration: float, end: float | None = None) -> None:
+        """记录已知耗时的阶段（如来自适配器时间戳的延迟）"""
+        end = time.perf_counter() if end is None else end
+        self.add_span(name, end - duration, end)
+
+    def stage_totals(self) -> dict[str, float]:
+        """按阶段汇总耗时（同名阶段累加，单位毫秒）"""
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration * 1000
+        return {name: round(value, 2) for name, value in totals.items()}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "message_id": self.message_id,
+            "stream_id": self.stream_id,
+            "started_at": self.started_at,
+            "status": self.status,
+            "duration_ms": round(self.duration * 1000, 2),
+            "stages": self.stage_totals(),
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+class _Span:
+    """记录到指定追踪的计时上下文"""
+
+    __slots__ = ("_begin", "_name", "_trace")
+
+    def __init__(self, trace: MessageTrace, name: str):
+        self._trace = trace
+        self._name = name
+        self._begin = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._begin = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._trace.add_span(self._name, self._begin, time.perf_counter())
+
+
+class _NoopSpan:
+    """未采样时使用的空操作上下文"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+@dataclass
+class StageHistogram:
+    """单个阶段的耗时直方图"""
+
+    counts: list[int] = field(default_factory=lambda: [0] * (len(HISTOGRAM_BUCKETS_MS) + 1))
+    total: int = 0
+    sum_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, value_ms)] += 1
+        self.total += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def quantile(self, q: float) -> float:
+        """按桶估算分位数（返回所在桶的上界，毫秒）"""
+        if self.total == 0:
+            return 0.0
+        target = q * self.total
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return float(HISTOGRAM_BUCKETS_MS[index]) if index < len(HISTOGRAM_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict[str, Any]:
+        labels = [f"<={bound}" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}"]
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 2) if self.total else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class MessageTracer:
+    """追踪管理器：采样、交接、完成后归档"""
+
+    def __init__(self, sample_rate: float = 0.0, buffer_size: int = 200):
+        self.sample_rate = sample_rate
+        self._completed: deque[MessageTrace] = deque(maxlen=max(1, buffer_size))
+        self._pending: OrderedDict[str, MessageTrace] = OrderedDict()
+        self._histograms: dict[str, StageHistogram] = {}
+        self.stats = {"sampled": 0, "completed": 0, "dropped": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def start_trace(self, message_id: str, stream_id: str, begin: float | None = None) -> MessageTrace | None:
+        """
+        按采样率为消息创建追踪
+
+        Args:
+            message_id: 消息ID
+            stream_id: 聊天流ID
+            begin: 追踪起点（perf_counter 时间），默认为当前时间
+
+        Returns:
+            MessageTrace | None: 未被采样时返回 None
+        """
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return None
+        trace = MessageTrace(message_id=str(message_id), stream_id=stream_id)
+        if begin is not None:
+            trace.begin = begin
+        self.stats["sampled"] += 1
+        return trace
+
+    @staticmethod
+    def activate(trace: MessageTrace | None) -> contextvars.Token:
+        """将追踪设为当前上下文的活动追踪，返回用于恢复的 token"""
+        return _current_trace.set(trace)
+
+    @staticmethod
+    def deactivate(token: contextvars.Token) -> None:
+        _current_trace.reset(token)
+
+    def hand_off(self, trace: MessageTrace) -> None:
+        """消息进入流上下文后登记追踪，等待流循环认领"""
+        trace.enqueued_at = time.perf_counter()
+        self._pending[trace.message_id] = trace
+        while len(self._pending) > MAX_PENDING_TRACES:
+            _, dropped = self._pending.popitem(last=False)
+            dropped.status = "dropped"
+            self.stats["dropped"] += 1
+
+    def claim(self, message_ids: Iterable[Any]) -> list[MessageTrace]:
+        """流循环开始处理时认领这些消息的追踪，并记录流循环等待耗时"""
+        if not self._pending:
+            return []
+        now = time.perf_counter()
+        claimed = []
+        for message_id in message_ids:
+            trace = self._pending.pop(str(message_id), None)
+            if trace is None:
+                continue
+            if trace.enqueued_at is not None:
+                trace.add_span("stream_wait", trace.enqueued_at, now)
+            claimed.append(trace)
+        return claimed
+
+    def discard(self, message_id: Any) -> None:
+        """消息不会进入流循环时丢弃其待交接的追踪"""
+        self._pending.pop(str(message_id), None)
+
+    def finish(self, trace: MessageTrace, status: str = "completed") -> None:
+        """结束追踪并归档"""
+        if trace.status != "active":
+            return
+        trace.status = status
+        trace.duration = time.perf_counter() - trace.begin
+        self._completed.append(trace)
+        self.stats["completed"] += 1
+        for span in trace.spans:
+            self._histogram(span.name).observe(span.duration * 1000)
+        if status == "completed":
+            self._histogram("total").observe(trace.duration * 1000)
+
+    def _histogram(self, name: str) -> StageHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = StageHistogram()
+        return histogram
+
+    def get_recent_traces(self, limit: int = 50, stream_id: str | None = None) -> list[dict[str, Any]]:
+        """获取最近完成的追踪（新的在前）"""
+        result = []
+        for trace in reversed(self._completed):
+            if stream_id and trace.stream_id != stream_id:
+                continue
+            result.append(trace.to_dict())
+            if len(result) >= limit:
+                break
+        return result
+
+    def get_trace(self, trace_id: str) -> dict[str, Any] | None:
+        for trace in self._completed:
+            if trace.trace_id == trace_id:
+                return trace.to_dict()
+        return None
+
+    def get_stage_histograms(self) -> dict[str, Any]:
+        return {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            **self.stats,
+            "sample_rate": self.sample_rate,
+            "pending": len(self._pending),
+            "buffered": len(self._completed),
+            "buffer_size": self._completed.maxlen,
+        }
+
+    def reset(self) -> None:
+        """清空已归档的追踪与直方图"""
+        self._completed.clear()
+        self._histograms.clear()
+
+
+def get_current_trace() -> MessageTrace | None:
+    """获取当前上下文的活动追踪"""
+    return _current_trace.get()
+
+
+def trace_span(name: str) -> "_Span | _NoopSpan":
+    """在当前活动追踪上记录一个阶段；没有活动追踪时为空操作"""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _Span(trace, name)
+
+
+_message_tracer: MessageTracer | None = None
+
+
+def get_message_tracer() -> MessageTracer:
+    """获取追踪管理器单例（采样率与缓冲区大小来自 debug 配置）"""
+    global _message_tracer
+    if _message_tracer is None:
+        from src.config.config import global_config
+
+        if global_config is not None:
+            _message_tracer = MessageTracer(
+                sample_rate=global_config.debug.trace_sample_rate,
+                buffer_size=global_config.debug.trace_buffer_size,
+            )
+        else:
+            _message_tracer = MessageTracer()
+    return _message_tracer
@@ -0,0 +1,324 @@
+"""
+近期消息环形缓冲区
+
+为每个聊天流在内存中保留最近的一段消息（与 Messages 表行结构一致的字典），
+用于直接响应"某聊天流最近 N 条 / 某时间段内"的历史查询，避免活跃聊天流反复访问数据库。
+
+- 在 MessageStorage.store_message 时写入，在 StreamContext 历史初始化时用数据库结果补齐
+- 每个流维护一个水位线 floor：缓冲区保证包含该流所有 time >= floor 的消息
+- 查询范围完全位于水位线之上时直接由缓冲区返回，否则返回 None 由调用方回退到数据库
+"""
+
+import math
+from collections import OrderedDict, deque
+from typing import Any
+
+from src.common.logger import get_logger
+from src.config.config import global_config
+
+logger = get_logger("recent_message_buffer")
+
+# 每个聊天流缓存的最大消息数
+DEFAULT_STREAM_CAPACITY = 200
+# 最多同时缓存的聊天流数量（按最近使用淘汰）
+DEFAULT_MAX_STREAMS = 1000
+
+
+class _StreamBuffer:
+    """单个聊天流的有序消息缓冲区"""
+
+    __slots__ = ("capacity", "floor", "records")
+
+    def __init__(self, capacity: int, floor: float):
+        self.capacity = capacity
+        self.floor = floor  # 缓冲区包含所有 time >= floor 的消息
+        self.records: deque[dict[str, Any]] = deque()
+
+    def insert(self, record: dict[str, Any]) -> dict[str, Any] | None:
+        """按时间顺序插入消息，返回因容量限制被淘汰的最旧消息"""
+        msg_time = record.get("time") or 0.0
+        if not self.records or (self.records[-1].get("time") or 0.0) <= msg_time:
+            self.records.append(record)
+        else:
+            # 乱序到达的消息通常只比队尾早一点，从右向左查找插入位置
+            index = len(self.records)
+            while index > 0 and (self.records[index - 1].get("time") or 0.0) > msg_time:
+                index -= 1
+            self.records.insert(index, record)
+
+        if len(self.records) > self.capacity:
+            evicted = self.records.popleft()
+            # 被淘汰消息时间之后（不含）的消息仍然完整
+            self.floor = max(self.floor, math.nextafter(evicted.get("time") or 0.0, math.inf))
+            return evicted
+        return None
+
+
+class RecentMessageBuffer:
+    """按聊天流划分的近期消息缓冲区管理器"""
+
+    def __init__(self, stream_capacity: int = DEFAULT_STREAM_CAPACITY, max_streams: int = DEFAULT_MAX_STREAMS):
+        self.stream_capacity = stream_capacity
+        self.max_streams = max_streams
+        self._streams: OrderedDict[str, _StreamBuffer] = OrderedDict()
+        self._message_index: dict[str, str] = {}  # message_id -> chat_id
+        self._stats = {"hits": 0, "misses": 0}
+
+    # ===== 写入 =====
+
+    def add(self, record: dict[str, Any]) -> None:
+        """写入一条新存储的消息（Messages 行结构的字典）"""
+        chat_id = record.get("chat_id")
+        message_id = record.get("message_id")
+        if not chat_id or not message_id:
+            return
+
+        stream = self._streams.get(chat_id)
+        if stream is None:
+            # 新建的缓冲区只对本条消息及之后的消息负责
+            stream = self._create_stream(chat_id, floor=record.get("time") or 0.0)
+        else:
+            self._streams.move_to_end(chat_id)
+
+        if str(message_id) in self._message_index:
+            return
+        self._insert(chat_id, stream, record)
+
+    def seed(self, chat_id: str, records: list[dict[str, Any]], limit: int) -> None:
+        """使用数据库中"最近 limit 条"查询结果补齐缓冲区
+
+        Args:
+            chat_id: 聊天流ID
+            records: 按时间升序的数据库消息
+            limit: 查询时使用的条数上限，结果不足 limit 条说明已包含该流全部历史
+        """
+        if not chat_id:
+            return
+
+        if records and len(records) >= limit > 0:
+            seeded_floor = math.nextafter(records[0].get("time") or 0.0, math.inf)
+        else:
+            seeded_floor = -math.inf
+
+        stream = self._streams.get(chat_id)
+        if stream is None:
+            stream = self._create_stream(chat_id, floor=seeded_floor)
+        else:
+            self._streams.move_to_end(chat_id)
+            stream.floor = min(stream.floor, seeded_floor)
+
+        for record in records:
+            message_id = record.get("message_id")
+            if message_id and str(message_id) not in self._message_index:
+                self._insert(chat_id, stream, dict(record))
+
+    def update_fields(self, message_id: str, values: dict[str, Any]) -> None:
+        """同步对已缓存消息字段的更新"""
+        record = self._find(message_id)
+        if record is not None:
+            record.update(values)
+
+    def rename_message(self, old_message_id: str, new_message_id: str) -> None:
+        """同步消息ID的变更（内部ID -> 平台ID）"""
+        old_key = str(old_message_id)
+        chat_id = self._message_index.pop(old_key, None)
+        if chat_id is None:
+            return
+        record = self._find_in_stream(chat_id, old_key)
+        if record is not None:
+            record["message_id"] = new_message_id
+            self._message_index[str(new_message_id)] = chat_id
+
+    def remove(self, message_id: str) -> None:
+        """移除已缓存的消息"""
+        key = str(message_id)
+        chat_id = self._message_index.pop(key, None)
+        if chat_id is None:
+            return
+        stream = self._streams.get(chat_id)
+        if stream is None:
+            return
+        for record in stream.records:
+            if str(record.get("message_id")) == key:
+                stream.records.remove(record)
+                break
+
+    # ===== 查询 =====
+
+    def query(
+        self,
+        message_filter: dict[str, Any],
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0,
+        limit_mode: str = "latest",
+        filter_bot: bool = False,
+        filter_command: bool = False,
+        filter_meaningless: bool = False,
+    ) -> list[dict[str, Any]] | None:
+        """尝试用缓冲区响应 find_messages 风格的查询
+
+        Returns:
+            与数据库查询结果等价的消息列表；缓冲区无法保证结果完整时返回 None
+        """
+        chat_id = message_filter.get("chat_id")
+        if not isinstance(chat_id, str):
+            return None
+        stream = self._streams.get(chat_id)
+        if stream is None or not stream.records:
+            self._stats["misses"] += 1
+            return None
+
+        if sort and any(field_name != "time" or direction not in (1, -1) for field_name, direction in sort):
+            return None
+
+        conditions = {k: v for k, v in message_filter.items() if k != "chat_id"}
+        lower_bound = self._extract_lower_bound(conditions.get("time"))
+        if lower_bound is None:
+            return None
+
+        sample = stream.records[-1]
+        if any(key not in sample for key in conditions):
+            return None
+
+        bot_account = str(global_config.bot.qq_account) if global_config and filter_bot else None
+        matched = [
+            record
+            for record in stream.records
+            if self._match(record, conditions)
+            and not (bot_account is not None and str(record.get("user_id")) == bot_account)
+            and not (filter_command and record.get("is_command"))
+            and not (
+                filter_meaningless
+                and (
+                    record.get("is_emoji")
+                    or record.get("is_notify")
+                    or record.get("is_public_notice")
+                    or record.get("is_command")
+                )
+            )
+        ]
+
+        covered = lower_bound >= stream.floor
+        if limit > 0:
+            if limit_mode == "earliest":
+                if not covered:
+                    self._stats["misses"] += 1
+                    return None
+                matched = matched[:limit]
+            else:
+                # 最新的 limit 条只要都落在水位线之上，结果就是完整的
+                if not covered and len(matched) < limit:
+                    self._stats["misses"] += 1
+                    return None
+                matched = matched[-limit:]
+        else:
+            if not covered:
+                self._stats["misses"] += 1
+                return None
+            if sort and sort[0][1] == -1:
+                matched = matched[::-1]
+
+        self._stream_touch(chat_id)
+        self._stats["hits"] += 1
+        return [dict(record) for record in matched]
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取缓冲区统计信息"""
+        return {
+            "streams": len(self._streams),
+            "messages": len(self._message_index),
+            **self._stats,
+        }
+
+    # ===== 内部工具 =====
+
+    def _create_stream(self, chat_id: str, floor: float) -> _StreamBuffer:
+        stream = _StreamBuffer(self.stream_capacity, floor)
+        self._streams[chat_id] = stream
+        while len(self._streams) > self.max_streams:
+            evicted_chat_id, evicted_stream = self._streams.popitem(last=False)
+            for record in evicted_stream.records:
+                self._message_index.pop(str(record.get("message_id")), None)
+            logger.debug(f"近期消息缓冲区淘汰聊天流: {evicted_chat_id}")
+        return stream
+
+    def _stream_touch(self, chat_id: str) -> None:
+        if chat_id in self._streams:
+            self._streams.move_to_end(chat_id)
+
+    def _insert(self, chat_id: str, stream: _StreamBuffer, record: dict[str, Any]) -> None:
+        self._message_index[str(record.get("message_id"))] = chat_id
+        evicted = stream.insert(record)
+        if evicted is not None:
+            self._message_index.pop(str(evicted.get("message_id")), None)
+
+    def _find(self, message_id: str) -> dict[str, Any] | None:
+        chat_id = self._message_index.get(str(message_id))
+        if chat_id is None:
+            return None
+        return self._find_in_stream(chat_id, str(message_id))
+
+    def _find_in_stream(self, chat_id: str, message_id: str) -> dict[str, Any] | None:
+        stream = self._streams.get(chat_id)
+        if stream is None:
+            return None
+        # 更新通常针对最新的消息，从右向左查找
+        for record in reversed(stream.records):
+            if str(record.get("message_id")) == message_id:
+                return record
+        return None
+
+    @staticmethod
+    def _extract_lower_bound(time_condition: Any) -> float | None:
+        """提取时间条件的包含式下界，无法解析时返回 None"""
+        if time_condition is None:
+            return -math.inf
+        if not isinstance(time_condition, dict):
+            return None
+        lower = -math.inf
+        for op, value in time_condition.items():
+            if op == "$gt":
+                lower = max(lower, math.nextafter(value, math.inf))
+            elif op == "$gte":
+                lower = max(lower, value)
+            elif op not in ("$lt", "$lte"):
+                return None
+        return lower
+
+    @staticmethod
+    def _match(record: dict[str, Any], conditions: dict[str, Any]) -> bool:
+        """按 find_messages 的过滤语义匹配单条消息"""
+        for key, expected in conditions.items():
+            actual = record.get(key)
+            if isinstance(expected, dict):
+                for op, op_value in expected.items():
+                    if actual is None and op in ("$gt", "$lt", "$gte", "$lte"):
+                        return False
+                    if op == "$gt" and not actual > op_value:
+                        return False
+                    if op == "$lt" and not actual < op_value:
+                        return False
+                    if op == "$gte" and not actual >= op_value:
+                        return False
+                    if op == "$lte" and not actual <= op_value:
+                        return False
+                    if op == "$ne" and actual == op_value:
+                        return False
+                    if op == "$in" and actual not in op_value:
+                        return False
+                    if op == "$nin" and actual in op_value:
+                        return False
+            elif actual != expected:
+                return False
+        return True
+
+
+_recent_message_buffer: RecentMessageBuffer | None = None
+
+
+def get_recent_message_buffer() -> RecentMessageBuffer:
+    """获取近期消息缓冲区单例"""
+    global _recent_message_buffer
+    if _recent_message_buffer is None:
+        _recent_message_buffer = RecentMessageBuffer()
+    return _recent_message_buffer
@@ -20,6 +20,10 @@ class APIProvider(ValidatedConfigBase):
         default=10, ge=1, description="API调用的超时时长（超过这个时长，本次请求将被视为'请求超时'，单位：秒）"
     )
     retry_interval: int = Field(default=10, ge=0, description="重试间隔（如果API调用失败，重试的间隔时间，单位：秒）")
+    stream_include_usage: bool = Field(
+        default=True,
+        description="流式请求时是否要求服务商在末尾返回用量（OpenAI的stream_options），不支持该参数的服务商可关闭",
+    )
 
     @classmethod
     def validate_base_url(cls, v):
@@ -68,6 +72,9 @@ class ModelInfo(ValidatedConfigBase):
     api_provider: str = Field(..., min_length=1, description="API提供商（如OpenAI、Azure等）")
     price_in: float = Field(default=0.0, ge=0, description="每M token输入价格")
     price_out: float = Field(default=0.0, ge=0, description="每M token输出价格")
+    price_in_cached: float | None = Field(
+        default=None, ge=0, description="每M token命中提示词缓存的输入价格（未设置时按普通输入价格计费）"
+    )
     force_stream_mode: bool = Field(default=False, description="是否强制使用流式输出模式")
     extra_params: dict[str, Any] = Field(default_factory=dict, description="额外参数（用于API调用时的额外配置）")
     anti_truncation: bool = Field(default=False, alias="use_anti_truncation", description="是否启用反截断功能，防止模型输出被截断")
@@ -579,12 +579,16 @@ class ResponseSplitterConfig(ValidatedConfigBase):
     max_length: int = Field(default=256, description="最大长度")
     max_sentence_num: int = Field(default=3, description="最大句子数")
     enable_kaomoji_protection: bool = Field(default=False, description="启用颜文字保护")
+    enable_stream_output: bool = Field(default=False, description="流式输出：回复的第一段生成后立即发送，无需等待完整回复")
+    stream_min_segment_length: int = Field(default=6, ge=1, description="流式输出时单段的最小长度（字符）")
 
 
 class DebugConfig(ValidatedConfigBase):
     """调试配置类"""
 
     show_prompt: bool = Field(default=False, description="显示提示")
+    trace_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="消息延迟追踪采样率，0为关闭")
+    trace_buffer_size: int = Field(default=200, ge=1, description="保留的已完成消息追踪数量")
 
 
 class ExperimentalConfig(ValidatedConfigBase):
@@ -701,6 +705,12 @@ class WebSearchConfig(ValidatedConfigBase):
     serper_api_keys: list[str] = Field(default_factory=list, description="serper API 密钥列表")
     enabled_engines: list[str] = Field(default_factory=lambda: ["ddg"], description="启用的搜索引擎")
     search_strategy: Literal["fallback", "single", "parallel"] = Field(default="single", description="搜索策略")
+    parallel_latency_budget: float = Field(
+        default=3.0, ge=0.0, description="并行策略的延迟预算（秒），超时后已有结果即返回，0表示等待所有引擎"
+    )
+    parallel_min_results: int = Field(
+        default=0, ge=0, description="并行策略提前返回所需的去重结果数，0表示使用请求的结果数"
+    )
 
 
 class MaizoneContextGroup(ValidatedConfigBase):
@@ -765,6 +775,13 @@ class PluginHttpSystemConfig(ValidatedConfigBase):
     event_handler_max_concurrency: int = Field(
         default=20, ge=1, le=200, description="����ÿ���¼�ͬʱִ�е�������߸���0��ʾ����������"
     )
+    client_timeout: float = Field(default=30.0, ge=1.0, le=600.0, description="插件出站HTTP请求的默认总超时（秒）")
+    client_max_connections: int = Field(default=100, ge=1, description="插件共享HTTP连接池的最大连接数")
+    client_per_host_limit: int = Field(default=8, ge=1, description="对同一主机的最大并发请求数")
+    client_max_retries: int = Field(default=2, ge=0, le=10, description="幂等请求失败时的默认重试次数")
+    client_max_response_bytes: int = Field(
+        default=20 * 1024 * 1024, ge=0, description="响应体大小上限（字节），0表示不限制"
+    )
 
 
 class MasterPromptConfig(ValidatedConfigBase):
@@ -939,6 +956,12 @@ class KokoroFlowChatterProactiveConfig(ValidatedConfigBase):
         description="主动思考触发概率（0.0~1.0），用于避免过于频繁打扰"
     )
 
+    # 7. 并发上限：同时处理的会话数（等待检查与主动发起都会调用 LLM）
+    max_concurrent_sessions: int = Field(
+        default=3, ge=1, le=32,
+        description="同时处理的会话数上限，避免大量会话同时到期时并发调用LLM"
+    )
+
 
 class KokoroFlowChatterConfig(ValidatedConfigBase):
     """
@@ -1,6 +1,6 @@
 import asyncio
 import io
-from collections.abc import Callable, Coroutine
+from collections.abc import AsyncIterator, Callable, Coroutine
 from typing import Any
 
 import aiohttp
@@ -18,10 +18,13 @@ from ..exceptions import (
 from ..payload_content.message import Message, RoleType
 from ..payload_content.resp_format import RespFormat, RespFormatType
 from ..payload_content.tool_option import ToolCall, ToolOption, ToolParam
-from .base_client import APIResponse, BaseClient, UsageRecord, client_registry
+from .base_client import APIResponse, BaseClient, StreamChunk, UsageRecord, client_registry
 
 logger = get_logger("AioHTTP-Gemini客户端")
 
+# 关闭旧会话的后台任务，保持引用避免被垃圾回收
+_background_tasks: set[asyncio.Task] = set()
+
 
 # gemini_thinking参数(默认范围) - 旧版 thinking_budget
 # 不同模型的思考预算范围配置
@@ -245,23 +248,27 @@ class AiohttpGeminiStreamParser:
         self.tool_calls_buffer = []  # 用于存储工具调用信息
         self.usage_record = None  # 用于存储最终的使用情况统计
 
-    def parse_chunk(self, chunk_text: str):
+    def parse_chunk(self, chunk_text: str) -> str:
         """
         解析单个流式数据块（通常是一行 SSE 数据）。
 
         Args:
             chunk_text: 从流式响应中接收到的原始文本数据块。
+
+        Returns:
+            本数据块新增的文本内容（没有新增内容时为空字符串）。
         """
+        text_delta = ""
         try:
             if not chunk_text.strip():
-                return
+                return ""
 
             # 移除data:前缀
             if chunk_text.startswith("data: "):
                 chunk_text = chunk_text[6:].strip()
 
             if chunk_text == "[DONE]":
-                return
+                return ""
 
             chunk_data = orjson.loads(chunk_text)
 
@@ -274,6 +281,7 @@ class AiohttpGeminiStreamParser:
                     for part in candidate["content"]["parts"]:
                         if "text" in part:
                             self.content_buffer.write(part["text"])
+                            text_delta += part["text"]
 
                 # 解析工具调用
                 if "functionCall" in candidate:
@@ -290,12 +298,14 @@ class AiohttpGeminiStreamParser:
                     usage.get("promptTokenCount", 0),
                     usage.get("candidatesTokenCount", 0),
                     usage.get("totalTokenCount", 0),
+                    usage.get("cachedContentTokenCount", 0),
                 )
 
         except orjson.JSONDecodeError as e:
             logger.warning(f"解析流式数据块失败: {e}, 数据: {chunk_text}")
         except Exception as e:
             logger.error(f"处理流式数据块时出错: {e}")
+        return text_delta
 
     def get_response(self) -> APIResponse:
         """
@@ -330,7 +340,7 @@ class AiohttpGeminiStreamParser:
 async def _default_stream_response_handler(
     response: aiohttp.ClientResponse,
     interrupt_flag: asyncio.Event | None,
-) -> tuple[APIResponse, tuple[int, int, int] | None]:
+) -> tuple[APIResponse, tuple[int, ...] | None]:
     """
     默认的流式响应处理器。
 
@@ -370,7 +380,7 @@ async def _default_stream_response_handler(
 
 def _default_normal_response_parser(
     response_data: dict,
-) -> tuple[APIResponse, tuple[int, int, int] | None]:
+) -> tuple[APIResponse, tuple[int, ...] | None]:
     """
     默认的非流式（普通）响应解析器。
 
@@ -414,6 +424,7 @@ def _default_normal_response_parser(
                 usage.get("promptTokenCount", 0),
                 usage.get("candidatesTokenCount", 0),
                 usage.get("totalTokenCount", 0),
+                usage.get("cachedContentTokenCount", 0),
             )
 
         api_response.raw_data = response_data
@@ -429,10 +440,12 @@ class AiohttpGeminiClient(BaseClient):
     一个使用 aiohttp 库与 Google Gemini API 进行异步通信的客户端。
 
     该客户端实现了 BaseClient 接口，提供了获取对话响应、处理流式数据、
-    管理 API key 和端点等功能。它被设计为无状态的，每次请求都创建一个
-    新的 aiohttp.ClientSession，以增强健壮性。
+    管理 API key 和端点等功能。同一事件循环内的请求复用一个 aiohttp.ClientSession，
+    以便复用 TCP/TLS 连接；事件循环变化或会话被关闭时会自动重建。
     """
 
+    supports_streaming = True
+
     def __init__(self, api_provider: APIProvider):
         """
         初始化 AiohttpGeminiClient。
@@ -442,7 +455,8 @@ class AiohttpGeminiClient(BaseClient):
         """
         super().__init__(api_provider)
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
-        self.session: aiohttp.ClientSession | None = None  # 注意：此 session 不再被全局使用
+        self.session: aiohttp.ClientSession | None = None
+        self._session_loop: asyncio.AbstractEventLoop | None = None
 
         # 如果 API provider 中提供了自定义的 base_url，则覆盖默认值
         if api_provider.base_url:
@@ -483,7 +497,43 @@ class AiohttpGeminiClient(BaseClient):
         logger.warning(f"模型 {model_id} 未在 THINKING_BUDGET_LIMITS 中定义，将使用动态模式 tb=-1 兼容。")
         return tb
 
-    # 移除全局 session，全部请求都用 with aiohttp.ClientSession() as session:
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        获取当前事件循环的共享会话，不存在、已关闭或事件循环变化时重新创建。
+        """
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self._session_loop is not loop:
+            if self.session is not None and not self.session.closed:
+                self._close_stale_session(self.session, self._session_loop)
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=300),
+                headers={
+                    "Content-Type": "application/json",
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/81.0.4044.113 Safari/537.36",
+                },
+                connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=30),
+            )
+            self._session_loop = loop
+        return self.session
+
+    @staticmethod
+    def _close_stale_session(session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop | None) -> None:
+        """
+        关闭属于旧事件循环的会话：旧循环仍在运行时交给它关闭，否则在当前事件循环中关闭。
+        """
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+
+        async def _close():
+            try:
+                await session.close()
+            except Exception as e:
+                logger.debug(f"关闭旧事件循环的会话时出错: {e}")
+
+        task = asyncio.create_task(_close())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
 
     async def _make_request(
         self, method: str, endpoint: str, data: dict | None = None, stream: bool = False
@@ -494,7 +544,7 @@ class AiohttpGeminiClient(BaseClient):
         此方法封装了 aiohttp 的请求逻辑，包括 URL 构建、认证、超时和错误处理。
         - 对于网络连接相关的 `aiohttp.ClientError`，它会最多重试3次。
         - 对于 HTTP 状态码错误（如 4xx, 5xx），它会立即失败，不会重试。
-        为了健壮性，它在每次调用时都会创建一个新的 aiohttp.ClientSession。
+        请求通过共享会话发出，返回的响应由调用方负责读取完毕或释放。
 
         Args:
             method: HTTP 请求方法 (例如, "POST")。
@@ -511,33 +561,30 @@ class AiohttpGeminiClient(BaseClient):
         """
         api_key = self.api_provider.get_api_key()
         url = f"{self.base_url}/{endpoint}?key={api_key}"
+        if stream:
+            # 不指定 alt=sse 时流式端点返回分段的 JSON 数组，无法逐行解析
+            url += "&alt=sse"
 
         max_retries = 3
         last_exception = None
 
         for attempt in range(max_retries):
             try:
-                async with aiohttp.ClientSession(
-                    timeout=aiohttp.ClientTimeout(total=300),
-                    headers={
-                        "Content-Type": "application/json",
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/81.0.4044.113 Safari/537.36",
-                    },
-                ) as session:
-                    if method.upper() == "POST":
-                        response = await session.post(
-                            url, json=data, headers={"Accept": "text/event-stream" if stream else "application/json"}
-                        )
-                    else:
-                        response = await session.get(url)
-
-                    # 检查HTTP状态码 - 如果是错误，立即失败，不重试
-                    if response.status >= 400:
-                        error_text = await response.text()
-                        raise RespNotOkException(response.status, error_text)
-
-                    # 成功，返回响应
-                    return response
+                session = self._get_session()
+                if method.upper() == "POST":
+                    response = await session.post(
+                        url, json=data, headers={"Accept": "text/event-stream" if stream else "application/json"}
+                    )
+                else:
+                    response = await session.get(url)
+
+                # 检查HTTP状态码 - 如果是错误，立即失败，不重试
+                if response.status >= 400:
+                    error_text = await response.text()
+                    raise RespNotOkException(response.status, error_text)
+
+                # 成功，返回响应
+                return response
 
             except aiohttp.ClientError as e:
                 last_exception = e
@@ -546,55 +593,19 @@ class AiohttpGeminiClient(BaseClient):
         # 如果所有重试都失败了
         raise NetworkConnectionError() from last_exception
 
-    async def get_response(
+    def _build_request_data(
         self,
         model_info: ModelInfo,
         message_list: list[Message],
-        tool_options: list[ToolOption] | None = None,
-        max_tokens: int = 1024,
-        temperature: float = 0.7,
-        response_format: RespFormat | None = None,
-        stream_response_handler: Callable[
-            [aiohttp.ClientResponse, asyncio.Event | None],
-            Coroutine[Any, Any, tuple[APIResponse, tuple[int, int, int] | None]],
-        ]
-        | None = None,
-        async_response_parser: Callable[[dict], tuple[APIResponse, tuple[int, int, int] | None]] | None = None,
-        interrupt_flag: asyncio.Event | None = None,
-        extra_params: dict[str, Any] | None = None,
-    ) -> APIResponse:
+        tool_options: list[ToolOption] | None,
+        max_tokens: int,
+        temperature: float,
+        response_format: RespFormat | None,
+        extra_params: dict[str, Any] | None,
+    ) -> dict[str, Any]:
         """
-        获取一个完整的对话响应，支持流式和非流式模式。
-
-        这是客户端的核心方法，它负责：
-        1. 转换输入消息和工具选项。
-        2. 构建请求体，包括生成配置。
-        3. 根据模型信息决定是使用流式还是非流式端点。
-        4. 发起请求并处理中断。
-        5. 使用适当的处理器/解析器处理响应。
-        6. 格式化最终的 APIResponse 对象，包括使用情况统计。
-
-        Args:
-            model_info: 包含模型标识符和配置的模型信息。
-            message_list: 对话消息列表。
-            tool_options: 可用的工具选项列表。
-            max_tokens: 最大生成 token 数。
-            temperature: 生成温度。
-            response_format: 响应格式。
-            stream_response_handler: 用于处理流式响应的可调用对象。
-            async_response_parser: 用于解析非流式响应的可调用对象。
-            interrupt_flag: 用于中断请求的 asyncio.Event。
-            extra_params: 包含额外参数的字典，例如 'thinking_budget'。
-
-        Returns:
-            一个包含模型响应的 APIResponse 对象。
+        构建 generateContent / streamGenerateContent 共用的请求体。
         """
-        if stream_response_handler is None:
-            stream_response_handler = _default_stream_response_handler
-
-        if async_response_parser is None:
-            async_response_parser = _default_normal_response_parser
-
         # 转换消息格式
         contents, system_instructions = _convert_messages(message_list)
 
@@ -641,6 +652,61 @@ class AiohttpGeminiClient(BaseClient):
         if tool_options:
             request_data["tools"] = _convert_tool_options(tool_options)
 
+        return request_data
+
+    async def get_response(
+        self,
+        model_info: ModelInfo,
+        message_list: list[Message],
+        tool_options: list[ToolOption] | None = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        response_format: RespFormat | None = None,
+        stream_response_handler: Callable[
+            [aiohttp.ClientResponse, asyncio.Event | None],
+            Coroutine[Any, Any, tuple[APIResponse, tuple[int, ...] | None]],
+        ]
+        | None = None,
+        async_response_parser: Callable[[dict], tuple[APIResponse, tuple[int, ...] | None]] | None = None,
+        interrupt_flag: asyncio.Event | None = None,
+        extra_params: dict[str, Any] | None = None,
+    ) -> APIResponse:
+        """
+        获取一个完整的对话响应，支持流式和非流式模式。
+
+        这是客户端的核心方法，它负责：
+        1. 转换输入消息和工具选项。
+        2. 构建请求体，包括生成配置。
+        3. 根据模型信息决定是使用流式还是非流式端点。
+        4. 发起请求并处理中断。
+        5. 使用适当的处理器/解析器处理响应。
+        6. 格式化最终的 APIResponse 对象，包括使用情况统计。
+
+        Args:
+            model_info: 包含模型标识符和配置的模型信息。
+            message_list: 对话消息列表。
+            tool_options: 可用的工具选项列表。
+            max_tokens: 最大生成 token 数。
+            temperature: 生成温度。
+            response_format: 响应格式。
+            stream_response_handler: 用于处理流式响应的可调用对象。
+            async_response_parser: 用于解析非流式响应的可调用对象。
+            interrupt_flag: 用于中断请求的 asyncio.Event。
+            extra_params: 包含额外参数的字典，例如 'thinking_budget'。
+
+        Returns:
+            一个包含模型响应的 APIResponse 对象。
+        """
+        if stream_response_handler is None:
+            stream_response_handler = _default_stream_response_handler
+
+        if async_response_parser is None:
+            async_response_parser = _default_normal_response_parser
+
+        request_data = self._build_request_data(
+            model_info, message_list, tool_options, max_tokens, temperature, response_format, extra_params
+        )
+
         try:
             if model_info.force_stream_mode:
                 # 流式请求
@@ -681,16 +747,63 @@ class AiohttpGeminiClient(BaseClient):
 
         # 设置使用统计
         if usage_record:
-            api_response.usage = UsageRecord(
-                model_name=model_info.name,
-                provider_name=model_info.api_provider,
-                prompt_tokens=usage_record[0],
-                completion_tokens=usage_record[1],
-                total_tokens=usage_record[2],
-            )
+            api_response.usage = UsageRecord.from_counts(model_info, usage_record)
 
         return api_response
 
+    async def get_response_stream(
+        self,
+        model_info: ModelInfo,
+        message_list: list[Message],
+        tool_options: list[ToolOption] | None = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        interrupt_flag: asyncio.Event | None = None,
+        extra_params: dict[str, Any] | None = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        以流式方式获取对话响应，每解析出新的文本就产出一个增量块。
+
+        Args:
+            model_info: 包含模型标识符和配置的模型信息。
+            message_list: 对话消息列表。
+            tool_options: 可用的工具选项列表。
+            max_tokens: 最大生成 token 数。
+            temperature: 生成温度。
+            interrupt_flag: 用于中断请求的 asyncio.Event。
+            extra_params: 包含额外参数的字典，例如 'thinking_budget'。
+
+        Yields:
+            StreamChunk: 内容增量块，最后一个块携带完整的 APIResponse。
+        """
+        request_data = self._build_request_data(
+            model_info, message_list, tool_options, max_tokens, temperature, None, extra_params
+        )
+        endpoint = f"models/{model_info.model_identifier}:streamGenerateContent"
+        parser = AiohttpGeminiStreamParser()
+
+        response = await self._make_request("POST", endpoint, request_data, stream=True)
+        try:
+            async for line in response.content:
+                if interrupt_flag and interrupt_flag.is_set():
+                    raise ReqAbortException("请求被外部信号中断")
+
+                line_text = line.decode("utf-8").strip()
+                if line_text and (text_delta := parser.parse_chunk(line_text)):
+                    yield StreamChunk(content=text_delta)
+        except ReqAbortException:
+            raise
+        except aiohttp.ClientError as e:
+            raise NetworkConnectionError() from e
+        finally:
+            # 提前结束时归还连接
+            response.release()
+
+        api_response = parser.get_response()
+        if parser.usage_record:
+            api_response.usage = UsageRecord.from_counts(model_info, parser.usage_record)
+        yield StreamChunk(response=api_response)
+
     async def get_embedding(
         self,
         model_info: ModelInfo,
@@ -761,13 +874,7 @@ class AiohttpGeminiClient(BaseClient):
             api_response, usage_record = _default_normal_response_parser(response_data)
 
             if usage_record:
-                api_response.usage = UsageRecord(
-                    model_name=model_info.name,
-                    provider_name=model_info.api_provider,
-                    prompt_tokens=usage_record[0],
-                    completion_tokens=usage_record[1],
-                    total_tokens=usage_record[2],
-                )
+                api_response.usage = UsageRecord.from_counts(model_info, usage_record)
 
             return api_response
 
@@ -782,4 +889,9 @@ class AiohttpGeminiClient(BaseClient):
         """
         return ["png", "jpg", "jpeg", "webp", "heic", "heif"]
 
-    # 移除 __aenter__、__aexit__、__del__，不再持有全局 session
+    async def close(self) -> None:
+        """关闭共享会话"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        self._session_loop = None
@@ -1,6 +1,6 @@
 import asyncio
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass
 from typing import Any
 
@@ -35,6 +35,53 @@ class UsageRecord:
     total_tokens: int = 0
     """总token数"""
 
+    cached_tokens: int = 0
+    """命中服务端提示词缓存的token数（包含在prompt_tokens中）"""
+
+    @classmethod
+    def from_counts(cls, model_info: ModelInfo, counts: tuple[int, ...]) -> "UsageRecord":
+        """
+        由响应解析器返回的计数元组构建使用记录
+
+        Args:
+            model_info: 模型信息
+            counts: (提示token数, 完成token数, 总token数[, 缓存命中token数])，兼容不含缓存计数的三元组
+        """
+        return cls(
+            model_name=model_info.name,
+            provider_name=model_info.api_provider,
+            prompt_tokens=counts[0],
+            completion_tokens=counts[1],
+            total_tokens=counts[2],
+            cached_tokens=counts[3] if len(counts) > 3 else 0,
+        )
+
+    @classmethod
+    def estimate(cls, model_info: ModelInfo, prompt: str, completion: str) -> "UsageRecord":
+        """
+        服务商未返回用量时，按文本长度粗略估算使用记录
+
+        Args:
+            model_info: 模型信息
+            prompt: 提示词文本
+            completion: 生成的文本（含推理内容）
+        """
+        prompt_tokens = _estimate_tokens(prompt)
+        completion_tokens = _estimate_tokens(completion)
+        return cls(
+            model_name=model_info.name,
+            provider_name=model_info.api_provider,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+
+
+def _estimate_tokens(text: str) -> int:
+    """粗略估算token数：中日韩字符约1个token，其余字符约4个字符1个token"""
+    cjk = sum(1 for ch in text if "\u2e80" <= ch <= "\u9fff" or "\uac00" <= ch <= "\ud7af")
+    return cjk + (len(text) - cjk + 3) // 4
+
 
 @dataclass
 class APIResponse:
@@ -61,6 +108,29 @@ class APIResponse:
     """响应原始数据"""
 
 
+@dataclass
+class StreamChunk:
+    """
+    流式响应块
+    """
+
+    content: str = ""
+    """本次新增的正式内容"""
+
+    reasoning_content: str = ""
+    """本次新增的推理内容"""
+
+    response: APIResponse | None = None
+    """完整响应（仅在最后一个块中给出，包含完整内容、工具调用与使用情况）"""
+
+    model_name: str = ""
+    """产生该响应的模型名称（由 LLMRequest 在最后一个块中填写）"""
+
+    @property
+    def is_final(self) -> bool:
+        return self.response is not None
+
+
 class BaseClient(ABC):
     """
     基础客户端
@@ -68,6 +138,9 @@ class BaseClient(ABC):
 
     api_provider: APIProvider
 
+    supports_streaming: bool = False
+    """是否原生支持流式输出（不支持时 get_response_stream 退化为一次性返回）"""
+
     def __init__(self, api_provider: APIProvider):
         self.api_provider = api_provider
 
@@ -80,9 +153,9 @@ class BaseClient(ABC):
         max_tokens: int = 1024,
         temperature: float = 0.7,
         response_format: RespFormat | None = None,
-        stream_response_handler: Callable[[Any, asyncio.Event | None], tuple[APIResponse, tuple[int, int, int]]]
+        stream_response_handler: Callable[[Any, asyncio.Event | None], tuple[APIResponse, tuple[int, ...]]]
         | None = None,
-        async_response_parser: Callable[[Any], tuple[APIResponse, tuple[int, int, int]]] | None = None,
+        async_response_parser: Callable[[Any], tuple[APIResponse, tuple[int, ...]]] | None = None,
         interrupt_flag: asyncio.Event | None = None,
         extra_params: dict[str, Any] | None = None,
     ) -> APIResponse:
@@ -101,6 +174,39 @@ class BaseClient(ABC):
         """
         raise NotImplementedError("'get_response' method should be overridden in subclasses")
 
+    async def get_response_stream(
+        self,
+        model_info: ModelInfo,
+        message_list: list[Message],
+        tool_options: list[ToolOption] | None = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        interrupt_flag: asyncio.Event | None = None,
+        extra_params: dict[str, Any] | None = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        以流式方式获取对话响应
+        默认实现退化为非流式请求，在最后一个块中一次性返回全部内容；原生支持流式的客户端应覆盖此方法
+        :param model_info: 模型信息
+        :param message_list: 对话体
+        :param tool_options: 工具选项（可选，默认为None）
+        :param max_tokens: 最大token数（可选，默认为1024）
+        :param temperature: 温度（可选，默认为0.7）
+        :param interrupt_flag: 中断信号量（可选，默认为None）
+        :param extra_params: 附加的请求参数
+        :return: 流式响应块的异步迭代器，最后一个块携带完整的 APIResponse
+        """
+        resp = await self.get_response(
+            model_info=model_info,
+            message_list=message_list,
+            tool_options=tool_options,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            interrupt_flag=interrupt_flag,
+            extra_params=extra_params,
+        )
+        yield StreamChunk(content=resp.content or "", reasoning_content=resp.reasoning_content or "", response=resp)
+
     @abstractmethod
     async def get_embedding(
         self,
@@ -253,5 +359,19 @@ class ClientRegistry:
             "cached_providers": list(self.client_instance_cache.keys()),
         }
 
+    async def close_all(self) -> None:
+        """关闭所有缓存的客户端实例（持有共享会话的客户端需实现 close 方法）"""
+        instances = list(self.client_instance_cache.items())
+        self.client_instance_cache.clear()
+        self._event_loop_cache.clear()
+        for provider_name, client in instances:
+            close = getattr(client, "close", None)
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception as e:
+                logger.warning(f"关闭 {provider_name} 的客户端时出错: {e}")
+
 
 client_registry = ClientRegistry()
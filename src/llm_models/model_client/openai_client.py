@@ -2,7 +2,7 @@ import asyncio
 import base64
 import io
 import re
-from collections.abc import Callable, Coroutine, Iterable
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterable
 from typing import Any, ClassVar
 
 import orjson
@@ -34,7 +34,7 @@ from ..exceptions import (
 from ..payload_content.message import Message, RoleType
 from ..payload_content.resp_format import RespFormat
 from ..payload_content.tool_option import ToolCall, ToolOption, ToolParam
-from .base_client import APIResponse, BaseClient, UsageRecord, client_registry
+from .base_client import APIResponse, BaseClient, StreamChunk, UsageRecord, client_registry
 
 logger = get_logger("OpenAI客户端")
 
@@ -242,7 +242,7 @@ def _build_stream_api_resp(
 async def _default_stream_response_handler(
     resp_stream: AsyncStream[ChatCompletionChunk],
     interrupt_flag: asyncio.Event | None,
-) -> tuple[APIResponse, tuple[int, int, int] | None]:
+) -> tuple[APIResponse, tuple[int, ...] | None]:
     """
     流式响应处理函数 - 处理OpenAI API的流式响应
     :param resp_stream: 流式响应对象
@@ -289,11 +289,7 @@ async def _default_stream_response_handler(
 
         if event.usage:
             # 如果有使用情况，则将其存储在APIResponse对象中
-            _usage_record = (
-                getattr(event.usage, "prompt_tokens", 0) or 0,
-                getattr(event.usage, "completion_tokens", 0) or 0,
-                getattr(event.usage, "total_tokens", 0) or 0,
-            )
+            _usage_record = _extract_usage(event.usage)
 
     try:
         return _build_stream_api_resp(
@@ -307,6 +303,33 @@ async def _default_stream_response_handler(
         raise
 
 
+def _extract_usage(usage: Any) -> tuple[int, int, int, int]:
+    """
+    从OpenAI兼容的usage对象中提取 (提示token数, 完成token数, 总token数, 缓存命中token数)
+
+    缓存命中数优先读取 OpenAI 的 prompt_tokens_details.cached_tokens，
+    其次兼容 DeepSeek 等服务商的 prompt_cache_hit_tokens 字段
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) if details else None
+    if cached_tokens is None:
+        cached_tokens = getattr(usage, "prompt_cache_hit_tokens", None)
+    return (
+        getattr(usage, "prompt_tokens", 0) or 0,
+        getattr(usage, "completion_tokens", 0) or 0,
+        getattr(usage, "total_tokens", 0) or 0,
+        cached_tokens or 0,
+    )
+
+
+def _read_since(buffer: io.StringIO, position: int) -> str:
+    """读取缓冲区中从 position 开始新写入的内容（读取后指针回到末尾）"""
+    if buffer.tell() <= position:
+        return ""
+    buffer.seek(position)
+    return buffer.read()
+
+
 pattern = re.compile(
     r"<think>(?P<think>.*?)</think>(?P<content>.*)|<think>(?P<think_unclosed>.*)|(?P<content_only>.+)",
     re.DOTALL,
@@ -316,7 +339,7 @@ pattern = re.compile(
 
 def _default_normal_response_parser(
     resp: ChatCompletion,
-) -> tuple[APIResponse, tuple[int, int, int] | None]:
+) -> tuple[APIResponse, tuple[int, ...] | None]:
     """
     解析对话补全响应 - 将OpenAI API响应解析为APIResponse对象
     :param resp: 响应对象
@@ -359,11 +382,7 @@ def _default_normal_response_parser(
 
     # 提取Usage信息
     if resp.usage:
-        _usage_record = (
-            getattr(resp.usage, "prompt_tokens", 0) or 0,
-            getattr(resp.usage, "completion_tokens", 0) or 0,
-            getattr(resp.usage, "total_tokens", 0) or 0,
-        )
+        _usage_record = _extract_usage(resp.usage)
     else:
         _usage_record = None
 
@@ -375,6 +394,8 @@ def _default_normal_response_parser(
 
 @client_registry.register_client_class("openai")
 class OpenaiClient(BaseClient):
+    supports_streaming = True
+
     # 类级别的全局缓存：所有 OpenaiClient 实例共享
     _global_client_cache: ClassVar[dict[tuple[int, int | None], AsyncOpenAI]] = {}
     """全局 AsyncOpenAI 客户端缓存：(config_hash, loop_id) -> AsyncOpenAI 实例"""
@@ -477,10 +498,10 @@ class OpenaiClient(BaseClient):
         response_format: RespFormat | None = None,
         stream_response_handler: Callable[
             [AsyncStream[ChatCompletionChunk], asyncio.Event | None],
-            Coroutine[Any, Any, tuple[APIResponse, tuple[int, int, int] | None]],
+            Coroutine[Any, Any, tuple[APIResponse, tuple[int, ...] | None]],
         ]
         | None = None,
-        async_response_parser: Callable[[ChatCompletion], tuple[APIResponse, tuple[int, int, int] | None]]
+        async_response_parser: Callable[[ChatCompletion], tuple[APIResponse, tuple[int, ...] | None]]
         | None = None,
         interrupt_flag: asyncio.Event | None = None,
         extra_params: dict[str, Any] | None = None,
@@ -567,16 +588,103 @@ class OpenaiClient(BaseClient):
             raise RespNotOkException(e.status_code, e.message) from e
 
         if usage_record:
-            resp.usage = UsageRecord(
-                model_name=model_info.name,
-                provider_name=model_info.api_provider,
-                prompt_tokens=usage_record[0],
-                completion_tokens=usage_record[1],
-                total_tokens=usage_record[2],
-            )
+            resp.usage = UsageRecord.from_counts(model_info, usage_record)
 
         return resp
 
+    async def get_response_stream(
+        self,
+        model_info: ModelInfo,
+        message_list: list[Message],
+        tool_options: list[ToolOption] | None = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        interrupt_flag: asyncio.Event | None = None,
+        extra_params: dict[str, Any] | None = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        以流式方式获取对话响应，每收到新的内容就产出一个增量块
+        Args:
+            model_info: 模型信息
+            message_list: 对话体
+            tool_options: 工具选项（可选，默认为None）
+            max_tokens: 最大token数（可选，默认为1024）
+            temperature: 温度（可选，默认为0.7）
+            interrupt_flag: 中断信号量（可选，默认为None）
+            extra_params: 附加的请求参数
+        Returns:
+            流式响应块的异步迭代器，最后一个块携带完整的 APIResponse
+        """
+        messages: Iterable[ChatCompletionMessageParam] = _convert_messages(message_list)
+        tools: Iterable[ChatCompletionToolParam] = _convert_tool_options(tool_options) if tool_options else NOT_GIVEN  # type: ignore
+
+        has_rc_attr_flag = False  # 标记是否有独立的推理内容块
+        in_rc_flag = False  # 标记是否在推理内容块中
+        rc_delta_buffer = io.StringIO()
+        fc_delta_buffer = io.StringIO()
+        tool_calls_buffer: list[tuple[str, str, io.StringIO]] = []
+        usage_record = None
+        resp_stream: AsyncStream[ChatCompletionChunk] | None = None
+
+        client = self._create_client()
+        try:
+            resp_stream = await client.chat.completions.create(
+                model=model_info.model_identifier,
+                messages=messages,
+                tools=tools,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                # 官方接口默认不在流中返回用量，需显式请求
+                stream_options={"include_usage": True} if self.api_provider.stream_include_usage else NOT_GIVEN,
+                response_format=NOT_GIVEN,
+                extra_body=extra_params,
+            )
+            async for event in resp_stream:
+                if interrupt_flag and interrupt_flag.is_set():
+                    raise ReqAbortException("请求被外部信号中断")
+
+                if event.usage:
+                    usage_record = _extract_usage(event.usage)
+                if not event.choices:
+                    # 部分服务商会在末尾单独发送只含usage的块
+                    continue
+
+                delta = event.choices[0].delta
+                if hasattr(delta, "reasoning_content") and delta.reasoning_content:  # type: ignore
+                    has_rc_attr_flag = True
+
+                fc_position, rc_position = fc_delta_buffer.tell(), rc_delta_buffer.tell()
+                in_rc_flag = _process_delta(
+                    delta,
+                    has_rc_attr_flag,
+                    in_rc_flag,
+                    rc_delta_buffer,
+                    fc_delta_buffer,
+                    tool_calls_buffer,
+                )
+                content_delta = _read_since(fc_delta_buffer, fc_position)
+                reasoning_delta = _read_since(rc_delta_buffer, rc_position)
+                if content_delta or reasoning_delta:
+                    yield StreamChunk(content=content_delta, reasoning_content=reasoning_delta)
+
+            resp = _build_stream_api_resp(fc_delta_buffer, rc_delta_buffer, tool_calls_buffer)
+        except APIConnectionError as e:
+            raise NetworkConnectionError() from e
+        except APIStatusError as e:
+            raise RespNotOkException(e.status_code, e.message) from e
+        finally:
+            if resp_stream is not None:
+                # 提前结束（中断、异常或调用方停止迭代）时释放连接
+                await resp_stream.close()
+            for buffer in (rc_delta_buffer, fc_delta_buffer, *(item[2] for item in tool_calls_buffer)):
+                if not buffer.closed:
+                    buffer.close()
+
+        if usage_record:
+            resp.usage = UsageRecord.from_counts(model_info, usage_record)
+        yield StreamChunk(response=resp)
+
     async def get_embedding(
         self,
         model_info: ModelInfo,
@@ -4,8 +4,8 @@ from datetime import datetime
 
 from PIL import Image
 
-from src.common.database.core import get_db_session
 from src.common.database.core.models import LLMUsage
+from src.common.database.optimization.write_queue import execute_write
 from src.common.logger import get_logger
 from src.config.api_ada_configs import ModelInfo
 
@@ -156,37 +156,44 @@ class LLMUsageRecorder:
         endpoint: str,
         time_cost: float = 0.0,
     ):
-        input_cost = (model_usage.prompt_tokens / 1000000) * model_info.price_in
+        # 命中提示词缓存的部分按缓存价格计费（未配置缓存价格时按普通输入价格）
+        cached_tokens = min(model_usage.cached_tokens or 0, model_usage.prompt_tokens or 0)
+        price_in_cached = model_info.price_in if model_info.price_in_cached is None else model_info.price_in_cached
+        input_cost = (
+            (model_usage.prompt_tokens - cached_tokens) / 1000000 * model_info.price_in
+            + cached_tokens / 1000000 * price_in_cached
+        )
         output_cost = (model_usage.completion_tokens / 1000000) * model_info.price_out
         total_cost = round(input_cost + output_cost, 6)
 
-        session = None
         try:
-            # 使用 SQLAlchemy 会话创建记录
-            async with get_db_session() as session:
-                usage_record = LLMUsage(
-                    model_name=model_info.model_identifier,
-                    model_assign_name=model_info.name,
-                    model_api_provider=model_info.api_provider,
-                    user_id=user_id,
-                    request_type=request_type,
-                    endpoint=endpoint,
-                    prompt_tokens=model_usage.prompt_tokens or 0,
-                    completion_tokens=model_usage.completion_tokens or 0,
-                    total_tokens=model_usage.total_tokens or 0,
-                    cost=total_cost,
-                    time_cost=round(time_cost or 0.0, 3),
-                    status="success",
-                    timestamp=datetime.now(),  # SQLAlchemy 会处理 DateTime 字段
-                )
+            usage_record = LLMUsage(
+                model_name=model_info.model_identifier,
+                model_assign_name=model_info.name,
+                model_api_provider=model_info.api_provider,
+                user_id=user_id,
+                request_type=request_type,
+                endpoint=endpoint,
+                prompt_tokens=model_usage.prompt_tokens or 0,
+                cached_tokens=cached_tokens,
+                completion_tokens=model_usage.completion_tokens or 0,
+                total_tokens=model_usage.total_tokens or 0,
+                cost=total_cost,
+                time_cost=round(time_cost or 0.0, 3),
+                status="success",
+                timestamp=datetime.now(),  # SQLAlchemy 会处理 DateTime 字段
+            )
 
+            async def _add_usage(session):
                 session.add(usage_record)
-                await session.commit()
+
+            # 经由写入队列与其他写入合并提交
+            await execute_write(_add_usage, name="llm_usage")
 
             logger.debug(
                 f"Token使用情况 - 模型: {model_usage.model_name}, "
                 f"用户: {user_id}, 类型: {request_type}, "
-                f"提示词: {model_usage.prompt_tokens}, 完成: {model_usage.completion_tokens}, "
+                f"提示词: {model_usage.prompt_tokens} (缓存命中: {cached_tokens}), 完成: {model_usage.completion_tokens}, "
                 f"总计: {model_usage.total_tokens}"
             )
         except Exception as e:
@@ -24,7 +24,7 @@ import re
 import string
 import time
 from collections import namedtuple
-from collections.abc import Callable, Coroutine
+from collections.abc import AsyncIterator, Callable, Coroutine
 from enum import Enum
 from typing import Any, ClassVar, Literal
 
@@ -35,7 +35,7 @@ from src.config.api_ada_configs import APIProvider, ModelInfo, TaskConfig
 from src.config.config import model_config
 
 from .exceptions import NetworkConnectionError, ReqAbortException, RespNotOkException, RespParseException
-from .model_client.base_client import APIResponse, BaseClient, UsageRecord, client_registry
+from .model_client.base_client import APIResponse, BaseClient, StreamChunk, UsageRecord, client_registry
 from .payload_content.message import Message, MessageBuilder
 from .payload_content.tool_option import ToolCall, ToolOption, ToolOptionBuilder
 from .utils import compress_messages, llm_usage_recorder
@@ -49,6 +49,29 @@ logger = get_logger("model_utils")
 # ==============================================================================
 
 
+# 提示词静态前缀与动态后缀的分界标记。
+# 模板把人设、规则、输出格式等不随消息变化的内容放在标记之前，时间、聊天记录等易变内容放在之后，
+# 使同一模板的多次请求共享完全相同的前缀，从而命中服务端的提示词缓存。标记会在发送前被移除。
+PROMPT_CACHE_BOUNDARY = "<<PROMPT_CACHE_BOUNDARY>>"
+
+
+def split_prompt_sections(prompt: str) -> tuple[str, str]:
+    """
+    按分界标记把提示词拆分为静态前缀与动态后缀
+
+    Args:
+        prompt (str): 完整提示词
+
+    Returns:
+        tuple[str, str]: (静态前缀, 动态后缀)；没有分界标记时整个提示词都视为动态后缀
+    """
+    prefix, separator, suffix = prompt.partition(PROMPT_CACHE_BOUNDARY)
+    if not separator:
+        return "", prompt
+    # 只保留第一个标记作为分界，其余的（如插件注入内容中误带的）直接移除
+    return prefix.rstrip(), suffix.replace(PROMPT_CACHE_BOUNDARY, "").lstrip()
+
+
 async def _normalize_image_format(image_format: str) -> str:
     """
     标准化图片格式名称，确保与各种API的兼容性
@@ -497,15 +520,21 @@ class _PromptProcessor:
     ) -> str:
         """
         为请求准备最终的提示词,应用各种扰动和指令。
+
+        提示词按 PROMPT_CACHE_BOUNDARY 拆分为静态前缀与动态后缀，扰动只作用于动态后缀，
+        保证静态前缀在多次请求之间逐字节一致，可以命中服务端的提示词缓存。
         """
         final_prompt_parts = []
-        user_prompt = prompt
+        static_prefix, user_prompt = split_prompt_sections(prompt)
 
-        # 步骤 A: 添加抗审查指令
+        # 步骤 A: 添加抗审查指令（固定文本，放在最前面不影响缓存）
         if model_info.enable_prompt_perturbation:
             final_prompt_parts.append(self.noise_instruction)
 
-        # 步骤 B: (可选) 应用统一的提示词扰动
+        if static_prefix:
+            final_prompt_parts.append(static_prefix)
+
+        # 步骤 B: (可选) 对动态后缀应用统一的提示词扰动
         if getattr(model_info, "enable_prompt_perturbation", False):
             logger.info(f"为模型 '{model_info.name}' 启用提示词扰动功能。")
             user_prompt = await self._apply_prompt_perturbation(
@@ -659,6 +688,67 @@ class _RequestExecutor:
         logger.error(f"模型 '{model_info.name}' 请求失败，达到最大重试次数 {api_provider.max_retry} 次")
         raise RuntimeError("请求失败，已达到最大重试次数")
 
+    async def execute_stream_request(
+        self,
+        api_provider: APIProvider,
+        client: BaseClient,
+        model_info: ModelInfo,
+        **kwargs,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        以流式方式执行文本请求，重试和异常处理逻辑与 execute_request 相同。
+
+        只有在尚未产出正式内容时才会重试；一旦已有内容交给调用方，后续错误直接抛出。
+
+        Args:
+            api_provider (APIProvider): API提供商配置。
+            client (BaseClient): 用于发送请求的客户端实例。
+            model_info (ModelInfo): 正在使用的模型的信息。
+            **kwargs: 传递给客户端方法的具体参数。
+
+        Yields:
+            StreamChunk: 流式响应块，最后一个块携带完整响应。
+        """
+        retry_remain = api_provider.max_retry
+        compressed_messages: list[Message] | None = None
+
+        while retry_remain > 0:
+            started = False
+            try:
+                request_params = kwargs.copy()
+                request_params["message_list"] = compressed_messages or kwargs.get("message_list")
+                async for chunk in client.get_response_stream(model_info=model_info, **request_params):
+                    if chunk.content:
+                        started = True
+                    yield chunk
+                return
+
+            except Exception as e:
+                if started:
+                    raise
+                logger.debug(f"流式请求失败: {e!s}")
+                await self.model_selector.update_failure_penalty(model_info.name, e)
+
+                wait_interval, new_compressed_messages = await self._handle_exception(
+                    e,
+                    model_info,
+                    api_provider,
+                    retry_remain,
+                    (kwargs.get("message_list"), compressed_messages is not None),
+                )
+                if new_compressed_messages:
+                    compressed_messages = new_compressed_messages
+
+                if wait_interval == -1:
+                    raise e
+                elif wait_interval > 0:
+                    await asyncio.sleep(wait_interval)
+            finally:
+                retry_remain -= 1
+
+        logger.error(f"模型 '{model_info.name}' 流式请求失败，达到最大重试次数 {api_provider.max_retry} 次")
+        raise RuntimeError("请求失败，已达到最大重试次数")
+
     async def _handle_exception(
         self, e: Exception, model_info: ModelInfo, api_provider: APIProvider, remain_try: int, messages_info
     ) -> tuple[int, list[Message] | None]:
@@ -854,6 +944,87 @@ class _RequestStrategy:
         fallback_model_info = model_config.get_model_info(self.model_list[0])
         return APIResponse(content="所有模型都请求失败"), fallback_model_info
 
+    async def stream_with_failover(
+        self, prompt: str, **kwargs
+    ) -> AsyncIterator[tuple[StreamChunk, ModelInfo]]:
+        """
+        以流式方式执行文本请求，并在模型失败时进行故障转移。
+
+        只有在尚未产出任何内容时才会切换模型；一旦已有内容交给调用方，后续错误会直接抛出。
+        客户端不支持流式、或模型启用了反截断（需要完整内容才能判断）时，退化为非流式请求，
+        在最后一个块中一次性给出全部内容。
+
+        Yields:
+            Tuple[StreamChunk, ModelInfo]: 流式响应块及产生它的模型信息，最后一个块携带完整响应。
+        """
+        failed_models_in_this_request = set()
+        max_attempts = len(self.model_list)
+        last_exception: Exception | None = None
+
+        for attempt in range(max_attempts):
+            selection_result = await self.model_selector.select_best_available_model(
+                failed_models_in_this_request, str(RequestType.RESPONSE.value)
+            )
+            if selection_result is None:
+                logger.error(f"尝试 {attempt + 1}/{max_attempts}: 没有可用的模型了。")
+                break
+
+            model_info, api_provider, client = selection_result
+            request_kwargs = kwargs.copy()
+            processed_prompt = await self.prompt_processor.prepare_prompt(prompt, model_info, self.task_name)
+            request_kwargs["message_list"] = [MessageBuilder().add_text_content(processed_prompt).build()]
+            if model_info.extra_params:
+                request_kwargs["extra_params"] = {
+                    **model_info.extra_params,
+                    **request_kwargs.get("extra_params", {}),
+                }
+
+            if not client.supports_streaming or model_info.anti_truncation:
+                logger.debug(f"模型 '{model_info.name}' 不使用流式输出，退化为非流式请求。")
+                try:
+                    response = await self._try_model_request(
+                        model_info, api_provider, client, RequestType.RESPONSE, **request_kwargs
+                    )
+                except Exception as e:
+                    logger.error(f"模型 '{model_info.name}' 失败，异常: {e}。将其添加到当前请求的失败模型列表中。")
+                    failed_models_in_this_request.add(model_info.name)
+                    last_exception = e
+                    continue
+                await self.model_selector.update_usage_penalty(model_info.name, increase=False)
+                yield StreamChunk(content=response.content or "", response=response), model_info
+                return
+
+            started = False
+            # 故障转移时保留选中时增加的使用惩罚；其余情况（成功、已输出内容后出错、调用方提前停止迭代）都要释放
+            keep_penalty = False
+            try:
+                async for chunk in self._try_model_stream(model_info, api_provider, client, **request_kwargs):
+                    if not chunk.is_final and not chunk.content:
+                        # 纯推理内容的增量不影响故障转移判断
+                        yield chunk, model_info
+                        continue
+                    started = True
+                    yield chunk, model_info
+            except Exception as e:
+                if started:
+                    raise
+                # 失败惩罚已由执行器更新
+                keep_penalty = True
+                logger.error(f"模型 '{model_info.name}' 流式请求失败，异常: {e}。将其添加到当前请求的失败模型列表中。")
+                failed_models_in_this_request.add(model_info.name)
+                last_exception = e
+                continue
+            finally:
+                if not keep_penalty:
+                    await self.model_selector.update_usage_penalty(model_info.name, increase=False)
+
+            return
+
+        logger.error(f"当前流式请求已尝试 {max_attempts} 个模型，所有模型均已失败。")
+        if last_exception:
+            raise RuntimeError("所有模型均未能生成响应。") from last_exception
+        raise RuntimeError("所有模型均未能生成响应，且无具体异常信息。")
+
     async def _try_model_request(
         self, model_info: ModelInfo, api_provider: APIProvider, client: BaseClient, request_type: RequestType, **kwargs
     ) -> APIResponse:
@@ -912,6 +1083,56 @@ class _RequestStrategy:
 
         raise RuntimeError("内部重试逻辑错误")  # 理论上不应到达这里
 
+    async def _try_model_stream(
+        self, model_info: ModelInfo, api_provider: APIProvider, client: BaseClient, **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        为单个模型尝试流式请求，包含空回复的内部重试逻辑。
+        只有在尚未产出正式内容时才会判定为空回复并重试。
+
+        Args:
+            model_info (ModelInfo): 要使用的模型信息。
+            api_provider (APIProvider): API提供商信息。
+            client (BaseClient): API客户端实例。
+            **kwargs: 传递给执行器的请求参数。
+
+        Yields:
+            StreamChunk: 流式响应块，最后一个块携带经过后处理的完整响应。
+
+        Raises:
+            RuntimeError: 如果在达到最大重试次数后仍然收到空回复。
+        """
+        max_empty_retry = api_provider.max_retry
+
+        for i in range(max_empty_retry + 1):
+            started = False
+            async for chunk in self.executor.execute_stream_request(api_provider, client, model_info, **kwargs):
+                if not chunk.is_final:
+                    started = started or bool(chunk.content)
+                    yield chunk
+                    continue
+
+                response = chunk.response
+                assert response is not None
+                content, reasoning, _ = await self.prompt_processor.process_response(response.content or "", False)
+                response.content = content
+                response.reasoning_content = response.reasoning_content or reasoning
+                if started or response.tool_calls or content:
+                    yield chunk
+                    return
+
+            if i < max_empty_retry:
+                logger.warning(
+                    f"模型 '{model_info.name}' 流式输出为空回复，正在进行内部重试 ({i + 1}/{max_empty_retry})..."
+                )
+                if api_provider.retry_interval > 0:
+                    await asyncio.sleep(api_provider.retry_interval)
+            else:
+                logger.error(f"模型 '{model_info.name}' 经过 {max_empty_retry} 次内部重试后仍然生成空回复。")
+                raise RuntimeError(f"模型 '{model_info.name}' 已达到空回复的最大内部重试次数。")
+
+        raise RuntimeError("内部重试逻辑错误")  # 理论上不应到达这里
+
 
 # ==============================================================================
 # Main Facade Class
@@ -1065,6 +1286,73 @@ class LLMRequest:
                 raise e
             return "所有并发请求都失败了", ("", "unknown", None)
 
+    async def generate_response_stream(
+        self,
+        prompt: str,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        以流式方式生成文本响应。
+
+        产出正式内容的增量块，最后一个块携带经过后处理的完整响应（含推理内容与用量）。
+        模型输出开头的 <think>...</think> 推理块不会作为内容增量产出。
+        不支持流式的模型会自动退化为非流式请求，只产出最后一个块。
+
+        Args:
+            prompt (str): 提示词
+            temperature (float, optional): 温度参数
+            max_tokens (int, optional): 最大token数
+
+        Yields:
+            StreamChunk: 内容增量块；最后一个块的 response 为完整的 APIResponse
+        """
+        async with self._semaphore:
+            start_time = time.time()
+            pending = ""  # 尚未确定是否属于 <think> 块的开头内容
+            in_think = None  # None 表示还未判断
+
+            async for chunk, model_info in self._strategy.stream_with_failover(
+                prompt,
+                temperature=self.model_for_task.temperature if temperature is None else temperature,
+                max_tokens=self.model_for_task.max_tokens if max_tokens is None else max_tokens,
+            ):
+                if chunk.is_final:
+                    response = chunk.response
+                    assert response is not None
+                    if response.usage is None:
+                        # 服务商未在流中返回用量，按文本长度估算，避免统计缺失
+                        response.usage = UsageRecord.estimate(
+                            model_info, prompt, (response.content or "") + (response.reasoning_content or "")
+                        )
+                    await self._record_usage(model_info, response.usage, time.time() - start_time, "/chat/completions")
+                    if chunk.content:
+                        # 非流式退化：内容已由故障转移策略完成后处理
+                        yield StreamChunk(content=chunk.content, response=response, model_name=model_info.name)
+                    else:
+                        # 流式结束：补发仍被暂存的内容（未闭合的<think>视为推理，不再补发）
+                        tail = "" if in_think else pending
+                        yield StreamChunk(content=tail, response=response, model_name=model_info.name)
+                    return
+
+                content = chunk.content
+                if in_think is not False and content:
+                    pending += content
+                    stripped = pending.lstrip()
+                    if in_think is None:
+                        if len(stripped) < len("<think>") and "<think>".startswith(stripped):
+                            continue
+                        in_think = stripped.startswith("<think>")
+                    if in_think:
+                        end = pending.find("</think>")
+                        if end == -1:
+                            continue
+                        pending = pending[end + len("</think>") :].lstrip()
+                    content, pending = pending, ""
+                    in_think = False
+                if content or chunk.reasoning_content:
+                    yield StreamChunk(content=content, reasoning_content=chunk.reasoning_content)
+
     async def _execute_single_text_request(
         self,
         prompt: str,
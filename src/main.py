@@ -5,9 +5,8 @@ import signal
 import sys
 import time
 import traceback
-from collections.abc import Callable, Coroutine
 from random import choices
-from typing import Any, cast
+from typing import cast
 
 from rich.traceback import install
 
@@ -33,6 +32,7 @@ from src.common.server import Server, get_global_server
 from src.config.config import global_config
 from src.individuality.individuality import Individuality, get_individuality
 from src.manager.async_task_manager import async_task_manager
+from src.manager.startup_graph import StartupGraph
 from src.mood.mood_manager import mood_manager
 from src.plugin_system.base.base_interest_calculator import BaseInterestCalculator
 from src.plugin_system.base.component_types import EventType
@@ -84,6 +84,9 @@ class MainSystem:
         # 存储清理任务的引用
         self._cleanup_tasks: list[asyncio.Task] = []
 
+        # 启动依赖图
+        self._startup_graph = StartupGraph()
+
     def _setup_signal_handlers(self) -> None:
         """设置信号处理器"""
 
@@ -223,6 +226,12 @@ class MainSystem:
         except Exception as e:
             logger.error(f"停止内存监控时出错: {e}")
 
+        # 取消仍在后台初始化的组件
+        try:
+            await asyncio.wait_for(self._startup_graph.cancel_background(), timeout=5.0)
+        except Exception as e:
+            logger.error(f"取消后台初始化组件时出错: {e}")
+
         cleanup_tasks = []
 
         # 停止消息批处理器
@@ -306,6 +315,22 @@ class MainSystem:
         except Exception as e:
             logger.error(f"准备停止适配器管理器时出错: {e}")
 
+        # 关闭插件共享的HTTP连接池
+        try:
+            from src.plugin_system.apis import http_api
+
+            cleanup_tasks.append(("HTTP连接池", http_api.close()))
+        except Exception as e:
+            logger.error(f"准备关闭HTTP连接池时出错: {e}")
+
+        # 关闭LLM客户端持有的共享会话
+        try:
+            from src.llm_models.model_client.base_client import client_registry
+
+            cleanup_tasks.append(("LLM客户端", client_registry.close_all()))
+        except Exception as e:
+            logger.error(f"准备关闭LLM客户端时出错: {e}")
+
         # 停止 CoreSinkManager
         try:
             cleanup_tasks.append(("CoreSinkManager", shutdown_core_sink_manager()))
@@ -345,6 +370,16 @@ class MainSystem:
         else:
             logger.warning("没有需要清理的任务")
 
+        # 提交写入队列中剩余的写入 (需在关闭数据库引擎之前)
+        try:
+            from src.common.database.optimization import close_write_queue
+
+            await asyncio.wait_for(close_write_queue(), timeout=10.0)
+        except asyncio.TimeoutError:
+            logger.error("关闭数据库写入队列超时")
+        except Exception as e:
+            logger.error(f"关闭数据库写入队列时出错: {e}")
+
         # 停止数据库服务 (在所有其他任务完成后最后停止)
         try:
             from src.common.database.core import close_engine as stop_database
@@ -414,10 +449,60 @@ MoFox_Bot(第三方修改版)
 """)
 
     async def _init_components(self) -> None:
-        """初始化其他组件"""
-        init_start_time = time.time()
+        """按依赖图并发初始化其他组件
 
-        # 并行初始化基础组件
+        适配器只依赖插件、消息存储与消息管理器这条路径，就绪后立即开始接收并持久化消息；
+        记忆图、LPMM 知识库、日程生成等重量级可选系统作为后台组件继续预热。
+        """
+        init_start_time = time.time()
+        graph = self._startup_graph
+
+        # 基础组件
+        graph.add("基础定时任务", self._init_base_tasks)
+        graph.add("默认事件", event_manager.init_default_events)
+        graph.add("权限管理器", self._init_permission_manager)
+        graph.add("API路由", self._register_api_routes)
+        graph.add("统一调度器", self._init_scheduler, depends_on=["默认事件"])
+        graph.add("插件系统", self._load_plugins, depends_on=["默认事件", "权限管理器", "统一调度器"])
+        graph.add("表情包管理器", self._init_emoji_manager)
+        graph.add("情绪管理器", self._init_mood_manager)
+        graph.add("聊天流自动保存", self._start_chat_auto_save)
+        graph.add("兴趣值计算组件", self._initialize_interest_calculator, depends_on=["插件系统"])
+        graph.add("个体特征", self._init_individuality)
+
+        # 消息路径
+        graph.add("消息重组器", self._start_reassembler)
+        graph.add("消息批处理器", self._start_message_batchers)
+        # 回复会用到机器人名称与 bot_person_id，消息管理器需等个体特征初始化完成
+        graph.add("消息管理器", self._start_message_manager, depends_on=["消息批处理器", "插件系统", "个体特征"])
+        graph.add(
+            "适配器",
+            self._start_adapters,
+            depends_on=["插件系统", "兴趣值计算组件", "消息批处理器", "消息管理器"],
+        )
+
+        # 启动事件在关键组件就绪后触发
+        graph.add(
+            "启动事件",
+            self._trigger_start_event,
+            depends_on=["插件系统", "兴趣值计算组件", "消息管理器", "个体特征", "情绪管理器", "表情包管理器"],
+        )
+        graph.add("内存监控", self._start_mem_monitor)
+
+        # 后台预热的重量级可选系统
+        graph.add("记忆图系统", self._init_memory_graph, background=True)
+        graph.add("三层记忆系统", self._init_unified_memory, depends_on=["记忆图系统"], background=True)
+        graph.add("LPMM知识库", self._init_lpmm_knowledge, background=True)
+        graph.add("计划系统", self._init_planning_components, background=True)
+
+        await graph.run()
+        graph.log_timings()
+
+        init_time = int(1000 * (time.time() - init_start_time))
+        logger.info(f"初始化完成，神经元放电{init_time}次")
+
+    async def _init_base_tasks(self) -> None:
+        """初始化基础定时任务"""
         base_init_tasks = [
             async_task_manager.add_task(OnlineTimeRecordTask()),
             async_task_manager.add_task(StatisticOutputTask()),
@@ -427,166 +512,142 @@ MoFox_Bot(第三方修改版)
         await asyncio.gather(*base_init_tasks, return_exceptions=True)
         logger.info("基础定时任务初始化成功")
 
-        # 注册默认事件
-        event_manager.init_default_events()
-
-        # 初始化权限管理器
-        try:
-            from src.plugin_system.apis.permission_api import permission_api
-            from src.plugin_system.core.permission_manager import PermissionManager
-
-            permission_manager = PermissionManager()
-            await permission_manager.initialize()
-            permission_api.set_permission_manager(permission_manager)
-            logger.info("权限管理器初始化成功")
-        except Exception as e:
-            logger.error(f"权限管理器初始化失败: {e}")
-
-        # 注册API路由
-        try:
-            from src.api.memory_visualizer_router import router as visualizer_router
-            from src.api.message_router import router as message_router
-            from src.api.statistic_router import router as llm_statistic_router
-
-            self.server.register_router(message_router, prefix="/api")
-            self.server.register_router(llm_statistic_router, prefix="/api")
-            self.server.register_router(visualizer_router, prefix="/visualizer")
-            logger.info("API路由注册成功")
-        except Exception as e:
-            logger.error(f"注册API路由失败: {e}")
-        # 初始化统一调度器
-        try:
-            from src.plugin_system.apis.unified_scheduler import initialize_scheduler
-
-            await initialize_scheduler()
-        except Exception as e:
-            logger.error(f"统一调度器初始化失败: {e}")
-
+    async def _init_permission_manager(self) -> None:
+        """初始化权限管理器"""
+        from src.plugin_system.apis.permission_api import permission_api
+        from src.plugin_system.core.permission_manager import PermissionManager
+
+        permission_manager = PermissionManager()
+        await permission_manager.initialize()
+        permission_api.set_permission_manager(permission_manager)
+        logger.info("权限管理器初始化成功")
+
+    def _register_api_routes(self) -> None:
+        """注册API路由"""
+        from src.api.memory_visualizer_router import router as visualizer_router
+        from src.api.message_router import router as message_router
+        from src.api.statistic_router import router as llm_statistic_router
+        from src.api.trace_router import router as trace_router
+
+        self.server.register_router(message_router, prefix="/api")
+        self.server.register_router(llm_statistic_router, prefix="/api")
+        self.server.register_router(trace_router, prefix="/api")
+        self.server.register_router(visualizer_router, prefix="/visualizer")
+        logger.info("API路由注册成功")
+
+    async def _init_scheduler(self) -> None:
+        """初始化统一调度器"""
+        from src.plugin_system.apis.unified_scheduler import initialize_scheduler
+
+        await initialize_scheduler()
+
+    def _load_plugins(self) -> None:
+        """加载所有插件并处理缓存的事件订阅"""
         # 设置核心消息接收器到插件管理器
         # 使用 CoreSinkManager 的 InProcessCoreSink
         if self.core_sink_manager:
             plugin_manager.set_core_sink(self.core_sink_manager.get_in_process_sink())
         else:
             logger.error("CoreSinkManager 未初始化，无法设置核心消息接收器")
-        
+
         # 加载所有插件
         plugin_manager.load_all_plugins()
 
         # 处理所有缓存的事件订阅（插件加载完成后）
         event_manager.process_all_pending_subscriptions()
 
-        # 初始化表情管理器
+    def _init_emoji_manager(self) -> None:
+        """初始化表情管理器"""
         get_emoji_manager().initialize()
         logger.info("表情包管理器初始化成功")
 
-        # 启动情绪管理器
+    async def _init_mood_manager(self) -> None:
+        """启动情绪管理器"""
         await mood_manager.start()
         logger.info("情绪管理器初始化成功")
 
-        # 启动聊天管理器的自动保存任务
+    def _start_chat_auto_save(self) -> None:
+        """启动聊天管理器的自动保存任务"""
         from src.chat.message_receive.chat_stream import get_chat_manager
+
         task = asyncio.create_task(get_chat_manager()._auto_save_task())
         _background_tasks.add(task)
         task.add_done_callback(_background_tasks.discard)
 
-        # 初始化记忆图系统
-        try:
-            from src.memory_graph.manager_singleton import initialize_memory_manager
-            await self._safe_init("记忆图系统", initialize_memory_manager)()
-        except Exception as e:
-            logger.error(f"记忆图系统初始化失败: {e}")
+    async def _init_individuality(self) -> None:
+        """初始化个体特征"""
+        await self.individuality.initialize()
+        logger.info("个体特征初始化成功")
 
-        # 初始化三层记忆系统（如果启用）
-        try:
-            if global_config and global_config.memory and global_config.memory.enable:
-                from src.memory_graph.manager_singleton import initialize_unified_memory_manager
-                logger.info("三层记忆系统已启用，正在初始化...")
-                await initialize_unified_memory_manager()
-                logger.info("三层记忆系统初始化成功")
-            else:
-                logger.debug("三层记忆系统未启用（配置中禁用）")
-        except Exception as e:
-            logger.error(f"三层记忆系统初始化失败: {e}")
+    async def _start_reassembler(self) -> None:
+        """启动消息重组器"""
+        from src.utils.message_chunker import reassembler
 
-        # 初始化消息兴趣值计算组件
-        await self._initialize_interest_calculator()
+        await reassembler.start_cleanup_task()
+        logger.info("消息重组器已启动")
 
-        # 初始化LPMM知识库
-        try:
-            from src.chat.knowledge.knowledge_lib import initialize_lpmm_knowledge
+    async def _start_message_batchers(self) -> None:
+        """启动消息存储与更新批处理器"""
+        from src.chat.message_receive.storage import get_message_storage_batcher, get_message_update_batcher
 
-            initialize_lpmm_knowledge()
-            logger.info("LPMM知识库初始化成功")
-        except Exception as e:
-            logger.error(f"LPMM知识库初始化失败: {e}")
+        storage_batcher = get_message_storage_batcher()
+        await storage_batcher.start()
+        logger.info("消息存储批处理器已启动")
 
-        # 消息接收器已在 initialize() 中通过 CoreSinkManager 创建
-        logger.info("核心消息接收器已就绪（通过 CoreSinkManager）")
+        update_batcher = get_message_update_batcher()
+        await update_batcher.start()
+        logger.info("消息更新批处理器已启动")
 
-        # 启动消息重组器
-        try:
-            from src.utils.message_chunker import reassembler
+    async def _start_message_manager(self) -> None:
+        """启动消息管理器"""
+        from src.chat.message_manager import message_manager
 
-            await reassembler.start_cleanup_task()
-            logger.info("消息重组器已启动")
-        except Exception as e:
-            logger.error(f"启动消息重组器失败: {e}")
+        await message_manager.start()
+        logger.info("消息管理器已启动")
 
-        # 启动消息存储批处理器
-        try:
-            from src.chat.message_receive.storage import get_message_storage_batcher, get_message_update_batcher
+    async def _start_adapters(self) -> None:
+        """启动所有适配器"""
+        from src.plugin_system.core.adapter_manager import get_adapter_manager
 
-            storage_batcher = get_message_storage_batcher()
-            await storage_batcher.start()
-            logger.info("消息存储批处理器已启动")
+        adapter_manager = get_adapter_manager()
+        await adapter_manager.start_all_adapters()
+        logger.info("所有适配器已启动")
 
-            update_batcher = get_message_update_batcher()
-            await update_batcher.start()
-            logger.info("消息更新批处理器已启动")
-        except Exception as e:
-            logger.error(f"启动消息批处理器失败: {e}")
+    async def _trigger_start_event(self) -> None:
+        """触发启动事件"""
+        await event_manager.trigger_event(EventType.ON_START, permission_group="SYSTEM")
 
-        # 启动消息管理器
-        try:
-            from src.chat.message_manager import message_manager
+    def _start_mem_monitor(self) -> None:
+        """启动内存监控"""
+        if MEM_MONITOR_ENABLED:
+            started = start_background_monitor(interval_sec=300)
+            if started:
+                logger.info("[DEV] 已启动 (间隔=300s)")
 
-            await message_manager.start()
-            logger.info("消息管理器已启动")
-        except Exception as e:
-            logger.error(f"启动消息管理器失败: {e}")
+    async def _init_memory_graph(self) -> None:
+        """初始化记忆图系统"""
+        from src.memory_graph.manager_singleton import initialize_memory_manager
 
-        # 初始化个体特征
-        await self._safe_init("个体特征", self.individuality.initialize)()
+        await initialize_memory_manager()
+        logger.info("记忆图系统初始化成功")
 
-        # 初始化计划相关组件
-        await self._init_planning_components()
+    async def _init_unified_memory(self) -> None:
+        """初始化三层记忆系统（如果启用）"""
+        if global_config and global_config.memory and global_config.memory.enable:
+            from src.memory_graph.manager_singleton import initialize_unified_memory_manager
 
-        # 触发启动事件
-        try:
-            await event_manager.trigger_event(EventType.ON_START, permission_group="SYSTEM")
-            init_time = int(1000 * (time.time() - init_start_time))
-            logger.info(f"初始化完成，神经元放电{init_time}次")
-        except Exception as e:
-            logger.error(f"启动事件触发失败: {e}")
-        
-        # 启动所有适配器
-        try:
-            from src.plugin_system.core.adapter_manager import get_adapter_manager
-            
-            adapter_manager = get_adapter_manager()
-            await adapter_manager.start_all_adapters()
-            logger.info("所有适配器已启动")
-        except Exception as e:
-            logger.error(f"启动适配器失败: {e}")
+            logger.info("三层记忆系统已启用，正在初始化...")
+            await initialize_unified_memory_manager()
+            logger.info("三层记忆系统初始化成功")
+        else:
+            logger.debug("三层记忆系统未启用（配置中禁用）")
 
-        # 启动内存监控
-        try:
-            if MEM_MONITOR_ENABLED:
-                started = start_background_monitor(interval_sec=300)
-                if started:
-                    logger.info("[DEV] 已启动 (间隔=300s)")
-        except Exception as e:
-            logger.error(f"启动内存监控失败: {e}")
+    async def _init_lpmm_knowledge(self) -> None:
+        """初始化LPMM知识库（从文件加载，放到线程中避免阻塞事件循环）"""
+        from src.chat.knowledge.knowledge_lib import initialize_lpmm_knowledge
+
+        await asyncio.to_thread(initialize_lpmm_knowledge)
+        logger.info("LPMM知识库初始化成功")
 
     async def _init_planning_components(self) -> None:
         """初始化计划相关组件"""
@@ -607,22 +668,6 @@ MoFox_Bot(第三方修改版)
             except Exception as e:
                 logger.error(f"日程表管理器初始化失败: {e}")
 
-    def _safe_init(self, component_name: str, init_func) -> "Callable[[], Coroutine[Any, Any, bool]]":
-        """安全初始化组件，捕获异常"""
-
-        async def wrapper():
-            try:
-                result = init_func()
-                if asyncio.iscoroutine(result):
-                    await result
-                logger.info(f"{component_name}初始化成功")
-                return True
-            except Exception as e:
-                logger.error(f"{component_name}初始化失败: {e}")
-                return False
-
-        return wrapper
-
     async def schedule_tasks(self) -> None:
         """调度定时任务"""
         try:
@@ -0,0 +1,179 @@
+"""
+启动依赖图
+
+将启动阶段的各个组件声明为带依赖关系的节点，按依赖图并发启动：
+- 每个组件在其全部依赖完成（无论成功与否）后立即开始，互不依赖的组件并发执行
+- 关键组件全部完成后 run() 返回；后台组件（重量级的可选系统）在后台继续预热
+- 记录每个组件的启动耗时，便于定位冷启动瓶颈
+
+与原先的启动流程保持一致：单个组件失败只记录错误，不会阻止依赖它的组件启动。
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.common.logger import get_logger
+
+logger = get_logger("startup_graph")
+
+
+@dataclass
+class StartupComponent:
+    """启动组件"""
+
+    name: str
+    init_func: Callable[[], Any]  # 同步函数或返回协程的函数
+    depends_on: list[str] = field(default_factory=list)
+    background: bool = False  # 后台组件不阻塞启动完成
+    status: str = "pending"  # pending / running / success / failed / cancelled
+    started_at: float = 0.0
+    duration: float = 0.0
+    error: str | None = None
+
+
+class StartupGraph:
+    """按依赖关系并发启动组件"""
+
+    def __init__(self) -> None:
+        self._components: dict[str, StartupComponent] = {}
+        self._done_events: dict[str, asyncio.Event] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._start_time: float = 0.0
+
+    def add(
+        self,
+        name: str,
+        init_func: Callable[[], Any],
+        depends_on: list[str] | None = None,
+        background: bool = False,
+    ) -> None:
+        """
+        声明一个启动组件
+
+        Args:
+            name: 组件名称（唯一）
+            init_func: 初始化函数，可以是同步函数或异步函数
+            depends_on: 依赖的组件名称列表
+            background: 是否为后台组件
+        """
+        if name in self._components:
+            raise ValueError(f"启动组件 {name} 重复声明")
+        self._components[name] = StartupComponent(
+            name=name, init_func=init_func, depends_on=list(depends_on or []), background=background
+        )
+
+    def _validate(self) -> None:
+        """检查依赖是否存在、是否有环，以及关键组件是否依赖后台组件"""
+        for component in self._components.values():
+            for dep in component.depends_on:
+                if dep not in self._components:
+                    raise ValueError(f"启动组件 {component.name} 依赖未声明的组件 {dep}")
+                if not component.background and self._components[dep].background:
+                    raise ValueError(f"关键组件 {component.name} 不能依赖后台组件 {dep}")
+
+        visiting: set[str] = set()
+        visited: set[str] = set()
+
+        def visit(name: str, path: list[str]) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"启动组件存在循环依赖: {' -> '.join([*path, name])}")
+            visiting.add(name)
+            for dep in self._components[name].depends_on:
+                visit(dep, [*path, name])
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self._components:
+            visit(name, [])
+
+    async def run(self) -> None:
+        """启动所有组件，关键组件全部完成后返回"""
+        self._validate()
+        self._start_time = time.perf_counter()
+        self._done_events = {name: asyncio.Event() for name in self._components}
+
+        for name in self._components:
+            self._tasks[name] = asyncio.create_task(self._run_component(name), name=f"startup:{name}")
+
+        critical = [self._tasks[name] for name, c in self._components.items() if not c.background]
+        if critical:
+            await asyncio.gather(*critical, return_exceptions=True)
+
+        background = [name for name, c in self._components.items() if c.background and c.status != "success"]
+        if background:
+            logger.info(f"以下组件将在后台继续初始化: {', '.join(background)}")
+
+    async def wait_for(self, name: str) -> None:
+        """等待指定组件完成"""
+        await self._done_events[name].wait()
+
+    async def _run_component(self, name: str) -> None:
+        component = self._components[name]
+        try:
+            if component.depends_on:
+                await asyncio.gather(*(self._done_events[dep].wait() for dep in component.depends_on))
+                failed_deps = [dep for dep in component.depends_on if self._components[dep].status != "success"]
+                if failed_deps:
+                    logger.warning(f"组件 {name} 的依赖未成功初始化: {', '.join(failed_deps)}，仍尝试继续启动")
+
+            component.status = "running"
+            component.started_at = time.perf_counter() - self._start_time
+            begin = time.perf_counter()
+            try:
+                result = component.init_func()
+                if asyncio.iscoroutine(result):
+                    await result
+                component.status = "success"
+            except asyncio.CancelledError:
+                component.status = "cancelled"
+                raise
+            except Exception as e:
+                component.status = "failed"
+                component.error = str(e)
+                logger.error(f"{name}初始化失败: {e}")
+            finally:
+                component.duration = time.perf_counter() - begin
+
+            if component.background:
+                outcome = "完成" if component.status == "success" else "结束"
+                logger.info(f"后台组件 {name} 初始化{outcome}，耗时 {component.duration * 1000:.0f}ms")
+        finally:
+            self._done_events[name].set()
+
+    async def cancel_background(self) -> None:
+        """取消仍在运行的后台组件（关闭时调用）"""
+        pending = [task for task in self._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def get_timings(self) -> list[dict[str, Any]]:
+        """获取各组件的启动耗时（按开始时间排序）"""
+        return [
+            {
+                "name": c.name,
+                "status": c.status,
+                "background": c.background,
+                "started_at_ms": round(c.started_at * 1000),
+                "duration_ms": round(c.duration * 1000),
+                "error": c.error,
+            }
+            for c in sorted(self._components.values(), key=lambda c: c.started_at)
+        ]
+
+    def log_timings(self) -> None:
+        """输出关键组件的启动耗时"""
+        lines = [
+            f"  {t['name']:<16} +{t['started_at_ms']:>6}ms  耗时 {t['duration_ms']:>6}ms  [{t['status']}]"
+            for t in self.get_timings()
+            if not t["background"]
+        ]
+        total = round((time.perf_counter() - self._start_time) * 1000)
+        logger.info(f"组件启动耗时（关键路径共 {total}ms）:\n" + "\n".join(lines))
+
@@ -1076,6 +1076,7 @@ class MemoryManager:
                     logger.debug(f"删除边失败 {source} -> {target}: {e}")
 
             if orphan_nodes_count > 0 or orphan_edges_count > 0:
+                self.graph_store.mark_changed()
                 logger.info(
                     f"清理完成: {orphan_nodes_count} 个孤立节点, {orphan_edges_count} 条孤立边"
                 )
@@ -4,7 +4,9 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+import functools
+from collections.abc import Callable, Iterable
+from typing import Any, TypeVar
 
 import networkx as nx
 
@@ -13,6 +15,21 @@ from src.memory_graph.models import Memory, MemoryEdge
 
 logger = get_logger(__name__)
 
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def _mutation(func: _F) -> _F:
+    """标记会修改图结构的方法：执行结束后（无论成功与否）递增图版本号"""
+
+    @functools.wraps(func)
+    def wrapper(self: GraphStore, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self.version += 1
+
+    return wrapper  # type: ignore[return-value]
+
 
 class GraphStore:
     """
@@ -39,8 +56,15 @@ class GraphStore:
         # 节点 -> {memory_id: [MemoryEdge]}，用于快速获取邻接边
         self.node_edge_index: dict[str, dict[str, list[MemoryEdge]]] = {}
 
+        # 图版本号：每次结构变更后递增，供可视化等只读视图判断缓存是否过期
+        self.version: int = 0
+
         logger.info("初始化图存储")
 
+    def mark_changed(self) -> None:
+        """在外部直接修改 graph / node_to_memories 后调用，使基于版本号的缓存失效"""
+        self.version += 1
+
 
     def _register_memory_edges(self, memory: Memory) -> None:
         """在记忆中的边加入邻接索引"""
@@ -80,6 +104,7 @@ class GraphStore:
         for memory in self.memory_index.values():
             self._register_memory_edges(memory)
 
+    @_mutation
     def add_memory(self, memory: Memory) -> None:
         """
         添加记忆到图
@@ -130,6 +155,7 @@ class GraphStore:
             logger.error(f"添加记忆失败: {e}")
             raise
 
+    @_mutation
     def add_node(
         self,
         node_id: str,
@@ -211,6 +237,7 @@ class GraphStore:
             logger.error(f"添加节点失败: {e}")
             return False
 
+    @_mutation
     def update_node(
         self,
         node_id: str,
@@ -260,6 +287,7 @@ class GraphStore:
             logger.error(f"更新节点失败: {e}")
             return False
 
+    @_mutation
     def add_edge(
         self,
         source_id: str,
@@ -344,6 +372,7 @@ class GraphStore:
             logger.error(f"添加边失败: {e}")
             return None
 
+    @_mutation
     def update_edge(
         self,
         edge_id: str,
@@ -408,6 +437,7 @@ class GraphStore:
             logger.error(f"更新边失败: {e}")
             return False
 
+    @_mutation
     def remove_edge(self, edge_id: str) -> bool:
         """
         删除边
@@ -458,6 +488,7 @@ class GraphStore:
             logger.error(f"删除边失败: {e}")
             return False
 
+    @_mutation
     def merge_memories(self, target_memory_id: str, source_memory_ids: list[str]) -> bool:
         """
         合并多个记忆到目标记忆
@@ -750,6 +781,7 @@ class GraphStore:
         """
         return self.graph.subgraph(node_ids).copy()
 
+    @_mutation
     def merge_nodes(self, source_id: str, target_id: str) -> None:
         """
         合并两个节点（将source的所有边转移到target，然后删除source）
@@ -942,6 +974,7 @@ class GraphStore:
                 existing_edges.setdefault(mid, set()).add(mem_edge.id)
         self._rebuild_node_edge_index()
 
+    @_mutation
     def remove_memory(self, memory_id: str, cleanup_orphans: bool = True) -> bool:
         """
         从图中删除指定记忆
@@ -984,6 +1017,7 @@ class GraphStore:
             logger.error(f"删除记忆失败 {memory_id}: {e}")
             return False
 
+    @_mutation
     def clear(self) -> None:
         """清空图（危险操作，仅用于测试）"""
         self.graph.clear()
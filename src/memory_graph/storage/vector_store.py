@@ -8,6 +8,7 @@
 from __future__ import annotations
 
 import asyncio
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
@@ -18,6 +19,9 @@ from src.memory_graph.models import MemoryNode, NodeType
 
 logger = get_logger(__name__)
 
+# 节点向量本地缓存的最大条目数
+NODE_CACHE_SIZE = 20000
+
 
 class VectorStore:
     """
@@ -51,6 +55,9 @@ class VectorStore:
         self.collection = None
         self.embedding_function = embedding_function
 
+        # 节点向量与元数据的本地缓存（供图扩展按跳批量读取），写操作时失效
+        self._node_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
     async def initialize(self) -> None:
         """异步初始化 ChromaDB"""
         try:
@@ -128,6 +135,7 @@ class VectorStore:
                 )
             
             await asyncio.to_thread(_add_node)
+            self._node_cache.pop(node.id, None)
 
             logger.debug(f"添加节点到向量存储: {node}")
 
@@ -181,6 +189,8 @@ class VectorStore:
                 )
             
             await asyncio.to_thread(_add_batch)
+            for n in valid_nodes:
+                self._node_cache.pop(n.id, None)
 
         except Exception as e:
             logger.error(f"批量添加节点失败: {e}")
@@ -409,6 +419,66 @@ class VectorStore:
             logger.debug(f"获取节点失败（节点可能不存在）: {e}")
             return None
 
+    async def get_nodes_by_ids(self, node_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        批量获取节点元数据和向量
+
+        优先读取本地缓存，未缓存的节点通过一次 ChromaDB 查询获取
+
+        Args:
+            node_ids: 节点ID列表
+
+        Returns:
+            {node_id: {"id", "metadata", "embedding"}}，不存在的节点不包含在结果中
+        """
+        if not self.collection:
+            raise RuntimeError("向量存储未初始化")
+
+        nodes: dict[str, dict[str, Any]] = {}
+        missing = []
+        for node_id in node_ids:
+            cached = self._node_cache.get(node_id)
+            if cached is not None:
+                self._node_cache.move_to_end(node_id)
+                nodes[node_id] = cached
+            else:
+                missing.append(node_id)
+
+        if not missing:
+            return nodes
+
+        try:
+            # ChromaDB get() 是同步阻塞操作，必须在线程中执行
+            def _get():
+                return self.collection.get(ids=missing, include=["metadatas", "embeddings"])
+
+            result = await asyncio.to_thread(_get)
+        except Exception as e:
+            logger.debug(f"批量获取节点失败: {e}")
+            return nodes
+
+        ids = result.get("ids") if result is not None else None
+        if ids is None:
+            return nodes
+        metadatas = result.get("metadatas")
+        embeddings = result.get("embeddings")
+
+        for i, node_id in enumerate(ids):
+            metadata = metadatas[i] if metadatas is not None and len(metadatas) > i else None
+            embedding = embeddings[i] if embeddings is not None and len(embeddings) > i else None
+            node = {
+                "id": node_id,
+                "metadata": metadata or {},
+                "embedding": np.asarray(embedding, dtype=np.float32) if embedding is not None else None,
+            }
+            nodes[node_id] = node
+            self._node_cache[node_id] = node
+
+        while len(self._node_cache) > NODE_CACHE_SIZE:
+            self._node_cache.popitem(last=False)
+
+        return nodes
+
     async def delete_node(self, node_id: str) -> None:
         """
         删除节点
@@ -425,6 +495,7 @@ class VectorStore:
                 self.collection.delete(ids=[node_id])
             
             await asyncio.to_thread(_delete)
+            self._node_cache.pop(node_id, None)
             logger.debug(f"删除节点: {node_id}")
 
         except Exception as e:
@@ -448,6 +519,7 @@ class VectorStore:
                 self.collection.update(ids=[node_id], embeddings=[embedding.tolist()])
             
             await asyncio.to_thread(_update)
+            self._node_cache.pop(node_id, None)
             logger.debug(f"更新节点 embedding: {node_id}")
 
         except Exception as e:
@@ -481,6 +553,7 @@ class VectorStore:
                 )
             
             self.collection = await asyncio.to_thread(_clear)
+            self._node_cache.clear()
             logger.warning(f"向量存储已清空: {self.collection_name}")
 
         except Exception as e:
@@ -450,6 +450,7 @@ class MemoryTools:
                 importance=edge.importance,
                 **edge.metadata
             )
+            self.graph_store.mark_changed()
 
             # 5. 异步保存（不阻塞当前操作）
             asyncio.create_task(self._async_save_graph_store())
@@ -14,7 +14,6 @@
 - 多维度最终评分
 """
 
-import asyncio
 import heapq
 import time
 from dataclasses import dataclass, field
@@ -22,7 +21,6 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any
 
 from src.common.logger import get_logger
-from src.memory_graph.utils.similarity import cosine_similarity_async
 
 if TYPE_CHECKING:
     import numpy as np
@@ -122,10 +120,6 @@ class PathScoreExpansion:
         self.config = config or PathExpansionConfig()
         self.prefer_node_types: list[str] = []  # 🆕 偏好节点类型
 
-        # 🚀 性能优化：邻居边缓存
-        self._neighbor_cache: dict[str, list[Any]] = {}
-        self._node_score_cache: dict[str, float] = {}
-
         logger.debug(
             f"PathScoreExpansion 初始化: max_hops={self.config.max_hops}, "
             f"damping={self.config.damping_factor}, "
@@ -157,9 +151,10 @@ class PathScoreExpansion:
             logger.warning("初始节点为空，无法进行路径扩展")
             return []
 
-        # 🚀 清空缓存（每次查询重新开始）
-        self._neighbor_cache.clear()
-        self._node_score_cache.clear()
+        # 🚀 查询级缓存：实例在多个并发查询间共享，缓存只随本次调用传递
+        # 邻居表在每次查询时重建（图可能在两次查询之间变化），节点分数依赖本次查询向量
+        neighbor_cache: dict[str, list[tuple[Any, str, float]]] = {}
+        node_score_cache: dict[str, float] = {}
 
         # 保存偏好类型
         self.prefer_node_types = prefer_node_types or []
@@ -182,54 +177,48 @@ class PathScoreExpansion:
 
         for hop in range(self.config.max_hops):
             hop_start = time.time()
-            next_paths = []
             branches_created = 0
             paths_merged = 0
             paths_pruned = 0
 
-            # 🚀 性能优化：收集所有需要评分的候选节点，然后批量计算
-            candidate_nodes_for_batch = set()
+            # 🚀 第一阶段：按叶子节点一次性取出整个前沿的邻居表
             path_candidates: list[tuple[Path, Any, str, float]] = []  # (path, edge, next_node, edge_weight)
+            candidate_nodes_for_batch: dict[str, None] = {}
 
-            # 第一阶段：收集所有候选节点
             for path in active_paths:
                 current_node = path.get_leaf_node()
                 if not current_node:
                     continue
 
-                # 获取排序后的邻居边
-                neighbor_edges = await self._get_sorted_neighbor_edges(current_node)
-
                 # 动态计算最大分叉数
                 max_branches = self._calculate_max_branches(path.score)
+                visited = set(path.nodes)
                 branch_count = 0
 
-                for edge in neighbor_edges[:max_branches]:
-                    next_node = edge.target_id if edge.source_id == current_node else edge.source_id
-
+                for edge, next_node, edge_weight in self._get_neighbors(current_node, neighbor_cache)[:max_branches]:
                     # 避免环路
-                    if path.contains_node(next_node):
+                    if next_node in visited:
                         continue
 
-                    edge_weight = self._get_edge_weight(edge)
-
-                    # 记录候选
                     path_candidates.append((path, edge, next_node, edge_weight))
-                    candidate_nodes_for_batch.add(next_node)
+                    candidate_nodes_for_batch[next_node] = None
 
                     branch_count += 1
                     if branch_count >= max_branches:
                         break
 
-            # 🚀 第二阶段：批量计算所有候选节点的分数
+            # 🚀 第二阶段：一次批量获取向量并计算所有候选节点的分数
             if candidate_nodes_for_batch:
                 batch_node_scores = await self._batch_get_node_scores(
-                    list(candidate_nodes_for_batch), query_embedding
+                    list(candidate_nodes_for_batch), query_embedding, node_score_cache
                 )
             else:
                 batch_node_scores = {}
 
-            # 🚀 第三阶段：使用批量计算的分数创建路径
+            # 🚀 第三阶段：使用批量计算的分数创建路径，按叶子节点合并
+            next_paths: list[Path | None] = []
+            unmerged_by_leaf: dict[str, int] = {}  # 叶子节点 -> next_paths 中未合并路径的位置
+
             for path, edge, next_node, edge_weight in path_candidates:
                 node_score = batch_node_scores.get(next_node, 0.3)
 
@@ -241,13 +230,13 @@ class PathScoreExpansion:
                 )
 
                 # 剪枝：如果到达该节点的分数远低于已有最优路径，跳过
-                if next_node in best_score_to_node:
-                    if new_score < best_score_to_node[next_node] * self.config.pruning_threshold:
-                        paths_pruned += 1
-                        continue
+                best_score = best_score_to_node.get(next_node)
+                if best_score is not None and new_score < best_score * self.config.pruning_threshold:
+                    paths_pruned += 1
+                    continue
 
                 # 更新最佳分数
-                best_score_to_node[next_node] = max(best_score_to_node.get(next_node, 0), new_score)
+                best_score_to_node[next_node] = max(best_score or 0, new_score)
 
                 # 创建新路径
                 new_path = Path(
@@ -258,16 +247,20 @@ class PathScoreExpansion:
                     parent=path,
                 )
 
-                # 尝试路径合并
-                merged_path = self._try_merge_paths(new_path, next_paths)
-                if merged_path:
-                    next_paths.append(merged_path)
+                # 尝试路径合并（端点相遇）
+                existing_index = unmerged_by_leaf.pop(next_node, None)
+                if existing_index is not None:
+                    next_paths.append(self._merge_paths(new_path, next_paths[existing_index]))
+                    next_paths[existing_index] = None
                     paths_merged += 1
                 else:
+                    unmerged_by_leaf[next_node] = len(next_paths)
                     next_paths.append(new_path)
 
                 branches_created += 1
 
+            next_paths = [p for p in next_paths if p is not None]
+
             # 路径数量控制：如果爆炸性增长，保留高分路径
             if len(next_paths) > self.config.max_active_paths:
                 logger.warning(
@@ -384,33 +377,35 @@ class PathScoreExpansion:
 
         return result
 
-    async def _get_sorted_neighbor_edges(self, node_id: str) -> list[Any]:
+    def _get_neighbors(
+        self, node_id: str, neighbor_cache: dict[str, list[tuple[Any, str, float]]]
+    ) -> list[tuple[Any, str, float]]:
         """
-        获取节点的排序邻居边（按边权重排序）- 带缓存优化
+        获取节点的邻居表（按边权重降序）- 带缓存优化
+
+        邻居表直接由 GraphStore 的邻接索引计算，预先解析出对端节点和边权重
 
         Args:
             node_id: 节点ID
+            neighbor_cache: 本次查询的邻居表缓存
 
         Returns:
-            排序后的边列表
+            [(edge, neighbor_id, edge_weight), ...]
         """
         # 🚀 缓存检查
-        if node_id in self._neighbor_cache:
-            return self._neighbor_cache[node_id]
-
-        edges = self.graph_store.get_edges_for_node(node_id)
+        neighbors = neighbor_cache.get(node_id)
+        if neighbors is not None:
+            return neighbors
 
-        if not edges:
-            self._neighbor_cache[node_id] = []
-            return []
-
-        # 按边权重排序
-        unique_edges = sorted(edges, key=lambda e: self._get_edge_weight(e), reverse=True)
+        neighbors = [
+            (edge, edge.target_id if edge.source_id == node_id else edge.source_id, self._get_edge_weight(edge))
+            for edge in self.graph_store.get_edges_for_node(node_id)
+        ]
+        neighbors.sort(key=lambda item: item[2], reverse=True)
 
         # 🚀 存入缓存
-        self._neighbor_cache[node_id] = unique_edges
-
-        return unique_edges
+        neighbor_cache[node_id] = neighbors
+        return neighbors
 
     def _get_edge_weight(self, edge: Any) -> float:
         """
@@ -432,106 +427,70 @@ class PathScoreExpansion:
         # 综合权重
         return base_weight * type_weight
 
-    async def _get_node_score(self, node_id: str, query_embedding: "np.ndarray | None") -> float:
-        """
-        获取节点分数（基于与查询的相似度 + 偏好类型加成）
-
-        Args:
-            node_id: 节点ID
-            query_embedding: 查询向量
-
-        Returns:
-            节点分数（0.0-1.0，偏好类型节点可能超过1.0）
-        """
-        # 从向量存储获取节点数据
-        node_data = await self.vector_store.get_node_by_id(node_id)
-
-        if query_embedding is None:
-            base_score = 0.5  # 默认中等分数
-        else:
-            if not node_data or "embedding" not in node_data:
-                base_score = 0.3  # 无向量的节点给低分
-            else:
-                node_embedding = node_data["embedding"]
-                similarity = await cosine_similarity_async(query_embedding, node_embedding)
-                base_score = max(0.0, min(1.0, similarity))  # 限制在[0, 1]
-
-        # 🆕 偏好类型加成
-        if self.prefer_node_types and node_data:
-            metadata = node_data.get("metadata", {})
-            node_type = metadata.get("node_type")
-            if node_type and node_type in self.prefer_node_types:
-                # 给予20%的分数加成
-                bonus = base_score * 0.2
-                logger.debug(f"节点 {node_id[:8]} 类型 {node_type} 匹配偏好，加成 {bonus:.3f}")
-                return base_score + bonus
-
-        return base_score
-
     async def _batch_get_node_scores(
-        self, node_ids: list[str], query_embedding: "np.ndarray | None"
+        self, node_ids: list[str], query_embedding: "np.ndarray | None", score_cache: dict[str, float]
     ) -> dict[str, float]:
         """
         批量获取节点分数（性能优化版本）
 
+        未缓存的节点向量通过一次向量存储查询获取，相似度用一次矩阵运算算出
+
         Args:
             node_ids: 节点ID列表
             query_embedding: 查询向量
+            score_cache: 本次查询的节点分数缓存（分数与查询向量绑定，不能跨查询复用）
 
         Returns:
             {node_id: score} 字典
         """
         import numpy as np
 
-        scores = {}
-
         if query_embedding is None:
             # 无查询向量时，返回默认分数
             return dict.fromkeys(node_ids, 0.5)
 
-        # 批量获取节点数据
-        node_data_list = await asyncio.gather(
-            *[self.vector_store.get_node_by_id(nid) for nid in node_ids],
-            return_exceptions=True
-        )
+        scores = {nid: score_cache[nid] for nid in node_ids if nid in score_cache}
+        pending_ids = [nid for nid in node_ids if nid not in scores]
+        if not pending_ids:
+            return scores
+
+        # 一次批量获取（向量存储带本地缓存）
+        try:
+            node_data_map = await self.vector_store.get_nodes_by_ids(pending_ids)
+        except Exception as e:
+            logger.warning(f"批量获取节点向量失败: {e}")
+            node_data_map = {}
 
         # 收集有效的嵌入向量
-        valid_embeddings = []
         valid_node_ids = []
-        node_metadata_map = {}
-
-        for nid, node_data in zip(node_ids, node_data_list):
-            if isinstance(node_data, Exception):
-                scores[nid] = 0.3
-                continue
-
-            # 类型守卫：确保 node_data 是字典
-            if not node_data or not isinstance(node_data, dict) or "embedding" not in node_data:
-                scores[nid] = 0.3
+        valid_embeddings = []
+        node_types: dict[str, str | None] = {}
+        for nid in pending_ids:
+            node_data = node_data_map.get(nid)
+            embedding = node_data.get("embedding") if node_data else None
+            if embedding is None:
+                scores[nid] = 0.3  # 无向量的节点给低分
             else:
-                valid_embeddings.append(node_data["embedding"])
                 valid_node_ids.append(nid)
-                node_metadata_map[nid] = node_data.get("metadata", {})
+                valid_embeddings.append(embedding)
+                node_types[nid] = (node_data.get("metadata") or {}).get("node_type")
 
         if valid_embeddings:
-            # 批量计算相似度（使用矩阵运算）- 移至to_thread执行
-            similarities = await asyncio.to_thread(self._batch_compute_similarities, valid_embeddings, query_embedding)
+            # 批量计算相似度（使用矩阵运算）
+            similarities = self._batch_compute_similarities(valid_embeddings, np.asarray(query_embedding))
 
             # 应用偏好类型加成
             for nid, sim in zip(valid_node_ids, similarities):
                 base_score = float(sim)
-
-                # 偏好类型加成
-                if self.prefer_node_types and nid in node_metadata_map:
-                    node_type = node_metadata_map[nid].get("node_type")
-                    if node_type and node_type in self.prefer_node_types:
-                        bonus = base_score * 0.2
-                        scores[nid] = base_score + bonus
-                    else:
-                        scores[nid] = base_score
+                node_type = node_types.get(nid)
+                if self.prefer_node_types and node_type and node_type in self.prefer_node_types:
+                    scores[nid] = base_score * 1.2
                 else:
                     scores[nid] = base_score
 
+        for nid in pending_ids:
+            score_cache[nid] = scores[nid]
+
         return scores
 
     def _calculate_path_score(self, old_score: float, edge_weight: float, node_score: float, depth: int) -> float:
@@ -577,44 +536,30 @@ class PathScoreExpansion:
         else:
             return int(self.config.max_branches_per_node * 0.5)  # 低分路径少探索
 
-    def _try_merge_paths(self, new_path: Path, existing_paths: list[Path]) -> Path | None:
+    def _merge_paths(self, new_path: Path, existing: Path) -> Path:
         """
-        尝试路径合并（端点相遇）
+        合并两条端点相遇的路径
 
         Args:
             new_path: 新路径
-            existing_paths: 现有路径列表
+            existing: 以同一节点结尾的已有路径
 
         Returns:
-            合并后的路径，如果不合并则返回 None
+            合并后的路径
         """
-        endpoint = new_path.get_leaf_node()
-        if not endpoint:
-            return None
-
-        for existing in existing_paths:
-            if existing.get_leaf_node() == endpoint and not existing.is_merged:
-                # 端点相遇，合并路径
-                merged_score = self._merge_score(new_path.score, existing.score)
-
-                merged_path = Path(
-                    nodes=new_path.nodes,  # 保留新路径的节点序列
-                    edges=new_path.edges,
-                    score=merged_score,
-                    depth=new_path.depth,
-                    parent=new_path.parent,
-                    is_merged=True,
-                    merged_from=[new_path, existing],
-                )
-
-                # 从现有列表中移除被合并的路径
-                existing_paths.remove(existing)
+        merged_score = self._merge_score(new_path.score, existing.score)
 
-                logger.debug(f"🔀 路径合并: {new_path.score:.3f} + {existing.score:.3f} → {merged_score:.3f}")
+        logger.debug(f"🔀 路径合并: {new_path.score:.3f} + {existing.score:.3f} → {merged_score:.3f}")
 
-                return merged_path
-
-        return None
+        return Path(
+            nodes=new_path.nodes,  # 保留新路径的节点序列
+            edges=new_path.edges,
+            score=merged_score,
+            depth=new_path.depth,
+            parent=new_path.parent,
+            is_merged=True,
+            merged_from=[new_path, existing],
+        )
 
     def _merge_score(self, score1: float, score2: float) -> float:
         """
@@ -857,7 +802,7 @@ class PathScoreExpansion:
         query_embedding: "np.ndarray"
     ) -> "np.ndarray":
         """
-        批量计算向量相似度（CPU密集型操作，移至to_thread中执行）
+        批量计算向量相似度（单次矩阵运算）
 
         Args:
             valid_embeddings: 有效的嵌入向量列表
@@ -869,7 +814,7 @@ class PathScoreExpansion:
         import numpy as np
 
         # 批量计算相似度（使用矩阵运算）
-        embeddings_matrix = np.array(valid_embeddings)
+        embeddings_matrix = np.vstack(valid_embeddings)
         query_norm = np.linalg.norm(query_embedding)
         embeddings_norms = np.linalg.norm(embeddings_matrix, axis=1)
 
@@ -1,3 +1,4 @@
+import asyncio
 import math
 import random
 import time
@@ -12,6 +13,11 @@ from src.manager.async_task_manager import AsyncTask, async_task_manager
 
 logger = get_logger("mood")
 
+# 情绪回归：距上次情绪变化多久后开始回归（秒）、每轮最多回归几次、同时进行的回归数
+REGRESSION_IDLE_SECONDS = 180
+MAX_REGRESSION_COUNT = 3
+REGRESSION_CONCURRENCY = 4
+
 
 def init_prompt():
     Prompt(
@@ -52,6 +58,20 @@ class ChatMood:
         self._initialized = False
 
         self.mood_state: str = "感觉很平静"
+        self.regression_count: int = 0
+        self.last_change_time: float = 0
+
+        # 最近一条消息的时间，没有新消息的聊天不需要重新读取历史
+        self.last_message_time: float = 0.0
+        # 同一聊天同时只允许一个情绪 LLM 请求，进行中的请求会读取到最新的聊天记录
+        self._llm_busy: bool = False
+        # 情绪回归使用的聊天记录缓存：(last_change_time, last_message_time, 可读文本)
+        self._regress_history: tuple[float, float, str] | None = None
+
+    @property
+    def is_updating(self) -> bool:
+        """是否有情绪 LLM 请求正在进行"""
+        return self._llm_busy
 
     async def _initialize(self):
         """异步初始化方法"""
@@ -109,6 +129,7 @@ class ChatMood:
 
         # 使用 DatabaseMessages 的时间字段
         message_time = message.time
+        self.last_message_time = max(self.last_message_time, message_time)
 
         # 防止负时间差
         during_last_time = max(0, message_time - self.last_change_time)
@@ -132,9 +153,20 @@ class ChatMood:
             logger.debug(f"{self.log_prefix} 情绪更新概率未达到阈值，跳过更新。概率: {update_probability:.3f}")
             return
 
+        if self._llm_busy:
+            logger.debug(f"{self.log_prefix} 已有情绪更新正在进行，合并本次更新。")
+            return
+
         logger.debug(
             f"{self.log_prefix} 更新情绪状态，感兴趣度: {interested_rate:.2f}, 更新概率: {update_probability:.2f}"
         )
+        self._llm_busy = True
+        try:
+            await self._update_mood(message_time)
+        finally:
+            self._llm_busy = False
+
+    async def _update_mood(self, message_time: float):
         message_list_before_now = await get_raw_msg_by_timestamp_with_chat_inclusive(
             chat_id=self.chat_id,
             timestamp_start=self.last_change_time,
@@ -183,11 +215,27 @@ class ChatMood:
         self.last_change_time = message_time
 
     async def regress_mood(self):
-        message_time = time.time()
+        if self._llm_busy:
+            logger.debug(f"{self.log_prefix} 已有情绪更新正在进行，跳过本次回归。")
+            return
+
+        self._llm_busy = True
+        try:
+            await self._regress_mood()
+        finally:
+            self._llm_busy = False
+
+    async def _get_regress_history(self) -> str:
+        """获取情绪回归使用的聊天记录，自上次读取后没有新消息时直接复用"""
+        cached = self._regress_history
+        if cached is not None and cached[0] == self.last_change_time and cached[1] == self.last_message_time:
+            return cached[2]
+
+        last_message_time = self.last_message_time
         message_list_before_now = await get_raw_msg_by_timestamp_with_chat_inclusive(
             chat_id=self.chat_id,
             timestamp_start=self.last_change_time,
-            timestamp_end=message_time,
+            timestamp_end=time.time(),
             limit=15,
             limit_mode="last",
         )
@@ -200,6 +248,11 @@ class ChatMood:
             truncate=True,
             show_actions=True,
         )
+        self._regress_history = (self.last_change_time, last_message_time, chat_talking_prompt)
+        return chat_talking_prompt
+
+    async def _regress_mood(self):
+        chat_talking_prompt = await self._get_regress_history()
 
         bot_name = global_config.bot.nickname
         if global_config.bot.alias_names:
@@ -241,22 +294,35 @@ class MoodRegressionTask(AsyncTask):
     async def run(self):
         logger.debug("开始情绪回归任务...")
         now = time.time()
-        for mood in self.mood_manager.mood_list:
-            if mood.last_change_time == 0:
-                continue
+        pending = [
+            mood
+            for mood in self.mood_manager.mood_list
+            if mood.last_change_time != 0
+            and now - mood.last_change_time > REGRESSION_IDLE_SECONDS
+            and mood.regression_count < MAX_REGRESSION_COUNT
+            and not mood.is_updating
+        ]
+        if not pending:
+            return
 
-            if now - mood.last_change_time > 180:
-                if mood.regression_count >= 3:
-                    continue
+        # 各聊天的回归互不依赖，限制并发后同时进行，避免聊天较多时一轮回归超过任务间隔
+        semaphore = asyncio.Semaphore(REGRESSION_CONCURRENCY)
 
+        async def regress(mood: ChatMood):
+            async with semaphore:
                 logger.debug(f"{mood.log_prefix} 开始情绪回归, 第 {mood.regression_count + 1} 次")
-                await mood.regress_mood()
+                try:
+                    await mood.regress_mood()
+                except Exception as e:
+                    logger.error(f"{mood.log_prefix} 情绪回归失败: {e}")
+
+        await asyncio.gather(*(regress(mood) for mood in pending))
 
 
 class MoodManager:
     def __init__(self):
-        self.mood_list: list[ChatMood] = []
-        """当前情绪状态"""
+        self.moods: dict[str, ChatMood] = {}
+        """当前情绪状态，按 chat_id 索引"""
         self.task_started: bool = False
         self.insomnia_chats: set[str] = set()  # 正在失眠的聊天ID列表
 
@@ -271,14 +337,17 @@ class MoodManager:
         self.task_started = True
         logger.info("情绪回归任务已启动")
 
-    def get_mood_by_chat_id(self, chat_id: str) -> ChatMood:
-        for mood in self.mood_list:
-            if mood.chat_id == chat_id:
-                return mood
+    @property
+    def mood_list(self) -> list[ChatMood]:
+        """所有聊天的情绪状态"""
+        return list(self.moods.values())
 
-        new_mood = ChatMood(chat_id)
-        self.mood_list.append(new_mood)
-        return new_mood
+    def get_mood_by_chat_id(self, chat_id: str) -> ChatMood:
+        mood = self.moods.get(chat_id)
+        if mood is None:
+            mood = ChatMood(chat_id)
+            self.moods[chat_id] = mood
+        return mood
 
 init_prompt()
 
@@ -7,8 +7,10 @@ from typing import Any
 
 import orjson
 from json_repair import repair_json
+from sqlalchemy import select
 
 from src.common.database.api.crud import CRUDBase
+from src.common.database.core import get_db_session
 from src.common.database.core.models import PersonInfo
 from src.common.database.utils.decorators import cached
 from src.common.logger import get_logger
@@ -168,6 +170,21 @@ class PersonInfoManager:
         # 将 SQLAlchemy 模型对象转换为字典
         return {c.name: getattr(record, c.name) for c in record.__table__.columns}
 
+    @staticmethod
+    async def get_nicknames(person_ids: list[str]) -> dict[str, str | None]:
+        """批量获取用户昵称，按 IN 查询分批读取，返回 {person_id: nickname}"""
+        nicknames: dict[str, str | None] = {}
+        unique_ids = list(dict.fromkeys(pid for pid in person_ids if pid))
+        batch_size = 500  # 保持在 SQLite 绑定参数上限之内
+        for i in range(0, len(unique_ids), batch_size):
+            batch = unique_ids[i : i + batch_size]
+            async with get_db_session() as session:
+                result = await session.execute(
+                    select(PersonInfo.person_id, PersonInfo.nickname).where(PersonInfo.person_id.in_(batch))
+                )
+                nicknames.update({row[0]: row[1] for row in result.all()})
+        return nicknames
+
     @staticmethod
     async def get_person_id_by_name_robust(name: str) -> str | None:
         """[新] 稳健地根据名称获取 person_id，按 person_name -> nickname 顺序回退"""
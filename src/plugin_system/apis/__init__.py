@@ -13,6 +13,7 @@ from src.plugin_system.apis import (
     database_api,
     emoji_api,
     generator_api,
+    http_api,
     llm_api,
     message_api,
     mood_api,
@@ -40,6 +41,7 @@ __all__ = [
     "emoji_api",
     "generator_api",
     "get_logger",
+    "http_api",
     "llm_api",
     "message_api",
     "mood_api",
@@ -8,7 +8,9 @@
     success, reply_set, _ = await generator_api.generate_reply(chat_stream, action_data, reasoning)
 """
 
+import asyncio
 import traceback
+from collections.abc import Awaitable, Callable
 from typing import TYPE_CHECKING, Any
 
 from rich.traceback import install
@@ -16,6 +18,8 @@ from rich.traceback import install
 from src.chat.utils.utils import process_llm_response
 from src.common.data_models.database_data_model import DatabaseMessages
 from src.common.logger import get_logger
+from src.common.message_trace import trace_span
+from src.config.config import global_config
 from src.plugin_system.base.component_types import ActionInfo
 
 if TYPE_CHECKING:
@@ -92,6 +96,7 @@ async def generate_reply(
     request_type: str = "generator_api",
     from_plugin: bool = True,
     read_mark: float = 0.0,
+    reply_segment_sender: Callable[[list[tuple[str, Any]]], Awaitable[None]] | None = None,
 ) -> tuple[bool, list[tuple[str, Any]], str | None]:
     """生成回复
 
@@ -110,9 +115,14 @@ async def generate_reply(
         model_set_with_weight: 模型配置列表，每个元素为 (TaskConfig, weight) 元组
         request_type: 请求类型（可选，记录LLM使用）
         from_plugin: 是否来自插件
+        reply_segment_sender: 分段发送回调。提供时由它负责发送全部回复：启用流式输出
+            （response_splitter.enable_stream_output）时每处理完一段就按顺序调用一次，
+            否则在生成完成后以完整回复集合调用一次；返回的回复集合仅用于记录
     Returns:
         Tuple[bool, List[Tuple[str, Any]], Optional[str]]: (是否成功, 回复集合, 提示词)
     """
+    sender_task: asyncio.Task | None = None
+    streamed_reply_set: list[tuple[str, Any]] = []  # 流式输出时已发送的分段
     try:
         # 获取回复器
         replyer = await get_replyer(chat_stream, chat_id, request_type=request_type)
@@ -147,25 +157,58 @@ async def generate_reply(
             else:
                 extra_info = f"思考过程：{thinking}"
 
+        from src.chat.utils.utils import filter_system_format_content
+
+        # 流式输出：分段后处理后放入队列，由独立任务按顺序发送，发送时的打字延迟不阻塞生成
+        segment_callback = None
+        if reply_segment_sender is not None and global_config and global_config.response_splitter.enable_stream_output:
+            segment_queue: asyncio.Queue[list[tuple[str, Any]] | None] = asyncio.Queue()
+
+            async def _drain_segments():
+                while (segment_set := await segment_queue.get()) is not None:
+                    await reply_segment_sender(segment_set)
+                    streamed_reply_set.extend(segment_set)
+
+            async def segment_callback(segment: str):
+                if segment_set := process_human_text(
+                    filter_system_format_content(segment), enable_splitter, enable_chinese_typo
+                ):
+                    segment_queue.put_nowait(segment_set)
+
+            sender_task = asyncio.create_task(_drain_segments())
+
         # 调用回复器生成回复
-        success, llm_response_dict, prompt = await replyer.generate_reply_with_context(
-            reply_to=reply_to,
-            extra_info=extra_info,
-            available_actions=available_actions,
-            enable_tool=enable_tool,
-            from_plugin=from_plugin,
-            stream_id=chat_stream.stream_id if chat_stream else chat_id,
-            reply_message=reply_message,
-        )
+        try:
+            success, llm_response_dict, prompt = await replyer.generate_reply_with_context(
+                reply_to=reply_to,
+                extra_info=extra_info,
+                available_actions=available_actions,
+                enable_tool=enable_tool,
+                from_plugin=from_plugin,
+                stream_id=chat_stream.stream_id if chat_stream else chat_id,
+                reply_message=reply_message,
+                segment_callback=segment_callback,
+            )
+        finally:
+            if sender_task is not None:
+                # 等待已生成的分段全部发送完毕（生成出错时也要结束发送任务）
+                segment_queue.put_nowait(None)
+                await sender_task
         if not success:
+            if streamed_reply_set:
+                logger.warning("[GeneratorAPI] 回复生成中途失败，已发送的分段作为本次回复")
+                return True, streamed_reply_set, prompt if return_prompt else None
             logger.warning("[GeneratorAPI] 回复生成失败")
             return False, [], None
         assert llm_response_dict is not None, "llm_response_dict不应为None"  # 虽然说不会出现llm_response为空的情况
-        if content := llm_response_dict.get("content", ""):
+        if sender_task is not None:
+            reply_set = streamed_reply_set
+        elif content := llm_response_dict.get("content", ""):
             # 处理为拟人化文本
-            from src.chat.utils.utils import filter_system_format_content
             content = filter_system_format_content(content)
             reply_set = process_human_text(content, enable_splitter, enable_chinese_typo)
+            if reply_set and reply_segment_sender is not None:
+                await reply_segment_sender(reply_set)
         else:
             reply_set = []
         logger.debug(f"[GeneratorAPI] 回复生成成功，生成了 {len(reply_set)} 个回复项")
@@ -180,12 +223,17 @@ async def generate_reply(
 
     except UserWarning as uw:
         logger.warning(f"[GeneratorAPI] 中断了生成: {uw}")
-        return False, [], None
+        # 已有分段发出时，回复确实发生了，按已发送的部分记录
+        return bool(streamed_reply_set), streamed_reply_set, None
 
     except Exception as e:
         logger.error(f"[GeneratorAPI] 生成回复时出错: {e}")
         logger.error(traceback.format_exc())
-        return False, [], None
+        return bool(streamed_reply_set), streamed_reply_set, None
+
+    finally:
+        if sender_task is not None and not sender_task.done():
+            sender_task.cancel()
 
 
 async def rewrite_reply(
@@ -272,7 +320,8 @@ def process_human_text(content: str, enable_splitter: bool, enable_chinese_typo:
         raise ValueError("content 必须是字符串类型")
     try:
         # 处理LLM响应
-        processed_response = process_llm_response(content, enable_splitter, enable_chinese_typo)
+        with trace_span("post_process"):
+            processed_response = process_llm_response(content, enable_splitter, enable_chinese_typo)
 
         reply_set = []
         for text in processed_response:
@@ -0,0 +1,439 @@
+"""
+HTTP客户端API模块
+
+为插件提供共享的出站HTTP客户端，避免每次请求都重新建立连接：
+- 按代理 / SSL 配置复用 aiohttp 连接池（keep-alive），会话之间不共享 Cookie
+- 按主机限制并发请求数，排队的请求不会占满连接池
+- 统一的超时、重试（指数退避，遵循 Retry-After）与响应大小限制
+- 按主机记录请求数、失败、重试、流量与耗时
+- 程序退出时统一关闭
+
+使用方式：
+    from src.plugin_system.apis import http_api
+
+    # 普通请求：读取完整响应体
+    response = await http_api.get("https://example.com/api", params={"q": "test"})
+    response.raise_for_status()
+    data = response.json()
+
+    # 非幂等请求默认不重试，可以显式传入重试策略
+    response = await http_api.post(url, json=payload, retry=http_api.RetryPolicy(max_retries=2))
+
+    # 流式读取（大文件、音视频），在并发限制内持有原始 aiohttp 响应
+    async with http_api.stream("GET", url) as resp:
+        async for chunk in resp.content.iter_chunked(65536):
+            ...
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+import orjson
+
+from src.common.logger import get_logger
+from src.common.tcp_connector import ssl_context
+
+logger = get_logger("http_api")
+
+# 默认可以安全重试的请求方法
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class HttpClientError(Exception):
+    """请求失败（连接错误、超时等）"""
+
+
+class HttpStatusError(HttpClientError):
+    """响应状态码表示失败"""
+
+    def __init__(self, response: "HttpResponse"):
+        super().__init__(f"HTTP {response.status}: {response.url}")
+        self.response = response
+
+
+class ResponseTooLargeError(HttpClientError):
+    """响应体超过大小限制"""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """重试策略"""
+
+    max_retries: int = 2
+    backoff_base: float = 0.5  # 首次重试前的等待时间（秒），之后按指数增长
+    backoff_max: float = 8.0
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    idempotent_only: bool = True  # 为 True 时非幂等请求（如 POST）不重试
+
+    def attempts_for(self, method: str) -> int:
+        if self.idempotent_only and method.upper() not in IDEMPOTENT_METHODS:
+            return 1
+        return self.max_retries + 1
+
+    def delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """第 attempt 次失败后的等待时间，带少量随机抖动"""
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        delay = min(self.backoff_max, self.backoff_base * (2**attempt))
+        return delay * random.uniform(0.8, 1.2)
+
+
+NO_RETRY = RetryPolicy(max_retries=0)
+
+
+@dataclass
+class HttpResponse:
+    """已读取完整响应体的响应"""
+
+    status: int
+    url: str
+    headers: dict[str, str]
+    content: bytes
+    elapsed: float
+    charset: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def text(self, encoding: str | None = None) -> str:
+        return self.content.decode(encoding or self.charset or "utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return orjson.loads(self.content)
+
+    def raise_for_status(self) -> "HttpResponse":
+        if not self.ok:
+            raise HttpStatusError(self)
+        return self
+
+
+@dataclass
+class HostStats:
+    """单个主机的请求统计"""
+
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes_received: int = 0
+    total_time: float = 0.0
+    in_flight: int = 0
+    status_counts: dict[int, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes_received": self.bytes_received,
+            "avg_latency_ms": round(self.total_time / self.requests * 1000, 1) if self.requests else 0.0,
+            "in_flight": self.in_flight,
+            "status_counts": dict(sorted(self.status_counts.items())),
+        }
+
+
+class HttpClientManager:
+    """共享HTTP连接池管理器"""
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        max_connections: int = 100,
+        per_host_limit: int = 8,
+        max_retries: int = 2,
+        max_response_bytes: int = 20 * 1024 * 1024,
+    ):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.default_retry = RetryPolicy(max_retries=max_retries)
+        self.max_response_bytes = max_response_bytes
+        self._sessions: dict[tuple[str, bool], aiohttp.ClientSession] = {}
+        self._host_limits: dict[str, int] = {}
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._stats: dict[str, HostStats] = {}
+
+    # ===== 连接池 =====
+
+    def get_session(self, proxy: str | None = None, verify_ssl: bool = True) -> aiohttp.ClientSession:
+        """
+        获取共享的 aiohttp 会话
+
+        HTTP 代理按请求传入，共用同一个连接池；SOCKS 代理需要独立的连接器，按代理地址区分。
+        返回的会话由管理器持有，调用方不要关闭它。
+        """
+        socks_proxy = proxy if proxy and proxy.startswith("socks") else ""
+        key = (socks_proxy, verify_ssl)
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=self._create_connector(socks_proxy, verify_ssl),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                cookie_jar=aiohttp.DummyCookieJar(),  # 共享会话不保存 Cookie，需要时按请求传入
+            )
+            self._sessions[key] = session
+        return session
+
+    def _create_connector(self, socks_proxy: str, verify_ssl: bool) -> aiohttp.BaseConnector:
+        ssl: Any = ssl_context if verify_ssl else False
+        if socks_proxy:
+            try:
+                from aiohttp_socks import ProxyConnector
+            except ImportError as e:
+                raise HttpClientError("使用 SOCKS 代理需要安装 aiohttp_socks") from e
+            return ProxyConnector.from_url(socks_proxy, ssl=ssl, limit=self.max_connections)
+        return aiohttp.TCPConnector(ssl=ssl, limit=self.max_connections, ttl_dns_cache=300)
+
+    # ===== 并发限制与统计 =====
+
+    def set_host_limit(self, host: str, limit: int) -> None:
+        """设置指定主机的并发请求上限（对之后获取信号量的请求生效）"""
+        self._host_limits[host] = max(1, limit)
+        self._host_semaphores.pop(host, None)
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            limit = self._host_limits.get(host, self.per_host_limit)
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _host_stats(self, host: str) -> HostStats:
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = self._stats[host] = HostStats()
+        return stats
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "sessions": len([s for s in self._sessions.values() if not s.closed]),
+            "hosts": {host: stats.to_dict() for host, stats in sorted(self._stats.items())},
+        }
+
+    # ===== 请求 =====
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        proxy: str | None = None,
+        verify_ssl: bool = True,
+        timeout: float | None = None,
+        retry: RetryPolicy | None = None,
+        max_bytes: int | None = None,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        """
+        发送请求并读取完整响应体
+
+        Args:
+            method: 请求方法
+            url: 请求地址
+            proxy: 代理地址（http/https/socks5）
+            verify_ssl: 是否校验证书
+            timeout: 总超时（秒），默认使用配置值
+            retry: 重试策略，默认只对幂等请求重试；传入 NO_RETRY 关闭重试
+            max_bytes: 响应体大小上限，默认使用配置值
+            **kwargs: 透传给 aiohttp 的参数（headers、params、json、data、cookies 等）
+
+        Raises:
+            HttpClientError: 连接失败或超时（重试耗尽后）
+            ResponseTooLargeError: 响应体超过大小限制
+        """
+        method = method.upper()
+        policy = retry or self.default_retry
+        attempts = policy.attempts_for(method)
+        limit = self.max_response_bytes if max_bytes is None else max_bytes
+        host = urlsplit(url).netloc
+        stats = self._host_stats(host)
+        session = self.get_session(proxy, verify_ssl)
+        if proxy and not proxy.startswith("socks"):
+            kwargs["proxy"] = proxy
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+        for attempt in range(attempts):
+            begin = time.perf_counter()
+            try:
+                async with self._semaphore(host):
+                    stats.in_flight += 1
+                    try:
+                        async with session.request(method, url, **kwargs) as resp:
+                            content = await self._read_body(resp, limit)
+                            response = HttpResponse(
+                                status=resp.status,
+                                url=str(resp.url),
+                                headers=dict(resp.headers),
+                                content=content,
+                                elapsed=time.perf_counter() - begin,
+                                charset=resp.charset,
+                            )
+                    finally:
+                        stats.in_flight -= 1
+            except ResponseTooLargeError:
+                stats.errors += 1
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                stats.requests += 1
+                stats.total_time += time.perf_counter() - begin
+                if attempt + 1 >= attempts:
+                    stats.errors += 1
+                    raise HttpClientError(f"{method} {url} 失败: {type(e).__name__}: {e}") from e
+                stats.retries += 1
+                delay = policy.delay(attempt)
+                logger.debug(f"{method} {url} 失败（{type(e).__name__}），{delay:.1f}s 后重试")
+                await asyncio.sleep(delay)
+                continue
+
+            stats.requests += 1
+            stats.total_time += response.elapsed
+            stats.bytes_received += len(response.content)
+            stats.status_counts[response.status] = stats.status_counts.get(response.status, 0) + 1
+
+            if response.status in policy.retry_statuses and attempt + 1 < attempts:
+                stats.retries += 1
+                delay = policy.delay(attempt, response.headers.get("Retry-After"))
+                logger.debug(f"{method} {url} 返回 {response.status}，{delay:.1f}s 后重试")
+                await asyncio.sleep(delay)
+                continue
+            if not response.ok:
+                stats.errors += 1
+            return response
+
+        raise HttpClientError(f"{method} {url} 失败")  # 不会到达，循环中总会返回或抛出
+
+    @staticmethod
+    async def _read_body(resp: aiohttp.ClientResponse, limit: int) -> bytes:
+        if limit > 0 and resp.content_length is not None and resp.content_length > limit:
+            raise ResponseTooLargeError(f"响应体 {resp.content_length} 字节，超过上限 {limit} 字节: {resp.url}")
+        chunks = []
+        size = 0
+        async for chunk in resp.content.iter_chunked(READ_CHUNK_SIZE):
+            size += len(chunk)
+            if limit > 0 and size > limit:
+                raise ResponseTooLargeError(f"响应体超过上限 {limit} 字节: {resp.url}")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        *,
+        proxy: str | None = None,
+        verify_ssl: bool = True,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """流式请求：在主机并发限制内返回原始 aiohttp 响应，不重试、不限制大小"""
+        host = urlsplit(url).netloc
+        stats = self._host_stats(host)
+        session = self.get_session(proxy, verify_ssl)
+        if proxy and not proxy.startswith("socks"):
+            kwargs["proxy"] = proxy
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+        begin = time.perf_counter()
+        async with self._semaphore(host):
+            stats.in_flight += 1
+            try:
+                async with session.request(method.upper(), url, **kwargs) as resp:
+                    stats.status_counts[resp.status] = stats.status_counts.get(resp.status, 0) + 1
+                    yield resp
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                stats.errors += 1
+                raise
+            finally:
+                stats.in_flight -= 1
+                stats.requests += 1
+                stats.total_time += time.perf_counter() - begin
+
+    async def close(self) -> None:
+        """关闭所有连接池"""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+
+_http_client: HttpClientManager | None = None
+
+
+def get_http_client() -> HttpClientManager:
+    """获取共享HTTP客户端单例（参数来自 plugin_http_system 配置）"""
+    global _http_client
+    if _http_client is None:
+        from src.config.config import global_config
+
+        cfg = getattr(global_config, "plugin_http_system", None) if global_config is not None else None
+        if cfg is not None:
+            _http_client = HttpClientManager(
+                timeout=cfg.client_timeout,
+                max_connections=cfg.client_max_connections,
+                per_host_limit=cfg.client_per_host_limit,
+                max_retries=cfg.client_max_retries,
+                max_response_bytes=cfg.client_max_response_bytes,
+            )
+        else:
+            _http_client = HttpClientManager()
+    return _http_client
+
+
+# ===== 便捷函数 =====
+
+
+async def request(method: str, url: str, **kwargs: Any) -> HttpResponse:
+    """发送请求并读取完整响应体，参数见 HttpClientManager.request"""
+    return await get_http_client().request(method, url, **kwargs)
+
+
+async def get(url: str, **kwargs: Any) -> HttpResponse:
+    return await get_http_client().request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs: Any) -> HttpResponse:
+    return await get_http_client().request("POST", url, **kwargs)
+
+
+def stream(method: str, url: str, **kwargs: Any):
+    """流式请求，用法: async with http_api.stream("GET", url) as resp: ..."""
+    return get_http_client().stream(method, url, **kwargs)
+
+
+def get_session(proxy: str | None = None, verify_ssl: bool = True) -> aiohttp.ClientSession:
+    """获取共享的 aiohttp 会话（用于需要直接使用 aiohttp 接口的场景，不要关闭）"""
+    return get_http_client().get_session(proxy, verify_ssl)
+
+
+def set_host_limit(host: str, limit: int) -> None:
+    """设置指定主机（含端口）的并发请求上限"""
+    get_http_client().set_host_limit(host, limit)
+
+
+def get_stats() -> dict[str, Any]:
+    """获取各主机的请求统计"""
+    return get_http_client().get_stats()
+
+
+async def close() -> None:
+    """关闭共享连接池（程序退出时调用）"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.close()
+        _http_client = None
@@ -27,6 +27,7 @@ from src.chat.utils.chat_message_builder import (
     num_new_messages_since,
     num_new_messages_since_with_users,
 )
+from src.common.message_repository import count_messages_grouped
 from src.config.config import global_config
 
 # =============================================================================
@@ -407,6 +408,30 @@ async def count_new_messages_for_users(chat_id: str, start_time: float, end_time
     return await num_new_messages_since_with_users(chat_id, start_time, end_time, person_ids)
 
 
+async def count_messages_by_group(
+    start_time: float, end_time: float, group_by: tuple[str, ...] = ("chat_id", "user_id")
+) -> list[tuple[Any, ...]]:
+    """
+    按字段分组统计指定时间范围内的消息数量（在数据库中聚合）
+
+    Args:
+        start_time: 开始时间戳
+        end_time: 结束时间戳
+        group_by: 分组字段，例如 ("chat_id",) 或 ("chat_id", "user_id")
+
+    Returns:
+        List[Tuple]: [(分组值..., 数量), ...]
+
+    Raises:
+        ValueError: 如果参数不合法
+    """
+    if not isinstance(start_time, int | float) or not isinstance(end_time, int | float):
+        raise ValueError("start_time 和 end_time 必须是数字类型")
+    if not group_by:
+        raise ValueError("group_by 不能为空")
+    return await count_messages_grouped(start_time, end_time, tuple(group_by))
+
+
 # =============================================================================
 # 消息格式化API函数
 # =============================================================================
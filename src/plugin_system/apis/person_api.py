@@ -77,6 +77,17 @@ async def get_person_info(person_id: str) -> dict[str, Any]:
         return {}
 
 
+async def get_person_nicknames(person_ids: list[str]) -> dict[str, str | None]:
+    """批量获取用户昵称，返回 {person_id: nickname}，未找到的用户不包含在结果中"""
+    if not person_ids:
+        return {}
+    try:
+        return await PersonInfoManager.get_nicknames(person_ids)
+    except Exception as e:
+        logger.error(f"[PersonAPI] 批量获取用户昵称失败: count={len(person_ids)}, error={e}")
+        return {}
+
+
 async def get_person_impression(person_id: str, short: bool = False) -> str:
     """获取对用户的印象
 
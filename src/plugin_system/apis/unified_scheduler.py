@@ -378,7 +378,10 @@ class UnifiedScheduler:
         try:
             from src.plugin_system.core.event_manager import event_manager
 
-            event_manager.register_scheduler_callback(self._handle_event_trigger)
+            # 只有存在订阅任务的事件才会通知调度器
+            event_manager.register_scheduler_callback(
+                self._handle_event_trigger, event_names=list(self._event_subscriptions.keys())
+            )
             logger.debug("调度器已注册到 event_manager")
         except ImportError:
             logger.warning("无法导入 event_manager，事件触发功能将不可用")
@@ -715,11 +718,7 @@ class UnifiedScheduler:
 
             # 清理事件订阅
             if task.trigger_type == TriggerType.EVENT:
-                event_name = task.trigger_config.get("event_name")
-                if event_name and event_name in self._event_subscriptions:
-                    self._event_subscriptions[event_name].discard(task.schedule_id)
-                    if not self._event_subscriptions[event_name]:
-                        del self._event_subscriptions[event_name]
+                self._remove_event_subscription(task.trigger_config.get("event_name"), task.schedule_id)
 
             # 添加到已完成列表
             self._completed_tasks.append(task)
@@ -730,6 +729,33 @@ class UnifiedScheduler:
 
     # ==================== 事件触发处理 ====================
 
+    def _remove_event_subscription(self, event_name: str | EventType | None, schedule_id: str) -> None:
+        """移除任务的事件订阅，事件无订阅任务时通知 event_manager 不再转发"""
+        if not event_name or event_name not in self._event_subscriptions:
+            return
+        self._event_subscriptions[event_name].discard(schedule_id)
+        if not self._event_subscriptions[event_name]:
+            del self._event_subscriptions[event_name]
+            # EventType 与其字符串值视为同一事件，两者都没有订阅时才取消关注
+            normalized = event_name.value if isinstance(event_name, EventType) else event_name
+            if not any(
+                (key.value if isinstance(key, EventType) else key) == normalized for key in self._event_subscriptions
+            ):
+                self._set_event_interest(event_name, interested=False)
+            logger.debug(f"事件 '{event_name}' 已无订阅任务")
+
+    @staticmethod
+    def _set_event_interest(event_name: str | EventType, interested: bool) -> None:
+        """同步调度器对事件的关注状态到 event_manager"""
+        try:
+            from src.plugin_system.core.event_manager import event_manager
+        except ImportError:
+            return
+        if interested:
+            event_manager.add_scheduler_event_interest(event_name)
+        else:
+            event_manager.remove_scheduler_event_interest(event_name)
+
     async def _handle_event_trigger(self, event_name: str | EventType, event_params: dict[str, Any]) -> None:
         """处理来自 event_manager 的事件通知（无锁设计）"""
         task_ids = self._event_subscriptions.get(event_name, set())
@@ -997,6 +1023,8 @@ class UnifiedScheduler:
             event_name = trigger_config.get("event_name")
             if not event_name:
                 raise ValueError("事件触发类型必须提供 event_name")
+            if not self._event_subscriptions[event_name]:
+                self._set_event_interest(event_name, interested=True)
             self._event_subscriptions[event_name].add(schedule_id)
             logger.debug(f"任务 {task_name} 订阅事件: {event_name}")
 
@@ -1029,12 +1057,7 @@ class UnifiedScheduler:
 
         # 清理事件订阅
         if task.trigger_type == TriggerType.EVENT:
-            event_name = task.trigger_config.get("event_name")
-            if event_name and event_name in self._event_subscriptions:
-                self._event_subscriptions[event_name].discard(schedule_id)
-                if not self._event_subscriptions[event_name]:
-                    del self._event_subscriptions[event_name]
-                    logger.debug(f"事件 '{event_name}' 已无订阅任务")
+            self._remove_event_subscription(task.trigger_config.get("event_name"), schedule_id)
 
         logger.debug(f"移除调度任务: {task.task_name}")
         return True
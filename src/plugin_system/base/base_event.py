@@ -85,22 +85,82 @@ class HandlerResultsCollection:
         }
 
 
+# 没有订阅者时返回的共享空结果，避免每次触发都创建新对象
+EMPTY_RESULTS = HandlerResultsCollection([])
+
+
+def _get_handler_name(subscriber: "BaseEventHandler") -> str:
+    return subscriber.handler_name if hasattr(subscriber, "handler_name") else subscriber.__class__.__name__
+
+
 class BaseEvent:
     def __init__(
         self, name: str, allowed_subscribers: list[str] | None = None, allowed_triggers: list[str] | None = None
     ):
         self.name = name
-        self.enabled = True
+        self._enabled = True
         self.allowed_subscribers = allowed_subscribers  # 记录事件处理器名
         self.allowed_triggers = allowed_triggers  # 记录插件名
 
         self.subscribers: list["BaseEventHandler"] = []  # 订阅该事件的事件处理器列表
 
+        # 预编译的分发计划：按权重排序后的 (处理器, 处理器名) 元组，订阅关系或启用状态变化时失效
+        self._dispatch_plan: tuple[tuple["BaseEventHandler", str], ...] | None = None
+
         self.event_handle_lock = asyncio.Lock()
 
     def __name__(self):
         return self.name
 
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = value
+        self.invalidate_dispatch_plan()
+
+    def add_subscriber(self, subscriber: "BaseEventHandler") -> None:
+        """添加订阅者并使分发计划失效"""
+        self.subscribers.append(subscriber)
+        # 按权重从高到低排序订阅者
+        self.subscribers.sort(key=lambda h: getattr(h, "weight", 0), reverse=True)
+        self.invalidate_dispatch_plan()
+
+    def remove_subscriber(self, subscriber: "BaseEventHandler") -> None:
+        """移除订阅者并使分发计划失效"""
+        self.subscribers.remove(subscriber)
+        self.invalidate_dispatch_plan()
+
+    def invalidate_dispatch_plan(self) -> None:
+        """使分发计划失效，下次激活时重新构建
+
+        直接修改 subscribers 列表后需要调用此方法
+        """
+        self._dispatch_plan = None
+
+    def get_dispatch_plan(self) -> tuple[tuple["BaseEventHandler", str], ...]:
+        """获取分发计划（事件禁用时为空）"""
+        plan = self._dispatch_plan
+        if plan is None:
+            if not self._enabled:
+                plan = ()
+            else:
+                sorted_subscribers = sorted(
+                    self.subscribers,
+                    key=lambda h: h.weight if hasattr(h, "weight") and h.weight != -1 else 0,
+                    reverse=True,
+                )
+                plan = tuple((subscriber, _get_handler_name(subscriber)) for subscriber in sorted_subscribers)
+            self._dispatch_plan = plan
+        return plan
+
+    @property
+    def has_active_subscribers(self) -> bool:
+        """事件是否启用且存在订阅者"""
+        return bool(self.get_dispatch_plan())
+
     async def activate(
         self, params: dict, handler_timeout: float | None = None, max_concurrency: int | None = None
     ) -> HandlerResultsCollection:
@@ -112,72 +172,38 @@ class BaseEvent:
         Returns:
             HandlerResultsCollection: 所有处理器的执行结果集合
         """
-        if not self.enabled:
-            return HandlerResultsCollection([])
-
         # 移除全局锁，允许同一事件并发触发
         # async with self.event_handle_lock:
-        sorted_subscribers = sorted(
-            self.subscribers, key=lambda h: h.weight if hasattr(h, "weight") and h.weight != -1 else 0, reverse=True
-        )
-
-        if not sorted_subscribers:
-            return HandlerResultsCollection([])
+        plan = self.get_dispatch_plan()
+        if not plan:
+            return EMPTY_RESULTS
+
+        # 单个订阅者直接执行，无需创建任务
+        if len(plan) == 1:
+            subscriber, handler_name = plan[0]
+            return HandlerResultsCollection(
+                [await self._run_handler(subscriber, handler_name, params, handler_timeout, None)]
+            )
 
         concurrency_limit = None
         if max_concurrency is not None:
             concurrency_limit = max_concurrency if max_concurrency > 0 else None
             if concurrency_limit:
-                concurrency_limit = min(concurrency_limit, len(sorted_subscribers))
+                concurrency_limit = min(concurrency_limit, len(plan))
 
-        semaphore = (
-            asyncio.Semaphore(concurrency_limit)
-            if concurrency_limit and concurrency_limit < len(sorted_subscribers)
-            else None
-        )
-
-        async def _run_handler(subscriber):
-            handler_name = (
-                subscriber.handler_name if hasattr(subscriber, "handler_name") else subscriber.__class__.__name__
-            )
+        semaphore = asyncio.Semaphore(concurrency_limit) if concurrency_limit and concurrency_limit < len(plan) else None
 
-            async def _invoke():
-                return await self._execute_subscriber(subscriber, params)
-
-            try:
-                if handler_timeout and handler_timeout > 0:
-                    result = await asyncio.wait_for(_invoke(), timeout=handler_timeout)
-                else:
-                    result = await _invoke()
-            except asyncio.TimeoutError:
-                logger.warning(f"事件处理器 {handler_name} 执行超时 ({handler_timeout}s)")
-                return HandlerResult(False, True, f"timeout after {handler_timeout}s", handler_name)
-            except Exception as exc:
-                logger.error(f"事件处理器 {handler_name} 执行失败: {exc}")
-                return HandlerResult(False, True, str(exc), handler_name)
-
-            if not isinstance(result, HandlerResult):
-                return HandlerResult(True, True, result, handler_name)
-
-            if not result.handler_name:
-                result.handler_name = handler_name
-            return result
-
-        async def _guarded_run(subscriber):
-            if semaphore:
-                async with semaphore:
-                    return await _run_handler(subscriber)
-            return await _run_handler(subscriber)
-
-        tasks = [asyncio.create_task(_guarded_run(subscriber)) for subscriber in sorted_subscribers]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await asyncio.gather(
+            *(
+                self._run_handler(subscriber, handler_name, params, handler_timeout, semaphore)
+                for subscriber, handler_name in plan
+            ),
+            return_exceptions=True,
+        )
 
         processed_results: list[HandlerResult] = []
-        for subscriber, result in zip(sorted_subscribers, results):
-            handler_name = (
-                subscriber.handler_name if hasattr(subscriber, "handler_name") else subscriber.__class__.__name__
-            )
-            if isinstance(result, Exception):
+        for (_, handler_name), result in zip(plan, results):
+            if isinstance(result, BaseException):
                 logger.error(f"事件处理器 {handler_name} 执行失败: {result}")
                 processed_results.append(HandlerResult(False, True, str(result), handler_name))
             else:
@@ -185,6 +211,38 @@ class BaseEvent:
 
         return HandlerResultsCollection(processed_results)
 
+    async def _run_handler(
+        self,
+        subscriber: "BaseEventHandler",
+        handler_name: str,
+        params: dict,
+        handler_timeout: float | None,
+        semaphore: asyncio.Semaphore | None,
+    ) -> HandlerResult:
+        """执行单个处理器，统一处理超时、异常与返回值"""
+        if semaphore:
+            async with semaphore:
+                return await self._run_handler(subscriber, handler_name, params, handler_timeout, None)
+
+        try:
+            if handler_timeout and handler_timeout > 0:
+                result = await asyncio.wait_for(self._execute_subscriber(subscriber, params), timeout=handler_timeout)
+            else:
+                result = await self._execute_subscriber(subscriber, params)
+        except asyncio.TimeoutError:
+            logger.warning(f"事件处理器 {handler_name} 执行超时 ({handler_timeout}s)")
+            return HandlerResult(False, True, f"timeout after {handler_timeout}s", handler_name)
+        except Exception as exc:
+            logger.error(f"事件处理器 {handler_name} 执行失败: {exc}")
+            return HandlerResult(False, True, str(exc), handler_name)
+
+        if not isinstance(result, HandlerResult):
+            return HandlerResult(True, True, result, handler_name)
+
+        if not result.handler_name:
+            result.handler_name = handler_name
+        return result
+
     @staticmethod
     async def _execute_subscriber(subscriber, params: dict) -> HandlerResult:
         """执行单个订阅者处理器"""
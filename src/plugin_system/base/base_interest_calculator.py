@@ -110,6 +110,19 @@ class BaseInterestCalculator(ABC):
         """
         pass
 
+    async def execute_batch(self, messages: list["DatabaseMessages"]) -> list[InterestCalculationResult]:
+        """批量执行兴趣值计算
+
+        默认逐条调用 execute，子类可重写以在同一批消息之间共享查询（如批量获取 embedding、关系分）
+
+        Args:
+            messages: 数据库消息对象列表（同一聊天流、按到达顺序）
+
+        Returns:
+            list[InterestCalculationResult]: 与 messages 一一对应的计算结果
+        """
+        return [await self.execute(message) for message in messages]
+
     async def initialize(self) -> bool:
         """初始化组件
 
@@ -197,6 +210,43 @@ class BaseInterestCalculator(ABC):
             self._update_statistics(result)
             return result
 
+    async def _safe_execute_batch(self, messages: list["DatabaseMessages"]) -> list[InterestCalculationResult]:
+        """安全执行批量计算，包含统计和错误处理"""
+        if not self._enabled:
+            return [
+                InterestCalculationResult(
+                    success=False,
+                    message_id=getattr(message, "message_id", ""),
+                    interest_value=0.0,
+                    error_message="组件未启用",
+                )
+                for message in messages
+            ]
+
+        start_time = time.time()
+        try:
+            results = await self.execute_batch(messages)
+            if len(results) != len(messages):
+                raise ValueError(f"批量计算结果数量({len(results)})与消息数量({len(messages)})不一致")
+        except Exception as e:
+            results = [
+                InterestCalculationResult(
+                    success=False,
+                    message_id=getattr(message, "message_id", ""),
+                    interest_value=0.0,
+                    error_message=f"计算执行失败: {e!s}",
+                )
+                for message in messages
+            ]
+
+        # 批量计算的耗时按消息数均摊
+        average_time = (time.time() - start_time) / max(1, len(messages))
+        for result in results:
+            if not result.calculation_time:
+                result.calculation_time = average_time
+            self._update_statistics(result)
+        return results
+
     def get_config(self, key: str, default: Any = None) -> Any:
         """获取插件配置，支持嵌套键访问"""
         if not self.plugin_config:
@@ -396,6 +396,10 @@ class PluginBase(ABC):
         """插件加载完成后的钩子函数"""
         pass
 
+    async def on_plugin_unloaded(self):
+        """插件卸载时的异步钩子函数，用于停止后台任务、关闭连接等"""
+        pass
+
     def on_unload(self):
         """插件卸载时的钩子函数"""
         pass
@@ -8,7 +8,7 @@ from typing import Any, Optional
 
 from src.common.logger import get_logger
 from src.config.config import global_config
-from src.plugin_system.base.base_event import BaseEvent, HandlerResultsCollection
+from src.plugin_system.base.base_event import EMPTY_RESULTS, BaseEvent, HandlerResultsCollection
 from src.plugin_system.base.base_events_handler import BaseEventHandler
 from src.plugin_system.base.component_types import EventType
 
@@ -41,6 +41,7 @@ class EventManager:
         self._event_handlers: dict[str, BaseEventHandler] = {}
         self._pending_subscriptions: dict[str, list[str]] = {}  # 缓存失败的订阅
         self._scheduler_callback: Any | None = None  # scheduler 回调函数
+        self._scheduler_event_names: set[str] = set()  # scheduler 关心的事件名，其他事件不会通知 scheduler
         plugin_cfg = getattr(global_config, "plugin_http_system", None)
         self._default_handler_timeout: float | None = (
             getattr(plugin_cfg, "event_handler_timeout", 30.0) if plugin_cfg else 30.0
@@ -243,7 +244,7 @@ class EventManager:
             # 创建订阅者列表的副本进行迭代，以安全地修改原始列表
             for subscriber in list(event.subscribers):
                 if getattr(subscriber, 'handler_name', None) == handler_name:
-                    event.subscribers.remove(subscriber)
+                    event.remove_subscriber(subscriber)
                     logger.debug(f"事件处理器 {handler_name} 已从事件 {event.name} 取消订阅。")
 
         logger.info(f"事件处理器 {handler_name} 已被完全移除。")
@@ -279,10 +280,8 @@ class EventManager:
             logger.warning(f"事件处理器 {handler_name} 不在事件 {event_name} 的订阅者白名单中，无法订阅")
             return False
 
-        event.subscribers.append(handler_instance)
-
-        # 按权重从高到低排序订阅者
-        event.subscribers.sort(key=lambda h: getattr(h, "weight", 0), reverse=True)
+        # 添加订阅者（按权重从高到低排序，并使分发计划失效）
+        event.add_subscriber(handler_instance)
 
         logger.info(f"事件处理器 {handler_name} 成功订阅到事件 {event_name}，当前权重排序完成")
         return True
@@ -306,7 +305,7 @@ class EventManager:
         removed = False
         for subscriber in event.subscribers[:]:
             if hasattr(subscriber, "handler_name") and subscriber.handler_name == handler_name:
-                event.subscribers.remove(subscriber)
+                event.remove_subscriber(subscriber)
                 removed = True
                 break
 
@@ -351,8 +350,6 @@ class EventManager:
         Returns:
             HandlerResultsCollection: 所有处理器的执行结果，事件不存在返回None
         """
-        params = kwargs or {}
-
         event = self.get_event(event_name)
         if event is None:
             logger.error(f"事件 {event_name} 不存在，无法触发")
@@ -366,11 +363,20 @@ class EventManager:
             logger.warning(f"插件 {permission_group} 没有权限触发事件 {event_name}，已拒绝触发！")
             return None
 
+        scheduler_interested = self._scheduler_callback is not None and event.name in self._scheduler_event_names
+
+        # 快速路径：没有启用的订阅者且 scheduler 不关心该事件时直接返回
+        if not scheduler_interested and not event.has_active_subscribers:
+            return EMPTY_RESULTS
+
+        params = kwargs or {}
+
         # 🔧 修复：异步通知 scheduler，避免阻塞当前事件流程
-        if hasattr(self, "_scheduler_callback") and self._scheduler_callback:
+        if scheduler_interested:
             try:
                 # 使用 create_task 异步执行，避免死锁
-                asyncio.create_task(self._scheduler_callback(event_name, params))
+                task = asyncio.create_task(self._scheduler_callback(event_name, params))
+                self._track_background_task(task)
             except Exception as e:
                 logger.error(f"调用 scheduler 回调时出错: {e}")
 
@@ -379,20 +385,37 @@ class EventManager:
 
         return await event.activate(params, handler_timeout=timeout, max_concurrency=concurrency)
 
-    def register_scheduler_callback(self, callback) -> None:
+    def register_scheduler_callback(self, callback, event_names: list[EventType | str] | None = None) -> None:
         """注册 scheduler 回调函数
 
+        只有通过 event_names 或 add_scheduler_event_interest 声明过的事件才会通知 scheduler
+
         Args:
             callback: async callable，接收 (event_name, params) 参数
+            event_names: scheduler 关心的事件名列表
         """
         self._scheduler_callback = callback
+        self._scheduler_event_names = {self._normalize_event_name(name) for name in event_names or []}
         logger.info("Scheduler 回调已注册")
 
     def unregister_scheduler_callback(self) -> None:
         """取消注册 scheduler 回调"""
         self._scheduler_callback = None
+        self._scheduler_event_names.clear()
         logger.info("Scheduler 回调已取消注册")
 
+    def add_scheduler_event_interest(self, event_name: EventType | str) -> None:
+        """声明 scheduler 关心指定事件"""
+        self._scheduler_event_names.add(self._normalize_event_name(event_name))
+
+    def remove_scheduler_event_interest(self, event_name: EventType | str) -> None:
+        """取消 scheduler 对指定事件的关注"""
+        self._scheduler_event_names.discard(self._normalize_event_name(event_name))
+
+    @staticmethod
+    def _normalize_event_name(event_name: EventType | str) -> str:
+        return event_name.value if isinstance(event_name, EventType) else event_name
+
     def emit_event(
         self,
         event_name: EventType | str,
@@ -249,6 +249,7 @@ class PluginManager:
         if plugin_name not in self.loaded_plugins:
             logger.warning(f"插件 {plugin_name} 未加载")
             return False
+        await self._call_plugin_unloaded_hook(plugin_name, self.loaded_plugins[plugin_name])
         # 调用 component_registry 中统一的卸载方法
         success = await component_registry.unregister_plugin(plugin_name)
         if success:
@@ -256,6 +257,16 @@ class PluginManager:
             del self.loaded_plugins[plugin_name]
         return success
 
+    @staticmethod
+    async def _call_plugin_unloaded_hook(plugin_name: str, plugin_instance: PluginBase) -> None:
+        """调用插件的 on_plugin_unloaded 钩子（如果存在）"""
+        if hasattr(plugin_instance, "on_plugin_unloaded") and callable(plugin_instance.on_plugin_unloaded):
+            logger.debug(f"为插件 '{plugin_name}' 调用 on_plugin_unloaded 钩子")
+            try:
+                await plugin_instance.on_plugin_unloaded()
+            except Exception as e:
+                logger.error(f"调用插件 '{plugin_name}' 的 on_plugin_unloaded 钩子时出错: {e}")
+
     async def reload_registered_plugin(self, plugin_name: str) -> bool:
         """
         重载插件模块
@@ -672,11 +683,15 @@ class PluginManager:
                     loop = None
 
                 if loop and loop.is_running():
+                    task = loop.create_task(self._call_plugin_unloaded_hook(plugin_name, plugin_instance))
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
                     # 如果在运行的事件循环中，直接创建任务，不等待结果以避免死锁
                     # 注意：这意味着我们无法确切知道卸载是否成功完成，但避免了阻塞
                     logger.warning(f"unload_plugin 在异步上下文中被调用 ({plugin_name})，将异步执行组件卸载。建议使用 remove_registered_plugin。")
                     loop.create_task(component_registry.unregister_plugin(plugin_name))
                 else:
+                    asyncio.run(self._call_plugin_unloaded_hook(plugin_name, plugin_instance))
                     asyncio.run(component_registry.unregister_plugin(plugin_name))
             except Exception as e:  # 捕获并记录卸载阶段协程调用错误
                 logger.debug(
@@ -78,7 +78,12 @@ class ReplyAction(BaseAction):
             action_data = self.action_data.copy()
             action_data["prompt_mode"] = "s4u"
             
-            # 生成回复
+            # 生成回复（分段交给 _send_response 发送，启用流式输出时首段生成后即发送）
+            sent_texts: list[str] = []
+
+            async def send_segments(segment_set) -> None:
+                sent_texts.append(await self._send_response(segment_set, is_first_batch=not sent_texts))
+
             success, response_set, _ = await generator_api.generate_reply(
                 chat_stream=self.chat_stream,
                 reply_message=reply_message,
@@ -87,14 +92,14 @@ class ReplyAction(BaseAction):
                 enable_tool=global_config.tool.enable_tool,
                 request_type="chat.replyer",
                 from_plugin=False,
+                reply_segment_sender=send_segments,
             )
             
             if not success or not response_set:
                 logger.warning(f"{self.log_prefix} 回复生成失败")
                 return False, ""
             
-            # 发送回复
-            reply_text = await self._send_response(response_set)
+            reply_text = "".join(sent_texts)
             
             logger.info(f"{self.log_prefix} reply 动作执行成功")
             return True, reply_text
@@ -108,11 +113,11 @@ class ReplyAction(BaseAction):
             traceback.print_exc()
             return False, ""
     
-    async def _send_response(self, response_set) -> str:
-        """发送回复内容"""
+    async def _send_response(self, response_set, is_first_batch: bool = True) -> str:
+        """发送回复内容（流式输出时会被多次调用，只有第一批的首条消息引用原消息且不模拟打字）"""
         reply_text = ""
         should_quote = self.action_data.get("should_quote_reply", False)
-        first_sent = False
+        first_sent = not is_first_batch
         
         # 确保 action_message 是 DatabaseMessages 类型
         reply_message = self.action_message if isinstance(self.action_message, DatabaseMessages) else None
@@ -201,7 +206,12 @@ class RespondAction(BaseAction):
             # 确保 action_message 是 DatabaseMessages 类型，否则使用 None
             reply_message = self.action_message if isinstance(self.action_message, DatabaseMessages) else None
             
-            # 生成回复
+            # 生成回复（respond 默认不引用，启用流式输出时首段生成后即发送）
+            sent_texts: list[str] = []
+
+            async def send_segments(segment_set) -> None:
+                sent_texts.append(await self._send_response(segment_set, is_first_batch=not sent_texts))
+
             success, response_set, _ = await generator_api.generate_reply(
                 chat_stream=self.chat_stream,
                 reply_message=reply_message,
@@ -210,14 +220,14 @@ class RespondAction(BaseAction):
                 enable_tool=global_config.tool.enable_tool,
                 request_type="chat.replyer",
                 from_plugin=False,
+                reply_segment_sender=send_segments,
             )
             
             if not success or not response_set:
                 logger.warning(f"{self.log_prefix} 回复生成失败")
                 return False, ""
             
-            # 发送回复（respond 默认不引用）
-            reply_text = await self._send_response(response_set)
+            reply_text = "".join(sent_texts)
             
             logger.info(f"{self.log_prefix} respond 动作执行成功")
             return True, reply_text
@@ -231,10 +241,10 @@ class RespondAction(BaseAction):
             traceback.print_exc()
             return False, ""
     
-    async def _send_response(self, response_set) -> str:
-        """发送回复内容（不引用原消息）"""
+    async def _send_response(self, response_set, is_first_batch: bool = True) -> str:
+        """发送回复内容（不引用原消息，流式输出时会被多次调用）"""
         reply_text = ""
-        first_sent = False
+        first_sent = not is_first_batch
         
         for reply_seg in response_set:
             if isinstance(reply_seg, tuple) and len(reply_seg) >= 2:
@@ -180,6 +180,47 @@ class AffinityInterestCalculator(BaseInterestCalculator):
                 success=False, message_id=getattr(message, "message_id", ""), interest_value=0.0, error_message=str(e)
             )
 
+    async def execute_batch(self, messages: list["DatabaseMessages"]) -> list[InterestCalculationResult]:
+        """批量计算兴趣值
+
+        同一批消息共享外部查询：一次请求获取所有消息的 embedding，并发预取涉及用户的关系分，
+        然后按到达顺序逐条评分（阈值调整状态需要按顺序推进）
+        """
+        if not messages:
+            return []
+
+        # 1. 批量获取 embedding
+        if self.use_smart_matching and bot_interest_manager.is_initialized:
+            text_map = {
+                str(index): content
+                for index, message in enumerate(messages)
+                if (content := getattr(message, "processed_plain_text", ""))
+                and not getattr(message, "semantic_embedding", None)
+            }
+            if text_map:
+                try:
+                    embeddings = await bot_interest_manager.generate_embeddings_for_texts(text_map)
+                    for key, vector in embeddings.items():
+                        if vector:
+                            messages[int(key)].semantic_embedding = vector
+                except Exception as e:
+                    logger.warning(f"[Affinity兴趣计算] 批量获取embedding失败，将逐条获取: {e}")
+
+        # 2. 并发预取关系分（结果写入 user_relationships 缓存）
+        user_ids = set()
+        for message in messages:
+            user_info = getattr(message, "user_info", None)
+            user_id = getattr(user_info, "user_id", "") if user_info else ""
+            if user_id and user_id not in self.user_relationships:
+                user_ids.add(user_id)
+        if user_ids:
+            await asyncio.gather(
+                *(self._calculate_relationship_score(user_id) for user_id in user_ids), return_exceptions=True
+            )
+
+        # 3. 逐条评分
+        return [await self.execute(message) for message in messages]
+
     async def _calculate_interest_match_score(
         self, message: "DatabaseMessages", content: str, keywords: list[str] | None = None
     ) -> float:
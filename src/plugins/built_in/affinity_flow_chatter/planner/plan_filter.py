@@ -17,6 +17,7 @@ from src.chat.utils.chat_message_builder import (
 from src.chat.utils.prompt import global_prompt_manager
 from src.common.data_models.info_data_model import ActionPlannerInfo, Plan
 from src.common.logger import get_logger
+from src.common.message_trace import trace_span
 from src.config.config import global_config, model_config
 from src.llm_models.utils_model import LLMRequest
 from src.mood.mood_manager import mood_manager
@@ -55,16 +56,18 @@ class ChatterPlanFilter:
         执行筛选逻辑，并填充 Plan 对象的 decided_actions 字段。
         """
         try:
-            prompt, used_message_id_list = await self._build_prompt(plan)
+            with trace_span("planner_prompt"):
+                prompt, used_message_id_list = await self._build_prompt(plan)
             plan.llm_prompt = prompt
             if global_config.debug.show_prompt:
                 logger.info(
                     f"规划器原始提示词:{prompt}"
                 )  # 叫你不要改你耳朵聋吗😡😡😡😡😡
 
-            llm_content, _ = await self.planner_llm.generate_response_async(
-                prompt=prompt
-            )
+            with trace_span("planner_llm"):
+                llm_content, _ = await self.planner_llm.generate_response_async(
+                    prompt=prompt
+                )
 
             if llm_content:
                 if global_config.debug.show_prompt:
@@ -146,31 +146,18 @@ class ChatterActionPlanner:
             logger.debug("当前无可用兴趣计算器，跳过批量兴趣计算")
             return
 
-        text_map: dict[str, str] = {}
-        for message in pending_messages:
-            text = getattr(message, "processed_plain_text", None) or getattr(message, "display_message", "") or ""
-            text_map[str(message.message_id)] = text
-
+        # 兴趣管理器会将整批消息交给计算组件的批量入口（共享 embedding 与关系分查询）
         try:
-            embeddings = await bot_interest_manager.generate_embeddings_for_texts(text_map)
+            results = await interest_manager.calculate_interest_batch(pending_messages)
         except Exception as exc:  # noqa: BLE001
-            logger.error(f"批量获取消息embedding失败: {exc}")
-            embeddings = {}
+            logger.error(f"批量计算消息兴趣失败: {exc}")
+            return
 
         interest_updates: dict[str, float] = {}
         reply_updates: dict[str, bool] = {}
 
-        for message in pending_messages:
+        for message, result in zip(pending_messages, results):
             message_id = str(message.message_id)
-            if message_id in embeddings:
-                message.semantic_embedding = embeddings[message_id]
-
-            try:
-                result = await interest_manager.calculate_interest(message)
-            except Exception as exc:  # noqa: BLE001
-                logger.error(f"批量计算消息兴趣失败: {exc}")
-                continue
-
             if result.success:
                 message.interest_value = result.interest_value
                 message.should_reply = result.should_reply
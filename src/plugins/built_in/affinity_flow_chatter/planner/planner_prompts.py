@@ -17,27 +17,12 @@ def init_prompts():
     # 核心规划器提示词，用于在接收到新消息时决定如何回应。
     # 它构建了一个复杂的上下文，包括历史记录、可用动作、角色设定等，
     # 并要求模型以 JSON 格式输出一个或多个动作组合。
+    # 人设、规则、动作列表和输出格式放在 <<PROMPT_CACHE_BOUNDARY>> 之前，时间、心情和聊天记录放在之后，
+    # 使连续的规划请求共享相同的前缀。
     Prompt(
         """
-{time_block}
-{mood_block}
 {identity_block}
-{schedule_block}
-
-{users_in_chat}
 {custom_prompt_block}
-{chat_context_description}。
-
-{actions_before_now_block}
-
-## 🤔 最近的决策历史 (回顾你之前的思考与动作，可以帮助你避免重复，并做出更有趣的连贯回应)
-{decision_history_block}
-
-## 📜 已读历史（仅供理解，不可作为动作对象）
-{read_history_block}
-
-## 📬 未读历史（只能对这里的消息执行动作）
-{unread_history_block}
 
 {moderation_prompt}
 
@@ -62,6 +47,26 @@ def init_prompts():
 - 如果没有合适的目标或无需动作，请返回空的 actions 列表： "actions": []
 
 {no_action_block}
+<<PROMPT_CACHE_BOUNDARY>>
+{time_block}
+{mood_block}
+{schedule_block}
+
+{users_in_chat}
+{chat_context_description}。
+
+{actions_before_now_block}
+
+## 🤔 最近的决策历史 (回顾你之前的思考与动作，可以帮助你避免重复，并做出更有趣的连贯回应)
+{decision_history_block}
+
+## 📜 已读历史（仅供理解，不可作为动作对象）
+{read_history_block}
+
+## 📬 未读历史（只能对这里的消息执行动作）
+{unread_history_block}
+
+请根据以上聊天内容，按照输出格式给出你的思绪流与动作组合。
 """,
         "planner_prompt",
     )
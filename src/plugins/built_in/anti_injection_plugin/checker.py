@@ -1,10 +1,20 @@
 """
 反注入检测器实现
+
+检测分为三层，越往后越贵：
+1. 规则层：所有规则合并为一个正则，一次扫描即可判断消息是否命中任何规则
+2. 置信度闸门：命中多条规则直接判定，未命中规则且没有可疑特征的消息直接放行
+3. LLM层：只处理闸门判定为"模糊"的消息（命中单条规则或带有可疑特征）
+
+检测结果按消息内容缓存（TTL + LRU），同一消息在多个群同时出现时只检测一次。
 """
 
+import asyncio
+import dataclasses
 import hashlib
 import re
 import time
+from collections import OrderedDict
 
 from src.chat.security.interfaces import (
     SecurityAction,
@@ -43,6 +53,16 @@ class AntiInjectionChecker(SecurityChecker):
         r"(紧急|urgent|emergency).{0,20}(必须|need|require).{0,20}(立即|immediately|now)",
     ]
 
+    # 可疑特征片段：单独出现不足以判定为攻击，只用于决定是否值得交给LLM复核
+    SUSPICIOUS_FRAGMENTS = [
+        "忽略", "无视", "忘记", "扮演", "假装", "设定", "人格", "提示词", "指令", "系统", "管理员", "权限",
+        "开发者", "越狱", "ignore", "disregard", "forget", "pretend", "roleplay", "jailbreak", "prompt",
+        "system", "instruction", "developer", "admin", "root", "<|im_start|>", "[INST]", "```",
+    ]
+
+    # 包含反向引用或全局内联标志的规则无法安全地合并进同一个正则，单独扫描
+    _UNMERGEABLE_PATTERN = re.compile(r"\\[1-9]|\(\?P=|^\(\?[aiLmsux]+\)")
+
     def __init__(self, config: dict | None = None, priority: int = 80):
         """初始化检测器
 
@@ -51,14 +71,22 @@ class AntiInjectionChecker(SecurityChecker):
             priority: 优先级
         """
         super().__init__(name="anti_injection", priority=priority)
-        self.config = config or {}
+        self.config = self._flatten_config(config or {})
 
         # 编译正则表达式
         self._compiled_patterns: list[re.Pattern] = []
+        self._combined_pattern: re.Pattern | None = None  # 合并后的规则，分组名 r<序号> 对应规则序号
+        self._separate_patterns: list[int] = []  # 无法合并、需要单独扫描的规则序号
         self._compile_patterns()
+        self._suspicious_pattern = re.compile(
+            "|".join(re.escape(fragment) for fragment in self.SUSPICIOUS_FRAGMENTS), re.IGNORECASE
+        )
 
-        # 缓存
-        self._cache: dict[str, SecurityCheckResult] = {}
+        # 缓存：缓存键 -> (写入时间, 检测结果)，按访问顺序淘汰
+        self._cache: OrderedDict[str, tuple[float, SecurityCheckResult]] = OrderedDict()
+        # 正在检测中的消息，相同消息并发到达时共享同一次检测
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.stats = {"checks": 0, "cache_hits": 0, "coalesced": 0, "llm_calls": 0, "llm_skipped": 0}
 
         logger.info(
             f"反注入检测器初始化完成 - 规则: {self.config.get('enabled_rules', True)}, "
@@ -76,7 +104,39 @@ class AntiInjectionChecker(SecurityChecker):
             except re.error as e:
                 logger.error(f"编译正则表达式失败: {pattern}, 错误: {e}")
 
-        logger.debug(f"已编译 {len(self._compiled_patterns)} 个检测模式")
+        mergeable = []
+        for index, compiled in enumerate(self._compiled_patterns):
+            if self._UNMERGEABLE_PATTERN.search(compiled.pattern):
+                self._separate_patterns.append(index)
+            else:
+                mergeable.append(index)
+
+        if mergeable:
+            try:
+                self._combined_pattern = re.compile(
+                    "|".join(f"(?P<r{index}>{self._compiled_patterns[index].pattern})" for index in mergeable),
+                    re.IGNORECASE | re.MULTILINE,
+                )
+            except re.error as e:
+                # 自定义规则中可能有与合并冲突的写法（如重名分组），退回逐条扫描
+                logger.warning(f"合并检测规则失败，改为逐条扫描: {e}")
+                self._combined_pattern = None
+                self._separate_patterns = list(range(len(self._compiled_patterns)))
+
+        logger.debug(
+            f"已编译 {len(self._compiled_patterns)} 个检测模式（单独扫描 {len(self._separate_patterns)} 个）"
+        )
+
+    @staticmethod
+    def _flatten_config(config: dict) -> dict:
+        """插件配置按 detection/processing/performance 分节，检测器按扁平键读取"""
+        flat = {}
+        for key, value in config.items():
+            if isinstance(value, dict):
+                flat.update(value)
+            else:
+                flat[key] = value
+        return flat
 
     async def pre_check(self, message: str, context: dict | None = None) -> bool:
         """预检查"""
@@ -108,22 +168,53 @@ class AntiInjectionChecker(SecurityChecker):
 
     async def check(self, message: str, context: dict | None = None) -> SecurityCheckResult:
         """执行检测"""
-        start_time = time.time()
-        context = context or {}
+        self.stats["checks"] += 1
+        if not self.config.get("cache_enabled", True):
+            return await self._check_uncached(message, context or {})
 
-        # 检查缓存
-        if self.config.get("cache_enabled", True):
-            cache_key = self._get_cache_key(message)
-            if cache_key in self._cache:
-                cached_result = self._cache[cache_key]
-                if self._is_cache_valid(cached_result, start_time):
-                    logger.debug(f"使用缓存结果: {cache_key[:16]}...")
-                    return cached_result
+        cache_key = self._get_cache_key(message)
+        cached_result = self._get_cached_result(cache_key)
+        if cached_result is not None:
+            self.stats["cache_hits"] += 1
+            logger.debug(f"使用缓存结果: {cache_key[:16]}...")
+            return cached_result
+
+        # 相同消息（如多个群里同时出现的广播）正在检测中，等待同一次检测的结果
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            try:
+                return dataclasses.replace(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+            # 共享的检测失败或被取消，自行检测
+            return await self._check_uncached(message, context or {})
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            result = await self._check_uncached(message, context or {})
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+        # LLM失败时的默认放行只是临时结论，不写入缓存，下次重新检测
+        if not result.details.get("llm_error"):
+            self._cache_result(cache_key, result)
+        future.set_result(result)
+        return result
+
+    async def _check_uncached(self, message: str, context: dict) -> SecurityCheckResult:
+        """执行不经过缓存的完整检测"""
+        start_time = time.time()
 
         # 检查消息长度
         max_length = self.config.get("max_message_length", 4096)
         if len(message) > max_length:
-            result = SecurityCheckResult(
+            return SecurityCheckResult(
                 is_safe=False,
                 level=SecurityLevel.HIGH_RISK,
                 confidence=1.0,
@@ -132,46 +223,83 @@ class AntiInjectionChecker(SecurityChecker):
                 matched_patterns=["MESSAGE_TOO_LONG"],
                 processing_time=time.time() - start_time,
             )
-            self._cache_result(message, result)
-            return result
 
         # 规则检测
+        rule_result = None
         if self.config.get("enabled_rules", True):
             rule_result = await self._check_by_rules(message)
-            if not rule_result.is_safe:
+
+        llm_enabled = self.config.get("enabled_llm", False)
+        if rule_result is not None and not rule_result.is_safe:
+            # 命中多条规则已足够确定；命中单条规则属于模糊情况，交给LLM复核
+            if not llm_enabled or len(rule_result.matched_patterns) >= 2:
                 rule_result.processing_time = time.time() - start_time
-                self._cache_result(message, rule_result)
                 return rule_result
 
-        # LLM检测（如果启用且规则未命中）
-        if self.config.get("enabled_llm", False):
-            llm_result = await self._check_by_llm(message, context)
-            llm_result.processing_time = time.time() - start_time
-            self._cache_result(message, llm_result)
-            return llm_result
+        # LLM检测：规则未命中时只复核带有可疑特征的消息
+        if llm_enabled:
+            ambiguous = rule_result is not None and not rule_result.is_safe
+            if ambiguous or not self.config.get("llm_gate_enabled", True) or self._has_suspicious_signal(message):
+                self.stats["llm_calls"] += 1
+                llm_result = await self._check_by_llm(message, context)
+                if ambiguous and not llm_result.details.get("llm_verdict"):
+                    # LLM未给出有效结论（不可用、调用失败或解析失败）时沿用规则结果
+                    llm_result = rule_result
+                elif ambiguous:
+                    llm_result.details["rule_patterns"] = rule_result.matched_patterns
+                llm_result.processing_time = time.time() - start_time
+                return llm_result
+            self.stats["llm_skipped"] += 1
 
         # 所有检测通过
-        result = SecurityCheckResult(
+        return SecurityCheckResult(
             is_safe=True,
             level=SecurityLevel.SAFE,
             action=SecurityAction.ALLOW,
             reason="未检测到风险",
             processing_time=time.time() - start_time,
         )
-        self._cache_result(message, result)
-        return result
 
-    async def _check_by_rules(self, message: str) -> SecurityCheckResult:
-        """基于规则的检测"""
-        matched_patterns = []
+    def _has_suspicious_signal(self, message: str) -> bool:
+        """置信度闸门：统计可疑特征片段的种类数，达到阈值才值得调用LLM"""
+        min_hits = self.config.get("llm_gate_min_signals", 1)
+        if min_hits <= 0:
+            return True
+        hits = set()
+        for match in self._suspicious_pattern.finditer(message):
+            hits.add(match.group().lower())
+            if len(hits) >= min_hits:
+                return True
+        return False
+
+    def _match_rules(self, message: str) -> list[str]:
+        """扫描消息，返回命中的规则
 
-        for pattern in self._compiled_patterns:
-            matches = pattern.findall(message)
-            if matches:
-                matched_patterns.append(pattern.pattern)
-                logger.debug(f"规则匹配: {pattern.pattern[:50]}... -> {matches[:2]}")
+        未命中任何规则（绝大多数消息）时只对合并后的正则做一次扫描；
+        命中时再补查在同一位置被前面的规则抢先匹配、因而没有报告的规则。
+        """
+        matched: set[int] = set()
+        if self._combined_pattern is not None:
+            for match in self._combined_pattern.finditer(message):
+                if match.lastgroup:
+                    matched.add(int(match.lastgroup[1:]))
+            if matched:
+                for index, pattern in enumerate(self._compiled_patterns):
+                    if index not in matched and pattern.search(message):
+                        matched.add(index)
+                return [self._compiled_patterns[index].pattern for index in sorted(matched)]
+
+        for index in self._separate_patterns:
+            if self._compiled_patterns[index].search(message):
+                matched.add(index)
+        return [self._compiled_patterns[index].pattern for index in sorted(matched)]
 
+    async def _check_by_rules(self, message: str) -> SecurityCheckResult:
+        """基于规则的检测"""
+        matched_patterns = self._match_rules(message)
         if matched_patterns:
+            logger.debug(f"规则匹配: {[pattern[:50] for pattern in matched_patterns]}")
+
             # 根据匹配数量计算置信度和风险级别
             confidence = min(1.0, len(matched_patterns) * 0.25 + 0.5)
 
@@ -219,7 +347,7 @@ class AntiInjectionChecker(SecurityChecker):
                         level=SecurityLevel.SAFE,
                         action=SecurityAction.ALLOW,
                         reason="无可用的LLM模型",
-                        details={"llm_enabled": False},
+                        details={"llm_enabled": False, "llm_error": True},
                     )
 
             # 构建检测提示词
@@ -254,6 +382,7 @@ class AntiInjectionChecker(SecurityChecker):
                 level=SecurityLevel.SAFE,
                 action=SecurityAction.ALLOW,
                 reason="LLM API不可用",
+                details={"llm_error": True},
             )
         except Exception as e:
             logger.error(f"LLM检测失败: {e}")
@@ -262,6 +391,7 @@ class AntiInjectionChecker(SecurityChecker):
                 level=SecurityLevel.SAFE,
                 action=SecurityAction.ALLOW,
                 reason=f"LLM检测异常: {e}",
+                details={"llm_error": True},
             )
 
     @staticmethod
@@ -336,7 +466,7 @@ class AntiInjectionChecker(SecurityChecker):
                 confidence=confidence,
                 action=action,
                 reason=reasoning,
-                details={"llm_analysis": response, "parsed_level": risk_level_str},
+                details={"llm_analysis": response, "parsed_level": risk_level_str, "llm_verdict": True},
             )
 
         except Exception as e:
@@ -346,29 +476,29 @@ class AntiInjectionChecker(SecurityChecker):
                 level=SecurityLevel.SAFE,
                 action=SecurityAction.ALLOW,
                 reason=f"解析失败: {e}",
+                details={"llm_error": True},
             )
 
     def _get_cache_key(self, message: str) -> str:
         """生成缓存键"""
         return hashlib.md5(message.encode("utf-8")).hexdigest()
 
-    def _is_cache_valid(self, result: SecurityCheckResult, current_time: float) -> bool:
-        """检查缓存是否有效"""
-        cache_ttl = self.config.get("cache_ttl", 3600)
-        age = current_time - (result.processing_time or 0)
-        return age < cache_ttl
-
-    def _cache_result(self, message: str, result: SecurityCheckResult):
-        """缓存结果"""
-        if not self.config.get("cache_enabled", True):
-            return
-
-        cache_key = self._get_cache_key(message)
-        self._cache[cache_key] = result
-
-        # 简单的缓存清理
-        if len(self._cache) > 1000:
-            # 删除最旧的一半
-            keys = list(self._cache.keys())
-            for key in keys[: len(keys) // 2]:
-                del self._cache[key]
+    def _get_cached_result(self, cache_key: str) -> SecurityCheckResult | None:
+        """读取未过期的缓存结果（返回副本，调用方修改不会影响缓存）"""
+        entry = self._cache.get(cache_key)
+        if entry is None:
+            return None
+        cached_at, result = entry
+        if time.monotonic() - cached_at >= self.config.get("cache_ttl", 3600):
+            del self._cache[cache_key]
+            return None
+        self._cache.move_to_end(cache_key)
+        return dataclasses.replace(result)
+
+    def _cache_result(self, cache_key: str, result: SecurityCheckResult):
+        """缓存结果，超出容量时淘汰最久未使用的条目"""
+        self._cache[cache_key] = (time.monotonic(), dataclasses.replace(result))
+        self._cache.move_to_end(cache_key)
+        max_size = max(1, self.config.get("cache_max_size", 1000))
+        while len(self._cache) > max_size:
+            self._cache.popitem(last=False)
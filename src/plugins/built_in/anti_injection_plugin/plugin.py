@@ -56,6 +56,16 @@ class AntiInjectionPlugin(BasePlugin):
                 default=0.7,
                 description="LLM检测阈值 (0-1)，置信度超过此值才认为是注入攻击",
             ),
+            "llm_gate_enabled": ConfigField(
+                type=bool,
+                default=True,
+                description="是否只把模糊消息（命中单条规则或带有可疑特征）交给LLM检测，其余消息直接由规则判定",
+            ),
+            "llm_gate_min_signals": ConfigField(
+                type=int,
+                default=1,
+                description="未命中规则时，至少出现几种可疑特征才调用LLM检测",
+            ),
             "whitelist": ConfigField(
                 type=list,
                 default=[],
@@ -112,6 +122,11 @@ class AntiInjectionPlugin(BasePlugin):
                 default=3600,
                 description="缓存有效期（秒）",
             ),
+            "cache_max_size": ConfigField(
+                type=int,
+                default=1000,
+                description="缓存最大条目数，超出时淘汰最久未使用的结果",
+            ),
             "stats_enabled": ConfigField(
                 type=bool,
                 default=True,
@@ -205,11 +205,14 @@ class MessageProcessor:
 
             from src.common.database.core import get_db_session
             from src.common.database.core.models import Messages
+            from src.common.recent_message_buffer import get_recent_message_buffer
 
             message_id = message_data.get("message_id")
             if not message_id:
                 return
 
+            get_recent_message_buffer().remove(message_id)
+
             async with get_db_session() as session:
                 stmt = delete(Messages).where(Messages.message_id == message_id)
                 result = await session.execute(stmt)
@@ -14,6 +14,7 @@ import asyncio
 from typing import TYPE_CHECKING, ClassVar, Optional
 
 from src.common.logger import get_logger
+from src.common.message_trace import trace_span
 from src.config.config import global_config
 from src.plugin_system import ActionActivationType, BaseAction, ChatMode
 from src.plugin_system.apis import send_api
@@ -175,11 +176,12 @@ class KFCReplyAction(BaseAction):
                 return []
             
             # 2. 分段处理 + 错字生成
-            processed_segments = process_llm_response(
-                filtered_content,
-                enable_splitter=enable_splitter,
-                enable_chinese_typo=enable_chinese_typo,
-            )
+            with trace_span("post_process"):
+                processed_segments = process_llm_response(
+                    filtered_content,
+                    enable_splitter=enable_splitter,
+                    enable_chinese_typo=enable_chinese_typo,
+                )
             
             # 过滤空段落
             processed_segments = [seg for seg in processed_segments if seg and seg.strip()]
@@ -73,6 +73,9 @@ class ProactiveConfig:
     
     # 关系门槛：最低好感度，达到此值才会主动关心
     min_affinity_for_proactive: float = 0.3
+    
+    # 同时处理的会话数上限（等待检查与主动发起都会调用 LLM）
+    max_concurrent_sessions: int = 3
 
 
 @dataclass
@@ -218,6 +221,7 @@ def load_config() -> KokoroFlowChatterConfig:
                     quiet_hours_end=getattr(pro_cfg, 'quiet_hours_end', "07:00"),
                     trigger_probability=getattr(pro_cfg, 'trigger_probability', 0.3),
                     min_affinity_for_proactive=getattr(pro_cfg, 'min_affinity_for_proactive', 0.3),
+                    max_concurrent_sessions=getattr(pro_cfg, 'max_concurrent_sessions', 3),
                 )
             
             # 提示词配置
@@ -66,6 +66,13 @@ class KokoroFlowChatterPlugin(BasePlugin):
             self._is_started = False
         except Exception as e:
             logger.warning(f"[KFC] 停止主动思考器失败: {e}")
+
+        try:
+            from .session import get_session_manager
+
+            await get_session_manager().close()
+        except Exception as e:
+            logger.warning(f"[KFC] 保存会话失败: {e}")
     
     def get_plugin_components(self):
         """返回组件列表"""
@@ -26,7 +26,7 @@ from src.plugin_system.apis.unified_scheduler import TriggerType, unified_schedu
 
 from .config import KFCMode, get_config
 from .models import EventType, SessionStatus
-from .session import KokoroSession, get_session_manager
+from .session import THINKING_MIN_INTERVAL, THINKING_TRIGGERS, KokoroSession, get_session_manager
 
 if TYPE_CHECKING:
     from src.chat.message_receive.chat_stream import ChatStream
@@ -44,9 +44,10 @@ class ProactiveThinker:
     3. 长期沉默后主动发起
     
     核心逻辑：
-    - 定期检查所有 WAITING 状态的 Session
+    - 定期从 SessionManager 的截止时间索引中取出到期的 WAITING Session
     - 触发连续思考或超时决策
-    - 定期检查长期沉默的 Session，考虑主动发起
+    - 定期取出沉默时长已满足的 IDLE Session，考虑主动发起
+    - 同时处理的 Session 数量受 max_concurrent_sessions 限制
     
     支持两种工作模式（与 Chatter 保持一致）：
     - unified: 单次 LLM 调用
@@ -54,7 +55,7 @@ class ProactiveThinker:
     """
     
     # 连续思考触发点（等待进度百分比）
-    THINKING_TRIGGERS = [0.3, 0.6, 0.85]
+    THINKING_TRIGGERS = THINKING_TRIGGERS
     
     # 任务名称
     TASK_WAITING_CHECK = "kfc_waiting_check"
@@ -66,6 +67,9 @@ class ProactiveThinker:
         # 配置
         self._load_config()
         
+        # 限制同时处理的 Session 数量（每个都可能触发 LLM 调用）
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_sessions)
+
         # 调度任务 ID
         self._waiting_schedule_id: Optional[str] = None
         self._proactive_schedule_id: Optional[str] = None
@@ -100,6 +104,7 @@ class ProactiveThinker:
         self.quiet_hours_end = proactive_cfg.quiet_hours_end
         self.trigger_probability = proactive_cfg.trigger_probability
         self.min_affinity_for_proactive = proactive_cfg.min_affinity_for_proactive
+        self.max_concurrent_sessions = max(1, proactive_cfg.max_concurrent_sessions)
     
     async def start(self) -> None:
         """启动主动思考器"""
@@ -122,6 +127,7 @@ class ProactiveThinker:
         
         # 注册主动思考检查任务（仅在启用时注册）
         if self.proactive_enabled:
+            self.session_manager.configure_proactive(self.silence_threshold, self.min_proactive_interval)
             self._proactive_schedule_id = await unified_scheduler.create_schedule(
                 callback=self._check_proactive_sessions,
                 trigger_type=TriggerType.TIME,
@@ -153,20 +159,23 @@ class ProactiveThinker:
     # 等待检查
     # ========================
     
+    async def _run_bounded(self, coros: list[Coroutine[Any, Any, None]]) -> None:
+        """并发执行，同时运行的数量不超过 max_concurrent_sessions"""
+        async def _run(coro: Coroutine[Any, Any, None]) -> None:
+            async with self._semaphore:
+                await coro
+
+        await asyncio.gather(*(_run(coro) for coro in coros), return_exceptions=True)
+
     async def _check_waiting_sessions(self) -> None:
-        """检查所有等待中的 Session"""
+        """检查到期的等待中 Session"""
         self._stats["waiting_checks"] += 1
         
-        sessions = await self.session_manager.get_waiting_sessions()
+        sessions = self.session_manager.pop_due_waiting_sessions()
         if not sessions:
             return
         
-        # 并行处理
-        tasks = [
-            asyncio.create_task(self._process_waiting_session(s))
-            for s in sessions
-        ]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._run_bounded([self._process_waiting_session(s) for s in sessions])
     
     async def _process_waiting_session(self, session: KokoroSession) -> None:
         """处理单个等待中的 Session"""
@@ -199,6 +208,9 @@ class ProactiveThinker:
                 
         except Exception as e:
             logger.error(f"[ProactiveThinker] 处理等待 Session 失败 {session.user_id}: {e}")
+        finally:
+            # 跳过处理的 Session 仍然到期，会在下一次检查时再次取出
+            self.session_manager.reschedule(session)
     
     def _should_trigger_thinking(self, session: KokoroSession, progress: float) -> bool:
         """判断是否应触发连续思考"""
@@ -211,7 +223,7 @@ class ProactiveThinker:
         # 确保两次思考之间有间隔
         if session.waiting_config.last_thinking_at > 0:
             elapsed = time.time() - session.waiting_config.last_thinking_at
-            if elapsed < 30:  # 至少 30 秒间隔
+            if elapsed < THINKING_MIN_INTERVAL:
                 return False
         
         return True
@@ -524,16 +536,24 @@ class ProactiveThinker:
         if self._is_quiet_hours():
             return
         
-        sessions = await self.session_manager.get_all_sessions()
         current_time = time.time()
+        sessions = self.session_manager.pop_due_proactive_sessions(current_time)
+        if not sessions:
+            return
         
-        for session in sessions:
-            try:
-                trigger_reason = self._should_trigger_proactive(session, current_time)
-                if trigger_reason:
-                    await self._handle_proactive(session, trigger_reason)
-            except Exception as e:
-                logger.error(f"[ProactiveThinker] 检查主动思考失败 {session.user_id}: {e}")
+        await self._run_bounded([self._process_proactive_session(s, current_time) for s in sessions])
+
+    async def _process_proactive_session(self, session: KokoroSession, current_time: float) -> None:
+        """对单个到期的 Session 判断并执行主动思考"""
+        try:
+            trigger_reason = self._should_trigger_proactive(session, current_time)
+            if trigger_reason:
+                await self._handle_proactive(session, trigger_reason)
+        except Exception as e:
+            logger.error(f"[ProactiveThinker] 检查主动思考失败 {session.user_id}: {e}")
+        finally:
+            # 未通过概率判定的 Session 仍然到期，下一次检查时再次尝试
+            self.session_manager.reschedule(session)
     
     def _is_quiet_hours(self) -> bool:
         """检查是否在勿扰时段"""
@@ -5,11 +5,19 @@ Kokoro Flow Chatter - 会话管理
 - Session 只有 IDLE 和 WAITING 两种状态
 - 包含 mental_log（心理活动历史）
 - 包含 waiting_config（等待配置）
+
+持久化与调度：
+- 会话保存在一个 SQLite 文件中（每个用户一行），save_session 只标记脏数据，
+  由后台任务合并一段时间内的修改后批量写入，序列化与磁盘IO都不在事件循环上执行
+- 内存中按截止时间维护两个堆（等待检查时间、可主动发起时间），
+  ProactiveThinker 每次检查只取出已到期的会话，而不是遍历所有会话
 """
 
 import asyncio
+import heapq
 import json
-import os
+import sqlite3
+import threading
 import time
 from pathlib import Path
 from typing import Optional
@@ -25,6 +33,12 @@ from .models import (
 
 logger = get_logger("kfc_session")
 
+# 连续思考触发点（等待进度百分比）
+THINKING_TRIGGERS = (0.3, 0.6, 0.85)
+
+# 两次连续思考之间的最小间隔（秒）
+THINKING_MIN_INTERVAL = 30.0
+
 
 class KokoroSession:
     """
@@ -285,22 +299,42 @@ class SessionManager:
         self,
         data_dir: str = "data/kokoro_flow_chatter/sessions",
         max_session_age_days: int = 30,
+        flush_interval: float = 2.0,
     ):
         if hasattr(self, "_initialized") and self._initialized:
             return
         
         self._initialized = True
         self.data_dir = Path(data_dir)
+        self.db_path = self.data_dir / "sessions.db"
         self.max_session_age_days = max_session_age_days
+        self.flush_interval = flush_interval
         
         # 内存缓存
         self._sessions: dict[str, KokoroSession] = {}
         self._locks: dict[str, asyncio.Lock] = {}
         
+        # 持久化：脏会话集合 + 后台批量写入
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._dirty: set[str] = set()
+        self._flush_event: asyncio.Event | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock: asyncio.Lock | None = None
+
+        # 截止时间索引：堆中为 (到期时间, user_id)，字典记录每个会话当前有效的到期时间，
+        # 过期的堆条目在弹出时丢弃
+        self._waiting_heap: list[tuple[float, str]] = []
+        self._waiting_due: dict[str, float] = {}
+        self._proactive_heap: list[tuple[float, str]] = []
+        self._proactive_due: dict[str, float] = {}
+        # 主动发起规则 (沉默阈值, 两次主动发起最小间隔)，由 ProactiveThinker 启动时设置
+        self._proactive_rule: tuple[float, float] | None = None
+
         # 确保数据目录存在
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
-        logger.info(f"SessionManager 初始化完成: {self.data_dir}")
+        logger.info(f"SessionManager 初始化完成: {self.db_path}")
     
     def _get_lock(self, user_id: str) -> asyncio.Lock:
         """获取用户级别的锁"""
@@ -309,7 +343,7 @@ class SessionManager:
         return self._locks[user_id]
     
     def _get_file_path(self, user_id: str) -> Path:
-        """获取会话文件路径"""
+        """获取旧版会话文件路径（仅用于迁移）"""
         safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in user_id)
         return self.data_dir / f"{safe_id}.json"
     
@@ -322,64 +356,243 @@ class SessionManager:
                 session.stream_id = stream_id  # 更新 stream_id
                 return session
             
-            # 尝试从文件加载
-            session = await self._load_from_file(user_id)
+            # 尝试从存储加载
+            session = await self._load_from_store(user_id)
             if session:
                 session.stream_id = stream_id
                 self._sessions[user_id] = session
+                self._reindex(session)
                 return session
             
             # 创建新会话
             session = KokoroSession(user_id=user_id, stream_id=stream_id)
             self._sessions[user_id] = session
+            self._reindex(session)
             logger.info(f"创建新会话: {user_id}")
             return session
     
-    async def _load_from_file(self, user_id: str) -> Optional[KokoroSession]:
-        """从文件加载会话"""
-        file_path = self._get_file_path(user_id)
-        if not file_path.exists():
-            return None
+    # ========================
+    # 持久化
+    # ========================
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接（在工作线程中调用，调用方需持有 _db_lock）"""
+        if self._db is None:
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "user_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _read_row(self, user_id: str) -> tuple[dict | None, bool]:
+        """读取会话数据，返回 (数据, 是否来自旧版JSON文件)"""
+        with self._db_lock:
+            row = self._connect().execute("SELECT data FROM sessions WHERE user_id = ?", (user_id,)).fetchone()
+        if row:
+            return json.loads(row[0]), False
         
-        try:
+        file_path = self._get_file_path(user_id)
+        if file_path.exists():
             with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+                return json.load(f), True
+        return None, False
+
+    def _write_rows(self, rows: list[tuple[str, dict, float]]) -> None:
+        """在一个事务中写入一批会话"""
+        payload = [(user_id, json.dumps(data, ensure_ascii=False), updated_at) for user_id, data, updated_at in rows]
+        with self._db_lock:
+            db = self._connect()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO sessions (user_id, data, updated_at) VALUES (?, ?, ?)",
+                    payload,
+                )
+
+    async def _load_from_store(self, user_id: str) -> KokoroSession | None:
+        """从存储加载会话，旧版JSON文件会在下次刷写时迁移进数据库"""
+        try:
+            data, legacy = await asyncio.to_thread(self._read_row, user_id)
+            if data is None:
+                return None
             session = KokoroSession.from_dict(data)
-            logger.debug(f"从文件加载会话: {user_id}")
+            if legacy:
+                self._mark_dirty(user_id)
+                logger.info(f"从旧版会话文件迁移: {user_id}")
+            else:
+                logger.debug(f"从存储加载会话: {user_id}")
             return session
         except Exception as e:
             logger.error(f"加载会话失败 {user_id}: {e}")
             return None
     
-    async def save_session(self, user_id: str) -> bool:
-        """保存会话到文件"""
-        async with self._get_lock(user_id):
-            if user_id not in self._sessions:
-                return False
-            
-            session = self._sessions[user_id]
-            file_path = self._get_file_path(user_id)
-            
+    def _mark_dirty(self, user_id: str) -> None:
+        """标记会话待写入，并唤醒后台刷写任务"""
+        self._dirty.add(user_id)
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # 没有运行中的事件循环时等待 save_all/close 显式刷写
+            self._flush_event = asyncio.Event()
+            self._flush_task = loop.create_task(self._flush_loop(), name="kfc_session_flush")
+        if self._flush_event is not None:
+            self._flush_event.set()
+
+    async def _flush_loop(self) -> None:
+        """后台刷写：被唤醒后再等待一个合并窗口，把期间的修改一次写入"""
+        assert self._flush_event is not None
+        while True:
+            await self._flush_event.wait()
+            await asyncio.sleep(self.flush_interval)
+            self._flush_event.clear()
+            await self.flush()
+            if self._dirty:
+                # 写入失败的会话留在脏集合中，下一个窗口重试
+                self._flush_event.set()
+
+    async def flush(self) -> int:
+        """立即写入所有脏会话，返回写入的数量"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+            user_ids = list(self._dirty)
+            self._dirty.clear()
+            # 在事件循环上取快照，序列化与写入交给工作线程
+            rows = [
+                (user_id, session.to_dict(), session.last_activity_at)
+                for user_id in user_ids
+                if (session := self._sessions.get(user_id)) is not None
+            ]
+            if not rows:
+                return 0
             try:
-                data = session.to_dict()
-                temp_path = file_path.with_suffix(".json.tmp")
-                
-                with open(temp_path, "w", encoding="utf-8") as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                
-                os.replace(temp_path, file_path)
-                return True
+                await asyncio.to_thread(self._write_rows, rows)
             except Exception as e:
-                logger.error(f"保存会话失败 {user_id}: {e}")
-                return False
+                logger.error(f"批量保存会话失败（{len(rows)} 个），稍后重试: {e}")
+                self._dirty.update(user_ids)
+                return 0
+            logger.debug(f"已批量保存 {len(rows)} 个会话")
+            return len(rows)
+
+    async def save_session(self, user_id: str) -> bool:
+        """保存会话：标记为脏数据并刷新调度索引，实际写入由后台任务批量完成"""
+        session = self._sessions.get(user_id)
+        if session is None:
+            return False
+        self._reindex(session)
+        self._mark_dirty(user_id)
+        return True
     
     async def save_all(self) -> int:
-        """保存所有会话"""
-        count = 0
-        for user_id in list(self._sessions.keys()):
-            if await self.save_session(user_id):
-                count += 1
-        return count
+        """立即保存所有会话"""
+        self._dirty.update(self._sessions.keys())
+        return await self.flush()
+
+    async def close(self) -> None:
+        """停止后台刷写并写入剩余的修改"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        await self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # ========================
+    # 截止时间索引
+    # ========================
+
+    @staticmethod
+    def _waiting_deadline(session: KokoroSession) -> float | None:
+        """等待中的会话下一次需要处理的时间（连续思考触发点或超时）"""
+        if session.status != SessionStatus.WAITING or not session.waiting_config.is_active():
+            return None
+        config = session.waiting_config
+        deadline = config.started_at + config.max_wait_seconds
+        if config.thinking_count < len(THINKING_TRIGGERS):
+            thinking_at = config.started_at + THINKING_TRIGGERS[config.thinking_count] * config.max_wait_seconds
+            if config.last_thinking_at > 0:
+                thinking_at = max(thinking_at, config.last_thinking_at + THINKING_MIN_INTERVAL)
+            deadline = min(deadline, thinking_at)
+        return deadline
+
+    def _proactive_deadline(self, session: KokoroSession) -> float | None:
+        """空闲会话最早可以主动发起的时间"""
+        if self._proactive_rule is None or session.status != SessionStatus.IDLE:
+            return None
+        silence_threshold, min_interval = self._proactive_rule
+        deadline = session.last_activity_at + silence_threshold
+        if session.last_proactive_at:
+            deadline = max(deadline, session.last_proactive_at + min_interval)
+        return deadline
+
+    @staticmethod
+    def _set_deadline(
+        heap: list[tuple[float, str]], due: dict[str, float], user_id: str, deadline: float | None
+    ) -> None:
+        if deadline is None:
+            due.pop(user_id, None)
+            return
+        if due.get(user_id) == deadline:
+            return
+        due[user_id] = deadline
+        heapq.heappush(heap, (deadline, user_id))
+        # 过期条目过多时重建堆
+        if len(heap) > 2 * len(due) + 64:
+            heap[:] = [(value, uid) for uid, value in due.items()]
+            heapq.heapify(heap)
+
+    def _reindex(self, session: KokoroSession) -> None:
+        """根据会话当前状态更新两个截止时间索引"""
+        self._set_deadline(self._waiting_heap, self._waiting_due, session.user_id, self._waiting_deadline(session))
+        self._set_deadline(
+            self._proactive_heap, self._proactive_due, session.user_id, self._proactive_deadline(session)
+        )
+
+    def reschedule(self, session: KokoroSession) -> None:
+        """会话被处理后重新计算到期时间（仍然到期的会话会在下一次检查时再次取出）"""
+        if self._sessions.get(session.user_id) is session:
+            self._reindex(session)
+
+    def _pop_due(
+        self, heap: list[tuple[float, str]], due: dict[str, float], now: float
+    ) -> list[KokoroSession]:
+        sessions = []
+        while heap and heap[0][0] <= now:
+            deadline, user_id = heapq.heappop(heap)
+            if due.get(user_id) != deadline:
+                continue  # 已被更新或移除的过期条目
+            del due[user_id]
+            session = self._sessions.get(user_id)
+            if session is not None:
+                sessions.append(session)
+        return sessions
+
+    def pop_due_waiting_sessions(self, now: float | None = None) -> list[KokoroSession]:
+        """取出已到达连续思考或超时时间的等待中会话"""
+        return self._pop_due(self._waiting_heap, self._waiting_due, time.time() if now is None else now)
+
+    def pop_due_proactive_sessions(self, now: float | None = None) -> list[KokoroSession]:
+        """取出沉默时长和主动间隔都已满足的空闲会话"""
+        return self._pop_due(self._proactive_heap, self._proactive_due, time.time() if now is None else now)
+
+    def configure_proactive(self, silence_threshold: float, min_interval: float) -> None:
+        """设置主动发起规则，并为已加载的会话建立索引"""
+        self._proactive_rule = (silence_threshold, min_interval)
+        for session in self._sessions.values():
+            self._reindex(session)
     
     async def get_waiting_sessions(self) -> list[KokoroSession]:
         """获取所有处于等待状态的会话"""
@@ -13,13 +13,12 @@ from pathlib import Path
 from typing import Any
 
 import aiofiles
-import aiohttp
 import bs4
 import json5
 import orjson
 
 from src.common.logger import get_logger
-from src.plugin_system.apis import config_api, person_api
+from src.plugin_system.apis import config_api, http_api, person_api
 from src.plugin_system.apis import cross_context_api
 
 from .content_service import ContentService
@@ -594,22 +593,21 @@ class QZoneService:
 
                 payload = {"domain": "user.qzone.qq.com"}
 
-                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30.0)) as session:
-                    async with session.post(url, json=payload, headers=headers) as resp:
-                        resp.raise_for_status()
+                resp = await http_api.post(url, json=payload, headers=headers, timeout=30.0)
+                resp.raise_for_status()
 
-                        if resp.status != 200:
-                            error_msg = f"Napcat服务返回错误状态码: {resp.status}"
-                            if resp.status == 403:
-                                error_msg += " (Token验证失败)"
-                            raise RuntimeError(error_msg)
+                if resp.status != 200:
+                    error_msg = f"Napcat服务返回错误状态码: {resp.status}"
+                    if resp.status == 403:
+                        error_msg += " (Token验证失败)"
+                    raise RuntimeError(error_msg)
 
-                        data = await resp.json()
-                        if data.get("status") != "ok" or "cookies" not in data.get("data", {}):
-                            raise RuntimeError(f"获取 cookie 失败: {data}")
-                        return data["data"]
+                data = resp.json()
+                if data.get("status") != "ok" or "cookies" not in data.get("data", {}):
+                    raise RuntimeError(f"获取 cookie 失败: {data}")
+                return data["data"]
 
-            except aiohttp.ClientError as e:
+            except http_api.HttpClientError as e:
                 if attempt < max_retries - 1:
                     logger.warning(f"无法连接到Napcat服务(尝试 {attempt + 1}/{max_retries}): {url}，错误: {e!s}")
                     await asyncio.sleep(retry_delay)
@@ -654,13 +652,11 @@ class QZoneService:
             if headers:
                 final_headers.update(headers)
 
-            async with aiohttp.ClientSession(cookies=cookies) as session:
-                timeout = aiohttp.ClientTimeout(total=20)
-                async with session.request(
-                    method, url, params=params, data=data, headers=final_headers, timeout=timeout
-                ) as response:
-                    response.raise_for_status()
-                    return await response.text()
+            response = await http_api.request(
+                method, url, params=params, data=data, headers=final_headers, cookies=cookies, timeout=20
+            )
+            response.raise_for_status()
+            return response.text()
 
         async def _publish(content: str, images: list[bytes]) -> tuple[bool, str]:
             """发布说说"""
@@ -800,49 +796,49 @@ class QZoneService:
 
                 logger.info(f"开始上传图片 {index + 1}...")
 
-                async with aiohttp.ClientSession(cookies=cookies) as session:
-                    timeout = aiohttp.ClientTimeout(total=60)
-                    async with session.post(upload_url, data=post_data, headers=headers, timeout=timeout) as response:
-                        if response.status == 200:
-                            resp_text = await response.text()
-                            logger.info(f"图片上传响应状态码: {response.status}")
-                            logger.info(f"图片上传响应内容前500字符: {resp_text[:500]}")
-
-                            # 按照原版方式解析响应
-                            start_idx = resp_text.find("{")
-                            end_idx = resp_text.rfind("}") + 1
-                            if start_idx != -1 and end_idx != -1:
-                                json_str = resp_text[start_idx:end_idx]
-                                try:
-                                    upload_result = orjson.loads(json_str)
-                                except orjson.JSONDecodeError:
-                                    logger.error(f"图片上传响应JSON解析失败，原始响应: {resp_text}")
-                                    return None
-
-                                logger.debug(f"图片上传解析结果: {upload_result}")
-
-                                if upload_result.get("ret") == 0:
-                                    try:
-                                        # 使用原版的参数提取逻辑
-                                        picbo, richval = _get_picbo_and_richval(upload_result)
-                                        logger.info(f"图片 {index + 1} 上传成功: picbo={picbo}")
-                                        return {"pic_bo": picbo, "richval": richval}
-                                    except Exception as e:
-                                        logger.error(
-                                            f"从上传结果中提取图片参数失败: {e}, 上传结果: {upload_result}",
-                                            exc_info=True,
-                                        )
-                                        return None
-                                else:
-                                    logger.error(f"图片 {index + 1} 上传失败: {upload_result}")
-                                    return None
-                            else:
-                                logger.error(f"无法从响应中提取JSON内容: {resp_text}")
+                response = await http_api.post(
+                    upload_url, data=post_data, headers=headers, cookies=cookies, timeout=60
+                )
+                if response.status == 200:
+                    resp_text = response.text()
+                    logger.info(f"图片上传响应状态码: {response.status}")
+                    logger.info(f"图片上传响应内容前500字符: {resp_text[:500]}")
+
+                    # 按照原版方式解析响应
+                    start_idx = resp_text.find("{")
+                    end_idx = resp_text.rfind("}") + 1
+                    if start_idx != -1 and end_idx != -1:
+                        json_str = resp_text[start_idx:end_idx]
+                        try:
+                            upload_result = orjson.loads(json_str)
+                        except orjson.JSONDecodeError:
+                            logger.error(f"图片上传响应JSON解析失败，原始响应: {resp_text}")
+                            return None
+
+                        logger.debug(f"图片上传解析结果: {upload_result}")
+
+                        if upload_result.get("ret") == 0:
+                            try:
+                                # 使用原版的参数提取逻辑
+                                picbo, richval = _get_picbo_and_richval(upload_result)
+                                logger.info(f"图片 {index + 1} 上传成功: picbo={picbo}")
+                                return {"pic_bo": picbo, "richval": richval}
+                            except Exception as e:
+                                logger.error(
+                                    f"从上传结果中提取图片参数失败: {e}, 上传结果: {upload_result}",
+                                    exc_info=True,
+                                )
                                 return None
                         else:
-                            error_text = await response.text()
-                            logger.error(f"图片上传HTTP请求失败，状态码: {response.status}, 响应: {error_text[:200]}")
+                            logger.error(f"图片 {index + 1} 上传失败: {upload_result}")
                             return None
+                    else:
+                        logger.error(f"无法从响应中提取JSON内容: {resp_text}")
+                        return None
+                else:
+                    error_text = response.text()
+                    logger.error(f"图片上传HTTP请求失败，状态码: {response.status}, 响应: {error_text[:200]}")
+                    return None
 
             except Exception as e:
                 logger.error(f"上传图片 {index + 1} 异常: {e}")
@@ -6,12 +6,16 @@ from src.plugin_system import BasePlugin, ComponentInfo, register_plugin
 from src.plugin_system.base.base_tool import BaseTool
 from src.plugin_system.base.component_types import ComponentType, ToolInfo
 
+from .transcriber import (
+    TranscriptionBusyError,
+    TranscriptionWorker,
+    WhisperBackend,
+    get_transcription_worker,
+    set_transcription_worker,
+)
+
 logger = get_logger("stt_whisper_plugin")
 
-# 全局变量来缓存模型，避免重复加载
-_whisper_model = None
-_is_loading = False
-_model_ready_event = asyncio.Event()
 _background_tasks = set()  # 背景任务集合
 
 class LocalASRTool(BaseTool):
@@ -27,29 +31,23 @@ class LocalASRTool(BaseTool):
     @classmethod
     async def load_model_once(cls, plugin_config: dict):
         """
-        一个类方法，用于在插件加载时触发一次模型加载。
+        一个类方法，用于在插件加载时创建转写工作器，并在其专用线程中加载一次模型。
         """
-        global _whisper_model, _is_loading, _model_ready_event
-        if _whisper_model is None and not _is_loading:
-            _is_loading = True
-            try:
-                import whisper
-
-                model_size = plugin_config.get("whisper", {}).get("model_size", "tiny")
-                device = plugin_config.get("whisper", {}).get("device", "cpu")
-                logger.info(f"正在预加载 Whisper ASR 模型: {model_size} ({device})")
-
-                loop = asyncio.get_running_loop()
-                _whisper_model = await loop.run_in_executor(
-                    None, whisper.load_model, model_size, device
-                )
-                logger.info(f"Whisper ASR 模型 '{model_size}' 预加载成功!")
-            except Exception as e:
-                logger.error(f"预加载 Whisper ASR 模型失败: {e}")
-                _whisper_model = None
-            finally:
-                _is_loading = False
-                _model_ready_event.set()  # 通知等待的任务
+        if get_transcription_worker() is not None:
+            return
+
+        whisper_config = plugin_config.get("whisper", {})
+        backend = WhisperBackend(
+            model_size=whisper_config.get("model_size", "tiny"),
+            device=whisper_config.get("device", "cpu"),
+        )
+        worker = TranscriptionWorker(
+            backend,
+            max_queue_size=whisper_config.get("max_queue_size", 16),
+            cache_size=whisper_config.get("cache_size", 512),
+        )
+        set_transcription_worker(worker)
+        await worker.start()
 
     async def execute(self, function_args: dict) -> str:
         audio_path = function_args.get("audio_path")
@@ -57,24 +55,19 @@ class LocalASRTool(BaseTool):
 
             return "错误：缺少 audio_path 参数。"
 
-        global _whisper_model
-        # 使用 Event 等待模型加载完成
-        if _is_loading:
-            await _model_ready_event.wait()
-
-        if _whisper_model is None:
+        worker = get_transcription_worker()
+        # 等待模型加载完成
+        if worker is None or not await worker.wait_ready():
             return "Whisper 模型加载失败，无法识别语音。"
 
         try:
             logger.info(f"开始使用 Whisper 识别音频: {audio_path}")
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(
-                None, _whisper_model.transcribe, audio_path
-            )
-            text_result = result.get("text", "")
-            text = str(text_result).strip()
+            text = await worker.transcribe(audio_path)
             logger.info(f"音频识别成功: {text}")
             return text
+        except TranscriptionBusyError as e:
+            logger.warning(f"语音识别任务被拒绝: {e}")
+            return f"语音识别失败: {e}"
         except Exception as e:
             logger.error(f"使用 Whisper 识别音频失败: {e}")
             return f"语音识别出错: {e}"
@@ -99,6 +92,13 @@ class STTWhisperPlugin(BasePlugin):
         except Exception as e:
             logger.error(f"触发 Whisper 模型预加载时出错: {e}")
 
+    async def on_plugin_unloaded(self):
+        """插件卸载时停止转写工作器"""
+        worker = get_transcription_worker()
+        if worker is not None:
+            set_transcription_worker(None)
+            await worker.stop()
+
     def get_plugin_components(self) -> list[tuple[ComponentInfo, type]]:
         """根据主配置动态注册组件"""
         try:
@@ -0,0 +1,216 @@
+"""
+语音转写工作线程
+
+所有转写任务都在一个专用线程中串行执行，不再占用默认线程池（数据库、图片处理等也在使用），
+同一个模型也不会在多个线程里并行推理：
+- 任务队列有上限，语音消息过多时直接拒绝新任务，而不是无限堆积
+- 转写结果按音频内容哈希缓存，同一段语音（如被转发）只识别一次
+- 同一段音频的并发请求合并为一个任务
+- 后端可替换，测试时可以使用不加载模型的快速实现
+"""
+
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from src.common.logger import get_logger
+
+logger = get_logger("stt_whisper_plugin.transcriber")
+
+
+class TranscriptionError(Exception):
+    """转写失败"""
+
+
+class TranscriptionBusyError(TranscriptionError):
+    """任务队列已满"""
+
+
+class TranscriptionBackend(ABC):
+    """转写后端：load 与 transcribe 都在工作线程中调用"""
+
+    @abstractmethod
+    def load(self) -> None:
+        """加载模型"""
+
+    @abstractmethod
+    def transcribe(self, audio_path: str) -> str:
+        """转写音频文件，返回文本"""
+
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper 本地模型"""
+
+    def __init__(self, model_size: str = "tiny", device: str = "cpu"):
+        self.model_size = model_size
+        self.device = device
+        self._model: Any = None
+
+    def load(self) -> None:
+        import whisper
+
+        logger.info(f"正在加载 Whisper ASR 模型: {self.model_size} ({self.device})")
+        self._model = whisper.load_model(self.model_size, self.device)
+        logger.info(f"Whisper ASR 模型 '{self.model_size}' 加载成功!")
+
+    def transcribe(self, audio_path: str) -> str:
+        if self._model is None:
+            raise TranscriptionError("Whisper 模型未加载")
+        result = self._model.transcribe(audio_path)
+        return str(result.get("text", "")).strip()
+
+
+class TranscriptionWorker:
+    """单线程转写工作器"""
+
+    def __init__(self, backend: TranscriptionBackend, max_queue_size: int = 16, cache_size: int = 512):
+        self.backend = backend
+        self.cache_size = max(0, cache_size)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt_worker")
+        self._queue: asyncio.Queue[tuple[str, str, asyncio.Future]] = asyncio.Queue(maxsize=max(1, max_queue_size))
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._worker_task: asyncio.Task | None = None
+        self._ready = asyncio.Event()
+        self._load_error: Exception | None = None
+        self.stats = {"transcribed": 0, "cache_hits": 0, "deduplicated": 0, "rejected": 0, "failed": 0}
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._ready.is_set() and self._load_error is None
+
+    async def start(self) -> None:
+        """在工作线程中加载模型并启动任务循环"""
+        if self._worker_task is not None:
+            return
+        self._worker_task = asyncio.create_task(self._run())
+
+    async def wait_ready(self) -> bool:
+        """等待模型加载完成，返回是否加载成功"""
+        await self._ready.wait()
+        return self._load_error is None
+
+    async def transcribe(self, audio_path: str, audio_hash: str | None = None) -> str:
+        """
+        转写音频文件
+
+        Args:
+            audio_path: 音频文件路径
+            audio_hash: 音频内容哈希，缺省时读取文件计算
+
+        Raises:
+            TranscriptionBusyError: 队列已满
+            TranscriptionError: 模型不可用或转写失败
+        """
+        if audio_hash is None:
+            audio_hash = await asyncio.to_thread(self._hash_file, audio_path)
+
+        cached = self._cache.get(audio_hash)
+        if cached is not None:
+            self._cache.move_to_end(audio_hash)
+            self.stats["cache_hits"] += 1
+            return cached
+
+        inflight = self._inflight.get(audio_hash)
+        if inflight is not None:
+            self.stats["deduplicated"] += 1
+            return await asyncio.shield(inflight)
+
+        if self._worker_task is None:
+            await self.start()
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((audio_hash, audio_path, future))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise TranscriptionBusyError(f"语音识别队列已满（{self._queue.maxsize}），请稍后再试") from None
+
+        self._inflight[audio_hash] = future
+        future.add_done_callback(lambda _: self._inflight.pop(audio_hash, None))
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _hash_file(audio_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(audio_path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self.backend.load)
+        except Exception as e:
+            logger.error(f"加载转写模型失败: {e}")
+            self._load_error = e
+        finally:
+            self._ready.set()
+
+        while True:
+            audio_hash, audio_path, future = await self._queue.get()
+            try:
+                if future.done():
+                    continue
+                if self._load_error is not None:
+                    future.set_exception(TranscriptionError(f"转写模型加载失败: {self._load_error}"))
+                    continue
+                try:
+                    text = await loop.run_in_executor(self._executor, self.backend.transcribe, audio_path)
+                except asyncio.CancelledError:
+                    if not future.done():
+                        future.set_exception(TranscriptionError("转写工作器已停止"))
+                    raise
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    if not future.done():
+                        future.set_exception(TranscriptionError(str(e)))
+                    continue
+
+                self.stats["transcribed"] += 1
+                self._remember(audio_hash, text)
+                if not future.done():
+                    future.set_result(text)
+            finally:
+                self._queue.task_done()
+
+    def _remember(self, audio_hash: str, text: str) -> None:
+        if self.cache_size <= 0 or not text:
+            return
+        self._cache[audio_hash] = text
+        self._cache.move_to_end(audio_hash)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def stop(self) -> None:
+        """停止任务循环，未完成的任务以异常结束"""
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(TranscriptionError("转写工作器已停止"))
+        self._executor.shutdown(wait=False)
+
+
+_worker: TranscriptionWorker | None = None
+
+
+def get_transcription_worker() -> TranscriptionWorker | None:
+    """获取当前的转写工作器（未配置时为 None）"""
+    return _worker
+
+
+def set_transcription_worker(worker: TranscriptionWorker | None) -> None:
+    """替换转写工作器，例如测试中换成不加载模型的快速后端"""
+    global _worker
+    _worker = worker
@@ -77,6 +77,10 @@ command_enabled = true
 server = "http://127.0.0.1:9880"
 timeout = 180
 max_text_length = 1000
+# 是否缓存合成的音频（相同文本、风格、语言与音效配置直接复用）
+audio_cache_enabled = true
+# 音频缓存的最大条数
+audio_cache_max_entries = 500
 
 # TTS 风格参数配置
 # 每个 [[tts_styles]] 代表一个独立的语音风格配置
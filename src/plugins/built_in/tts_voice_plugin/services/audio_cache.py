@@ -0,0 +1,120 @@
+"""
+合成音频缓存
+
+以 (文本, 风格配置, 语言, 高级参数, 空间音效配置) 的哈希作为文件名，
+把最终音频（已应用音效）保存在磁盘上，重启后依然有效。
+问候语、固定回复等重复内容命中缓存后无需再请求 TTS 服务。
+"""
+
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Any
+
+import orjson
+
+from src.common.logger import get_logger
+
+logger = get_logger("tts_voice_plugin.audio_cache")
+
+DEFAULT_CACHE_DIR = os.path.join("data", "plugin_data", "tts_voice_plugin", "audio_cache")
+
+
+class TTSAudioCache:
+    """基于磁盘文件的合成音频 LRU 缓存"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_entries: int = 500):
+        self.cache_dir = cache_dir
+        self.max_entries = max(1, max_entries)
+        self._index: OrderedDict[str, None] | None = None  # 按最近使用排序的缓存键
+        self._lock = asyncio.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(text: str, style_config: dict[str, Any], language: str, extra: dict[str, Any]) -> str:
+        """根据合成参数计算缓存键，任一参数变化都会得到不同的键"""
+        payload = orjson.dumps(
+            {"text": text, "style": style_config, "language": language, "extra": extra},
+            option=orjson.OPT_SORT_KEYS,
+            default=str,
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def _load_index(self) -> OrderedDict[str, None]:
+        """扫描缓存目录，按修改时间恢复 LRU 顺序"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".wav"):
+                continue
+            try:
+                entries.append((os.path.getmtime(os.path.join(self.cache_dir, name)), name[:-4]))
+            except OSError:
+                continue
+        entries.sort()
+        return OrderedDict((key, None) for _, key in entries)
+
+    async def _ensure_index(self) -> OrderedDict[str, None]:
+        if self._index is None:
+            self._index = await asyncio.to_thread(self._load_index)
+            logger.debug(f"TTS 音频缓存已加载 {len(self._index)} 条")
+        return self._index
+
+    def _read(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # 更新修改时间，重启后保持 LRU 顺序
+            return data
+        except OSError:
+            return None
+
+    def _write(self, key: str, data: bytes, evicted: list[str]) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    async def get(self, key: str) -> bytes | None:
+        async with self._lock:
+            index = await self._ensure_index()
+            if key not in index:
+                self.stats["misses"] += 1
+                return None
+            data = await asyncio.to_thread(self._read, key)
+            if data is None:
+                index.pop(key, None)
+                self.stats["misses"] += 1
+                return None
+            index.move_to_end(key)
+            self.stats["hits"] += 1
+            return data
+
+    async def put(self, key: str, data: bytes) -> None:
+        async with self._lock:
+            index = await self._ensure_index()
+            index[key] = None
+            index.move_to_end(key)
+            evicted = []
+            while len(index) > self.max_entries:
+                old_key, _ = index.popitem(last=False)
+                evicted.append(old_key)
+            try:
+                await asyncio.to_thread(self._write, key, data, evicted)
+            except OSError as e:
+                index.pop(key, None)
+                logger.warning(f"写入 TTS 音频缓存失败: {e}")
+                return
+            self.stats["writes"] += 1
+            self.stats["evictions"] += len(evicted)
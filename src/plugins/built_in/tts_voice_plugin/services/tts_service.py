@@ -6,18 +6,50 @@ import base64
 import io
 import os
 import re
+import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Any
 
-import aiohttp
 import soundfile as sf
 from pedalboard import Convolution, Pedalboard, Reverb
 from pedalboard.io import AudioFile
 
 from src.common.logger import get_logger
+from src.plugin_system.apis import http_api
+
+from .audio_cache import TTSAudioCache
 
 logger = get_logger("tts_voice_plugin.service")
 
+# 记录的已加载权重的有效期（秒），过期后重新下发一次切换请求，防止 TTS 服务重启后状态不一致
+WEIGHTS_STATE_TTL = 600.0
+
+# 空间音效处理线程池（Pedalboard 与 soundfile 处理期间会释放 GIL）
+_effects_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts_effects")
+
+
+@dataclass
+class TTSServerState:
+    """单个 TTS 服务端的模型加载状态"""
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)  # 同一服务端的切换与合成串行执行
+    loaded_weights: dict[str, str] = field(default_factory=dict)  # 权重类型(gpt/sovits) -> 已加载的路径
+    updated_at: float = 0.0
+
+    def is_loaded(self, weight_type: str, weights_path: str) -> bool:
+        if time.monotonic() - self.updated_at > WEIGHTS_STATE_TTL:
+            self.loaded_weights.clear()
+        return self.loaded_weights.get(weight_type) == weights_path
+
+    def mark_loaded(self, weight_type: str, weights_path: str) -> None:
+        self.loaded_weights[weight_type] = weights_path
+        self.updated_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        self.loaded_weights.clear()
+
 
 class TTSService:
     """封装了TTS合成的核心逻辑"""
@@ -27,6 +59,9 @@ class TTSService:
         self.tts_styles: dict[str, Any] = {}
         self.timeout: int = 60
         self.max_text_length: int = 500
+        self.audio_cache_enabled: bool = True
+        self._server_states: dict[str, TTSServerState] = {}
+        self._audio_cache: TTSAudioCache | None = None
         self._load_config()
 
     def _load_config(self) -> None:
@@ -34,6 +69,9 @@ class TTSService:
         try:
             self.timeout = self.get_config("tts.timeout", 60)
             self.max_text_length = self.get_config("tts.max_text_length", 500)
+            self.audio_cache_enabled = bool(self.get_config("tts.audio_cache_enabled", True))
+            if self._audio_cache is None:
+                self._audio_cache = TTSAudioCache(max_entries=int(self.get_config("tts.audio_cache_max_entries", 500)))
             self.tts_styles = self._load_tts_styles()
 
             if self.tts_styles:
@@ -149,80 +187,92 @@ class TTSService:
 
         return text.strip()
 
+    def _get_server_state(self, base_url: str) -> TTSServerState:
+        state = self._server_states.get(base_url)
+        if state is None:
+            state = self._server_states[base_url] = TTSServerState()
+        return state
+
+    async def _ensure_weights(self, state: TTSServerState, base_url: str, weights_path: str | None, weight_type: str):
+        """服务端尚未加载指定权重时才发送切换请求（调用方需持有 state.lock）"""
+        if not weights_path or state.is_loaded(weight_type, weights_path):
+            return
+        switch_url = f"{base_url}/set_{weight_type}_weights"
+        try:
+            resp = await http_api.get(switch_url, params={"weights_path": weights_path}, timeout=self.timeout)
+            if resp.status != 200:
+                state.loaded_weights.pop(weight_type, None)
+                logger.error(f"切换 {weight_type} 模型失败: {resp.status} - {resp.text()}")
+            else:
+                state.mark_loaded(weight_type, weights_path)
+                logger.info(f"成功切换 {weight_type} 模型为: {weights_path}")
+        except Exception as e:
+            state.loaded_weights.pop(weight_type, None)
+            logger.error(f"请求切换 {weight_type} 模型时发生网络异常: {e}")
+
     async def _call_tts_api(self, server_config: dict, text: str, text_language: str, **kwargs) -> bytes | None:
         """
-        最终修复版：先切换模型，然后仅通过路径发送合成请求。
+        先确保服务端加载了该风格的模型（仅在变化时切换），然后仅通过路径发送合成请求。
+
+        同一服务端的切换与合成在锁内串行执行，避免并发请求交替切换模型。
         """
         ref_wav_path = kwargs.get("refer_wav_path")
         if not ref_wav_path:
             logger.error(f"API 调用失败：缺少 refer_wav_path。当前风格配置: {server_config}")
             return None
-        try:
-            base_url = server_config["url"].rstrip("/")
-
-            # --- 步骤一：像稳定版一样，先切换模型 ---
-            async def switch_model_weights(weights_path: str | None, weight_type: str):
-                if not weights_path:
-
-                    return
-                api_endpoint = f"/set_{weight_type}_weights"
-                switch_url = f"{base_url}{api_endpoint}"
-                try:
-                    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
-                        async with session.get(switch_url, params={"weights_path": weights_path}) as resp:
-                            if resp.status != 200:
-                                error_text = await resp.text()
-                                logger.error(f"切换 {weight_type} 模型失败: {resp.status} - {error_text}")
-                            else:
-                                logger.info(f"成功切换 {weight_type} 模型为: {weights_path}")
-                except Exception as e:
-                    logger.error(f"请求切换 {weight_type} 模型时发生网络异常: {e}")
-
-            await switch_model_weights(kwargs.get("gpt_weights"), "gpt")
-            await switch_model_weights(kwargs.get("sovits_weights"), "sovits")
-
-            # --- 步骤二：构建纯净的、不含Base64的请求数据 ---
-            data = {
-                "text": text,
-                "text_lang": text_language,
-                "ref_audio_path": ref_wav_path,
-                "prompt_text": kwargs.get("prompt_text", ""),
-                "prompt_lang": kwargs.get("prompt_language", "zh"),
-                # 在稳定版中，这两个参数是通过API切换的，而不是直接放在请求体里
-                # "gpt_model_path": kwargs.get("gpt_weights"),
-                # "sovits_model_path": kwargs.get("sovits_weights"),
-            }
 
-            # 合并高级配置
-            advanced_config = self.get_config("tts_advanced", {})
-            if isinstance(advanced_config, dict):
-                data.update({k: v for k, v in advanced_config.items() if v is not None})
-
-            # 优先使用风格特定的语速
-            if server_config.get("speed_factor") is not None:
-                data["speed_factor"] = server_config["speed_factor"]
-
-            # --- 步骤三：发送最终的合成请求 ---
-            tts_url = base_url if base_url.endswith("/tts") else f"{base_url}/tts"
-            logger.info(f"发送到 TTS API 的数据: {data}")
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(tts_url, json=data, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
-                    if response.status == 200:
-                        return await response.read()
-                    else:
-                        error_info = await response.text()
-                        logger.error(f"TTS API调用失败: {response.status} - {error_info}")
-                        return None
-        except asyncio.TimeoutError:
-            logger.error("TTS服务请求超时")
-            return None
-        except Exception as e:
-            logger.error(f"TTS API调用异常: {e}")
-            return None
+        base_url = server_config["url"].rstrip("/")
+        state = self._get_server_state(base_url)
+        async with state.lock:
+            try:
+                # --- 步骤一：按需切换模型 ---
+                await self._ensure_weights(state, base_url, kwargs.get("gpt_weights"), "gpt")
+                await self._ensure_weights(state, base_url, kwargs.get("sovits_weights"), "sovits")
+
+                # --- 步骤二：构建纯净的、不含Base64的请求数据 ---
+                data = {
+                    "text": text,
+                    "text_lang": text_language,
+                    "ref_audio_path": ref_wav_path,
+                    "prompt_text": kwargs.get("prompt_text", ""),
+                    "prompt_lang": kwargs.get("prompt_language", "zh"),
+                    # 在稳定版中，这两个参数是通过API切换的，而不是直接放在请求体里
+                    # "gpt_model_path": kwargs.get("gpt_weights"),
+                    # "sovits_model_path": kwargs.get("sovits_weights"),
+                }
+
+                # 合并高级配置
+                advanced_config = self.get_config("tts_advanced", {})
+                if isinstance(advanced_config, dict):
+                    data.update({k: v for k, v in advanced_config.items() if v is not None})
+
+                # 优先使用风格特定的语速
+                if server_config.get("speed_factor") is not None:
+                    data["speed_factor"] = server_config["speed_factor"]
+
+                # --- 步骤三：发送最终的合成请求 ---
+                tts_url = base_url if base_url.endswith("/tts") else f"{base_url}/tts"
+                logger.info(f"发送到 TTS API 的数据: {data}")
+
+                response = await http_api.post(tts_url, json=data, timeout=self.timeout)
+                if response.status == 200:
+                    return response.content
+                else:
+                    # 合成失败时不再信任记录的模型状态（服务端可能已重启）
+                    state.invalidate()
+                    logger.error(f"TTS API调用失败: {response.status} - {response.text()}")
+                    return None
+            except (asyncio.TimeoutError, http_api.HttpClientError) as e:
+                state.invalidate()
+                logger.error(f"TTS服务请求失败: {e}")
+                return None
+            except Exception as e:
+                state.invalidate()
+                logger.error(f"TTS API调用异常: {e}")
+                return None
 
     async def _apply_spatial_audio_effect(self, audio_data: bytes) -> bytes | None:
-        """根据配置应用空间效果（混响和卷积）"""
+        """根据配置应用空间效果（混响和卷积），处理过程在线程池中执行；出错时返回None"""
         try:
             effects_config = self.get_config("spatial_effects", {})
             if not effects_config.get("enabled", False):
@@ -236,50 +286,58 @@ class TTSService:
             bot_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(plugin_file))))
             ir_path = os.path.join(bot_root, "assets", "small_room_ir.wav")
 
-            effects = []
-
-            # 根据配置添加Reverb效果
-            if effects_config.get("reverb_enabled", False):
-                effects.append(Reverb(
-                    room_size=effects_config.get("room_size", 0.15),
-                    damping=effects_config.get("damping", 0.5),
-                    wet_level=effects_config.get("wet_level", 0.33),
-                    dry_level=effects_config.get("dry_level", 0.4),
-                    width=effects_config.get("width", 1.0)
-                ))
-
-            # 根据配置添加Convolution效果
-            if effects_config.get("convolution_enabled", False) and os.path.exists(ir_path):
-                effects.append(Convolution(
-                    impulse_response_filename=ir_path,
-                    mix=effects_config.get("convolution_mix", 0.5)
-                ))
-            elif effects_config.get("convolution_enabled"):
-                logger.warning(f"卷积混响已启用，但IR文件不存在 ({ir_path})，跳过该效果。")
-
-            if not effects:
-
-
-                return audio_data
-
-            # 将原始音频数据加载到内存中的 AudioFile 对象
-            with io.BytesIO(audio_data) as audio_stream:
-                with AudioFile(audio_stream, "r") as f:
-                    board = Pedalboard(effects)
-                    effected = board(f.read(f.frames), f.samplerate)
-
-            # 将处理后的音频数据写回内存中的字节流
-            with io.BytesIO() as output_stream:
-                # 使用 soundfile 写入，因为它更稳定
-                sf.write(output_stream, effected.T, f.samplerate, format="WAV")
-                processed_audio_data = output_stream.getvalue()
-
-            logger.info("成功应用空间效果。")
-            return processed_audio_data
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _effects_executor, self._process_spatial_effects, audio_data, effects_config, ir_path
+            )
 
         except Exception as e:
             logger.error(f"应用空间效果时出错: {e}")
-            return audio_data  # 如果出错，返回原始音频
+            return None  # 由调用方回退到原始音频
+
+    @staticmethod
+    def _process_spatial_effects(audio_data: bytes, effects_config: dict[str, Any], ir_path: str) -> bytes:
+        """构建效果链并处理音频（CPU 密集，在线程池中执行）"""
+        effects = []
+
+        # 根据配置添加Reverb效果
+        if effects_config.get("reverb_enabled", False):
+            effects.append(Reverb(
+                room_size=effects_config.get("room_size", 0.15),
+                damping=effects_config.get("damping", 0.5),
+                wet_level=effects_config.get("wet_level", 0.33),
+                dry_level=effects_config.get("dry_level", 0.4),
+                width=effects_config.get("width", 1.0)
+            ))
+
+        # 根据配置添加Convolution效果
+        if effects_config.get("convolution_enabled", False) and os.path.exists(ir_path):
+            effects.append(Convolution(
+                impulse_response_filename=ir_path,
+                mix=effects_config.get("convolution_mix", 0.5)
+            ))
+        elif effects_config.get("convolution_enabled"):
+            logger.warning(f"卷积混响已启用，但IR文件不存在 ({ir_path})，跳过该效果。")
+
+        if not effects:
+
+
+            return audio_data
+
+        # 将原始音频数据加载到内存中的 AudioFile 对象
+        with io.BytesIO(audio_data) as audio_stream:
+            with AudioFile(audio_stream, "r") as f:
+                board = Pedalboard(effects)
+                effected = board(f.read(f.frames), f.samplerate)
+
+        # 将处理后的音频数据写回内存中的字节流
+        with io.BytesIO() as output_stream:
+            # 使用 soundfile 写入，因为它更稳定
+            sf.write(output_stream, effected.T, f.samplerate, format="WAV")
+            processed_audio_data = output_stream.getvalue()
+
+        logger.info("成功应用空间效果。")
+        return processed_audio_data
 
     async def generate_voice(self, text: str, style_hint: str = "default", language_hint: str | None = None) -> str | None:
         self._load_config()
@@ -317,6 +375,24 @@ class TTSService:
             final_language = self._determine_final_language(clean_text, language_policy)
             logger.info(f"决策模型未指定语言，使用策略 '{language_policy}' -> 最终语言: {final_language}")
 
+        # 相同文本、风格、语言与音效配置的音频直接复用
+        spatial_config = self.get_config("spatial_effects", {})
+        cache_key = None
+        if self.audio_cache_enabled and self._audio_cache is not None:
+            cache_key = self._audio_cache.make_key(
+                clean_text,
+                server_config,
+                final_language,
+                {
+                    "tts_advanced": self.get_config("tts_advanced", {}),
+                    "spatial_effects": spatial_config if spatial_config.get("enabled", False) else None,
+                },
+            )
+            cached_audio = await self._audio_cache.get(cache_key)
+            if cached_audio:
+                logger.info(f"TTS音频缓存命中，文本：{clean_text[:50]}..., 风格：{style}")
+                return base64.b64encode(cached_audio).decode("utf-8")
+
         logger.info(f"开始TTS语音合成，文本：{clean_text[:50]}..., 风格：{style}, 最终语言: {final_language}")
 
         audio_data = await self._call_tts_api(
@@ -330,7 +406,6 @@ class TTSService:
 
         if audio_data:
             # 检查是否启用空间音频效果
-            spatial_config = self.get_config("spatial_effects", {})
             if spatial_config.get("enabled", False):
                 logger.info("检测到已启用空间音频效果，开始处理...")
                 processed_audio = await self._apply_spatial_audio_effect(audio_data)
@@ -339,6 +414,10 @@ class TTSService:
                     audio_data = processed_audio
                 else:
                     logger.warning("空间音频效果应用失败，将使用原始音频。")
+                    cache_key = None  # 与配置不符的结果不写入缓存
+
+            if cache_key is not None and self._audio_cache is not None:
+                await self._audio_cache.put(cache_key, audio_data)
 
             return base64.b64encode(audio_data).decode("utf-8")
         return None
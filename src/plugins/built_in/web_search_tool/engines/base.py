@@ -30,6 +30,12 @@ class BaseSearchEngine(ABC):
         """
         return None
 
+    async def close(self) -> None:
+        """
+        释放引擎持有的连接池等资源
+        """
+        return None
+
     @abstractmethod
     def is_available(self) -> bool:
         """
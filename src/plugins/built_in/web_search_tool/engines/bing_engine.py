@@ -3,12 +3,11 @@ Bing search engine implementation
 """
 
 import asyncio
-import functools
 import random
 import traceback
 from typing import Any
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
 
 from src.common.logger import get_logger
@@ -56,6 +55,16 @@ HEADERS = {
 
 bing_search_url = "https://www.bing.com/search?q="
 
+# 必要的Cookie
+COOKIES = {
+    "SRCHHPGUSR": "SRCHLANG=zh-Hans",  # 设置默认搜索语言为中文
+    "SRCHD": "AF=NOFORM",
+    "SRCHUID": "V=2&GUID=1A4D4F1C8844493F9A2E3DB0D1BC806C",
+    "_SS": "SID=0D89D9A3C95C60B62E7AC80CC85461B3",
+    "_EDGE_S": "ui=zh-cn",  # 设置界面语言为中文
+    "_EDGE_V": "1",
+}
+
 
 class BingSearchEngine(BaseSearchEngine):
     """
@@ -63,8 +72,24 @@ class BingSearchEngine(BaseSearchEngine):
     """
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers = HEADERS
+        # 复用同一个连接池，避免每次查询都重新建立 TLS 连接
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=HEADERS,
+                cookies=COOKIES,
+                follow_redirects=True,
+                timeout=httpx.Timeout(6.0, connect=3.05),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     def is_available(self) -> bool:
         """检查Bing搜索引擎是否可用"""
@@ -77,16 +102,13 @@ class BingSearchEngine(BaseSearchEngine):
         time_range = args.get("time_range", "any")
 
         try:
-            loop = asyncio.get_running_loop()
-            func = functools.partial(self._search_sync, query, num_results, time_range)
-            search_response = await loop.run_in_executor(None, func)
-            return search_response
+            return await self._search(query, num_results, time_range)
         except Exception as e:
             logger.error(f"Bing 搜索失败: {e}")
             return []
 
-    def _search_sync(self, keyword: str, num_results: int, time_range: str) -> list[dict[str, Any]]:
-        """同步执行Bing搜索"""
+    async def _search(self, keyword: str, num_results: int, time_range: str) -> list[dict[str, Any]]:
+        """执行Bing搜索：请求走共享连接池，HTML 解析放到线程中执行"""
         if not keyword:
             return []
 
@@ -102,7 +124,8 @@ class BingSearchEngine(BaseSearchEngine):
             search_url += "&qft=+filterui:date-range-30"
 
         try:
-            data = self._parse_html(search_url)
+            html = await self._fetch(search_url)
+            data = await asyncio.to_thread(self._parse_html, html) if html else []
             if data:
                 list_result.extend(data)
                 logger.debug(f"Bing搜索 [{keyword}] 找到 {len(data)} 个结果")
@@ -114,68 +137,57 @@ class BingSearchEngine(BaseSearchEngine):
         logger.debug(f"Bing搜索 [{keyword}] 完成，总共 {len(list_result)} 个结果")
         return list_result[:num_results] if len(list_result) > num_results else list_result
 
-    @staticmethod
-    def _parse_html(url: str) -> list[dict[str, Any]]:
-        """解析处理结果"""
+    async def _fetch(self, url: str) -> str | None:
+        """请求搜索页面，失败或被拦截时返回None"""
+        logger.debug(f"访问Bing搜索URL: {url}")
+        client = self._get_client()
+
+        # 为每次请求随机选择不同的用户代理，降低被屏蔽风险
+        headers = {"User-Agent": random.choice(user_agents)}
+
+        # 发送请求
         try:
-            logger.debug(f"访问Bing搜索URL: {url}")
-
-            # 设置必要的Cookie
-            cookies = {
-                "SRCHHPGUSR": "SRCHLANG=zh-Hans",  # 设置默认搜索语言为中文
-                "SRCHD": "AF=NOFORM",
-                "SRCHUID": "V=2&GUID=1A4D4F1C8844493F9A2E3DB0D1BC806C",
-                "_SS": "SID=0D89D9A3C95C60B62E7AC80CC85461B3",
-                "_EDGE_S": "ui=zh-cn",  # 设置界面语言为中文
-                "_EDGE_V": "1",
-            }
-
-            # 为每次请求随机选择不同的用户代理，降低被屏蔽风险
-            headers = HEADERS.copy()
-            headers["User-Agent"] = random.choice(user_agents)
-
-            # 创建新的session
-            session = requests.Session()
-            session.headers.update(headers)
-            session.cookies.update(cookies)
-
-            # 发送请求
+            res = await client.get(url, headers=headers)
+        except (httpx.TimeoutException, httpx.ConnectError) as e:
+            logger.warning(f"第一次请求超时，正在重试: {e!s}")
             try:
-                res = session.get(url=url, timeout=(3.05, 6), verify=True, allow_redirects=True)
-            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-                logger.warning(f"第一次请求超时，正在重试: {e!s}")
-                try:
-                    res = session.get(url=url, timeout=(5, 10), verify=False)
-                except Exception as e2:
-                    logger.error(f"第二次请求也失败: {e2!s}")
-                    return []
+                res = await client.get(url, headers=headers, timeout=httpx.Timeout(10.0, connect=5.0))
+            except Exception as e2:
+                logger.error(f"第二次请求也失败: {e2!s}")
+                return None
 
-            res.encoding = "utf-8"
+        # 检查响应状态
+        if res.status_code == 403:
+            logger.error("被禁止访问 (403 Forbidden)，可能是IP被限制")
+            return None
 
-            # 检查响应状态
-            if res.status_code == 403:
-                logger.error("被禁止访问 (403 Forbidden)，可能是IP被限制")
-                return []
+        if res.status_code != 200:
+            logger.error(f"必应搜索请求失败，状态码: {res.status_code}")
+            return None
 
-            if res.status_code != 200:
-                logger.error(f"必应搜索请求失败，状态码: {res.status_code}")
-                return []
+        # 检查是否被重定向到登录页面或验证页面
+        final_url = str(res.url)
+        if "login.live.com" in final_url or "login.microsoftonline.com" in final_url:
+            logger.error("被重定向到登录页面，可能需要登录")
+            return None
 
-            # 检查是否被重定向到登录页面或验证页面
-            if "login.live.com" in res.url or "login.microsoftonline.com" in res.url:
-                logger.error("被重定向到登录页面，可能需要登录")
-                return []
+        if "https://www.bing.com/ck/a" in final_url:
+            logger.error("被重定向到验证页面，可能被识别为机器人")
+            return None
 
-            if "https://www.bing.com/ck/a" in res.url:
-                logger.error("被重定向到验证页面，可能被识别为机器人")
-                return []
+        res.encoding = "utf-8"
+        return res.text
 
+    @staticmethod
+    def _parse_html(html: str) -> list[dict[str, Any]]:
+        """解析处理结果"""
+        try:
             # 解析HTML
             try:
-                root = BeautifulSoup(res.text, "lxml")
+                root = BeautifulSoup(html, "lxml")
             except Exception:
                 try:
-                    root = BeautifulSoup(res.text, "html.parser")
+                    root = BeautifulSoup(html, "html.parser")
                 except Exception as e:
                     logger.error(f"HTML解析失败: {e!s}")
                     return []
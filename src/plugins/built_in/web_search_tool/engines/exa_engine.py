@@ -2,12 +2,10 @@
 Exa search engine implementation
 """
 
-import asyncio
-import functools
 from datetime import datetime, timedelta
 from typing import Any
 
-from exa_py import Exa
+from exa_py import AsyncExa
 
 from src.common.logger import get_logger
 from src.plugin_system.apis import config_api
@@ -31,8 +29,8 @@ class ExaSearchEngine(BaseSearchEngine):
         # 从主配置文件读取API密钥
         exa_api_keys = config_api.get_global_config("web_search.exa_api_keys", None)
 
-        # 创建API密钥管理器
-        self.api_manager = create_api_key_manager_from_config(exa_api_keys, lambda key: Exa(api_key=key), "Exa")
+        # 创建API密钥管理器（异步客户端内部持有连接池，随引擎实例复用）
+        self.api_manager = create_api_key_manager_from_config(exa_api_keys, lambda key: AsyncExa(api_key=key), "Exa")
 
     def is_available(self) -> bool:
         """检查Exa搜索引擎是否可用"""
@@ -68,10 +66,8 @@ class ExaSearchEngine(BaseSearchEngine):
                 logger.error("无法获取Exa客户端")
                 return []
 
-            loop = asyncio.get_running_loop()
             # 使用 search_and_contents 方法
-            func = functools.partial(exa_client.search_and_contents, **exa_args)
-            search_response = await loop.run_in_executor(None, func)
+            search_response = await exa_client.search_and_contents(**exa_args)
 
             # 优化结果处理 - 更注重答案质量
             results = []
@@ -126,9 +122,7 @@ class ExaSearchEngine(BaseSearchEngine):
             if not exa_client:
                 return []
 
-            loop = asyncio.get_running_loop()
-            func = functools.partial(exa_client.search_and_contents, **exa_args)
-            search_response = await loop.run_in_executor(None, func)
+            search_response = await exa_client.search_and_contents(**exa_args)
 
             # 极简结果处理 - 只保留最核心信息
             results = []
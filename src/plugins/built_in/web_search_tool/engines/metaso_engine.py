@@ -26,6 +26,18 @@ class MetasoClient:
             "Accept": "application/json",
             "Content-Type": "application/json",
         }
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Reuse one connection pool for all requests made with this key."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=90.0, headers=self.headers)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def search(self, query: str, **kwargs) -> list[dict[str, Any]]:
         """Perform a search using the Metaso Chat Completions API."""
@@ -33,44 +45,44 @@ class MetasoClient:
         search_url = f"{self.base_url}/chat/completions"
         full_response_content = ""
 
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            try:
-                async with client.stream("POST", search_url, headers=self.headers, json=payload) as response:
-                    response.raise_for_status()
-                    async for line in response.aiter_lines():
-                        if line.startswith("data:"):
-                            data_str = line[len("data:") :].strip()
-                            if data_str == "[DONE]":
-                                break
-                            try:
-                                data = orjson.loads(data_str)
-                                delta = data.get("choices", [{}])[0].get("delta", {})
-                                content_chunk = delta.get("content")
-                                if content_chunk:
-                                    full_response_content += content_chunk
-                            except orjson.JSONDecodeError:
-                                logger.warning(f"Metaso stream: could not decode JSON line: {data_str}")
-                                continue
-
-                if not full_response_content:
-                    logger.warning("Metaso search returned an empty stream.")
-                    return []
-
-                return [
-                    {
-                        "title": query,
-                        "url": "https://metaso.cn/",
-                        "snippet": full_response_content,
-                        "provider": "Metaso (Chat)",
-                    }
-                ]
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error occurred while searching with Metaso Chat: {e.response.text}")
-                return []
-            except Exception as e:
-                logger.error(f"An error occurred while searching with Metaso Chat: {e}")
+        client = self._get_client()
+        try:
+            async with client.stream("POST", search_url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line.startswith("data:"):
+                        data_str = line[len("data:") :].strip()
+                        if data_str == "[DONE]":
+                            break
+                        try:
+                            data = orjson.loads(data_str)
+                            delta = data.get("choices", [{}])[0].get("delta", {})
+                            content_chunk = delta.get("content")
+                            if content_chunk:
+                                full_response_content += content_chunk
+                        except orjson.JSONDecodeError:
+                            logger.warning(f"Metaso stream: could not decode JSON line: {data_str}")
+                            continue
+
+            if not full_response_content:
+                logger.warning("Metaso search returned an empty stream.")
                 return []
 
+            return [
+                {
+                    "title": query,
+                    "url": "https://metaso.cn/",
+                    "snippet": full_response_content,
+                    "provider": "Metaso (Chat)",
+                }
+            ]
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error occurred while searching with Metaso Chat: {e.response.text}")
+            return []
+        except Exception as e:
+            logger.error(f"An error occurred while searching with Metaso Chat: {e}")
+            return []
+
 
 class MetasoSearchEngine(BaseSearchEngine):
     """Metaso Search Engine implementation."""
@@ -85,6 +97,11 @@ class MetasoSearchEngine(BaseSearchEngine):
             metaso_api_keys, lambda key: MetasoClient(api_key=key), "Metaso"
         )
 
+    async def close(self) -> None:
+        """Close the connection pools held by every Metaso client."""
+        for client in self.api_manager.clients:
+            await client.close()
+
     def is_available(self) -> bool:
         """Check if the Metaso search engine is available."""
         return self.api_manager.is_available()
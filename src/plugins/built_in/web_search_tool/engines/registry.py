@@ -0,0 +1,51 @@
+"""
+搜索引擎实例注册表
+
+工具实例按调用创建，引擎及其持有的连接池则在进程内共享，
+避免每次搜索都重新创建 SDK 客户端和 HTTP 连接。
+"""
+
+from src.common.logger import get_logger
+
+from .base import BaseSearchEngine
+
+logger = get_logger("web_search_engines")
+
+_engines: dict[str, BaseSearchEngine] | None = None
+
+
+def get_search_engines() -> dict[str, BaseSearchEngine]:
+    """获取共享的搜索引擎实例（首次调用时创建）"""
+    global _engines
+    if _engines is None:
+        from .bing_engine import BingSearchEngine
+        from .ddg_engine import DDGSearchEngine
+        from .exa_engine import ExaSearchEngine
+        from .metaso_engine import MetasoSearchEngine
+        from .searxng_engine import SearXNGSearchEngine
+        from .serper_engine import SerperSearchEngine
+        from .tavily_engine import TavilySearchEngine
+
+        _engines = {
+            "exa": ExaSearchEngine(),
+            "tavily": TavilySearchEngine(),
+            "ddg": DDGSearchEngine(),
+            "bing": BingSearchEngine(),
+            "searxng": SearXNGSearchEngine(),
+            "metaso": MetasoSearchEngine(),
+            "serper": SerperSearchEngine(),
+        }
+    return _engines
+
+
+async def close_search_engines() -> None:
+    """关闭所有引擎持有的连接池，下次获取时重新创建"""
+    global _engines
+    if _engines is None:
+        return
+    engines, _engines = _engines, None
+    for name, engine in engines.items():
+        try:
+            await engine.close()
+        except Exception as e:
+            logger.warning(f"关闭搜索引擎 {name} 失败: {e}")
@@ -136,8 +136,11 @@ class SearXNGSearchEngine(BaseSearchEngine):
 
         return parsed
 
+    async def close(self) -> None:
+        await self._client.aclose()
+
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        await self._client.aclose()
+        await self.close()
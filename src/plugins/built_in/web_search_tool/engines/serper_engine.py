@@ -5,10 +5,8 @@ Google Search via Serper.dev API
 
 from typing import Any
 
-import aiohttp
-
 from src.common.logger import get_logger
-from src.plugin_system.apis import config_api
+from src.plugin_system.apis import config_api, http_api
 
 from ..utils.api_key_manager import create_api_key_manager_from_config
 from .base import BaseSearchEngine
@@ -80,19 +78,13 @@ class SerperSearchEngine(BaseSearchEngine):
 
         try:
             # 执行搜索请求
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url,
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Serper API错误: {response.status} - {error_text}")
-                        return []
-
-                    data = await response.json()
+            # 使用插件共享的连接池
+            response = await http_api.post(url, json=payload, headers=headers, timeout=10)
+            if response.status != 200:
+                logger.error(f"Serper API错误: {response.status} - {response.text()}")
+                return []
+
+            data = response.json()
 
             # 处理搜索结果
             results = []
@@ -132,7 +124,7 @@ class SerperSearchEngine(BaseSearchEngine):
             logger.info(f"Serper搜索成功: 查询='{query}', 结果数={len(results)}")
             return results
 
-        except aiohttp.ClientError as e:
+        except http_api.HttpClientError as e:
             logger.error(f"Serper 网络请求失败: {e}")
             return []
         except Exception as e:
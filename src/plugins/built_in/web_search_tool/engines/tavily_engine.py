@@ -2,11 +2,9 @@
 Tavily search engine implementation
 """
 
-import asyncio
-import functools
 from typing import Any
 
-from tavily import TavilyClient
+from tavily import AsyncTavilyClient
 
 from src.common.logger import get_logger
 from src.plugin_system.apis import config_api
@@ -30,9 +28,9 @@ class TavilySearchEngine(BaseSearchEngine):
         # 从主配置文件读取API密钥
         tavily_api_keys = config_api.get_global_config("web_search.tavily_api_keys", None)
 
-        # 创建API密钥管理器
+        # 创建API密钥管理器（异步客户端随引擎实例复用）
         self.api_manager = create_api_key_manager_from_config(
-            tavily_api_keys, lambda key: TavilyClient(api_key=key), "Tavily"
+            tavily_api_keys, lambda key: AsyncTavilyClient(api_key=key), "Tavily"
         )
 
     def is_available(self) -> bool:
@@ -71,9 +69,7 @@ class TavilySearchEngine(BaseSearchEngine):
             elif time_range == "month":
                 search_params["days"] = 30
 
-            loop = asyncio.get_running_loop()
-            func = functools.partial(tavily_client.search, **search_params)
-            search_response = await loop.run_in_executor(None, func)
+            search_response = await tavily_client.search(**search_params)
 
             results = []
             if search_response and "results" in search_response:
@@ -39,32 +39,20 @@ class WEBSEARCHPLUGIN(BasePlugin):
         # 立即初始化所有搜索引擎，触发API密钥管理器的日志输出
         logger.info("🚀 正在初始化所有搜索引擎...")
         try:
-            from .engines.bing_engine import BingSearchEngine
-            from .engines.ddg_engine import DDGSearchEngine
-            from .engines.exa_engine import ExaSearchEngine
-            from .engines.metaso_engine import MetasoSearchEngine
-            from .engines.searxng_engine import SearXNGSearchEngine
-            from .engines.serper_engine import SerperSearchEngine
-            from .engines.tavily_engine import TavilySearchEngine
-
-            # 实例化所有搜索引擎，这会触发API密钥管理器的初始化
-            exa_engine = ExaSearchEngine()
-            tavily_engine = TavilySearchEngine()
-            ddg_engine = DDGSearchEngine()
-            bing_engine = BingSearchEngine()
-            searxng_engine = SearXNGSearchEngine()
-            metaso_engine = MetasoSearchEngine()
-            serper_engine = SerperSearchEngine()
+            from .engines.registry import get_search_engines
+
+            # 获取共享的引擎实例，这会触发API密钥管理器的初始化
+            engines = get_search_engines()
 
              # 报告每个引擎的状态
             engines_status = {
-                "Exa": exa_engine.is_available(),
-                "Tavily": tavily_engine.is_available(),
-                "DuckDuckGo": ddg_engine.is_available(),
-                "Bing": bing_engine.is_available(),
-                "SearXNG": searxng_engine.is_available(),
-                "Metaso": metaso_engine.is_available(),
-                "Serper": serper_engine.is_available(),
+                "Exa": engines["exa"].is_available(),
+                "Tavily": engines["tavily"].is_available(),
+                "DuckDuckGo": engines["ddg"].is_available(),
+                "Bing": engines["bing"].is_available(),
+                "SearXNG": engines["searxng"].is_available(),
+                "Metaso": engines["metaso"].is_available(),
+                "Serper": engines["serper"].is_available(),
             }
 
             available_engines = [name for name, available in engines_status.items() if available]
@@ -104,6 +92,14 @@ class WEBSEARCHPLUGIN(BasePlugin):
         },
     }
 
+    async def on_plugin_unloaded(self):
+        """插件卸载时关闭搜索引擎与URL解析的连接池"""
+        from .engines.registry import close_search_engines
+        from .tools.url_parser import close_http_clients
+
+        await close_search_engines()
+        await close_http_clients()
+
     def get_plugin_components(self) -> list[tuple[ComponentInfo, type]]:
         """
         获取插件组件列表
@@ -4,10 +4,10 @@ URL parser tool implementation
 
 import asyncio
 import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, ClassVar
 
 import httpx
-from bs4 import BeautifulSoup
 from exa_py import Exa
 
 from src.common.cache_manager import tool_cache
@@ -17,10 +17,25 @@ from src.plugin_system.apis import config_api
 
 from ..utils.api_key_manager import create_api_key_manager_from_config
 from ..utils.formatters import format_url_parse_results
-from ..utils.url_utils import parse_urls_from_input, validate_urls
+from ..utils.page_cache import MAX_DOCUMENT_BYTES, ExtractedPage, extract_page, get_page_cache, hash_content
+from ..utils.url_utils import normalize_url, parse_urls_from_input, validate_urls
 
 logger = get_logger("url_parser_tool")
 
+# HTML 提取线程池，避免解析大页面时阻塞事件循环
+_extract_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="url_extract")
+
+# 按代理配置复用的连接池
+_http_clients: dict[str, httpx.AsyncClient] = {}
+
+
+async def close_http_clients() -> None:
+    """关闭复用的HTTP客户端"""
+    clients = list(_http_clients.values())
+    _http_clients.clear()
+    for client in clients:
+        await client.aclose()
+
 
 class URLParserTool(BaseTool):
     """
@@ -51,52 +66,108 @@ class URLParserTool(BaseTool):
             exa_api_keys, lambda key: Exa(api_key=key), "Exa URL Parser"
         )
 
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """按当前代理配置获取复用的HTTP客户端"""
+        enable_proxy = self.get_config("proxy.enable_proxy", False)
+        client_kwargs: dict[str, Any] = {"timeout": 15.0, "follow_redirects": True}
+        proxy_key = "direct"
+
+        if enable_proxy:
+            socks5_proxy = self.get_config("proxy.socks5_proxy", None)
+            http_proxy = self.get_config("proxy.http_proxy", None)
+            https_proxy = self.get_config("proxy.https_proxy", None)
+
+            # 优先使用SOCKS5代理（全协议代理）
+            if socks5_proxy:
+                client_kwargs["proxy"] = socks5_proxy
+                proxy_key = f"socks5={socks5_proxy}"
+            elif http_proxy or https_proxy:
+                mounts = {}
+                if http_proxy:
+                    mounts["http://"] = httpx.AsyncHTTPTransport(proxy=http_proxy)
+                if https_proxy:
+                    mounts["https://"] = httpx.AsyncHTTPTransport(proxy=https_proxy)
+                client_kwargs["mounts"] = mounts
+                proxy_key = f"http={http_proxy};https={https_proxy}"
+
+        client = _http_clients.get(proxy_key)
+        if client is None or client.is_closed:
+            if proxy_key != "direct":
+                logger.info(f"使用代理配置: {proxy_key}")
+            client = _http_clients[proxy_key] = httpx.AsyncClient(**client_kwargs)
+        return client
+
+    @staticmethod
+    async def _read_limited(response: httpx.Response) -> bytes:
+        """读取响应体，超过 MAX_DOCUMENT_BYTES 后停止读取"""
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= MAX_DOCUMENT_BYTES:
+                logger.debug(f"页面 '{response.url}' 超过 {MAX_DOCUMENT_BYTES} 字节，已截断")
+                break
+        return b"".join(chunks)[:MAX_DOCUMENT_BYTES]
+
+    async def _fetch_page(self, url: str) -> ExtractedPage:
+        """
+        获取并提取页面内容
+
+        新鲜期内直接使用缓存；过期后带 ETag/Last-Modified 条件请求，304 时复用已有内容。
+        文档按内容哈希缓存提取结果，HTML 解析在线程池中执行。
+        """
+        cache = get_page_cache()
+        url_key = normalize_url(url)
+
+        page = cache.get_fresh_page(url_key)
+        if page is not None:
+            logger.debug(f"页面缓存命中: {url}")
+            return page
+
+        entry = cache.get_entry(url_key)
+        headers = entry.conditional_headers() if entry else {}
+
+        async with self._get_http_client().stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and entry is not None:
+                page = cache.revalidated(url_key)
+                if page is not None:
+                    logger.debug(f"页面未修改，复用缓存内容: {url}")
+                    return page
+            response.raise_for_status()
+            body = await self._read_limited(response)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            encoding = response.charset_encoding
+
+        content_hash = hash_content(body)
+        page = cache.lookup_page(content_hash)
+        if page is None:
+            loop = asyncio.get_running_loop()
+            page = await loop.run_in_executor(_extract_executor, extract_page, body, encoding)
+            cache.put_page(content_hash, page)
+        cache.put_entry(url_key, content_hash, etag, last_modified)
+        return page
+
     async def _local_parse_and_summarize(self, url: str) -> dict[str, Any]:
         """
         使用本地库(httpx, BeautifulSoup)解析URL，并调用LLM进行总结。
         """
         try:
-            # 读取代理配置
-            enable_proxy = self.get_config("proxy.enable_proxy", False)
-            proxies = None
-
-            if enable_proxy:
-                socks5_proxy = self.get_config("proxy.socks5_proxy", None)
-                http_proxy = self.get_config("proxy.http_proxy", None)
-                https_proxy = self.get_config("proxy.https_proxy", None)
-
-                # 优先使用SOCKS5代理（全协议代理）
-                if socks5_proxy:
-                    proxies = socks5_proxy
-                    logger.info(f"使用SOCKS5代理: {socks5_proxy}")
-                elif http_proxy or https_proxy:
-                    proxies = {}
-                    if http_proxy:
-                        proxies["http://"] = http_proxy
-                    if https_proxy:
-                        proxies["https://"] = https_proxy
-                    logger.info(f"使用HTTP/HTTPS代理配置: {proxies}")
-
-            client_kwargs = {"timeout": 15.0, "follow_redirects": True}
-            if proxies:
-                client_kwargs["proxies"] = proxies
-
-            async with httpx.AsyncClient(**client_kwargs) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            title = soup.title.string if soup.title else "无标题"
-            for script in soup(["script", "style"]):
-                script.extract()
-            text = soup.get_text(strip=True)
+            page = await self._fetch_page(url)
+            title, text = page.title, page.text
 
             if not text:
 
 
                 return {"error": "无法从页面提取有效文本内容。"}
 
+            # 同一篇文章（正文相同）只总结一次
+            summary = get_page_cache().get_summary(page.text_hash)
+            if summary is not None:
+                logger.info(f"摘要缓存命中: {url}")
+                return {"title": title, "url": url, "snippet": summary, "source": "local"}
+
             summary_prompt = f"请根据以下网页内容，生成一段不超过300字的中文摘要，保留核心信息和关键点:\n\n---\n\n标题: {title}\n\n内容:\n{text[:4000]}\n\n---\n\n摘要:"
 
             text_model = str(self.get_config("models.text_model", "replyer_1"))
@@ -118,6 +189,7 @@ class URLParserTool(BaseTool):
                 logger.info(f"生成摘要失败: {summary}")
                 return {"error": "发生ai错误"}
 
+            get_page_cache().put_summary(page.text_hash, summary)
             logger.info(f"成功生成摘要内容：'{summary}'")
 
             return {"title": title, "url": url, "snippet": summary, "source": "local"}
@@ -3,6 +3,7 @@ Web search tool implementation
 """
 
 import asyncio
+import time
 from typing import Any, ClassVar
 
 from src.common.cache_manager import tool_cache
@@ -10,12 +11,9 @@ from src.common.logger import get_logger
 from src.plugin_system import BaseTool, ToolParamType
 from src.plugin_system.apis import config_api
 
-from ..engines.bing_engine import BingSearchEngine
-from ..engines.ddg_engine import DDGSearchEngine
-from ..engines.exa_engine import ExaSearchEngine
-from ..engines.metaso_engine import MetasoSearchEngine
-from ..engines.searxng_engine import SearXNGSearchEngine
-from ..engines.tavily_engine import TavilySearchEngine
+from ..engines.base import BaseSearchEngine
+from ..engines.registry import get_search_engines
+from ..utils.engine_stats import get_engine_tracker
 from ..utils.formatters import deduplicate_results, format_search_results
 
 logger = get_logger("web_search_tool")
@@ -57,15 +55,8 @@ class WebSurfingTool(BaseTool):
 
     def __init__(self, plugin_config=None, chat_stream=None):
         super().__init__(plugin_config, chat_stream)
-        # 初始化搜索引擎
-        self.engines = {
-            "exa": ExaSearchEngine(),
-            "tavily": TavilySearchEngine(),
-            "ddg": DDGSearchEngine(),
-            "bing": BingSearchEngine(),
-            "searxng": SearXNGSearchEngine(),
-            "metaso": MetasoSearchEngine(),
-        }
+        # 搜索引擎在进程内共享，复用各引擎的客户端与连接池
+        self.engines = get_search_engines()
 
     async def execute(self, function_args: dict[str, Any]) -> dict[str, Any]:
         query = function_args.get("query")
@@ -104,74 +95,110 @@ class WebSurfingTool(BaseTool):
 
         return result
 
+    async def _run_engine(
+        self, engine_name: str, engine: BaseSearchEngine, function_args: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        """调用单个引擎并记录耗时与成败"""
+        custom_args = function_args.copy()
+        custom_args["num_results"] = custom_args.get("num_results", 5)
+
+        tracker = get_engine_tracker()
+        begin = time.perf_counter()
+        try:
+            # 如果启用了answer模式且是Exa引擎，使用answer_search方法
+            if function_args.get("answer_mode", False) and engine_name == "exa" and hasattr(engine, "answer_search"):
+                results = await engine.answer_search(custom_args)  # type: ignore[attr-defined]
+            else:
+                results = await engine.search(custom_args)
+        except asyncio.CancelledError:
+            tracker.record_cancelled(engine_name, time.perf_counter() - begin)
+            raise
+        except Exception:
+            tracker.record(engine_name, time.perf_counter() - begin, success=False)
+            raise
+
+        tracker.record(engine_name, time.perf_counter() - begin, success=bool(results))
+        return results
+
     async def _execute_parallel_search(
         self, function_args: dict[str, Any], enabled_engines: list[str]
     ) -> dict[str, Any]:
-        """并行搜索策略：同时使用所有启用的搜索引擎"""
-        search_tasks = []
-        answer_mode = function_args.get("answer_mode", False)
-
+        """
+        并行搜索策略：同时请求所有启用的搜索引擎，凑够结果即返回
+
+        - 去重后的结果数达到目标时立即返回，取消仍在进行的引擎
+        - 超过延迟预算后，只要已有结果就返回；一个结果都没有时继续等待下一个完成的引擎
+        - 延迟预算为 0 时等待所有引擎完成
+        """
+        tasks: dict[asyncio.Task, str] = {}
         for engine_name in enabled_engines:
             engine = self.engines.get(engine_name)
             if engine and engine.is_available():
-                custom_args = function_args.copy()
-                custom_args["num_results"] = custom_args.get("num_results", 5)
-
-                # 如果启用了answer模式且是Exa引擎，使用answer_search方法
-                if answer_mode and engine_name == "exa" and hasattr(engine, "answer_search"):
-                    search_tasks.append(engine.answer_search(custom_args))
-                else:
-                    search_tasks.append(engine.search(custom_args))
-
-        if not search_tasks:
-
+                task = asyncio.create_task(self._run_engine(engine_name, engine, function_args))
+                tasks[task] = engine_name
 
+        if not tasks:
             return {"error": "没有可用的搜索引擎。"}
 
-        try:
-            search_results_lists = await asyncio.gather(*search_tasks, return_exceptions=True)
-
-            all_results = []
-            for result in search_results_lists:
-                if isinstance(result, list):
-                    all_results.extend(result)
-                elif isinstance(result, Exception):
-                    logger.error(f"搜索时发生错误: {result}")
-
-            # 去重并格式化
-            unique_results = deduplicate_results(all_results)
-            formatted_content = format_search_results(unique_results)
-
-            return {
-                "type": "web_search_result",
-                "content": formatted_content,
-            }
+        num_results = function_args.get("num_results") or 5
+        target = config_api.get_global_config("web_search.parallel_min_results", 0) or num_results
+        budget = config_api.get_global_config("web_search.parallel_latency_budget", 3.0)
+        deadline = time.perf_counter() + budget if budget > 0 else None
 
+        results_by_engine: dict[str, list[dict[str, Any]]] = {}
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.error(f"{tasks[task]} 搜索时发生错误: {e}")
+                        continue
+                    if isinstance(result, list) and result:
+                        results_by_engine[tasks[task]] = result
+
+                unique_count = len(deduplicate_results([r for res in results_by_engine.values() for r in res]))
+                if unique_count >= target:
+                    break
+                if deadline is not None and time.perf_counter() >= deadline:
+                    if unique_count:
+                        break
+                    # 预算耗尽但还没有任何结果：不再限时，之后任意一个引擎返回结果即可
+                    deadline = None
+                    target = 1
         except Exception as e:
             logger.error(f"执行并行网络搜索时发生异常: {e}")
             return {"error": f"执行网络搜索时发生严重错误: {e!s}"}
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.debug(f"已取消未完成的搜索引擎: {[tasks[task] for task in pending]}")
+
+        # 按配置顺序合并，保证同一组引擎结果的排列稳定
+        all_results = [r for name in enabled_engines for r in results_by_engine.get(name, [])]
+        unique_results = deduplicate_results(all_results)
+        formatted_content = format_search_results(unique_results)
+
+        return {
+            "type": "web_search_result",
+            "content": formatted_content,
+        }
 
     async def _execute_fallback_search(
         self, function_args: dict[str, Any], enabled_engines: list[str]
     ) -> dict[str, Any]:
-        """回退搜索策略：按顺序尝试搜索引擎，失败则尝试下一个"""
-        answer_mode = function_args.get("answer_mode", False)
-
-        for engine_name in enabled_engines:
+        """回退搜索策略：按健康度（失败率与平均延迟）依次尝试搜索引擎，失败则尝试下一个"""
+        for engine_name in get_engine_tracker().order(enabled_engines):
             engine = self.engines.get(engine_name)
             if not engine or not engine.is_available():
                 continue
 
             try:
-                custom_args = function_args.copy()
-                custom_args["num_results"] = custom_args.get("num_results", 5)
-
-                # 如果启用了answer模式且是Exa引擎，使用answer_search方法
-                if answer_mode and engine_name == "exa" and hasattr(engine, "answer_search"):
-                    logger.info("使用Exa答案模式进行搜索（fallback策略）")
-                    results = await engine.answer_search(custom_args)
-                else:
-                    results = await engine.search(custom_args)
+                results = await self._run_engine(engine_name, engine, function_args)
 
                 if results:  # 如果有结果，直接返回
                     formatted_content = format_search_results(results)
@@ -188,23 +215,13 @@ class WebSurfingTool(BaseTool):
 
     async def _execute_single_search(self, function_args: dict[str, Any], enabled_engines: list[str]) -> dict[str, Any]:
         """单一搜索策略：只使用第一个可用的搜索引擎"""
-        answer_mode = function_args.get("answer_mode", False)
-
         for engine_name in enabled_engines:
             engine = self.engines.get(engine_name)
             if not engine or not engine.is_available():
                 continue
 
             try:
-                custom_args = function_args.copy()
-                custom_args["num_results"] = custom_args.get("num_results", 5)
-
-                # 如果启用了answer模式且是Exa引擎，使用answer_search方法
-                if answer_mode and engine_name == "exa" and hasattr(engine, "answer_search"):
-                    logger.info("使用Exa答案模式进行搜索")
-                    results = await engine.answer_search(custom_args)
-                else:
-                    results = await engine.search(custom_args)
+                results = await self._run_engine(engine_name, engine, function_args)
 
                 if results:
                     formatted_content = format_search_results(results)
@@ -0,0 +1,133 @@
+"""
+搜索引擎健康度统计
+
+记录每个搜索引擎的延迟（指数加权移动平均）与失败率，
+用于决定 fallback / single 策略的尝试顺序：连续失败的引擎暂时排到最后，
+其余按失败率与平均延迟综合打分，越快越稳定的引擎越先被尝试。
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any
+
+# 延迟与失败率的平滑系数，越大越偏向最近的结果
+EWMA_ALPHA = 0.3
+
+# 连续失败达到该次数后进入冷却，冷却期内排在所有健康引擎之后
+FAILURE_COOLDOWN_THRESHOLD = 3
+FAILURE_COOLDOWN_SECONDS = 120.0
+
+# 失败率折算为延迟惩罚的系数（秒），失败率 100% 相当于额外 10 秒延迟
+FAILURE_PENALTY_SECONDS = 10.0
+
+
+@dataclass
+class EngineStats:
+    """单个搜索引擎的运行统计"""
+
+    latency: float | None = None  # 平均延迟（秒）
+    failure_rate: float = 0.0
+    consecutive_failures: int = 0
+    last_failure_at: float = 0.0
+    calls: int = 0
+    failures: int = 0
+    cancelled: int = 0
+
+    def cooling_down(self, now: float) -> bool:
+        return (
+            self.consecutive_failures >= FAILURE_COOLDOWN_THRESHOLD
+            and now - self.last_failure_at < FAILURE_COOLDOWN_SECONDS
+        )
+
+    def score(self) -> float:
+        """综合得分（越小越好）；没有记录的引擎按 0 分处理，优先获得尝试机会"""
+        latency = self.latency if self.latency is not None else 0.0
+        return latency + self.failure_rate * FAILURE_PENALTY_SECONDS
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "failure_rate": round(self.failure_rate, 3),
+            "consecutive_failures": self.consecutive_failures,
+            "calls": self.calls,
+            "failures": self.failures,
+            "cancelled": self.cancelled,
+        }
+
+
+class EngineHealthTracker:
+    """按引擎名称记录延迟与失败情况"""
+
+    def __init__(self):
+        self._stats: dict[str, EngineStats] = {}
+
+    def _get(self, engine_name: str) -> EngineStats:
+        stats = self._stats.get(engine_name)
+        if stats is None:
+            stats = self._stats[engine_name] = EngineStats()
+        return stats
+
+    def _observe_latency(self, stats: EngineStats, latency: float) -> None:
+        if stats.latency is None:
+            stats.latency = latency
+        else:
+            stats.latency += EWMA_ALPHA * (latency - stats.latency)
+
+    def record(self, engine_name: str, latency: float, success: bool) -> None:
+        """
+        记录一次完成的搜索
+
+        Args:
+            engine_name: 引擎名称
+            latency: 耗时（秒）
+            success: 是否返回了结果（引擎内部吞掉异常后返回空列表，同样视为失败）
+        """
+        stats = self._get(engine_name)
+        stats.calls += 1
+        self._observe_latency(stats, latency)
+        stats.failure_rate += EWMA_ALPHA * ((0.0 if success else 1.0) - stats.failure_rate)
+        if success:
+            stats.consecutive_failures = 0
+        else:
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.last_failure_at = time.monotonic()
+
+    def record_cancelled(self, engine_name: str, elapsed: float) -> None:
+        """
+        记录被提前取消的搜索
+
+        实际延迟至少为 elapsed，按该值计入平均延迟，使总是跑在最后的引擎逐渐排到后面，
+        但不计入失败率。
+        """
+        stats = self._get(engine_name)
+        stats.cancelled += 1
+        if stats.latency is None or elapsed > stats.latency:
+            self._observe_latency(stats, elapsed)
+
+    def order(self, engine_names: list[str]) -> list[str]:
+        """按健康度排序引擎名称，得分相同时保持配置中的顺序"""
+        now = time.monotonic()
+        positions = {name: index for index, name in enumerate(engine_names)}
+        return sorted(
+            engine_names,
+            key=lambda name: (
+                self._get(name).cooling_down(now),
+                self._get(name).score(),
+                positions[name],
+            ),
+        )
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in sorted(self._stats.items())}
+
+
+_engine_tracker: EngineHealthTracker | None = None
+
+
+def get_engine_tracker() -> EngineHealthTracker:
+    """获取搜索引擎健康度统计单例"""
+    global _engine_tracker
+    if _engine_tracker is None:
+        _engine_tracker = EngineHealthTracker()
+    return _engine_tracker
@@ -0,0 +1,172 @@
+"""
+网页内容缓存
+
+URL 解析工具的三级缓存，全部在内存中按 LRU 淘汰：
+- URL 索引：规范化URL -> 校验信息（ETag / Last-Modified）与内容哈希，
+  新鲜期内直接复用，过期后携带条件请求头重新获取，304 时继续使用已有内容
+- 页面内容：原始文档哈希 -> 提取出的标题与正文，内容相同的页面只解析一次
+- 摘要：正文哈希 -> LLM 摘要，同一篇文章以不同URL或跟踪参数分享时只总结一次
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from bs4 import BeautifulSoup
+
+# 单个文档参与解析的最大字节数，超出部分直接丢弃
+MAX_DOCUMENT_BYTES = 2 * 1024 * 1024
+
+# URL 索引的新鲜期（秒），期内不再发起请求
+PAGE_FRESH_SECONDS = 600.0
+
+MAX_URL_ENTRIES = 512
+MAX_PAGE_ENTRIES = 256
+MAX_SUMMARY_ENTRIES = 512
+
+
+@dataclass
+class ExtractedPage:
+    """从文档中提取出的内容"""
+
+    title: str
+    text: str
+    text_hash: str
+
+
+@dataclass
+class UrlEntry:
+    """URL 索引项"""
+
+    content_hash: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now - self.fetched_at < PAGE_FRESH_SECONDS
+
+    def conditional_headers(self) -> dict[str, str]:
+        """重新获取时使用的条件请求头"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def hash_content(content: bytes | str) -> str:
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def extract_page(content: bytes, encoding: str | None = None) -> ExtractedPage:
+    """
+    解析HTML文档，提取标题与正文（CPU 密集，应在线程池中调用）
+
+    Args:
+        content: 原始文档字节，超过 MAX_DOCUMENT_BYTES 的部分会被截断
+        encoding: 响应头声明的字符集，缺省时由 BeautifulSoup 根据文档自行探测
+    """
+    content = content[:MAX_DOCUMENT_BYTES]
+    try:
+        soup = BeautifulSoup(content, "lxml", from_encoding=encoding)
+    except Exception:
+        soup = BeautifulSoup(content, "html.parser", from_encoding=encoding)
+
+    title = soup.title.string if soup.title and soup.title.string else "无标题"
+    for script in soup(["script", "style"]):
+        script.extract()
+    text = soup.get_text(strip=True)
+    return ExtractedPage(title=str(title).strip(), text=text, text_hash=hash_content(text))
+
+
+class PageCache:
+    """URL 索引、页面内容与摘要的内存缓存"""
+
+    def __init__(self):
+        self._urls: OrderedDict[str, UrlEntry] = OrderedDict()
+        self._pages: OrderedDict[str, ExtractedPage] = OrderedDict()
+        self._summaries: OrderedDict[str, str] = OrderedDict()
+        self.stats = {"fresh_hits": 0, "revalidated": 0, "page_hits": 0, "summary_hits": 0, "fetches": 0}
+
+    @staticmethod
+    def _touch(cache: OrderedDict, key: str, value, limit: int) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+
+    def get_entry(self, url_key: str) -> UrlEntry | None:
+        entry = self._urls.get(url_key)
+        if entry is not None and entry.content_hash not in self._pages:
+            # 对应内容已被淘汰，校验信息不再可用
+            del self._urls[url_key]
+            return None
+        return entry
+
+    def get_fresh_page(self, url_key: str) -> ExtractedPage | None:
+        """新鲜期内直接返回页面内容"""
+        entry = self.get_entry(url_key)
+        if entry is None or not entry.is_fresh(time.monotonic()):
+            return None
+        self._urls.move_to_end(url_key)
+        self.stats["fresh_hits"] += 1
+        return self.get_page(entry.content_hash)
+
+    def revalidated(self, url_key: str) -> ExtractedPage | None:
+        """服务器返回 304 时刷新新鲜期并返回已有内容"""
+        entry = self.get_entry(url_key)
+        if entry is None:
+            return None
+        entry.fetched_at = time.monotonic()
+        self._urls.move_to_end(url_key)
+        self.stats["revalidated"] += 1
+        return self.get_page(entry.content_hash)
+
+    def put_entry(self, url_key: str, content_hash: str, etag: str | None, last_modified: str | None) -> None:
+        self.stats["fetches"] += 1
+        entry = UrlEntry(
+            content_hash=content_hash, etag=etag, last_modified=last_modified, fetched_at=time.monotonic()
+        )
+        self._touch(self._urls, url_key, entry, MAX_URL_ENTRIES)
+
+    def get_page(self, content_hash: str) -> ExtractedPage | None:
+        page = self._pages.get(content_hash)
+        if page is not None:
+            self._pages.move_to_end(content_hash)
+        return page
+
+    def lookup_page(self, content_hash: str) -> ExtractedPage | None:
+        """按文档哈希查找已解析的内容（不同URL返回相同文档时复用）"""
+        page = self.get_page(content_hash)
+        if page is not None:
+            self.stats["page_hits"] += 1
+        return page
+
+    def put_page(self, content_hash: str, page: ExtractedPage) -> None:
+        self._touch(self._pages, content_hash, page, MAX_PAGE_ENTRIES)
+
+    def get_summary(self, text_hash: str) -> str | None:
+        summary = self._summaries.get(text_hash)
+        if summary is not None:
+            self._summaries.move_to_end(text_hash)
+            self.stats["summary_hits"] += 1
+        return summary
+
+    def put_summary(self, text_hash: str, summary: str) -> None:
+        self._touch(self._summaries, text_hash, summary, MAX_SUMMARY_ENTRIES)
+
+
+_page_cache: PageCache | None = None
+
+
+def get_page_cache() -> PageCache:
+    """获取网页内容缓存单例"""
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = PageCache()
+    return _page_cache
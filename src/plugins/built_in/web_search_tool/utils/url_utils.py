@@ -3,6 +3,30 @@ URL processing utilities
 """
 
 import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 不影响页面内容的跟踪参数，规范化URL时移除
+TRACKING_PARAMS = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "dclid",
+        "msclkid",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "spm",
+        "spm_id_from",
+        "share_source",
+        "share_medium",
+        "share_plat",
+        "share_tag",
+        "share_from",
+        "vd_source",
+        "from_spmid",
+        "ref_src",
+    }
+)
 
 
 def parse_urls_from_input(urls_input) -> list[str]:
@@ -33,3 +57,26 @@ def validate_urls(urls: list[str]) -> list[str]:
     验证URL格式，返回有效的URL列表
     """
     return [url for url in urls if url.startswith(("http://", "https://"))]
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化URL，用于页面缓存的键
+
+    小写协议与域名，去掉片段、默认端口、跟踪参数（utm_* 等），并对剩余查询参数排序，
+    使同一页面带不同分享参数的链接落到同一个缓存项。
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(query), ""))